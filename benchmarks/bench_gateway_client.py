@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark do cliente HTTPS do gateway contra um servidor TLS local
+
+Compara sondas repetidas ao mesmo gateway em três modos:
+- urllib: conexão e handshake TLS completo a cada requisição (fluxo anterior)
+- retomada: conexão nova por requisição, sessão TLS retomada (max_idle=0)
+- keep-alive: conexão reaproveitada do pool, sem TCP nem TLS
+
+O certificado autoassinado é gerado com o `openssl` do sistema. Com --delay
+o servidor responde após um atraso (tempo de aplicação do gateway).
+"""
+
+import sys
+import os
+import ssl
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.request
+import urllib.error
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.gateway_client import GatewayClient, get_ssl_context
+from src.utils.histogram import LatencyHistogram
+
+
+# Configuração
+DEFAULT_REQUESTS = 200
+PATH = '/remote/saml/start?redirect=1'
+
+
+class GatewayHandler(BaseHTTPRequestHandler):
+    """Responde como o início do SAML do gateway (302) com keep-alive"""
+
+    protocol_version = 'HTTP/1.1'
+    delay = 0.0
+
+    def do_GET(self):
+        if self.delay:
+            time.sleep(self.delay)
+        self.send_response(302)
+        self.send_header('Location', '/remote/saml/login')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_certificate(directory: str) -> str:
+    """Gera certificado + chave autoassinados (PEM único) com o openssl"""
+    path = os.path.join(directory, 'gateway.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-subj', '/CN=localhost', '-keyout', path, '-out', path],
+                   check=True, capture_output=True)
+    return path
+
+
+def start_server(certificate: str, delay: float) -> ThreadingHTTPServer:
+    """Inicia o servidor TLS local em uma porta livre"""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certificate)
+    GatewayHandler.delay = delay
+    server = ThreadingHTTPServer(('127.0.0.1', 0), GatewayHandler)
+    server.daemon_threads = True
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def probe_urllib(port: int):
+    """Fluxo anterior: urlopen com contexto e handshake novos"""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    request = urllib.request.Request(f"https://127.0.0.1:{port}{PATH}", headers={'User-Agent': 'VPN-Client/1.0'})
+    opener = urllib.request.build_opener(urllib.request.HTTPSHandler(context=context),
+                                         NoRedirect())
+    try:
+        opener.open(request, timeout=10).close()
+    except urllib.error.HTTPError as e:
+        e.close()
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Não segue o 302 (compara só a sonda)"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def run(label: str, func, requests: int) -> LatencyHistogram:
+    """Executa func N vezes e imprime p50/p99 em µs"""
+    histogram = LatencyHistogram()
+    func()  # aquecimento (primeira conexão / primeiro ticket TLS)
+    for _ in range(requests):
+        start = time.perf_counter_ns()
+        func()
+        histogram.record((time.perf_counter_ns() - start) // 1000)
+    summary = histogram.summary()
+    print(f"{label:<28} p50 {summary['p50']:>7} µs | p99 {summary['p99']:>7} µs | média {summary['mean']:>9.1f} µs")
+    return histogram
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark do cliente HTTPS do gateway (servidor TLS local)")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS,
+                        help=f"Requisições por modo (padrão: {DEFAULT_REQUESTS})")
+    parser.add_argument("--delay", type=float, default=0.0, help="Atraso da resposta do servidor em segundos")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            certificate = make_certificate(directory)
+        except (OSError, subprocess.CalledProcessError):
+            print("❌ openssl não encontrado: necessário para gerar o certificado de teste")
+            sys.exit(1)
+        server = start_server(certificate, args.delay)
+        port = server.server_address[1]
+
+        print(f"🧪 Sondas ao gateway local (TLS em 127.0.0.1:{port}, {args.requests} por modo)")
+        print("-" * 78)
+        resumed_client = GatewayClient('127.0.0.1', port, max_idle=0)
+        pooled_client = GatewayClient('127.0.0.1', port)
+        run('urllib (handshake completo)', lambda: probe_urllib(port), args.requests)
+        run('retomada de sessão TLS', lambda: resumed_client.request('GET', PATH), args.requests)
+        run('keep-alive (pool)', lambda: pooled_client.request('GET', PATH), args.requests)
+        server.shutdown()
+
+    print()
+    for label, client in (('retomada', resumed_client), ('keep-alive', pooled_client)):
+        stats = client.stats()
+        print(f"📊 {label:<11} conexões {stats['connections']:>4} | TLS retomado {stats['resumed']:>4} | "
+              f"reaproveitadas {stats['reused']:>4} | handshake p50 {stats['connect_latency']['p50']} µs")
+    print(f"🔐 Contexto TLS compartilhado: {get_ssl_context() is resumed_client.context}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pool de gateways contra listeners TLS locais com atrasos injetados
+
+Cada gateway falso é uma porta em 127.0.0.1 que aceita o TCP na hora e
+atrasa o handshake TLS pelo tempo configurado. Há também uma porta fechada
+(conexão recusada) e um "buraco negro" que aceita o TCP e nunca responde ao
+TLS. Verifica o ranking, o tempo da corrida contra sondas em série, o custo
+do select() com o ranking em cache, o failover e a expiração do TTL.
+"""
+
+import sys
+import os
+import ssl
+import time
+import socket
+import argparse
+import tempfile
+import threading
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_gateway_client import make_certificate
+from src.core.gateway_pool import GatewayPool, probe_candidate, parse_gateway
+
+
+# Configuração
+DEFAULT_DELAYS = (0.15, 0.0, 0.07)  # segundos de atraso do handshake por gateway
+RACE_TIMEOUT = 1.0
+SELECTS = 10000
+
+
+def serve_tls(certificate: str, delay: float) -> int:
+    """Listener TLS que atrasa cada handshake; retorna a porta"""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certificate)
+    listener = socket.create_server(('127.0.0.1', 0))
+
+    def handle(conn):
+        try:
+            time.sleep(delay)
+            with context.wrap_socket(conn, server_side=True) as tls:
+                tls.recv(1)
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def accept_loop():
+        while True:
+            conn, _ = listener.accept()
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=accept_loop, daemon=True).start()
+    return listener.getsockname()[1]
+
+
+def blackhole() -> int:
+    """Aceita o TCP (backlog do kernel) e nunca faz o handshake"""
+    listener = socket.create_server(('127.0.0.1', 0))
+    blackhole.listeners.append(listener)
+    return listener.getsockname()[1]
+
+
+blackhole.listeners = []
+
+
+def closed_port() -> int:
+    """Porta sem listener"""
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def check(label: str, ok: bool, detail: str = '') -> bool:
+    """Imprime o resultado de uma verificação"""
+    print(f"{'✓' if ok else '✗'} {label}{f' ({detail})' if detail else ''}")
+    return ok
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark do pool de gateways (listeners TLS locais)")
+    parser.add_argument("--delays", type=str, default=','.join(f'{d:g}' for d in DEFAULT_DELAYS),
+                        help="Atrasos de handshake em segundos, separados por vírgula")
+    parser.add_argument("--timeout", type=float, default=RACE_TIMEOUT, help="Prazo da corrida em segundos")
+    args = parser.parse_args()
+    delays = [float(value) for value in args.delays.split(',')]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            certificate = make_certificate(directory)
+        except Exception:
+            print("❌ openssl não encontrado: necessário para gerar o certificado de teste")
+            sys.exit(1)
+        candidates = []
+        for index, delay in enumerate(delays):
+            candidate = parse_gateway(f"127.0.0.1:{serve_tls(certificate, delay)}")
+            candidate['name'] = f"gw{index + 1}-{delay * 1000:g}ms"
+            candidates.append(candidate)
+        candidates.append(dict(parse_gateway(f"127.0.0.1:{closed_port()}"), name='fechado'))
+        candidates.append(dict(parse_gateway(f"127.0.0.1:{blackhole()}"), name='buraco-negro'))
+
+        print(f"🧪 Corrida entre {len(candidates)} gateways locais (prazo {args.timeout:g}s)")
+        print("-" * 72)
+        pool = GatewayPool(candidates, timeout=args.timeout)
+        start = time.perf_counter()
+        ranking = pool.race()
+        race_time = time.perf_counter() - start
+        for result in ranking:
+            if result['healthy']:
+                print(f"   ✅ {result['name']:<16} total {result['total_ms']:7.1f} ms | "
+                      f"TCP {result['tcp_ms']:5.2f} ms | TLS {result['tls_ms']:7.1f} ms")
+            else:
+                print(f"   ❌ {result['name']:<16} {result['error']}")
+
+        start = time.perf_counter()
+        for candidate in candidates:
+            probe_candidate(candidate, args.timeout)
+        serial_time = time.perf_counter() - start
+        print()
+        print(f"corrida concorrente        {race_time * 1000:8.1f} ms")
+        print(f"sondas em série            {serial_time * 1000:8.1f} ms")
+
+        start = time.perf_counter_ns()
+        for _ in range(SELECTS):
+            choice = pool.select()
+        select_ns = (time.perf_counter_ns() - start) / SELECTS
+        print(f"select() com ranking em cache {select_ns / 1000:5.2f} µs")
+        print()
+
+        fastest = candidates[delays.index(min(delays))]['name']
+        healthy = [result['name'] for result in ranking if result['healthy']]
+        expected = [candidates[index]['name'] for index in sorted(range(len(delays)), key=lambda i: delays[i])]
+        results.append(check("mais rápido escolhido", choice['name'] == fastest, choice['name']))
+        results.append(check("saudáveis ranqueados por tempo", healthy == expected, ' > '.join(healthy)))
+        results.append(check("fechado e buraco negro fora", len(healthy) == len(delays)))
+        results.append(check("corrida não espera o buraco negro nem a soma das sondas",
+                             race_time < args.timeout and race_time < serial_time,
+                             f"{race_time:.2f}s vs {serial_time:.2f}s"))
+        results.append(check("select() em cache não abre sockets", select_ns < 100_000, f"{select_ns / 1000:.2f} µs"))
+
+        pool.mark_failed(fastest)
+        results.append(check("failover para o próximo do ranking", pool.select()['name'] == expected[1],
+                             pool.select()['name']))
+
+        pool.ttl = 0.05
+        ranked_at = pool.ranked_at
+        time.sleep(0.1)
+        pool.select()
+        results.append(check("ranking refeito após o TTL", pool.ranked_at != ranked_at and not pool.failed))
+
+    print()
+    if all(results):
+        print("✅ Todas as verificações passaram")
+    else:
+        print("❌ Verificações falharam")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
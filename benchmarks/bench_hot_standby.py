@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Benchmark do túnel reserva: troca de rotas na queda contra reconexão a frio
+
+Coloca no PATH um `sudo` que só executa o comando, um `az` com token fixo e
+um `openfortivpn` que cria uma interface (par veth nomeado pela porta), leva
+um atraso de autenticação configurável e imprime a saída de um túnel que
+subiu. Sem '--set-routes=0' ele instala as rotas "do gateway" (198.18.0.0/15,
+faixa de benchmark) na própria interface; no SIGTERM remove a interface, como
+o pppd faz. As rotas são conferidas com `ip route get`. O DNS aplicado por
+interface é sempre registrado em memória (o namespace não tem resolvedor).
+
+Como root e com `unshare`, roda em um namespace de rede próprio. Sem
+permissão para criar interfaces, as rotas são só registradas em memória.
+
+Mede: tempo da troca quando o openfortivpn ativo morre e quando o peer é
+declarado morto, tempo até a sessão antiga voltar como reserva, e a
+reconexão a frio de um ConnectionManager com o mesmo atraso de autenticação.
+Confere que rotas e DNS da VPN seguem a sessão ativa a cada troca.
+"""
+
+import sys
+import os
+import shutil
+import signal
+import argparse
+import tempfile
+import subprocess
+import time
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.token_cache import get_token_cache
+from src.core.hot_standby import HotStandby, STANDBY_ARGS
+from src.core.connection_manager import ConnectionManager, STATE_CONNECTED, STATE_DISCONNECTED
+
+
+# Configuração
+BASE_PORT = 20400
+DEFAULT_AUTH_DELAY = 1.0  # segundos de SAML + túnel TLS + PPP do openfortivpn falso
+UP_TIMEOUT = 15.0
+PROBE_ADDRESSES = ('198.18.0.1', '198.19.0.1')
+GATEWAY_ROUTES = ['198.18.0.0/16', '198.19.0.0/16']
+GATEWAY_NAMESERVERS = ['10.0.0.1', '10.0.0.2']
+GATEWAY_SUFFIX = ['corp.example']
+SWAP_BUDGET_MS = 100.0  # troca de rotas aceitável (dois `ip route replace` com sudo)
+NETNS_ENV = 'VPN_CONNECT_BENCH_NETNS'
+
+FAKE_SUDO = '#!/bin/sh\nexec "$@"\n'
+FAKE_AZ = """#!/bin/sh
+case "$2" in
+  show) echo '{"user": {"name": "bench@example.com"}}' ;;
+  get-access-token) echo '{"accessToken": "token-de-teste"}' ;;
+  *) exit 1 ;;
+esac
+"""
+FAKE_OPENFORTIVPN = """#!/bin/sh
+port=${1##*:}
+iface=hs$port
+routes=1
+for arg in "$@"; do
+  [ "$arg" = "--set-routes=0" ] && routes=0
+done
+echo "INFO:   Connected to gateway."
+sleep %(delay)s
+echo "INFO:   Authenticated."
+if [ -z "$FAKE_NO_LINK" ]; then
+  ip link add $iface type veth peer name hp$port || exit 1
+  ip link set hp$port up
+  ip link set $iface up
+  if [ $routes = 1 ]; then
+    for route in %(routes)s; do ip route replace $route dev $iface; done
+  fi
+fi
+sleep 3600 >/dev/null 2>&1 &
+pid=$!
+trap 'kill $pid; [ -z "$FAKE_NO_LINK" ] && ip link del $iface 2>/dev/null; exit 0' TERM
+echo "INFO:   Got addresses: [10.8.0.$((port %% 200 + 1))], ns [%(nameservers)s], ns_suffix [%(suffix)s]"
+echo "INFO:   Interface $iface is UP."
+echo "INFO:   Tunnel is up and running."
+wait $pid
+"""
+
+
+class RecordingRoutes:
+    """Rotas em memória (sem permissão para criar interfaces)"""
+
+    def __init__(self):
+        self.table = {}
+
+    def apply(self, interface: str, routes: list) -> int:
+        for route in routes:
+            self.table[route] = interface
+        return len(routes)
+
+    def capture(self, interface: str) -> list:
+        # Primário sem '--set-routes=0': o openfortivpn falso "instalou" as rotas do gateway
+        self.apply(interface, GATEWAY_ROUTES)
+        return list(GATEWAY_ROUTES)
+
+    def device(self, address: str):
+        return self.table.get(GATEWAY_ROUTES[PROBE_ADDRESSES.index(address)])
+
+
+class RecordingDns:
+    """DNS por interface em memória, no lugar de resolvectl/resolvconf"""
+
+    def __init__(self):
+        self.table = {}
+
+    def apply(self, interface: str, nameservers, suffix) -> bool:
+        if nameservers:
+            self.table[interface] = (list(nameservers), list(suffix))
+        else:
+            self.table.pop(interface, None)
+        return True
+
+    def describe(self) -> str:
+        return ', '.join(f"{interface}: {' '.join(servers)}" for interface, (servers, _) in self.table.items()) or '-'
+
+
+def dns_follows(hot: HotStandby, dns: RecordingDns, interface: str) -> bool:
+    """DNS da VPN configurado só na interface indicada"""
+    return (list(dns.table) == [interface]
+            and dns.table[interface] == (GATEWAY_NAMESERVERS, GATEWAY_SUFFIX)
+            and hot.dns_applied is True)
+
+
+def enter_netns():
+    """Reexecuta o benchmark em um namespace de rede próprio (rotas e interfaces isoladas)"""
+    if os.environ.get(NETNS_ENV) or os.geteuid() != 0 or shutil.which('unshare') is None:
+        return
+    os.environ[NETNS_ENV] = '1'
+    try:
+        os.execvp('unshare', ['unshare', '-n', sys.executable] + sys.argv)
+    except OSError:
+        pass
+
+
+def links_supported() -> bool:
+    """Verifica se é possível criar um par veth"""
+    if shutil.which('ip') is None:
+        return False
+    result = subprocess.run(['ip', 'link', 'add', 'hsprobe', 'type', 'veth', 'peer', 'name', 'hpprobe'],
+                            capture_output=True)
+    if result.returncode != 0:
+        return False
+    subprocess.run(['ip', 'link', 'del', 'hsprobe'], capture_output=True)
+    return True
+
+
+def route_device(address: str):
+    """Interface escolhida pelo kernel para o endereço (`ip route get`)"""
+    result = subprocess.run(['ip', 'route', 'get', address], capture_output=True, text=True)
+    fields = result.stdout.split()
+    if result.returncode != 0 or 'dev' not in fields:
+        return None
+    return fields[fields.index('dev') + 1]
+
+
+def install_fakes(directory: str, delay: float):
+    """Cria sudo, az e openfortivpn falsos e os coloca na frente do PATH"""
+    fake_openfortivpn = FAKE_OPENFORTIVPN % {'delay': delay, 'routes': ' '.join(GATEWAY_ROUTES),
+                                             'nameservers': ', '.join(GATEWAY_NAMESERVERS),
+                                             'suffix': ';'.join(GATEWAY_SUFFIX)}
+    for name, content in (('sudo', FAKE_SUDO), ('az', FAKE_AZ), ('openfortivpn', fake_openfortivpn)):
+        path = os.path.join(directory, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        os.chmod(path, 0o755)
+    os.environ['PATH'] = directory + os.pathsep + os.environ.get('PATH', '')
+
+
+def wait_for(condition, timeout: float = UP_TIMEOUT) -> bool:
+    """Aguarda a condição (polling a cada 1 ms)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.001)
+    return False
+
+
+def both_up(hot: HotStandby) -> bool:
+    """Sessão ativa e reserva no ar"""
+    return hot.interface is not None and hot.standby.interface is not None
+
+
+def check(label: str, ok: bool, detail: str = '') -> bool:
+    """Imprime o resultado de uma verificação"""
+    print(f"{'✓' if ok else '✗'} {label}{f' ({detail})' if detail else ''}")
+    return ok
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark do túnel reserva (openfortivpn e az falsos)")
+    parser.add_argument("--auth-delay", type=float, default=DEFAULT_AUTH_DELAY,
+                        help=f"Segundos até o túnel falso subir (padrão: {DEFAULT_AUTH_DELAY:g})")
+    args = parser.parse_args()
+    enter_netns()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        install_fakes(directory, args.auth_delay)
+        get_token_cache(None)
+        real_links = links_supported()
+        if real_links:
+            runner, reader, device = None, None, route_device
+            mode = "interfaces veth, rotas do kernel"
+        else:
+            os.environ['FAKE_NO_LINK'] = '1'
+            recording = RecordingRoutes()
+            runner, reader, device = recording.apply, recording.capture, recording.device
+            mode = "sem interfaces, rotas registradas em memória"
+        dns = RecordingDns()
+        kwargs = {'dns_runner': dns.apply}
+        if runner is not None:
+            kwargs.update(route_runner=runner, route_reader=reader)
+        print(f"🧪 Túnel reserva: autenticação falsa de {args.auth_delay:g}s ({mode})")
+        print("-" * 72)
+
+        hot = HotStandby('127.0.0.1', BASE_PORT, standby_port=BASE_PORT + 1, profile_log=None,
+                         maintenance_interval=0.05, **kwargs)
+        start = time.perf_counter()
+        hot.connect()
+        ready = wait_for(lambda: both_up(hot))
+        print(f"🔌 Ativa {hot.interface} e reserva {hot.standby.interface} no ar em "
+              f"{time.perf_counter() - start:.2f}s; rotas do gateway: {', '.join(hot.routes) or '-'}")
+        results.append(check("sessão ativa e reserva sobem", ready))
+        if not ready:
+            hot.disconnect(timeout=1)
+            print("❌ Verificações falharam")
+            sys.exit(1)
+        first, second = hot.interface, hot.standby.interface
+        results.append(check("rotas pela sessão ativa, nenhuma pela reserva",
+                             all(device(address) == first for address in PROBE_ADDRESSES),
+                             ', '.join(f"{address} → {device(address)}" for address in PROBE_ADDRESSES)))
+        results.append(check("reserva sobe sem rotas nem DNS", hot.standby.extra_args == STANDBY_ARGS,
+                             ' '.join(hot.standby.extra_args)))
+        results.append(check("DNS da VPN lido do primário, que o configurou sozinho",
+                             hot.nameservers == GATEWAY_NAMESERVERS and hot.dns_suffix == GATEWAY_SUFFIX
+                             and hot.dns_applied is None and not dns.table,
+                             f"{' '.join(hot.nameservers) or '-'}; search {' '.join(hot.dns_suffix) or '-'}"))
+
+        # 1. O openfortivpn ativo morre: troca assim que a saída é vista
+        killed_at = time.perf_counter()
+        os.kill(hot.manager.supervisor.pid, signal.SIGTERM)
+        swapped = wait_for(lambda: hot.failover_count >= 1, 5)
+        exit_ms = (time.perf_counter() - killed_at) * 1000
+        record = hot.failovers[-1] if swapped else None
+        print(f"💥 openfortivpn ativo encerrado: rotas em {second} após {exit_ms:.1f} ms "
+              f"(troca {record['swap_ms']:.1f} ms)" if record else "💥 openfortivpn ativo encerrado: sem troca")
+        results.append(check("queda do processo troca para a reserva", swapped and hot.interface == second))
+        results.append(check("rotas seguem para a reserva",
+                             all(device(address) == second for address in PROBE_ADDRESSES),
+                             ', '.join(f"{address} → {device(address)}" for address in PROBE_ADDRESSES)))
+        results.append(check("DNS segue para a reserva", record is not None and record['dns'] is True
+                             and dns_follows(hot, dns, second), dns.describe()))
+
+        # 2. Sessão antiga volta como reserva, em background
+        rebuilt = wait_for(lambda: both_up(hot))
+        rebuild_s = time.perf_counter() - killed_at
+        print(f"🔁 Sessão antiga de volta como reserva ({hot.standby.interface}) em {rebuild_s:.2f}s")
+        results.append(check("sessão antiga refeita como reserva", rebuilt and hot.standby.interface == first,
+                             f"{rebuild_s:.2f}s"))
+        results.append(check("reserva refeita não leva rotas nem DNS",
+                             all(device(address) == second for address in PROBE_ADDRESSES)
+                             and dns_follows(hot, dns, second), dns.describe()))
+
+        # 3. Peer morto com o processo vivo (detector de peer morto)
+        declared_at = time.perf_counter()
+        hot.declare_dead("peer sem resposta por 1s")
+        dead_ms = (time.perf_counter() - declared_at) * 1000
+        record = hot.failovers[-1]
+        print(f"🪦 Peer morto: rotas em {hot.interface} após {dead_ms:.1f} ms (troca {record['swap_ms']:.1f} ms)")
+        results.append(check("peer morto troca para a reserva", hot.failover_count == 2 and hot.interface == first,
+                             f"{hot.failover_count} trocas"))
+        results.append(check(f"troca em até {SWAP_BUDGET_MS:g} ms", dead_ms < SWAP_BUDGET_MS and exit_ms < SWAP_BUDGET_MS,
+                             f"queda {exit_ms:.1f} ms, peer morto {dead_ms:.1f} ms"))
+        results.append(check("DNS volta com as rotas", record['dns'] is True and first in dns.table,
+                             dns.describe()))
+        # A sessão antiga segue no ar até o rebuild encerrá-la
+        rebuilt = wait_for(lambda: hot.standby.interface is None, 5) and wait_for(lambda: both_up(hot))
+        results.append(check("reserva refeita após peer morto, DNS só na ativa",
+                             rebuilt and dns_follows(hot, dns, first), dns.describe()))
+        hot.disconnect(timeout=1)
+        results.append(check("DNS removido ao desconectar", not dns.table, dns.describe()))
+
+        # 4. Sem reserva: reconexão a frio pelo ConnectionManager
+        cold = ConnectionManager('127.0.0.1', BASE_PORT + 2, profile_log=None)
+        cold.connect()
+        wait_for(lambda: cold.state == STATE_CONNECTED)
+        killed_at = time.perf_counter()
+        os.kill(cold.supervisor.pid, signal.SIGTERM)
+        wait_for(lambda: cold.state == STATE_DISCONNECTED, 5)
+        cold.connect()
+        reconnected = wait_for(lambda: cold.state == STATE_CONNECTED)
+        cold_s = time.perf_counter() - killed_at
+        cold.disconnect(timeout=1)
+        print(f"🧊 Sem reserva: túnel de volta em {cold_s:.2f}s após a queda")
+        print()
+        results.append(check("reconexão a frio completa", reconnected))
+        results.append(check("troca pelo menos 10x mais rápida que a reconexão a frio",
+                             exit_ms * 10 < cold_s * 1000,
+                             f"{exit_ms:.1f} ms contra {cold_s * 1000:.0f} ms"))
+
+    print()
+    if all(results):
+        print("✅ Todas as verificações passaram")
+    else:
+        print("❌ Verificações falharam")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark - backend nativo de contadores vs caminho via subprocess
+Compara o custo por amostra de /proc/net/dev, sysfs e ifconfig/netstat
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.interface_counters import ProcNetDevReader, SysfsCounterReader
+from src.core.network_stats import NetworkStats
+
+
+def bench(label: str, func, iterations: int) -> float:
+    """
+    Executa uma função N vezes e imprime o custo médio.
+
+    Args:
+        label: Nome exibido no relatório
+        func: Função sem argumentos a medir
+        iterations: Número de execuções
+
+    Returns:
+        Custo médio por chamada em nanossegundos
+    """
+    func()  # aquecimento
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter_ns() - start
+    per_op = elapsed / iterations
+    print(f"  {label:<28} {per_op / 1000:>12.1f} µs/op  ({iterations} iterações)")
+    return per_op
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark de leitura de contadores de interface")
+    parser.add_argument("--interface", type=str, default="lo", help="Interface a medir (padrão: lo)")
+    parser.add_argument("--iterations", type=int, default=2000, help="Iterações do backend nativo")
+    parser.add_argument("--subprocess-iterations", type=int, default=50, help="Iterações do caminho via subprocess")
+    args = parser.parse_args()
+
+    print(f"📊 Contadores da interface {args.interface}")
+    results = {}
+
+    if ProcNetDevReader.is_available():
+        reader = ProcNetDevReader()
+        results['proc'] = bench("/proc/net/dev (fd aberto)", lambda: reader.read_interface(args.interface), args.iterations)
+        reader.close()
+    else:
+        print("  ⚠️  /proc/net/dev indisponível")
+
+    if SysfsCounterReader.is_available():
+        reader = SysfsCounterReader()
+        results['sysfs'] = bench("sysfs (fds abertos)", lambda: reader.read_interface(args.interface), args.iterations)
+        reader.close()
+    else:
+        print("  ⚠️  sysfs indisponível")
+
+    results['subprocess'] = bench("ifconfig/netstat (subprocess)",
+                                  lambda: NetworkStats.get_interface_stats_subprocess(args.interface),
+                                  args.subprocess_iterations)
+
+    print()
+    for key in ('proc', 'sysfs'):
+        if key in results:
+            print(f"  ⚡ {key}: {results['subprocess'] / results[key]:.0f}x mais rápido que subprocess")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark do prober de latência contra listeners locais (loopback)
+
+Sobe um servidor TCP e um servidor HTTP em 127.0.0.1, inclui uma porta
+fechada (perda garantida) e dispara rodadas com muitos alvos concorrentes,
+exibindo p50/p99, perda e o custo de cada rodada.
+"""
+
+import sys
+import os
+import socket
+import threading
+import time
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.latency_prober import LatencyProber
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """Responde HEAD/GET com 204 sem log"""
+
+    def do_HEAD(self):
+        self.send_response(204)
+        self.end_headers()
+
+    do_GET = do_HEAD
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalHTTPServer(ThreadingHTTPServer):
+    """Servidor HTTP local com fila de conexões grande o bastante para a rodada"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+def start_listeners():
+    """Sobe os servidores locais e retorna (porta TCP, porta HTTP, porta fechada)"""
+    tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    tcp.bind(('127.0.0.1', 0))
+    tcp.listen(1024)
+
+    def accept_loop():
+        while True:
+            try:
+                conn, _ = tcp.accept()
+                conn.close()
+            except OSError:
+                return
+
+    threading.Thread(target=accept_loop, daemon=True).start()
+
+    http = LocalHTTPServer(('127.0.0.1', 0), QuietHandler)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+
+    closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    closed.bind(('127.0.0.1', 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()  # porta livre e sem listener: conexão recusada
+    return tcp.getsockname()[1], http.server_address[1], closed_port
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark do prober de latência em loopback")
+    parser.add_argument("--targets", type=int, default=50, help="Alvos por tipo (padrão: 50)")
+    parser.add_argument("--rounds", type=int, default=20, help="Rodadas (padrão: 20)")
+    parser.add_argument("--concurrency", type=int, default=64, help="Probes simultâneos (padrão: 64)")
+    args = parser.parse_args()
+
+    tcp_port, http_port, closed_port = start_listeners()
+    targets = ([f"tcp://127.0.0.1:{tcp_port}/{i}" for i in range(args.targets)] +
+               [f"http://127.0.0.1:{http_port}/health?i={i}" for i in range(args.targets)] +
+               [f"127.0.0.1:{closed_port}"])
+    prober = LatencyProber(targets, timeout=1.0, concurrency=args.concurrency)
+
+    print(f"🔬 {len(prober.targets)} alvos, {args.rounds} rodadas, concorrência {args.concurrency}")
+    print("-" * 70)
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        prober.probe_once()
+    elapsed = time.perf_counter() - started
+
+    summary = prober.summary(recent=False)
+    for label, prefix in (("TCP connect", f"tcp://127.0.0.1:{tcp_port}"),
+                          ("HTTP HEAD", f"http://127.0.0.1:{http_port}"),
+                          ("Porta fechada", f"127.0.0.1:{closed_port}")):
+        rows = [stats for name, stats in summary.items() if name.startswith(prefix)]
+        sent = sum(row['sent'] for row in rows)
+        lost = sum(row['lost'] for row in rows)
+        p50 = max((row['p50'] for row in rows), default=0) / 1000
+        p99 = max((row['p99'] for row in rows), default=0) / 1000
+        errors = {row['last_error'] for row in rows if row['last_error']}
+        print(f"{label:<15} enviados {sent:>6}  perda {lost / sent * 100 if sent else 0:5.1f}%  "
+              f"p50 ≤ {p50:7.3f} ms  p99 ≤ {p99:7.3f} ms  {', '.join(sorted(errors))}")
+    overall = prober.overall()
+    print("-" * 70)
+    print(f"Geral: p50 {overall['p50'] / 1000:.3f} ms  p99 {overall['p99'] / 1000:.3f} ms  "
+          f"perda {overall['loss'] * 100:.1f}%")
+    print(f"⏱️  {elapsed / args.rounds * 1000:.1f} ms por rodada "
+          f"({len(prober.targets) * args.rounds / elapsed:,.0f} probes/s)")
+
+    # Modo background: mesmas rodadas pela thread do prober
+    prober = LatencyProber(targets[:10], interval=0.1, timeout=1.0)
+    prober.start()
+    time.sleep(1)
+    prober.stop()
+    print(f"🧵 Background: {prober.rounds} rodadas em 1s (intervalo 0.1s)")
+
+
+if __name__ == "__main__":
+    main()
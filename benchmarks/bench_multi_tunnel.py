@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark do supervisor de múltiplos túneis com um openfortivpn falso
+
+Coloca no PATH um `sudo` que só executa o comando e um `openfortivpn` que
+imprime a saída de um túnel que subiu e fica parado. Para cada quantidade
+de perfis, mede o CPU do processo supervisor com todos os túneis no ar
+(amostragem de contadores no intervalo configurado), o número de threads
+e o tempo até todos subirem. No fim, mata um openfortivpn e mede o tempo
+até o perfil voltar, sem afetar os demais.
+"""
+
+import sys
+import os
+import time
+import signal
+import argparse
+import tempfile
+import threading
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.multi_tunnel import MultiTunnelSupervisor, normalize_profile
+from src.core.connection_manager import STATE_CONNECTED
+
+
+# Configuração
+DEFAULT_COUNTS = (1, 10, 50)
+DEFAULT_INTERVAL = 0.1  # mais agressivo que o padrão (1s) para o custo da amostragem aparecer
+MEASURE_SECONDS = 3.0
+UP_TIMEOUT = 10.0
+CPU_BUDGET = 0.05  # fração de um núcleo aceitável com o maior número de perfis
+BASE_PORT = 20000
+
+FAKE_SUDO = '#!/bin/sh\nexec "$@"\n'
+FAKE_OPENFORTIVPN = """#!/bin/sh
+n=${1##*:}
+n=$((n - %d))
+echo "INFO:   Connected to gateway."
+echo "INFO:   Authenticated."
+echo "INFO:   Remote gateway has allocated a VPN."
+echo "INFO:   Got addresses: [10.8.$((n / 250)).$((n %% 250 + 1))], ns [10.0.0.1]"
+echo "INFO:   Interface ppp$n is UP."
+echo "INFO:   Tunnel is up and running."
+exec sleep 3600
+""" % BASE_PORT
+
+
+def install_fakes(directory: str):
+    """Cria sudo e openfortivpn falsos e os coloca na frente do PATH"""
+    for name, content in (('sudo', FAKE_SUDO), ('openfortivpn', FAKE_OPENFORTIVPN)):
+        path = os.path.join(directory, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        os.chmod(path, 0o755)
+    os.environ['PATH'] = directory + os.pathsep + os.environ.get('PATH', '')
+
+
+def wait_connected(supervisor: MultiTunnelSupervisor, count: int, timeout: float) -> bool:
+    """Aguarda `count` túneis no ar"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if supervisor.status()['aggregate']['connected'] == count:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def measure(count: int, interval: float, seconds: float) -> dict:
+    """
+    Sobe `count` perfis e mede o supervisor em regime.
+
+    Returns:
+        {'up_s', 'all_up', 'cpu', 'threads', 'samples', 'supervisor'}
+    """
+    profiles = [normalize_profile({'name': f'perfil-{index}', 'gateway': f'127.0.0.1:{BASE_PORT + index}'})
+                for index in range(count)]
+    threads_before = threading.active_count()
+    supervisor = MultiTunnelSupervisor(profiles, interval=interval, preflight=False)
+    start = time.perf_counter()
+    supervisor.start()
+    all_up = wait_connected(supervisor, count, UP_TIMEOUT)
+    up_s = time.perf_counter() - start
+    threads = threading.active_count() - threads_before
+
+    # Só a thread do supervisor trabalha; a principal dorme
+    samples_before = supervisor.samples
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    time.sleep(seconds)
+    cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+    return {'up_s': up_s, 'all_up': all_up, 'cpu': cpu, 'threads': threads,
+            'samples': supervisor.samples - samples_before, 'supervisor': supervisor}
+
+
+def check(label: str, ok: bool, detail: str = '') -> bool:
+    """Imprime o resultado de uma verificação"""
+    print(f"{'✓' if ok else '✗'} {label}{f' ({detail})' if detail else ''}")
+    return ok
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark do supervisor de múltiplos túneis (openfortivpn falso)")
+    parser.add_argument("--counts", type=str, default=','.join(str(c) for c in DEFAULT_COUNTS),
+                        help="Quantidades de perfis, separadas por vírgula")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Intervalo de amostragem em segundos")
+    parser.add_argument("--seconds", type=float, default=MEASURE_SECONDS, help="Duração de cada medição")
+    args = parser.parse_args()
+    counts = [int(value) for value in args.counts.split(',')]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        install_fakes(directory)
+        print(f"🧪 Supervisor de túneis: amostragem a cada {args.interval:g}s, {args.seconds:g}s por medição")
+        print("-" * 72)
+        print(f"{'perfis':>6} {'todos no ar':>12} {'CPU':>8} {'CPU/perfil':>11} {'threads':>8} {'leituras':>9}")
+        print("-" * 72)
+        measured = []
+        for count in counts:
+            result = measure(count, args.interval, args.seconds)
+            measured.append((count, result))
+            print(f"{count:>6} {result['up_s'] * 1000:>9.0f} ms {result['cpu'] * 100:>7.2f}% "
+                  f"{result['cpu'] * 100 / count:>10.3f}% {result['threads']:>8} {result['samples']:>9}")
+            if count != counts[-1]:
+                result['supervisor'].stop()
+
+        largest_count, largest = measured[-1]
+        smallest_count, smallest = measured[0]
+        supervisor = largest['supervisor']
+        print()
+
+        # Queda de um túnel: só ele é reiniciado, na hora
+        victim = supervisor.tunnels[len(supervisor.tunnels) // 2]
+        old_pid = victim.process.pid
+        killed_at = time.perf_counter()
+        os.kill(old_pid, signal.SIGKILL)
+        recovered = False
+        while time.perf_counter() - killed_at < UP_TIMEOUT:
+            item = next(t for t in supervisor.status()['tunnels'] if t['name'] == victim.name)
+            if item['state'] == STATE_CONNECTED and item['pid'] != old_pid:
+                recovered = True
+                break
+            time.sleep(0.005)
+        recovery_ms = (time.perf_counter() - killed_at) * 1000
+        aggregate = supervisor.status()['aggregate']
+        print(f"🔄 {victim.name}: openfortivpn morto e túnel de volta em {recovery_ms:.0f} ms")
+        print()
+        supervisor.stop()
+
+        results.append(check("todos os perfis sobem", all(result['all_up'] for _, result in measured)))
+        results.append(check("uma única thread para todos os perfis",
+                             all(result['threads'] == 1 for _, result in measured),
+                             ', '.join(str(result['threads']) for _, result in measured)))
+        results.append(check(f"CPU com {largest_count} perfis abaixo de {CPU_BUDGET * 100:g}% de um núcleo",
+                             largest['cpu'] < CPU_BUDGET, f"{largest['cpu'] * 100:.2f}%"))
+        results.append(check(f"CPU quase plano de {smallest_count} para {largest_count} perfis",
+                             largest['cpu'] - smallest['cpu'] < CPU_BUDGET / 2,
+                             f"+{(largest['cpu'] - smallest['cpu']) * 100:.2f} pontos"))
+        results.append(check("perfil derrubado volta sem espera", recovered and recovery_ms < 1000,
+                             f"{recovery_ms:.0f} ms"))
+        results.append(check("demais perfis não caem", aggregate['drops'] == 1,
+                             f"{aggregate['drops']} queda(s)"))
+
+    print()
+    if all(results):
+        print("✅ Todas as verificações passaram")
+    else:
+        print("❌ Verificações falharam")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos parsers de ifconfig/netstat/ip/proc
+Mede ns/op e pico de alocação por chamada com fixtures de 10, 100 e 1000 interfaces
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+import tracemalloc
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from parser_fixtures import FIXTURES, SIZES, VPN_INTERFACE, VPN_IP, _interfaces
+from src.core.network_stats import NetworkStats
+from src.core.iface_parser import parse_ifconfig, parse_netstat_ibn, parse_ip_json
+from src.core.interface_counters import parse_proc_net_dev
+
+
+# Configuração
+MIN_TIME = 0.2  # segundos medidos por caso (após calibrar o número de iterações)
+
+
+def expected(size: int) -> dict:
+    """Valores corretos da interface VPN na fixture de `size` interfaces"""
+    return _interfaces(size)[-1]
+
+
+# Casos: (fixture, parser, função(fixture) -> resultado, verificação(resultado, esperado) -> bool)
+CASES = (
+    ('ifconfig_macos', 'NetworkStats.parse_vpn_interface',
+     lambda data: NetworkStats.parse_vpn_interface(data),
+     lambda result, vpn: result == VPN_INTERFACE),
+    ('ifconfig_macos', 'iface_parser.parse_ifconfig',
+     parse_ifconfig,
+     lambda result, vpn: result[VPN_INTERFACE]['ipv4'] == [VPN_IP]),
+    ('ifconfig_linux', 'NetworkStats.parse_vpn_interface',
+     lambda data: NetworkStats.parse_vpn_interface(data),
+     lambda result, vpn: result == VPN_INTERFACE),
+    ('ifconfig_linux', 'iface_parser.parse_ifconfig',
+     parse_ifconfig,
+     lambda result, vpn: result[VPN_INTERFACE]['rx'] == vpn['rx'] and result[VPN_INTERFACE]['tx'] == vpn['tx']),
+    ('ifconfig_linux_single', 'NetworkStats.parse_ifconfig_bytes',
+     NetworkStats.parse_ifconfig_bytes,
+     lambda result, vpn: result['rx'] == vpn['rx'] and result['tx'] == vpn['tx']),
+    ('netstat_ibn', 'NetworkStats.parse_netstat_bytes',
+     lambda data: NetworkStats.parse_netstat_bytes(data, VPN_INTERFACE),
+     lambda result, vpn: result['rx'] == vpn['rx'] and result['tx'] == vpn['tx']),
+    ('netstat_ibn', 'NetworkStats.parse_netstat_details',
+     lambda data: NetworkStats.parse_netstat_details(data, VPN_INTERFACE),
+     lambda result, vpn: result == {'mtu': str(vpn['mtu']), 'ipkts': vpn['rx_packets'], 'opkts': vpn['tx_packets']}),
+    ('netstat_ibn', 'iface_parser.parse_netstat_ibn',
+     parse_netstat_ibn,
+     lambda result, vpn: result[VPN_INTERFACE]['rx'] == vpn['rx'] and result[VPN_INTERFACE]['tx'] == vpn['tx']),
+    ('ip_link_json', 'iface_parser.parse_ip_json',
+     parse_ip_json,
+     lambda result, vpn: result[VPN_INTERFACE]['rx'] == vpn['rx'] and result[VPN_INTERFACE]['tx'] == vpn['tx']),
+    ('ip_addr_json', 'iface_parser.parse_ip_json',
+     parse_ip_json,
+     lambda result, vpn: result[VPN_INTERFACE]['ipv4'] == [VPN_IP] and result[VPN_INTERFACE]['rx'] == vpn['rx']),
+    ('proc_net_dev', 'interface_counters.parse_proc_net_dev',
+     parse_proc_net_dev,
+     lambda result, vpn: result[VPN_INTERFACE]['rx'] == vpn['rx'] and result[VPN_INTERFACE]['tx'] == vpn['tx']),
+)
+
+
+def measure_time(func, data) -> float:
+    """
+    Custo médio por chamada, calibrando as iterações para durar MIN_TIME.
+
+    Args:
+        func: Parser a medir
+        data: Fixture de entrada
+
+    Returns:
+        Nanossegundos por chamada
+    """
+    func(data)  # aquecimento (regex compiladas, caches)
+    iterations = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            func(data)
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= MIN_TIME * 1e9:
+            return elapsed / iterations
+        iterations = max(iterations * 2, int(iterations * MIN_TIME * 1e9 / max(elapsed, 1) * 1.2))
+
+
+def measure_allocations(func, data) -> int:
+    """
+    Pico de memória alocada durante uma chamada (tracemalloc).
+
+    Args:
+        func: Parser a medir
+        data: Fixture de entrada
+
+    Returns:
+        Bytes alocados no pico, acima do já alocado antes da chamada
+    """
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = func(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        del result
+    finally:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+def format_ns(value: float) -> str:
+    """Formata nanossegundos com unidade adequada"""
+    if value >= 1e6:
+        return f"{value / 1e6:.2f} ms"
+    if value >= 1e3:
+        return f"{value / 1e3:.1f} µs"
+    return f"{value:.0f} ns"
+
+
+def main():
+    """Função principal"""
+    global MIN_TIME
+    parser = argparse.ArgumentParser(description="Benchmark dos parsers de saída de rede")
+    parser.add_argument("--sizes", type=int, nargs='+', default=list(SIZES), help="Números de interfaces")
+    parser.add_argument("--filter", type=str, default=None, help="Só casos cujo fixture/parser contém o texto")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="Segundos medidos por caso")
+    parser.add_argument("--json", type=str, default=None, help="Gravar resultados em JSON")
+    parser.add_argument("--compare", type=str, default=None, help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+    MIN_TIME = args.min_time
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(row['fixture'], row['parser'], row['size']): row for row in json.load(f)}
+
+    results = []
+    print(f"{'fixture':<22} {'parser':<38} {'ifaces':>6} {'tempo/op':>11} {'alloc pico':>11} {'ok':>3}"
+          + (f" {'vs anterior':>12}" if baseline else ""))
+    print("-" * (96 + (13 if baseline else 0)))
+    for fixture, label, func, check in CASES:
+        if args.filter and args.filter not in fixture and args.filter not in label:
+            continue
+        generator = FIXTURES[fixture][0]
+        for size in args.sizes:
+            data = generator(size)
+            try:
+                correct = bool(check(func(data), expected(size)))
+            except (KeyError, TypeError):
+                correct = False
+            ns_per_op = measure_time(func, data)
+            allocated = measure_allocations(func, data)
+            row = {'fixture': fixture, 'parser': label, 'size': size,
+                   'ns_per_op': ns_per_op, 'alloc_bytes': allocated, 'correct': correct}
+            results.append(row)
+            line = (f"{fixture:<22} {label:<38} {size:>6} {format_ns(ns_per_op):>11} "
+                    f"{allocated / 1024:>8.1f} KB {'✓' if correct else '✗':>3}")
+            previous = baseline.get((fixture, label, size))
+            if previous:
+                line += f" {(ns_per_op / previous['ns_per_op'] - 1) * 100:>+11.1f}%"
+            print(line)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Resultados gravados em {args.json}")
+    wrong = sum(1 for row in results if not row['correct'])
+    if wrong:
+        print(f"\n⚠️  {wrong} caso(s) com resultado incorreto para a fixture (✗)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark da pré-checagem da conexão: sequencial (fluxo antigo) vs paralela
+
+Usa binários falsos de `az` e `openfortivpn` num diretório temporário à frente
+do PATH, com atrasos configuráveis, para medir o tempo até o ponto em que o
+openfortivpn seria iniciado. O gateway aponta para uma porta local fechada.
+"""
+
+import sys
+import os
+import stat
+import time
+import socket
+import argparse
+import tempfile
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.vpn_connection import AzureAuth, VpnConnection
+from src.core.preflight import run_preflight
+from src.core.token_cache import get_token_cache
+
+
+# Configuração
+DEFAULT_ACCOUNT_DELAY = 0.8  # segundos de `az account show`
+DEFAULT_TOKEN_DELAY = 1.2  # segundos de `az account get-access-token`
+DEFAULT_RUNS = 3
+
+FAKE_AZ = """#!/bin/sh
+case "$2" in
+  show) sleep {account}; echo '{{"user": {{"name": "bench@example.com"}}}}' ;;
+  get-access-token) sleep {token}; echo '{{"accessToken": "token-de-teste"}}' ;;
+  *) exit 1 ;;
+esac
+"""
+
+
+def install_fakes(directory: str, account_delay: float, token_delay: float):
+    """Grava `az` e `openfortivpn` falsos no diretório"""
+    for name, content in (('az', FAKE_AZ.format(account=account_delay, token=token_delay)),
+                          ('openfortivpn', "#!/bin/sh\nexit 0\n")):
+        path = os.path.join(directory, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def closed_port() -> int:
+    """Porta local sem listener (a sonda ao gateway falha na hora)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def cold(func):
+    """Executa func sem token em cache (mede o caminho que executa o az)"""
+    get_token_cache(None).invalidate()
+    return func()
+
+
+def sequential(gateway: str, port: int):
+    """Fluxo anterior: script e connect() repetindo as checagens em série"""
+    for _ in range(2):
+        get_token_cache(None).invalidate()
+        AzureAuth.check_authenticated()
+        token = AzureAuth.get_token()
+        VpnConnection.check_openfortivpn()
+        if token:
+            AzureAuth.authenticate_with_token(gateway, port, token)
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark da pré-checagem da conexão")
+    parser.add_argument("--account-delay", type=float, default=DEFAULT_ACCOUNT_DELAY, help="Atraso do az account show")
+    parser.add_argument("--token-delay", type=float, default=DEFAULT_TOKEN_DELAY, help="Atraso do get-access-token")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help=f"Repetições (padrão: {DEFAULT_RUNS})")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        install_fakes(directory, args.account_delay, args.token_delay)
+        os.environ['PATH'] = directory + os.pathsep + os.environ.get('PATH', '')
+        port = closed_port()
+
+        print(f"🧪 Pré-checagem com az falso (show {args.account_delay:g}s, token {args.token_delay:g}s)")
+        print("-" * 70)
+        for label, func in (('sequencial (antes)', lambda: sequential('127.0.0.1', port)),
+                            ('paralela (run_preflight)', lambda: run_preflight('127.0.0.1', port, login=False))):
+            elapsed = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                cold(func)
+                elapsed.append(time.perf_counter() - start)
+            print(f"{label:<26} melhor {min(elapsed):6.2f}s | média {sum(elapsed) / len(elapsed):6.2f}s")
+
+        result = cold(lambda: run_preflight('127.0.0.1', port, login=False))
+        print()
+        print("⏱️  Checagens individuais na execução paralela:")
+        for name, duration in result['timings'].items():
+            print(f"   {name:<26} {duration / 1e9:6.2f}s")
+        print(f"   {'tempo de parede':<26} {result['elapsed_ns'] / 1e9:6.2f}s")
+
+        result = run_preflight('127.0.0.1', port, login=False)
+        print(f"   {'com token em cache':<26} {result['elapsed_ns'] / 1e9:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
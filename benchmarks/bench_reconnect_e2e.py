@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Benchmark ponta a ponta do monitor com o simulador de openfortivpn/az
+
+Para cada cenário de benchmarks/vpn_simulator.py, roda o VpnMonitor de
+verdade (o mesmo laço do vpn_menu.py, saída descartada) em um processo
+próprio, com os falsos na frente do PATH e o endpoint de métricas ligado.
+Mede:
+
+- tempo até o túnel subir (registro do openfortivpn falso) e até o monitor
+  mostrá-lo conectado (vpn_uptime_seconds > 0 no /metrics);
+- MTTR: da queda de cada túnel à subida do próximo, e o que o monitor
+  registrou em vpn_connection_phase_seconds{phase="reconnect"};
+- subprocessos iniciados pelo monitor por hora (audit hook em
+  subprocess.Popen e os.system), no total e com o túnel estável no ar,
+  junto com a fonte da tabela de interfaces usada pelo monitor (rtnetlink,
+  sysfs ou ifconfig). Com --no-netlink o driver ignora o rtnetlink, como em
+  contêineres sem acesso a ele.
+
+Como root, roda em um namespace de rede próprio e os túneis simulados
+criam interfaces pppN de verdade; sem isso o monitor não vê interface e só
+os tempos do túnel são medidos.
+"""
+
+import sys
+import os
+import json
+import time
+import signal
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.request
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from vpn_simulator import SCENARIOS, build_scenario, install, read_events, enter_netns, links_supported
+
+
+# Configuração
+GATEWAY = '127.0.0.1'
+DEFAULT_SECONDS = 10.0  # duração de cada cenário
+DEFAULT_CHECK_INTERVAL = 1.0  # intervalo do laço do monitor (vpn_menu usa 5)
+RECONNECT_DELAY = 10  # teto do backoff, como no vpn_menu
+CONNECT_TIMEOUT = 2.0  # prazo de uma tentativa travada no benchmark (padrão do monitor: 120s)
+SCRAPE_INTERVAL = 0.05
+SNAPSHOT_INTERVAL = 0.5  # segundos entre gravações da contagem de subprocessos pelo driver
+MTTR_SLACK = 1.0  # segundos além de autenticação + PPP aceitos no MTTR após uma queda
+STEADY_BUDGET = 60  # subprocessos por hora aceitáveis com o túnel estável
+SUBPROCESS_LOG = 'subprocesses.jsonl'
+
+
+def free_port() -> int:
+    """Porta local livre"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def interface_source() -> str:
+    """De onde o monitor lê a tabela de interfaces neste processo"""
+    from src.core.netlink_discovery import get_discovery
+    from src.core.interface_counters import get_interface_reader
+    if get_discovery() is not None:
+        return 'rtnetlink'
+    return 'sysfs' if get_interface_reader() is not None else 'ifconfig'
+
+
+def run_driver(directory: str, check_interval: float, metrics_port: int, connect_timeout: float,
+               netlink: bool = True):
+    """
+    Processo do monitor: conta subprocessos e roda o laço do VpnMonitor até receber SIGTERM.
+
+    Args:
+        directory: Diretório do simulador (a contagem vai para subprocesses.jsonl)
+        check_interval: Intervalo do laço
+        metrics_port: Porta do endpoint de métricas
+        connect_timeout: Prazo de cada tentativa de conexão
+        netlink: False para ignorar o rtnetlink (tabela de interfaces pelo fallback)
+    """
+    counts = {}
+    if not netlink:
+        from src.core import netlink_discovery
+        netlink_discovery._discovery_checked = True
+    source = interface_source()
+
+    def audit(event, args):
+        if event == 'subprocess.Popen':
+            command = args[1] if isinstance(args[1], (list, tuple)) else [args[1]]
+            name = os.path.basename(str(args[0] or command[0]))
+        elif event == 'os.system':
+            name = 'os.system'
+        else:
+            return
+        counts[name] = counts.get(name, 0) + 1
+
+    def snapshots():
+        with open(os.path.join(directory, SUBPROCESS_LOG), 'a') as f:
+            while True:
+                f.write(json.dumps({'at': time.time(), 'counts': dict(counts), 'interfaces': source}) + '\n')
+                f.flush()
+                time.sleep(SNAPSHOT_INTERVAL)
+
+    sys.addaudithook(audit)
+    threading.Thread(target=snapshots, name='subprocess-count', daemon=True).start()
+    from src.core.vpn_monitor import VpnMonitor
+    sys.stdout = open(os.devnull, 'w')
+    monitor = VpnMonitor(GATEWAY, free_port(), check_interval=check_interval, reconnect_delay=RECONNECT_DELAY,
+                         metrics_port=metrics_port, metrics_host='127.0.0.1')
+    monitor.manager.connect_timeout = connect_timeout
+    monitor.monitor()
+
+
+def scrape(port: int) -> dict:
+    """Métricas do monitor ({nome com rótulos: valor}); vazio se o endpoint ainda não responde"""
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=1) as response:
+            text = response.read().decode()
+    except OSError:
+        return {}
+    metrics = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, _, value = line.rpartition(' ')
+            try:
+                metrics[name] = float(value)
+            except ValueError:
+                continue
+    return metrics
+
+
+def read_snapshots(directory: str) -> list:
+    """Contagens de subprocessos gravadas pelo driver"""
+    snapshots = []
+    try:
+        with open(os.path.join(directory, SUBPROCESS_LOG)) as f:
+            for line in f:
+                try:
+                    snapshots.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return snapshots
+
+
+def run_scenario(name: str, root: str, seconds: float, check_interval: float, links: bool,
+                 netlink: bool = True) -> dict:
+    """
+    Roda o monitor contra um cenário do simulador.
+
+    Returns:
+        Medidas do cenário (tempos em segundos a partir do início do monitor)
+    """
+    directory = os.path.join(root, name)
+    scenario = build_scenario(name, links=links)
+    env = install(directory, scenario)
+    metrics_port = free_port()
+    command = [sys.executable, os.path.abspath(__file__), '--driver', directory,
+               '--check-interval', str(check_interval), '--metrics-port', str(metrics_port)]
+    if not netlink:
+        command.append('--no-netlink')
+    with open(os.path.join(directory, 'driver.err'), 'w') as errors:
+        started = time.time()
+        driver = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=errors,
+                                  start_new_session=True)
+        monitor_up_at = None
+        metrics = {}
+        while time.time() - started < seconds:
+            current = scrape(metrics_port)
+            if current:
+                metrics = current
+                # vpn_tunnel_up já é 1 com o openfortivpn rodando; uptime só conta com a interface no ar
+                if monitor_up_at is None and current.get('vpn_uptime_seconds', 0) > 0:
+                    monitor_up_at = time.time()
+            time.sleep(SCRAPE_INTERVAL)
+        finished = time.time()
+        # Monitor primeiro (sem chance de reconectar), depois os openfortivpn falsos do
+        # mesmo grupo: o SIGTERM remove as interfaces
+        driver.kill()
+        driver.wait()
+        try:
+            os.killpg(driver.pid, signal.SIGTERM)
+            time.sleep(0.2)
+            os.killpg(driver.pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+    events = read_events(directory)
+    tunnel = [event for event in events if event['tool'] == 'openfortivpn']
+    ups = [event['at'] for event in tunnel if event['event'] == 'up']
+    mttr = []
+    for down in (event['at'] for event in tunnel if event['event'] == 'down'):
+        later = [up for up in ups if up > down]
+        if later:
+            mttr.append(later[0] - down)
+    reconnect_count = metrics.get('vpn_connection_phase_seconds_count{phase="reconnect"}', 0)
+    reconnect_sum = metrics.get('vpn_connection_phase_seconds_sum{phase="reconnect"}', 0)
+
+    snapshots = read_snapshots(directory)
+    total = sum(snapshots[-1]['counts'].values()) if snapshots else 0
+    elapsed = (snapshots[-1]['at'] - started) if snapshots else 0
+    steady = None
+    if monitor_up_at is not None and not mttr:
+        # Em regime: a partir de 1s após o monitor ver o túnel, sem quedas no cenário
+        window = [snapshot for snapshot in snapshots if snapshot['at'] >= monitor_up_at + 1]
+        if len(window) >= 2 and window[-1]['at'] > window[0]['at']:
+            delta = sum(window[-1]['counts'].values()) - sum(window[0]['counts'].values())
+            steady = delta / (window[-1]['at'] - window[0]['at']) * 3600
+    return {
+        'scenario': scenario,
+        'duration': finished - started,
+        'tunnel_up': ups[0] - started if ups else None,
+        'monitor_up': monitor_up_at - started if monitor_up_at is not None else None,
+        'attempts': sum(1 for event in tunnel if event['event'] == 'start'),
+        'mttr': mttr,
+        'monitor_mttr': reconnect_sum / reconnect_count if reconnect_count else None,
+        'subprocesses': snapshots[-1]['counts'] if snapshots else {},
+        'interfaces': snapshots[-1].get('interfaces') if snapshots else None,
+        'per_hour': total / elapsed * 3600 if elapsed > 0 else 0,
+        'steady_per_hour': steady,
+        'az_calls': sum(1 for event in events if event['tool'] == 'az'),
+    }
+
+
+def seconds_text(value) -> str:
+    """Segundos formatados (ou '-')"""
+    return f"{value:.2f}s" if value is not None else "-"
+
+
+def check(label: str, ok: bool, detail: str = '') -> bool:
+    """Imprime o resultado de uma verificação"""
+    print(f"{'✓' if ok else '✗'} {label}{f' ({detail})' if detail else ''}")
+    return ok
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark ponta a ponta do monitor com openfortivpn/az simulados")
+    parser.add_argument("--scenarios", type=str, default=','.join(SCENARIOS),
+                        help=f"Cenários separados por vírgula (padrão: todos: {', '.join(SCENARIOS)})")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS, help="Duração de cada cenário")
+    parser.add_argument("--check-interval", type=float, default=DEFAULT_CHECK_INTERVAL,
+                        help=f"Intervalo do laço do monitor (padrão: {DEFAULT_CHECK_INTERVAL:g}s)")
+    parser.add_argument("--json", type=str, help="Grava os resultados em JSON (comparação entre versões)")
+    parser.add_argument("--no-netlink", action="store_true",
+                        help="Monitor sem rtnetlink (tabela de interfaces pelo fallback, como em contêineres)")
+    parser.add_argument("--driver", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--metrics-port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.driver:
+        run_driver(args.driver, args.check_interval, args.metrics_port, CONNECT_TIMEOUT, not args.no_netlink)
+        return
+
+    enter_netns()
+    names = [name for name in args.scenarios.split(',') if name]
+    links = links_supported()
+    print(f"🧪 Monitor ponta a ponta: {len(names)} cenários × {args.seconds:g}s, laço a cada {args.check_interval:g}s "
+          f"({'interfaces pppN reais' if links else 'sem interfaces: só tempos do túnel'})")
+    print("-" * 100)
+    print(f"{'cenário':<10} {'túnel no ar':>11} {'monitor vê':>11} {'tentativas':>10} {'MTTR túnel':>16} "
+          f"{'MTTR monitor':>12} {'subproc/h':>10} {'em regime/h':>12} {'az':>4}")
+    print("-" * 100)
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        for name in names:
+            result = run_scenario(name, root, args.seconds, args.check_interval, links, not args.no_netlink)
+            results[name] = result
+            mttr = (f"{sum(result['mttr']) / len(result['mttr']):.2f}s/{max(result['mttr']):.2f}s"
+                    if result['mttr'] else "-")
+            steady = f"{result['steady_per_hour']:.0f}" if result['steady_per_hour'] is not None else "-"
+            print(f"{name:<10} {seconds_text(result['tunnel_up']):>11} {seconds_text(result['monitor_up']):>11} "
+                  f"{result['attempts']:>10} {mttr:>16} {seconds_text(result['monitor_mttr']):>12} "
+                  f"{result['per_hour']:>10.0f} {steady:>12} {result['az_calls']:>4}")
+    print()
+    for name, result in results.items():
+        if result['subprocesses']:
+            breakdown = ', '.join(f"{command} {count}" for command, count in
+                                  sorted(result['subprocesses'].items(), key=lambda item: -item[1]))
+            print(f"   {name}: {breakdown} (interfaces via {result['interfaces'] or '?'})")
+    print()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({name: {key: value for key, value in result.items() if key != 'scenario'}
+                       for name, result in results.items()}, f, indent=2)
+        print(f"💾 Resultados em {args.json}")
+        print()
+
+    checks = [check("túnel sobe em todos os cenários", all(r['tunnel_up'] is not None for r in results.values()),
+                    ', '.join(name for name, r in results.items() if r['tunnel_up'] is None) or "ok")]
+    if links:
+        checks.append(check("monitor vê o túnel em todos os cenários",
+                            all(r['monitor_up'] is not None for r in results.values()),
+                            ', '.join(name for name, r in results.items() if r['monitor_up'] is None) or "ok"))
+    for name, result in results.items():
+        scenario = result['scenario']
+        if result['mttr']:
+            limit = scenario['auth_delay'] + scenario['ppp_delay'] + MTTR_SLACK
+            checks.append(check(f"{name}: reconexão imediata após cada queda (até {limit:.1f}s)",
+                                max(result['mttr']) <= limit, f"pior {max(result['mttr']):.2f}s"))
+        if 'hang' in scenario['outcomes']:
+            checks.append(check(f"{name}: tentativa travada encerrada após {CONNECT_TIMEOUT:g}s",
+                                result['attempts'] >= 2 and result['tunnel_up'] is not None,
+                                f"{result['attempts']} tentativas"))
+        if result['steady_per_hour'] is not None:
+            checks.append(check(f"{name}: até {STEADY_BUDGET} subprocessos/hora com o túnel estável",
+                                result['steady_per_hour'] <= STEADY_BUDGET, f"{result['steady_per_hour']:.0f}/h"))
+    print()
+    if all(checks):
+        print("✅ Todas as verificações passaram")
+    else:
+        print("❌ Verificações falharam")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark do cache de token Azure: busca no az vs memória vs disco, e renovação em background
+
+Usa um `az` falso à frente do PATH que demora um tempo configurável e devolve
+tokens com `expires_on` curto, para verificar que a renovação acontece antes
+da expiração sem que nenhuma chamada a get() bloqueie.
+"""
+
+import sys
+import os
+import stat
+import time
+import argparse
+import tempfile
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.token_cache import TokenCache
+
+
+# Configuração
+DEFAULT_TOKEN_DELAY = 1.0  # segundos de `az account get-access-token`
+DEFAULT_LIFETIME = 6  # validade (s) dos tokens do az falso
+DEFAULT_GETS = 10000
+
+FAKE_AZ = """#!/bin/sh
+case "$2" in
+  show) echo '{{"user": {{"name": "bench@example.com"}}}}' ;;
+  get-access-token)
+    sleep {delay}
+    now=$(date +%s)
+    echo "{{\\"accessToken\\": \\"token-$now-$$\\", \\"expires_on\\": $((now + {lifetime})), \\"tenant\\": \\"t\\"}}" ;;
+  *) exit 1 ;;
+esac
+"""
+
+
+def install_fake(directory: str, delay: float, lifetime: int):
+    """Grava o `az` falso no diretório"""
+    path = os.path.join(directory, 'az')
+    with open(path, 'w') as f:
+        f.write(FAKE_AZ.format(delay=delay, lifetime=lifetime))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+def check(label: str, ok: bool, detail: str = ''):
+    """Imprime o resultado de uma verificação"""
+    print(f"{'✓' if ok else '✗'} {label}{f' ({detail})' if detail else ''}")
+    return ok
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark do cache de token Azure")
+    parser.add_argument("--token-delay", type=float, default=DEFAULT_TOKEN_DELAY, help="Atraso do get-access-token")
+    parser.add_argument("--lifetime", type=int, default=DEFAULT_LIFETIME, help="Validade dos tokens falsos (s)")
+    parser.add_argument("--gets", type=int, default=DEFAULT_GETS, help=f"Leituras do cache (padrão: {DEFAULT_GETS})")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        bin_dir = os.path.join(directory, 'bin')
+        os.makedirs(bin_dir)
+        install_fake(bin_dir, args.token_delay, args.lifetime)
+        os.environ['PATH'] = bin_dir + os.pathsep + os.environ.get('PATH', '')
+        path = os.path.join(directory, 'cache', 'token-cache.json')
+
+        print(f"🧪 Cache de token com az falso ({args.token_delay:g}s por token, validade {args.lifetime}s)")
+        print("-" * 70)
+        # Margens pequenas para caber no tempo de vida curto dos tokens falsos
+        margin = args.token_delay + 2
+        cache = TokenCache(path, refresh_margin=margin, min_validity=1)
+
+        start = time.perf_counter()
+        first = cache.get()
+        print(f"busca no az (frio)        {(time.perf_counter() - start) * 1e3:10.1f} ms")
+
+        start = time.perf_counter_ns()
+        for _ in range(args.gets):
+            cache.get()
+        print(f"get() em memória          {(time.perf_counter_ns() - start) / args.gets / 1e3:10.2f} µs")
+
+        start = time.perf_counter_ns()
+        loaded = TokenCache(path, refresh_margin=margin, min_validity=1).get(wait=False)
+        print(f"novo processo (disco)     {(time.perf_counter_ns() - start) / 1e6:10.2f} ms")
+        print()
+
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+        results.append(check("arquivo do cache com permissão 0600", mode == 0o600, oct(mode)))
+        results.append(check("token lido do disco é o mesmo", loaded is not None and first is not None
+                             and loaded['access_token'] == first['access_token']))
+
+        # Renovação em background: get(wait=False) nunca deve ficar sem token
+        cache.start()
+        deadline = first['expires_at'] + args.lifetime
+        tokens = {first['access_token']}
+        misses, slowest = 0, 0
+        while time.time() < deadline:
+            start = time.perf_counter()
+            entry = cache.get(wait=False)
+            slowest = max(slowest, time.perf_counter() - start)
+            if entry is None:
+                misses += 1
+            else:
+                tokens.add(entry['access_token'])
+            time.sleep(0.05)
+        cache.stop()
+        results.append(check("token renovado antes de expirar", len(tokens) >= 2, f"{len(tokens)} tokens vistos"))
+        results.append(check("nenhum get() sem token válido", misses == 0, f"{misses} falhas"))
+        results.append(check("get() nunca bloqueou no az", slowest < args.token_delay / 2,
+                             f"pior {slowest * 1e3:.2f} ms"))
+
+    print()
+    if all(results):
+        print("✅ Todas as verificações passaram")
+    else:
+        print("❌ Verificações falharam")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark da detecção de queda do túnel: pidfd vs waitpid vs polling com pgrep
+
+Inicia processos `sleep` supervisionados, mata cada um e mede o tempo entre
+o sinal e a saída registrada pelo supervisor. Para comparação, mede o custo
+de uma verificação por polling (`pgrep -f` + `Popen.poll()`) e a latência
+média que ele implica com o intervalo de verificação do monitor.
+"""
+
+import sys
+import os
+import time
+import signal
+import argparse
+import subprocess
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.tunnel_supervisor import TunnelSupervisor, pidfd_supported
+
+
+# Configuração
+DEFAULT_RUNS = 50
+CHECK_INTERVAL = 5  # segundos (padrão do VpnMonitor)
+
+
+def percentile(values, pct: float) -> float:
+    """Percentil por rank mais próximo"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def measure_detection(use_pidfd: bool, runs: int) -> list:
+    """
+    Latência entre SIGTERM e a saída registrada pelo supervisor.
+
+    Args:
+        use_pidfd: Usar pidfd (True) ou thread em waitpid (False)
+        runs: Número de processos
+
+    Returns:
+        Latências em segundos
+    """
+    latencies = []
+    supervisor = TunnelSupervisor(use_pidfd=use_pidfd)
+    for _ in range(runs):
+        process = supervisor.spawn(['sleep', '60'])
+        time.sleep(0.01)  # garante que o watcher já está bloqueado
+        killed_at = time.monotonic()
+        os.kill(process.pid, signal.SIGTERM)
+        if not supervisor.wait(5):
+            continue
+        latencies.append(supervisor.exited_at - killed_at)
+    supervisor.release()
+    return latencies
+
+
+def measure_polling_cost(runs: int) -> float:
+    """Custo médio, em segundos, de uma verificação por polling (pgrep + poll)"""
+    process = subprocess.Popen(['sleep', '60'])
+    try:
+        start = time.perf_counter()
+        for _ in range(runs):
+            subprocess.run(['pgrep', '-f', 'openfortivpn'], capture_output=True)
+            process.poll()
+        return (time.perf_counter() - start) / runs
+    finally:
+        process.kill()
+        process.wait()
+
+
+def measure_state_cost(runs: int) -> float:
+    """Custo médio, em segundos, de consultar o estado do supervisor"""
+    supervisor = TunnelSupervisor()
+    supervisor.spawn(['sleep', '60'])
+    try:
+        start = time.perf_counter()
+        for _ in range(runs * 1000):
+            supervisor.is_running()
+        return (time.perf_counter() - start) / (runs * 1000)
+    finally:
+        supervisor.terminate()
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark da detecção de saída do openfortivpn")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help=f"Processos por modo (padrão: {DEFAULT_RUNS})")
+    parser.add_argument("--check-interval", type=float, default=CHECK_INTERVAL,
+                        help=f"Intervalo do polling comparado (padrão: {CHECK_INTERVAL}s)")
+    args = parser.parse_args()
+
+    print(f"🧪 Detecção de saída ({args.runs} processos por modo)")
+    print("-" * 70)
+    modes = [('pidfd', True)] if pidfd_supported() else []
+    modes.append(('waitpid', False))
+    if not pidfd_supported():
+        print("⚠️  pidfd indisponível neste sistema; só o fallback em thread será medido")
+    for name, use_pidfd in modes:
+        latencies = measure_detection(use_pidfd, args.runs)
+        if not latencies:
+            print(f"{name:<10} ❌ nenhuma saída detectada")
+            continue
+        print(f"{name:<10} p50 {percentile(latencies, 50) * 1000:7.3f} ms | "
+              f"p99 {percentile(latencies, 99) * 1000:7.3f} ms | "
+              f"máx {max(latencies) * 1000:7.3f} ms")
+
+    polling = measure_polling_cost(args.runs)
+    print(f"{'polling':<10} média {args.check_interval / 2 * 1000:7.0f} ms | "
+          f"pior {args.check_interval * 1000:7.0f} ms (intervalo de {args.check_interval:g}s)")
+    print()
+    print(f"💰 Custo por verificação: pgrep + poll {polling * 1e6:,.0f} µs | "
+          f"estado do supervisor {measure_state_cost(args.runs) * 1e9:,.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
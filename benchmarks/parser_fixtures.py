@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Fixtures sintéticas para o benchmark de parsers
+
+Gera saídas no formato exato de ifconfig (macOS e Linux), netstat -ibn,
+ip -s -j link, ip -j -s addr e /proc/net/dev, modeladas em capturas reais, com qualquer
+número de interfaces. A interface VPN (ppp0) fica sempre por último,
+que é o pior caso para as buscas lineares.
+"""
+
+import os
+import json
+import random
+import argparse
+from typing import Dict, List
+
+
+# Configuração
+DEFAULT_SEED = 1
+SIZES = (10, 100, 1000)
+VPN_INTERFACE = 'ppp0'
+VPN_IP = '10.212.134.5'
+VPN_PEER = '192.0.2.1'
+
+
+def _interfaces(count: int, seed: int = DEFAULT_SEED) -> List[Dict]:
+    """
+    Lista de interfaces com contadores determinísticos.
+
+    Args:
+        count: Total de interfaces (incluindo loopback e VPN)
+        seed: Semente para os contadores
+
+    Returns:
+        Lista de dicionários {'name', 'index', 'kind', 'mtu', 'mac', 'ipv4', contadores}
+    """
+    rng = random.Random(seed)
+    interfaces = [{'name': 'lo', 'kind': 'loopback', 'mtu': 65536, 'ipv4': '127.0.0.1'}]
+    # Mistura típica de um host com containers/bridges: físicas, bridges, veths
+    kinds = ('eth', 'br', 'veth', 'utun')
+    for i in range(max(0, count - 2)):
+        kind = kinds[i % len(kinds)]
+        interfaces.append({
+            'name': f'{kind}{i}',
+            'kind': kind,
+            'mtu': 1380 if kind == 'utun' else 1500,
+            'ipv4': f'172.{16 + i // 65536 % 16}.{i // 256 % 256}.{i % 256}' if kind in ('eth', 'br') else None,
+        })
+    interfaces.append({'name': VPN_INTERFACE, 'kind': 'ppp', 'mtu': 1354, 'ipv4': VPN_IP})
+    for index, interface in enumerate(interfaces, 1):
+        interface['index'] = index
+        interface['mac'] = ':'.join(f'{rng.randrange(256):02x}' for _ in range(6))
+        interface['rx'] = rng.randrange(10 ** 6, 10 ** 11)
+        interface['tx'] = rng.randrange(10 ** 6, 10 ** 10)
+        interface['rx_packets'] = interface['rx'] // rng.randrange(200, 1400)
+        interface['tx_packets'] = interface['tx'] // rng.randrange(200, 1400)
+        interface['rx_errors'] = rng.randrange(3)
+        interface['tx_errors'] = 0
+        interface['rx_drop'] = rng.randrange(50)
+        interface['tx_drop'] = 0
+    return interfaces
+
+
+def ifconfig_macos(count: int) -> str:
+    """Saída de `ifconfig` do macOS (sem contadores de bytes)"""
+    blocks = []
+    for interface in _interfaces(count):
+        name, kind = interface['name'], interface['kind']
+        if kind == 'loopback':
+            blocks.append("lo0: flags=8049<UP,LOOPBACK,RUNNING,MULTICAST> mtu 16384\n"
+                          "\toptions=1203<RXCSUM,TXCSUM,TXSTATUS,SW_TIMESTAMP>\n"
+                          "\tinet 127.0.0.1 netmask 0xff000000\n"
+                          "\tinet6 ::1 prefixlen 128 \n"
+                          "\tinet6 fe80::1%lo0 prefixlen 64 scopeid 0x1 \n"
+                          "\tnd6 options=201<PERFORMNUD,DAD>\n")
+        elif kind in ('ppp', 'utun'):
+            lines = [f"{name}: flags=8051<UP,POINTOPOINT,RUNNING,MULTICAST> mtu {interface['mtu']}\n"]
+            if interface['ipv4']:
+                lines.append(f"\tinet {interface['ipv4']} --> {VPN_PEER} netmask 0xff000000\n")
+            else:
+                lines.append(f"\tinet6 fe80::{interface['index']:x}%{name} prefixlen 64 scopeid 0x{interface['index']:x} \n")
+            lines.append("\tnd6 options=201<PERFORMNUD,DAD>\n")
+            blocks.append(''.join(lines))
+        else:
+            lines = [f"{name}: flags=8863<UP,BROADCAST,SMART,RUNNING,SIMPLEX,MULTICAST> mtu {interface['mtu']}\n",
+                     "\toptions=6463<RXCSUM,TXCSUM,TSO4,TSO6,CHANNEL_IO,PARTIAL_CSUM,ZEROINVERT_CSUM>\n",
+                     f"\tether {interface['mac']}\n",
+                     f"\tinet6 fe80::{interface['index']:x}:1%{name} prefixlen 64 secured scopeid 0x{interface['index']:x} \n"]
+            if interface['ipv4']:
+                lines.append(f"\tinet {interface['ipv4']} netmask 0xffff0000 broadcast 172.16.255.255\n")
+            lines += ["\tnd6 options=201<PERFORMNUD,DAD>\n", "\tmedia: autoselect\n", "\tstatus: active\n"]
+            blocks.append(''.join(lines))
+    return ''.join(blocks)
+
+
+def _linux_block(interface: Dict) -> str:
+    """Bloco de uma interface no formato do ifconfig do net-tools (Linux)"""
+    name, kind = interface['name'], interface['kind']
+    if kind == 'loopback':
+        header = f"{name}: flags=73<UP,LOOPBACK,RUNNING>  mtu {interface['mtu']}\n"
+        address = ("        inet 127.0.0.1  netmask 255.0.0.0\n"
+                   "        inet6 ::1  prefixlen 128  scopeid 0x10<host>\n"
+                   "        loop  txqueuelen 1000  (Local Loopback)\n")
+    elif kind in ('ppp', 'utun'):
+        header = f"{name}: flags=4305<UP,POINTOPOINT,RUNNING,NOARP,MULTICAST>  mtu {interface['mtu']}\n"
+        address = (f"        inet {interface['ipv4']}  netmask 255.255.255.255  destination {VPN_PEER}\n"
+                   if interface['ipv4'] else '') + \
+                  "        ppp  txqueuelen 3  (Point-to-Point Protocol)\n"
+    else:
+        header = f"{name}: flags=4163<UP,BROADCAST,RUNNING,MULTICAST>  mtu {interface['mtu']}\n"
+        address = (f"        inet {interface['ipv4']}  netmask 255.255.0.0  broadcast 172.16.255.255\n"
+                   if interface['ipv4'] else '') + \
+                  (f"        inet6 fe80::{interface['index']:x}:1  prefixlen 64  scopeid 0x20<link>\n"
+                   f"        ether {interface['mac']}  txqueuelen 1000  (Ethernet)\n")
+    return (header + address +
+            f"        RX packets {interface['rx_packets']}  bytes {interface['rx']} ({interface['rx'] / 2 ** 20:.1f} MiB)\n"
+            f"        RX errors {interface['rx_errors']}  dropped {interface['rx_drop']}  overruns 0  frame 0\n"
+            f"        TX packets {interface['tx_packets']}  bytes {interface['tx']} ({interface['tx'] / 2 ** 20:.1f} MiB)\n"
+            f"        TX errors 0  dropped 0 overruns 0  carrier 0  collisions 0\n\n")
+
+
+def ifconfig_linux(count: int) -> str:
+    """Saída de `ifconfig` do net-tools (Linux)"""
+    return ''.join(_linux_block(interface) for interface in _interfaces(count))
+
+
+def ifconfig_linux_single(count: int) -> str:
+    """Saída de `ifconfig ppp0` (uma interface; independe de `count`)"""
+    return _linux_block(_interfaces(count)[-1])
+
+
+def netstat_ibn(count: int) -> str:
+    """Saída de `netstat -ibn` do macOS (linha <Link#> + linhas de endereço)"""
+    lines = [f"{'Name':<10} {'Mtu':>5} {'Network':<13} {'Address':<19} {'Ipkts':>10} {'Ierrs':>5} "
+             f"{'Ibytes':>12} {'Opkts':>10} {'Oerrs':>5} {'Obytes':>12} {'Coll':>5}"]
+    for interface in _interfaces(count):
+        name = 'lo0' if interface['kind'] == 'loopback' else interface['name']
+        counters = (f"{interface['rx_packets']:>10} {interface['rx_errors']:>5} {interface['rx']:>12} "
+                    f"{interface['tx_packets']:>10} {interface['tx_errors']:>5} {interface['tx']:>12} {0:>5}")
+        # Interfaces ponto-a-ponto não têm endereço de link: a coluna fica vazia
+        link_address = '' if interface['kind'] in ('ppp', 'utun', 'loopback') else interface['mac']
+        lines.append(f"{name:<10} {interface['mtu']:>5} {'<Link#' + str(interface['index']) + '>':<13} "
+                     f"{link_address:<19} {counters}")
+        if interface['ipv4']:
+            network = '.'.join(interface['ipv4'].split('.')[:3]) + '/24'
+            lines.append(f"{name:<10} {interface['mtu']:>5} {network:<13} {interface['ipv4']:<19} "
+                         f"{interface['rx_packets']:>10} {'-':>5} {interface['rx']:>12} "
+                         f"{interface['tx_packets']:>10} {'-':>5} {interface['tx']:>12} {'-':>5}")
+    return '\n'.join(lines) + '\n'
+
+
+def ip_link_json(count: int, addresses: bool = False) -> str:
+    """Saída de `ip -s -j link` (iproute2); com `addresses`, de `ip -j -s addr`"""
+    records = []
+    for interface in _interfaces(count):
+        loopback = interface['kind'] == 'loopback'
+        point_to_point = interface['kind'] in ('ppp', 'utun')
+        records.append({
+            'ifindex': interface['index'],
+            'ifname': interface['name'],
+            'flags': (['LOOPBACK', 'UP', 'LOWER_UP'] if loopback else
+                      ['POINTOPOINT', 'MULTICAST', 'NOARP', 'UP', 'LOWER_UP'] if point_to_point else
+                      ['BROADCAST', 'MULTICAST', 'UP', 'LOWER_UP']),
+            'mtu': interface['mtu'],
+            'qdisc': 'noqueue' if loopback else 'fq_codel',
+            'operstate': 'UNKNOWN' if loopback or point_to_point else 'UP',
+            'linkmode': 'DEFAULT',
+            'group': 'default',
+            'txqlen': 3 if point_to_point else 1000,
+            'link_type': 'loopback' if loopback else 'ppp' if point_to_point else 'ether',
+            **({} if point_to_point else {'address': interface['mac'], 'broadcast': 'ff:ff:ff:ff:ff:ff'}),
+            **({'addr_info': _addr_info(interface)} if addresses else {}),
+            'stats64': {
+                'rx': {'bytes': interface['rx'], 'packets': interface['rx_packets'],
+                       'errors': interface['rx_errors'], 'dropped': interface['rx_drop'],
+                       'over_errors': 0, 'multicast': 0},
+                'tx': {'bytes': interface['tx'], 'packets': interface['tx_packets'],
+                       'errors': interface['tx_errors'], 'dropped': interface['tx_drop'],
+                       'carrier_errors': 0, 'collisions': 0},
+            },
+        })
+    return json.dumps(records, separators=(',', ':')) + '\n'
+
+
+def _addr_info(interface: Dict) -> List[Dict]:
+    """Lista addr_info de `ip -j addr` para uma interface"""
+    info = []
+    if interface['ipv4']:
+        entry = {'family': 'inet', 'local': interface['ipv4'], 'prefixlen': 32 if interface['kind'] == 'ppp' else 16,
+                 'scope': 'host' if interface['kind'] == 'loopback' else 'global',
+                 'label': interface['name'], 'valid_life_time': 4294967295, 'preferred_life_time': 4294967295}
+        if interface['kind'] == 'ppp':
+            entry['address'] = VPN_PEER
+        info.append(entry)
+    if interface['kind'] != 'ppp':
+        info.append({'family': 'inet6', 'local': '::1' if interface['kind'] == 'loopback' else f"fe80::{interface['index']:x}:1",
+                     'prefixlen': 128 if interface['kind'] == 'loopback' else 64,
+                     'scope': 'host' if interface['kind'] == 'loopback' else 'link',
+                     'valid_life_time': 4294967295, 'preferred_life_time': 4294967295})
+    return info
+
+
+def ip_addr_json(count: int) -> str:
+    """Saída de `ip -j -s addr` (iproute2)"""
+    return ip_link_json(count, addresses=True)
+
+
+def proc_net_dev(count: int) -> bytes:
+    """Conteúdo de /proc/net/dev"""
+    lines = ["Inter-|   Receive                                                |  Transmit",
+             " face |bytes    packets errs drop fifo frame compressed multicast|"
+             "bytes    packets errs drop fifo colls carrier compressed"]
+    for interface in _interfaces(count):
+        lines.append(f"{interface['name']:>6}: {interface['rx']:>8} {interface['rx_packets']:>7} "
+                     f"{interface['rx_errors']:>4} {interface['rx_drop']:>4} {0:>4} {0:>5} {0:>10} {0:>9} "
+                     f"{interface['tx']:>8} {interface['tx_packets']:>7} {interface['tx_errors']:>4} "
+                     f"{interface['tx_drop']:>4} {0:>4} {0:>5} {0:>7} {0:>10}")
+    return ('\n'.join(lines) + '\n').encode()
+
+
+# Formato -> (gerador, nome do arquivo ao gravar)
+FIXTURES = {
+    'ifconfig_macos': (ifconfig_macos, 'ifconfig-macos-{n}.txt'),
+    'ifconfig_linux': (ifconfig_linux, 'ifconfig-linux-{n}.txt'),
+    'ifconfig_linux_single': (ifconfig_linux_single, 'ifconfig-linux-ppp0.txt'),
+    'netstat_ibn': (netstat_ibn, 'netstat-ibn-{n}.txt'),
+    'ip_link_json': (ip_link_json, 'ip-s-j-link-{n}.json'),
+    'ip_addr_json': (ip_addr_json, 'ip-j-s-addr-{n}.json'),
+    'proc_net_dev': (proc_net_dev, 'proc-net-dev-{n}.txt'),
+}
+
+
+def main():
+    """Grava as fixtures em disco para inspeção ou uso externo"""
+    parser = argparse.ArgumentParser(description="Gerar fixtures de ifconfig/netstat/ip/proc")
+    parser.add_argument("directory", help="Diretório de destino")
+    parser.add_argument("--sizes", type=int, nargs='+', default=list(SIZES), help="Números de interfaces")
+    args = parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    for name, (generator, filename) in FIXTURES.items():
+        for size in args.sizes:
+            content = generator(size)
+            path = os.path.join(args.directory, filename.format(n=size))
+            with open(path, 'wb') as f:
+                f.write(content if isinstance(content, bytes) else content.encode())
+    print(f"✅ Fixtures gravadas em {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
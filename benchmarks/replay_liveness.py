@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Replay de tráfego pelo detector de peer morto: falsos positivos e latência de detecção
+
+Relógio virtual, sem rede. Cada cenário gera os contadores rx/tx da
+interface do túnel amostrados a 20 Hz (como o TrafficSampler) e responde às
+sondas do detector com o RTT do cenário enquanto o peer está vivo. Nas
+execuções com queda, o peer morre em um instante sorteado: a partir daí nada
+mais chega (o openfortivpn continua rodando, então o fluxo anterior nunca
+percebe). Nas execuções sem queda, qualquer declaração de morte é um falso
+positivo.
+
+Cenários: interativo (rajadas com resposta), download contínuo, upload UDP
+(só ida), túnel ocioso e interativo com RTT alto.
+"""
+
+import sys
+import os
+import heapq
+import random
+import argparse
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.liveness import LivenessDetector, STATE_DEAD, DEFAULT_BUDGET, IDLE_PROBE_INTERVAL
+
+
+# Configuração
+HZ = 20
+DURATION = 40.0  # segundos por execução
+DEFAULT_RUNS = 100
+DEFAULT_SEED = 11
+PROBE_BYTES = 60
+
+# nome: (probabilidade de envio por amostra, bytes enviados, bytes de resposta, RTT em segundos)
+SCENARIOS = {
+    'interativo': (0.15, 600, 8000, 0.04),
+    'download': (1.0, 1500, 60000, 0.03),
+    'upload-udp': (1.0, 40000, 0, 0.03),
+    'ocioso': (0.0, 0, 0, 0.03),
+    'rtt-alto': (0.1, 600, 4000, 0.6),
+}
+
+
+class Clock:
+    """Relógio virtual"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def replay(scenario: str, death_at, rng: random.Random, budget: float, probes: bool):
+    """
+    Reproduz uma execução.
+
+    Returns:
+        Instante em que o peer foi declarado morto, ou None
+    """
+    send_probability, sent_bytes, reply_bytes, rtt = SCENARIOS[scenario]
+    clock = Clock()
+    detector = LivenessDetector(budget, probes=probes, clock=clock)
+    alive = lambda at: death_at is None or at < death_at
+    rx = tx = 0
+    arrivals = []  # (instante, bytes) a somar no rx
+    probe = None  # (instante do resultado, ok)
+    step = 1.0 / HZ
+    for index in range(int(DURATION * HZ)):
+        now = clock.now = index * step
+        if sent_bytes and rng.random() < send_probability:
+            tx += sent_bytes
+            # Resposta só chega se o peer ainda está vivo quando ela chegaria
+            if reply_bytes and alive(now + rtt):
+                heapq.heappush(arrivals, (now + rtt, reply_bytes))
+        while arrivals and arrivals[0][0] <= now:
+            rx += heapq.heappop(arrivals)[1]
+        if probe is not None and probe[0] <= now:
+            detector.record_probe(probe[1], now)
+            probe = None
+        detector.update({'rx': rx, 'tx': tx}, now)
+        if detector.probe_due(now):
+            detector.probe_started(now)
+            tx += PROBE_BYTES
+            ok = alive(now + rtt) and rtt < detector.probe_timeout
+            if ok:
+                heapq.heappush(arrivals, (now + rtt, PROBE_BYTES))
+            probe = (now + (rtt if ok else detector.probe_timeout), ok)
+        if detector.state == STATE_DEAD:
+            return now
+    return None
+
+
+def percentile(values, pct: float) -> float:
+    """Percentil por rank mais próximo"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def evaluate(budget: float, probes: bool, runs: int, seed: int):
+    """
+    Roda todos os cenários com e sem queda.
+
+    Returns:
+        {cenário: {'false_positives', 'latencies', 'missed'}}
+    """
+    results = {}
+    for offset, scenario in enumerate(SCENARIOS):
+        rng = random.Random(seed * 100 + offset)
+        false_positives, latencies, missed = 0, [], 0
+        for _ in range(runs):
+            if replay(scenario, None, rng, budget, probes) is not None:
+                false_positives += 1
+            death_at = rng.uniform(5.0, DURATION - 15.0)
+            declared = replay(scenario, death_at, rng, budget, probes)
+            if declared is None:
+                missed += 1
+            elif declared < death_at:
+                false_positives += 1
+            else:
+                latencies.append(declared - death_at)
+        results[scenario] = {'false_positives': false_positives, 'latencies': latencies, 'missed': missed}
+    return results
+
+
+def report(label: str, results: dict, runs: int):
+    """Imprime a tabela de um modo"""
+    print(f"{label}")
+    print(f"   {'cenário':<12} {'falsos +':>9} {'p50':>8} {'p95':>8} {'máx':>8} {'não detect.':>12}")
+    for scenario, result in results.items():
+        latencies = result['latencies']
+        if latencies:
+            timings = (f"{percentile(latencies, 50):>7.2f}s {percentile(latencies, 95):>7.2f}s "
+                       f"{max(latencies):>7.2f}s")
+        else:
+            timings = f"{'-':>8} {'-':>8} {'-':>8}"
+        print(f"   {scenario:<12} {result['false_positives']:>5}/{runs * 2:<3} {timings} {result['missed']:>8}/{runs}")
+    print()
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Replay de tráfego pelo detector de peer morto")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help=f"Prazo de detecção (padrão: {DEFAULT_BUDGET}s)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help=f"Execuções por cenário (padrão: {DEFAULT_RUNS})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Semente (resultados reproduzíveis)")
+    args = parser.parse_args()
+
+    print(f"🧪 {len(SCENARIOS)} cenários × {args.runs} execuções com queda + {args.runs} sem queda "
+          f"({DURATION:g}s a {HZ} Hz), prazo {args.budget:g}s")
+    print("   Fluxo anterior: o openfortivpn segue vivo, o túnel nunca é dado como caído")
+    print("-" * 72)
+    probed = evaluate(args.budget, True, args.runs, args.seed)
+    report("📡 Contadores + sondas pelo túnel", probed, args.runs)
+    counters_only = evaluate(args.budget, False, args.runs, args.seed)
+    report("📈 Só contadores (sem alvos de sonda: suspeita só no painel)", counters_only, args.runs)
+
+    step = 1.0 / HZ
+    continuous = probed['download']['latencies']
+    slowest = {scenario: max(result['latencies']) - (IDLE_PROBE_INTERVAL + args.budget + SCENARIOS[scenario][3])
+               for scenario, result in probed.items() if scenario != 'download' and result['latencies']}
+    checks = [
+        ("nenhum falso positivo com sondas", sum(r['false_positives'] for r in probed.values()) == 0,
+         f"{sum(r['false_positives'] for r in probed.values())}"),
+        ("toda queda detectada com sondas", sum(r['missed'] for r in probed.values()) == 0,
+         f"{sum(r['missed'] for r in probed.values())} não detectadas"),
+        (f"tráfego contínuo: detecção no prazo de {args.budget:g}s (+ 4 amostras)",
+         max(continuous) <= args.budget + 4 * step + 1e-9, f"máx {max(continuous):.2f}s"),
+        ("rajadas, só ida e ocioso: detecção em até intervalo entre sondas + prazo + RTT",
+         all(excess <= 3 * step + 1e-9 for excess in slowest.values()),
+         f"pior caso {max(slowest.values()):+.2f}s do limite"),
+        ("só contadores: túnel nunca derrubado (nem upload UDP)",
+         all(not result['false_positives'] and not result['latencies'] for result in counters_only.values()),
+         f"upload-udp: {counters_only['upload-udp']['false_positives']} falsos +"),
+    ]
+    for label, ok, detail in checks:
+        print(f"{'✓' if ok else '✗'} {label} ({detail})")
+    print()
+    if all(ok for _, ok, _ in checks):
+        print("✅ Todas as verificações passaram")
+    else:
+        print("❌ Verificações falharam")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
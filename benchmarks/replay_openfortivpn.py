@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Replay de transcrições gravadas do openfortivpn pela máquina de estados de eventos
+
+Para cada transcrição em benchmarks/transcripts/, mostra a linha do tempo de
+eventos, confere a sequência esperada (✓/✗) e mede o custo do parser por linha.
+Também aceita transcrições avulsas (ex: saída capturada com `tee`).
+"""
+
+import sys
+import os
+import glob
+import time
+import argparse
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.openfortivpn_events import OpenfortivpnEventParser, replay_transcript
+
+
+# Configuração
+TRANSCRIPTS_DIR = os.path.join(os.path.dirname(__file__), 'transcripts')
+LINE_INTERVAL = 0.1  # segundos fictícios entre linhas no replay
+MIN_TIME = 0.2  # segundos medidos por transcrição
+
+# Sequência de eventos esperada por transcrição gravada
+EXPECTED = {
+    'saml-success.log': ['saml_url', 'auth_ok', 'ppp_negotiated', 'routes_installed', 'tunnel_up', 'disconnected'],
+    'auth-failure.log': ['saml_url', 'error', 'disconnected'],
+    'tunnel-drop.log': ['saml_url', 'auth_ok', 'ppp_negotiated', 'routes_installed', 'tunnel_up', 'error',
+                        'disconnected'],
+}
+
+
+def measure_line_cost(lines) -> float:
+    """Nanossegundos por linha alimentada ao parser"""
+    iterations = 0
+    start = time.perf_counter_ns()
+    while time.perf_counter_ns() - start < MIN_TIME * 1e9:
+        parser = OpenfortivpnEventParser()
+        for line in lines:
+            parser.feed(line)
+        parser.close()
+        iterations += 1
+    return (time.perf_counter_ns() - start) / (iterations * max(len(lines), 1))
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Replay de transcrições do openfortivpn")
+    parser.add_argument("files", nargs='*', help="Transcrições (padrão: benchmarks/transcripts/*.log)")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(TRANSCRIPTS_DIR, '*.log')))
+    wrong = 0
+    for path in files:
+        with open(path) as f:
+            lines = f.read().splitlines()
+        events = replay_transcript(lines, LINE_INTERVAL)
+        kinds = [event['kind'] for event in events]
+        expected = EXPECTED.get(os.path.basename(path))
+        mark = '' if expected is None else (' ✓' if kinds == expected else ' ✗')
+        if expected is not None and kinds != expected:
+            wrong += 1
+        print(f"📄 {os.path.basename(path)} ({len(lines)} linhas, "
+              f"{format(measure_line_cost(lines), ',.0f')} ns/linha){mark}")
+        for event in events:
+            extra = {key: value for key, value in event.items() if key not in ('kind', 'at', 'line') and value is not None}
+            details = ' '.join(f"{key}={value}" for key, value in extra.items())
+            print(f"   +{event['at']:5.1f}s {event['kind']:<17} {details}")
+        if expected is not None and kinds != expected:
+            print(f"   ⚠️  esperado: {' → '.join(expected)}")
+        print()
+    if wrong:
+        print(f"⚠️  {wrong} transcrição(ões) com sequência inesperada (✗)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Simulador de reconexão: MTTR e carga no gateway do agendador vs atrasos fixos
+
+Relógio virtual, sem rede nem processos. Cada queda sorteia a duração da
+indisponibilidade (a maioria é só uma queda do túnel com o gateway no ar);
+uma tentativa antes do fim falha após FAIL_TIME, depois dele o túnel sobe em
+CONNECT_TIME. Nas quedas de rede local, um evento de interface marca a volta
+da rede (só o agendador o usa, via wake()).
+
+Compara:
+- fixo Ns: espera N segundos antes de cada tentativa (fluxo anterior, N=10)
+- agendador: ReconnectScheduler com os parâmetros padrão
+"""
+
+import sys
+import os
+import random
+import argparse
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.reconnect_scheduler import ReconnectScheduler, CIRCUIT_OPEN
+
+
+# Configuração
+DEFAULT_OUTAGES = 2000
+DEFAULT_SEED = 7
+CONNECT_TIME = 3.0  # segundos do spawn ao túnel no ar
+FAIL_TIME = 2.0  # segundos até uma tentativa com o gateway fora falhar
+FIXED_DELAYS = (10.0, 2.0)
+
+# (probabilidade, duração mínima, máxima, volta sinalizada por evento de rede)
+OUTAGE_MIX = (
+    (0.55, 0.0, 0.0, False),  # túnel caiu, gateway no ar (timeout de sessão, DPD)
+    (0.15, 1.0, 30.0, True),  # troca de Wi-Fi / suspensão: rede local volta com evento
+    (0.20, 1.0, 60.0, False),  # oscilação curta do gateway
+    (0.10, 60.0, 1800.0, False),  # manutenção / gateway fora do ar
+)
+
+
+class Clock:
+    """Relógio virtual"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def sample_outage(rng: random.Random):
+    """Sorteia (duração, tem_evento_de_rede)"""
+    pick = rng.random()
+    for probability, low, high, network_event in OUTAGE_MIX:
+        if pick < probability:
+            return rng.uniform(low, high), network_event
+        pick -= probability
+    return 0.0, False
+
+
+def simulate_fixed(duration: float, delay: float):
+    """Atraso fixo antes de cada tentativa; retorna (tempo até subir, tentativas)"""
+    now, attempts = 0.0, 0
+    while True:
+        now += delay
+        attempts += 1
+        if now >= duration:
+            return now + CONNECT_TIME, attempts
+        now += FAIL_TIME
+
+
+def simulate_scheduler(duration: float, network_event: bool, rng: random.Random):
+    """ReconnectScheduler com relógio virtual; retorna (tempo até subir, tentativas, sondas)"""
+    clock = Clock()
+    scheduler = ReconnectScheduler(clock=clock, rng=rng)
+    scheduler.record_drop()
+    attempts, probes = 0, 0
+    wake_at = duration if network_event and duration > 0 else None
+    while True:
+        # Evento de rede antes da próxima tentativa/sonda cancela a espera
+        if wake_at is not None and clock.now <= wake_at < scheduler.next_attempt_at:
+            clock.now = wake_at
+            scheduler.wake()
+            wake_at = None
+        clock.now = max(clock.now, scheduler.next_attempt_at)
+        if scheduler.circuit == CIRCUIT_OPEN:
+            probes += 1
+            scheduler.record_probe(clock.now >= duration)
+            continue
+        attempts += 1
+        if clock.now >= duration:
+            scheduler.record_success()
+            return clock.now + CONNECT_TIME, attempts, probes
+        clock.now += FAIL_TIME
+        scheduler.record_failure(reachable=False)
+
+
+def percentile(values, pct: float) -> float:
+    """Percentil por rank mais próximo"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def report(label: str, recoveries, attempts, long_attempts):
+    """Imprime uma linha da tabela"""
+    mean = sum(recoveries) / len(recoveries)
+    print(f"{label:<14} {mean:>9.1f}s {percentile(recoveries, 50):>8.1f}s {percentile(recoveries, 95):>8.1f}s "
+          f"{sum(attempts) / len(attempts):>11.2f} {sum(long_attempts) / max(1, len(long_attempts)):>14.1f}")
+    return mean
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Simulador de MTTR: agendador de reconexão vs atraso fixo")
+    parser.add_argument("--outages", type=int, default=DEFAULT_OUTAGES, help=f"Quedas simuladas (padrão: {DEFAULT_OUTAGES})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Semente (resultados reproduzíveis)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    outages = [sample_outage(rng) for _ in range(args.outages)]
+    long_outages = [index for index, (duration, _) in enumerate(outages) if duration >= 60]
+
+    print(f"🧪 {args.outages} quedas simuladas ({len(long_outages)} com gateway fora por ≥ 60s)")
+    print("-" * 72)
+    print(f"{'política':<14} {'MTTR':>10} {'p50':>9} {'p95':>9} {'tentativas':>11} {'tent./longa':>14}")
+    print("-" * 72)
+
+    means = {}
+    long_load = {}
+    for delay in FIXED_DELAYS:
+        results = [simulate_fixed(duration, delay) for duration, _ in outages]
+        recoveries = [result[0] for result in results]
+        attempts = [result[1] for result in results]
+        long_load[delay] = [attempts[index] for index in long_outages]
+        means[delay] = report(f"fixo {delay:g}s", recoveries, attempts, long_load[delay])
+
+    jitter_rng = random.Random(args.seed + 1)
+    results = [simulate_scheduler(duration, network_event, jitter_rng) for duration, network_event in outages]
+    recoveries = [result[0] for result in results]
+    attempts = [result[1] for result in results]
+    scheduler_long = [attempts[index] for index in long_outages]
+    means['agendador'] = report("agendador", recoveries, attempts, scheduler_long)
+    probes = sum(result[2] for result in results)
+    print()
+    print(f"🔌 Sondas TCP com o circuito aberto: {probes} (nenhum openfortivpn iniciado nelas)")
+
+    blips = [index for index, (duration, _) in enumerate(outages) if duration == 0]
+    checks = [
+        ("MTTR do agendador menor que o do atraso fixo de 10s", means['agendador'] < means[10.0],
+         f"{means['agendador']:.1f}s vs {means[10.0]:.1f}s"),
+        ("queda com gateway no ar reconecta sem espera", all(recoveries[index] == CONNECT_TIME for index in blips),
+         f"{len(blips)} quedas"),
+        ("menos tentativas que o fixo de 2s em quedas longas",
+         sum(scheduler_long) < sum(long_load[2.0]), f"{sum(scheduler_long)} vs {sum(long_load[2.0])}"),
+    ]
+    print()
+    for label, ok, detail in checks:
+        print(f"{'✓' if ok else '✗'} {label} ({detail})")
+    if not all(ok for _, ok, _ in checks):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Simulador de openfortivpn, az, sudo, pgrep, scutil e open para testes ponta a ponta
+
+Grava executáveis falsos em um diretório (a colocar na frente do PATH) que
+reproduzem as transcrições gravadas em benchmarks/transcripts/ com os atrasos
+do cenário: login SAML, negociação PPP, falhas de autenticação, gateway
+recusando, processos travados antes do túnel e túneis que caem após N
+segundos. Como root, cada túnel cria uma interface pppN de verdade (par veth
+com o IP da VPN), vista pela descoberta de interfaces e pelos contadores.
+
+Cada execução dos falsos é registrada em events.log ("instante pid ferramenta
+evento detalhe"), lido por read_events(). Uso direto:
+
+    python3 benchmarks/vpn_simulator.py install /tmp/sim --scenario queda
+    eval "$(python3 benchmarks/vpn_simulator.py env /tmp/sim)"
+    python3 scripts/connect_vpn.py
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import subprocess
+from typing import Optional, Dict, List
+
+
+# Configuração
+TRANSCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'transcripts')
+EVENTS_FILE = 'events.log'
+NETNS_ENV = 'VPN_CONNECT_BENCH_NETNS'
+
+# Resultados de uma tentativa do openfortivpn falso
+OUTCOME_OK = 'ok'  # túnel sobe (e cai após 'up_for' segundos, se definido)
+OUTCOME_AUTH_FAIL = 'auth_fail'  # gateway rejeita a autenticação
+OUTCOME_REFUSED = 'refused'  # gateway não aceita a conexão
+OUTCOME_HANG = 'hang'  # processo trava antes do túnel, sem sair
+
+DEFAULT_SCENARIO = {
+    'auth_delay': 0.5,  # segundos de login SAML no navegador + autenticação
+    'ppp_delay': 0.2,  # segundos de negociação PPP até a interface subir
+    'az_delay': 0.0,  # segundos de cada `az account get-access-token`
+    'login_delay': 1.0,  # segundos do `az login`
+    'az_logged_in': True,  # Azure CLI autenticado (senão `az account show` falha até o login)
+    'outcomes': [],  # resultado de cada tentativa, em ordem
+    'then': OUTCOME_OK,  # resultado das tentativas após a lista
+    'up_for': None,  # segundos no ar antes da queda (None = até SIGTERM)
+    'links': True,  # criar a interface pppN (exige root); sem ela só a saída é simulada
+}
+
+SCENARIOS = {
+    'estavel': {},
+    'queda': {'up_for': 3.0},
+    'auth': {'outcomes': [OUTCOME_AUTH_FAIL, OUTCOME_AUTH_FAIL]},
+    'recusado': {'outcomes': [OUTCOME_REFUSED] * 2},
+    'travado': {'outcomes': [OUTCOME_HANG]},
+    'az-lento': {'az_delay': 1.5},
+    'az-login': {'az_logged_in': False},
+}
+
+FAKE_SUDO = '#!/bin/sh\nexec "$@"\n'
+
+FAKE_SCUTIL = """#!/bin/sh
+echo "$(date +%%s.%%N) $$ scutil call $*" >> '%(events)s'
+echo "Available network connection services in the current set (*=enabled):"
+"""
+
+FAKE_OPEN = """#!/bin/sh
+echo "$(date +%%s.%%N) $$ open saml $1" >> '%(events)s'
+"""
+
+FAKE_PGREP = """#!%(python)s -S
+import os, sys, time
+RUN_DIR = %(run_dir)r
+with open(%(events)r, 'a') as f:
+    f.write('%%.6f %%d pgrep call %%s\\n' %% (time.time(), os.getpid(), ' '.join(sys.argv[1:])))
+pids = []
+for name in os.listdir(RUN_DIR):
+    try:
+        os.kill(int(name), 0)
+        pids.append(name)
+    except (ValueError, OSError):
+        continue
+print('\\n'.join(pids)) if pids else None
+sys.exit(0 if pids else 1)
+"""
+
+FAKE_AZ = """#!%(python)s -S
+import os, sys, time, json
+SCENARIO = %(scenario)r
+STATE = %(state)r
+args = sys.argv[1:]
+with open(%(events)r, 'a') as f:
+    f.write('%%.6f %%d az call %%s\\n' %% (time.time(), os.getpid(), ' '.join(args[:2])))
+logged_in = SCENARIO['az_logged_in'] or os.path.exists(STATE)
+if args[:1] == ['login']:
+    time.sleep(SCENARIO['login_delay'])
+    open(STATE, 'w').close()
+    print(json.dumps([{'user': {'name': 'sim@example.com'}}]))
+elif args[:2] == ['account', 'show']:
+    if not logged_in:
+        sys.stderr.write("Please run 'az login' to setup account.\\n")
+        sys.exit(1)
+    print(json.dumps({'user': {'name': 'sim@example.com'}, 'tenantId': 'sim-tenant'}))
+elif args[:2] == ['account', 'get-access-token']:
+    time.sleep(SCENARIO['az_delay'])
+    if not logged_in:
+        sys.stderr.write("Please run 'az login' to setup account.\\n")
+        sys.exit(1)
+    print(json.dumps({'accessToken': 'token-simulado', 'expires_on': int(time.time()) + 3600,
+                      'tenant': 'sim-tenant'}))
+else:
+    sys.exit(1)
+"""
+
+FAKE_OPENFORTIVPN = """#!%(python)s -S
+import os, sys, time, fcntl, signal, subprocess
+SCENARIO = %(scenario)r
+TRANSCRIPTS = %(transcripts)r
+EVENTS = %(events)r
+RUN_DIR = %(run_dir)r
+COUNTER = %(counter)r
+
+
+def log(event, detail=''):
+    with open(EVENTS, 'a') as f:
+        f.write('%%.6f %%d openfortivpn %%s %%s\\n' %% (time.time(), os.getpid(), event, detail))
+
+
+def emit(line):
+    sys.stdout.write(line + '\\n')
+    sys.stdout.flush()
+
+
+def next_attempt():
+    with open(COUNTER, 'a+') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        number = int(f.read() or 0) + 1
+        f.seek(0)
+        f.truncate()
+        f.write(str(number))
+    return number
+
+
+def ip(*args):
+    subprocess.run(['ip'] + list(args), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+number = next_attempt()
+outcomes = SCENARIO['outcomes']
+outcome = outcomes[number - 1] if number <= len(outcomes) else SCENARIO['then']
+interface = 'ppp%%d' %% number
+address = '10.212.%%d.%%d' %% (number // 250, number %% 250 + 1)
+gateway = sys.argv[1] if len(sys.argv) > 1 else 'vpn.example.com:443'
+link = False
+
+
+def render(line):
+    return (line.replace('ppp0', interface).replace('10.212.134.5', address)
+            .replace('vpn.example.com:443', gateway))
+
+
+def cleanup():
+    if link:
+        ip('link', 'del', interface)
+    try:
+        os.unlink(os.path.join(RUN_DIR, str(os.getpid())))
+    except OSError:
+        pass
+
+
+def on_term(signum, frame):
+    log('exit', 'sigterm')
+    emit('INFO:   Closed connection to gateway.')
+    cleanup()
+    os._exit(0)
+
+
+signal.signal(signal.SIGTERM, on_term)
+open(os.path.join(RUN_DIR, str(os.getpid())), 'w').close()
+log('start', '%%s #%%d %%s' %% (outcome, number, gateway))
+
+if outcome == 'refused':
+    emit('ERROR:  connect: Connection refused')
+    emit('INFO:   Closed connection to gateway.')
+    log('exit', 'refused')
+    cleanup()
+    sys.exit(1)
+
+transcript = TRANSCRIPTS['auth_fail' if outcome == 'auth_fail' else 'ok']
+for line in transcript:
+    if line.startswith('INFO:   Processing HTTP SAML request'):
+        if outcome == 'hang':
+            # Travado antes do túnel (ex: navegador nunca conclui o login)
+            log('hang')
+            while True:
+                time.sleep(3600)
+        time.sleep(SCENARIO['auth_delay'])
+    elif line.startswith('Using interface'):
+        time.sleep(SCENARIO['ppp_delay'])
+        if SCENARIO['links']:
+            ip('link', 'add', interface, 'type', 'veth', 'peer', 'name', 'pv%%d' %% number)
+            ip('addr', 'add', address + '/32', 'dev', interface)
+            ip('link', 'set', 'pv%%d' %% number, 'up')
+            ip('link', 'set', interface, 'up')
+            link = True
+    emit(render(line))
+
+if outcome == 'auth_fail':
+    log('exit', 'auth_fail')
+    cleanup()
+    sys.exit(1)
+
+log('up', interface)
+if SCENARIO['up_for'] is None:
+    while True:
+        time.sleep(3600)
+time.sleep(SCENARIO['up_for'])
+log('down', interface)
+cleanup()
+for line in TRANSCRIPTS['drop']:
+    emit(render(line))
+log('exit', 'drop')
+sys.exit(1)
+"""
+
+
+def load_transcripts() -> Dict[str, List[str]]:
+    """
+    Transcrições usadas pelo openfortivpn falso.
+
+    Returns:
+        {'ok': até o túnel subir, 'auth_fail': autenticação rejeitada, 'drop': após a queda}
+    """
+    def read(name):
+        with open(os.path.join(TRANSCRIPTS_DIR, name)) as f:
+            return [line.rstrip('\n') for line in f if line.strip()]
+
+    drop = read('tunnel-drop.log')
+    up_index = next(index for index, line in enumerate(drop) if 'Tunnel is up and running' in line)
+    return {'ok': read('saml-success.log'), 'auth_fail': read('auth-failure.log'), 'drop': drop[up_index + 1:]}
+
+
+def build_scenario(name: str = 'estavel', **overrides) -> Dict:
+    """
+    Monta um cenário a partir de um pré-definido.
+
+    Args:
+        name: Chave de SCENARIOS
+        **overrides: Campos de DEFAULT_SCENARIO a substituir (None é ignorado)
+
+    Returns:
+        Cenário completo
+
+    Raises:
+        KeyError: Se o cenário não existe
+    """
+    scenario = dict(DEFAULT_SCENARIO, **SCENARIOS[name])
+    scenario.update({key: value for key, value in overrides.items() if value is not None})
+    return scenario
+
+
+def install(directory: str, scenario: Optional[Dict] = None) -> Dict[str, str]:
+    """
+    Grava os executáveis falsos e o estado do simulador.
+
+    Args:
+        directory: Diretório do simulador (criado se não existe; bin/, home/ e events.log dentro)
+        scenario: Cenário (padrão: DEFAULT_SCENARIO)
+
+    Returns:
+        Ambiente para os processos simulados: PATH com bin/ na frente e HOME isolado
+        (cache de token e logs de profiling não tocam os do usuário)
+    """
+    scenario = dict(DEFAULT_SCENARIO, **(scenario or {}))
+    directory = os.path.abspath(directory)
+    bin_dir = os.path.join(directory, 'bin')
+    run_dir = os.path.join(directory, 'run')
+    for path in (bin_dir, run_dir, os.path.join(directory, 'home')):
+        os.makedirs(path, exist_ok=True)
+    values = {
+        'python': sys.executable,
+        'scenario': scenario,
+        'transcripts': load_transcripts(),
+        'events': os.path.join(directory, EVENTS_FILE),
+        'run_dir': run_dir,
+        'counter': os.path.join(directory, 'attempts'),
+        'state': os.path.join(directory, 'az-logged-in'),
+    }
+    fakes = {'sudo': FAKE_SUDO, 'scutil': FAKE_SCUTIL % values, 'open': FAKE_OPEN % values,
+             'pgrep': FAKE_PGREP % values, 'az': FAKE_AZ % values, 'openfortivpn': FAKE_OPENFORTIVPN % values}
+    for name, content in fakes.items():
+        path = os.path.join(bin_dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        os.chmod(path, 0o755)
+    with open(os.path.join(directory, 'scenario.json'), 'w') as f:
+        json.dump(scenario, f, indent=2)
+    env = dict(os.environ)
+    env['PATH'] = bin_dir + os.pathsep + env.get('PATH', '')
+    env['HOME'] = os.path.join(directory, 'home')
+    return env
+
+
+def read_events(directory: str) -> List[Dict]:
+    """
+    Lê o registro de execuções dos falsos.
+
+    Args:
+        directory: Diretório do simulador
+
+    Returns:
+        Lista de {'at', 'pid', 'tool', 'event', 'detail'} em ordem de tempo
+    """
+    events = []
+    try:
+        with open(os.path.join(directory, EVENTS_FILE)) as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    for line in lines:
+        fields = line.rstrip('\n').split(' ', 4)
+        if len(fields) < 4:
+            continue
+        try:
+            events.append({'at': float(fields[0]), 'pid': int(fields[1]), 'tool': fields[2],
+                           'event': fields[3], 'detail': fields[4] if len(fields) > 4 else ''})
+        except ValueError:
+            continue
+    events.sort(key=lambda event: event['at'])
+    return events
+
+
+def enter_netns():
+    """Reexecuta o processo atual em um namespace de rede próprio (root + unshare), uma única vez"""
+    if os.environ.get(NETNS_ENV):
+        # Já no namespace novo: loopback começa desligado
+        subprocess.run(['ip', 'link', 'set', 'lo', 'up'], capture_output=True)
+        return
+    if os.geteuid() != 0 or shutil.which('unshare') is None:
+        return
+    os.environ[NETNS_ENV] = '1'
+    try:
+        os.execvp('unshare', ['unshare', '-n', sys.executable] + sys.argv)
+    except OSError:
+        pass
+
+
+def links_supported() -> bool:
+    """Verifica se é possível criar interfaces (par veth) para os túneis simulados"""
+    if shutil.which('ip') is None:
+        return False
+    result = subprocess.run(['ip', 'link', 'add', 'simprobe', 'type', 'veth', 'peer', 'name', 'simpeer'],
+                            capture_output=True)
+    if result.returncode != 0:
+        return False
+    subprocess.run(['ip', 'link', 'del', 'simprobe'], capture_output=True)
+    return True
+
+
+def main():
+    """Instala o simulador para uso manual com os scripts"""
+    parser = argparse.ArgumentParser(description="Simulador de openfortivpn/az/sudo/pgrep/scutil")
+    commands = parser.add_subparsers(dest='command', required=True)
+    install_parser = commands.add_parser('install', help="Grava os executáveis falsos")
+    install_parser.add_argument("directory", help="Diretório do simulador")
+    install_parser.add_argument("--scenario", choices=sorted(SCENARIOS), default='estavel', help="Cenário pré-definido")
+    install_parser.add_argument("--auth-delay", type=float, help="Segundos de login SAML + autenticação")
+    install_parser.add_argument("--az-delay", type=float, help="Segundos de cada get-access-token")
+    install_parser.add_argument("--up-for", type=float, help="Segundos no ar antes de cada queda")
+    install_parser.add_argument("--no-links", action="store_true", help="Não criar interfaces pppN")
+    env_parser = commands.add_parser('env', help="Imprime os exports de PATH e HOME")
+    env_parser.add_argument("directory", help="Diretório do simulador")
+    events_parser = commands.add_parser('events', help="Mostra o registro de execuções")
+    events_parser.add_argument("directory", help="Diretório do simulador")
+    args = parser.parse_args()
+
+    directory = os.path.abspath(args.directory)
+    if args.command == 'install':
+        scenario = build_scenario(args.scenario, auth_delay=args.auth_delay, az_delay=args.az_delay,
+                                  up_for=args.up_for, links=False if args.no_links else None)
+        install(directory, scenario)
+        print(f"✅ Simulador '{args.scenario}' instalado em {directory}")
+        print(f'💡 eval "$(python3 {sys.argv[0]} env {directory})"')
+    elif args.command == 'env':
+        print(f"export PATH={os.path.join(directory, 'bin')}{os.pathsep}$PATH")
+        print(f"export HOME={os.path.join(directory, 'home')}")
+    else:
+        for event in read_events(directory):
+            print(f"{event['at']:.3f} {event['pid']:>7} {event['tool']:<12} {event['event']:<6} {event['detail']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Script de benchmark de throughput através da VPN (substitui o iperf manual)
+"""
+
+import sys
+import os
+import time
+import argparse
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.network_snapshot import NetworkSnapshot
+from src.core.throughput_bench import (ThroughputBenchmark, ThroughputServer, DEFAULT_BENCH_HOST,
+                                       DEFAULT_BENCH_PORT, DEFAULT_STREAMS, DEFAULT_DURATION, MAX_DURATION)
+from src.utils.formatters import format_bytes, format_speed
+
+
+def print_flush(*args, **kwargs):
+    """Print com flush automático"""
+    print(*args, **kwargs, flush=True)
+
+
+def print_result(result: dict):
+    """Exibe o resultado de uma direção"""
+    arrow = "⬆️ " if result['direction'] == 'upload' else "⬇️ "
+    print_flush(f"{arrow} {result['direction'].upper()}: {format_speed(result['throughput'])} "
+                f"({format_bytes(result['bytes'])} em {result['elapsed']:.1f}s)")
+    for index, stream_bytes in enumerate(result['streams']):
+        share = stream_bytes / result['bytes'] * 100 if result['bytes'] else 0
+        print_flush(f"   stream {index + 1}: {format_speed(stream_bytes / result['elapsed']):>14} ({share:.1f}%)")
+    print_flush(f"   Justiça (Jain): {result['fairness']:.3f}")
+    print_flush(f"   CPU: {result['cpu_seconds']:.2f}s ({result['cpu_percent']:.0f}% de um núcleo, "
+                f"{result['cpu_per_gb']:.2f}s/GB)")
+    interface = result['interface']
+    if interface is not None:
+        measured = interface['tx_rate'] if result['direction'] == 'upload' else interface['rx_rate']
+        difference = (measured / result['throughput'] - 1) * 100 if result['throughput'] else 0
+        print_flush(f"   Interface: {format_speed(measured)} segundo get_interface_stats "
+                    f"({difference:+.1f}% vs benchmark, {interface['samples']} leituras)")
+    for error in result['errors']:
+        print_flush(f"   ⚠️  {error}")
+    print_flush()
+
+
+def run_command(args) -> int:
+    """Executa o cliente do benchmark"""
+    server = None
+    host = args.peer
+    port = args.port
+    if args.local:
+        # Servidor embutido em loopback: valida a ferramenta sem peer remoto
+        server = ThroughputServer('127.0.0.1', 0)
+        if not server.start():
+            print_flush("❌ Não foi possível iniciar o servidor local")
+            return 1
+        host, port = '127.0.0.1', server.port
+    elif not host:
+        print_flush("❌ Informe --peer (host com 'benchmark_vpn.py server') ou use --local")
+        return 1
+
+    interface = args.interface
+    if interface is None and not args.local:
+        interface = NetworkSnapshot.current().get_vpn_interface()
+        if not interface:
+            print_flush("⚠️  Interface VPN não encontrada; contadores não serão comparados")
+
+    print_flush(f"🚀 Benchmark: {host}:{port} | {args.streams} streams | {args.duration:g}s por direção"
+                + (f" | interface {interface}" if interface else ""))
+    print_flush("-" * 70)
+
+    def progress(direction: str, elapsed: float):
+        remaining = max(0.0, args.duration - elapsed)
+        sys.stdout.write(f"\r⏳ {direction}: {remaining:4.1f}s restantes ")
+        sys.stdout.flush()
+
+    benchmark = ThroughputBenchmark(host, port, args.streams, args.duration, interface)
+    try:
+        results = benchmark.run(args.direction, progress)
+    except OSError as exc:
+        print_flush(f"\n❌ Erro ao conectar em {host}:{port}: {exc}")
+        return 1
+    except KeyboardInterrupt:
+        print_flush("\n🛑 Benchmark interrompido")
+        return 1
+    finally:
+        if server is not None:
+            server.stop()
+
+    sys.stdout.write("\r" + " " * 40 + "\r")
+    for result in results:
+        print_result(result)
+    return 0
+
+
+def server_command(args) -> int:
+    """Executa o servidor sink/fonte do benchmark"""
+    bind = args.bind
+    if bind is None:
+        # Servidor sem autenticação: só no IP do túnel, ou em loopback se não houver túnel
+        snapshot = NetworkSnapshot.current()
+        interface = snapshot.get_vpn_interface()
+        vpn_ip = snapshot.get_vpn_ip(interface) if interface else "N/A"
+        bind = vpn_ip if vpn_ip != "N/A" else DEFAULT_BENCH_HOST
+        if bind == DEFAULT_BENCH_HOST:
+            print_flush("⚠️  Interface VPN não encontrada; escutando só em loopback (use --bind)")
+    server = ThroughputServer(bind, args.port)
+    if not server.start():
+        print_flush(f"❌ Não foi possível escutar em {bind}:{args.port}")
+        return 1
+    print_flush(f"📡 Servidor de benchmark em {bind}:{server.port}")
+    print_flush("💡 Pressione Ctrl+C para encerrar")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print_flush("")
+        print_flush("🛑 Encerrando servidor...")
+    finally:
+        server.stop()
+    return 0
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark de throughput através da VPN")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Medir throughput até um peer")
+    run.add_argument("--peer", type=str, default=None, help="Host rodando 'benchmark_vpn.py server'")
+    run.add_argument("--port", type=int, default=DEFAULT_BENCH_PORT, help=f"Porta (padrão: {DEFAULT_BENCH_PORT})")
+    run.add_argument("--local", action="store_true", help="Usar servidor embutido em 127.0.0.1")
+    run.add_argument("--streams", type=int, default=DEFAULT_STREAMS, help=f"Streams paralelos (padrão: {DEFAULT_STREAMS})")
+    run.add_argument("--duration", type=float, default=DEFAULT_DURATION, help=f"Segundos por direção (padrão: 10, máx: {MAX_DURATION:g})")
+    run.add_argument("--direction", choices=("up", "down", "both"), default="both", help="Direção (padrão: both)")
+    run.add_argument("--interface", type=str, default=None,
+                     help="Interface para comparar contadores (padrão: interface VPN)")
+    run.set_defaults(handler=run_command)
+
+    server = subparsers.add_parser("server", help="Servidor sink/fonte no peer")
+    server.add_argument("--bind", type=str, default=None,
+                        help="Endereço de escuta (padrão: IP do túnel VPN, ou 127.0.0.1 sem túnel)")
+    server.add_argument("--port", type=int, default=DEFAULT_BENCH_PORT, help=f"Porta (padrão: {DEFAULT_BENCH_PORT})")
+    server.set_defaults(handler=server_command)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,16 @@ Script para conectar à VPN usando openfortivpn com autenticação Azure CLI
 import sys
 import os
 import argparse
+from typing import Optional, Dict, List
 
 # Adicionar diretório raiz ao path para imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.core.vpn_connection import VpnConnection, AzureAuth
+from src.core.vpn_connection import VpnConnection
+from src.core.phase_profiler import PhaseProfiler, DEFAULT_PROFILE_LOG
+from src.core.preflight import run_preflight, complete_login
+from src.core.token_cache import get_token_cache, DEFAULT_TOKEN_CACHE
+from src.core.gateway_pool import GatewayPool, load_gateways, parse_gateway, DEFAULT_GATEWAYS_FILE
 
 
 def print_flush(*args, **kwargs):
@@ -18,46 +23,57 @@ def print_flush(*args, **kwargs):
     print(*args, **kwargs, flush=True)
 
 
-def connect_vpn(gateway: str, port: int = 443, username: str = None) -> bool:
-    """Conecta à VPN usando openfortivpn com Azure CLI"""
+def choose_gateway(candidates: List[Dict]) -> Optional[Dict]:
+    """Corrida de TCP + TLS entre os gateways; retorna o mais rápido saudável"""
+    print_flush(f"🏁 Comparando {len(candidates)} gateways (TCP + TLS)...")
+    pool = GatewayPool(candidates)
+    for result in pool.race():
+        if result['healthy']:
+            print_flush(f"   ✅ {result['name']:<32} {result['total_ms']:7.1f} ms "
+                        f"(TCP {result['tcp_ms']:.1f} ms, TLS {result['tls_ms']:.1f} ms)")
+        else:
+            print_flush(f"   ❌ {result['name']:<32} {result['error']}")
+    choice = pool.select()
+    if choice is None:
+        print_flush("❌ Nenhum gateway respondeu")
+    return choice
+
+
+def establish(gateway: str, port: int, username: Optional[str], profiler: PhaseProfiler) -> bool:
+    """Estabelece a conexão, cronometrando cada fase no profiler"""
     
-    # Verificar Azure CLI
-    print_flush("🔐 Verificando Azure CLI...")
-    azure_authenticated, account_info = AzureAuth.check_authenticated()
+    # Azure CLI, token, openfortivpn e gateway verificados em paralelo, uma única vez
+    print_flush("🔐 Verificando Azure CLI, token, openfortivpn e gateway...")
+    result = run_preflight(gateway, port, login=False, profiler=profiler)
     
-    if not azure_authenticated:
+    if not result['authenticated']:
         print_flush("⚠️  Azure CLI não está autenticado")
         print_flush("💡 Fazendo login no Azure...")
-        if not AzureAuth.login():
+        if not complete_login(result, gateway, port, profiler):
             print_flush("❌ Erro ao fazer login no Azure")
             return False
-        azure_authenticated, account_info = AzureAuth.check_authenticated()
     
-    if azure_authenticated:
-        user_name = account_info.get("user", {}).get("name", "usuário")
+    if result['authenticated']:
+        user_name = result['account'].get("user", {}).get("name", "usuário")
         print_flush(f"✅ Azure CLI autenticado: {user_name}")
     
-    # Obter token
-    print_flush("🔑 Obtendo token do Azure CLI...")
-    access_token = AzureAuth.get_token()
-    
-    if access_token:
-        print_flush("✅ Token obtido com sucesso")
+    if result['access_token']:
+        print_flush("✅ Token obtido do cache" if result['token_cached'] else "✅ Token obtido com sucesso")
     else:
         print_flush("⚠️  Não foi possível obter token")
     
-    if not VpnConnection.check_openfortivpn():
+    if not result['openfortivpn']:
         print_flush("❌ openfortivpn não encontrado!")
         print_flush("💡 Instale com: brew install openfortivpn")
         return False
     
-    print_flush(f"🔌 Conectando à VPN: {gateway}:{port}")
-    
-    # Tentar autenticar com token Azure CLI antes
-    if access_token:
-        print_flush("🔐 Tentando autenticar com token Azure CLI...")
-        AzureAuth.authenticate_with_token(gateway, port, access_token)
+    if result['gateway_reachable']:
         print_flush("✅ Gateway respondeu")
+    elif result['access_token']:
+        print_flush("⚠️  Gateway não respondeu à autenticação com token")
+    print_flush(f"⏱️  Pré-checagem em {result['elapsed_ns'] / 1e9:.2f}s")
+    
+    print_flush(f"🔌 Conectando à VPN: {gateway}:{port}")
     
     # Obter digest do certificado
     print_flush("🔐 Obtendo certificado do gateway...")
@@ -69,7 +85,21 @@ def connect_vpn(gateway: str, port: int = 443, username: str = None) -> bool:
     print_flush("")
     
     # Conectar usando VpnConnection
-    success = VpnConnection.connect(gateway, port, username)
+    return VpnConnection.connect(gateway, port, username, profiler=profiler, preflight=result)
+
+
+def connect_vpn(gateway: str, port: int = 443, username: str = None,
+                profile_log: Optional[str] = DEFAULT_PROFILE_LOG) -> bool:
+    """Conecta à VPN usando openfortivpn com Azure CLI"""
+    
+    # Uma linha por tentativa no log de profiling (agregado por profile_report.py)
+    profiler = PhaseProfiler(profile_log, gateway=gateway, port=port, source='connect_vpn')
+    try:
+        success = establish(gateway, port, username, profiler)
+    except KeyboardInterrupt:
+        profiler.finish(False, error='interrupted')
+        raise
+    profiler.finish(success)
     
     if success:
         print_flush("")
@@ -79,15 +109,13 @@ def connect_vpn(gateway: str, port: int = 443, username: str = None) -> bool:
         print_flush("💡 Pressione Ctrl+C para desconectar")
         print_flush("")
         
-        # Manter processo rodando
+        # Manter processo rodando até o openfortivpn reportar desconexão
         try:
-            import time
-            while True:
-                time.sleep(1)
-                if not VpnConnection.check_vpn_connected():
-                    print_flush("")
-                    print_flush("⚠️  VPN desconectada!")
-                    return False
+            while not VpnConnection.wait_disconnected(1):
+                pass
+            print_flush("")
+            print_flush("⚠️  VPN desconectada!")
+            return False
         except KeyboardInterrupt:
             print_flush("")
             print_flush("🛑 Desconectando VPN...")
@@ -102,13 +130,39 @@ def main():
     """Função principal"""
     parser = argparse.ArgumentParser(description="Conectar à VPN usando openfortivpn com Azure CLI")
     
-    parser.add_argument("--gateway", type=str, required=True, help="Gateway da VPN")
+    parser.add_argument("--gateway", type=str, default=None,
+                        help="Gateway da VPN; vários separados por vírgula conectam ao mais rápido (host[:porta])")
+    parser.add_argument("--gateways-file", type=str, default=DEFAULT_GATEWAYS_FILE,
+                        help="Lista JSON de gateways usada sem --gateway (padrão: ~/.vpn-connect/gateways.json)")
     parser.add_argument("--port", type=int, default=443, help="Porta (padrão: 443)")
     parser.add_argument("--username", type=str, default=None, help="Usuário (opcional)")
+    parser.add_argument("--profile-log", type=str, default=DEFAULT_PROFILE_LOG,
+                        help="Log JSON lines com o tempo de cada fase (padrão: ~/.vpn-connect/connect-profile.jsonl)")
+    parser.add_argument("--no-profile", action="store_true", help="Não gravar o tempo das fases")
+    parser.add_argument("--token-cache", action="store_true",
+                        help="Gravar o token Azure em disco (~/.vpn-connect/token-cache.json, 0600); padrão: só memória")
     
     args = parser.parse_args()
     
-    success = connect_vpn(args.gateway, args.port, args.username)
+    # Cache de token compartilhado entre reconexões; renovado em background enquanto o túnel está no ar
+    get_token_cache(DEFAULT_TOKEN_CACHE if args.token_cache else None)
+    
+    if args.gateway:
+        try:
+            candidates = [parse_gateway(spec, args.port) for spec in args.gateway.split(',') if spec.strip()]
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        candidates = load_gateways(args.gateways_file)
+    if not candidates:
+        parser.error(f"informe --gateway ou configure {args.gateways_file}")
+    
+    gateway = candidates[0] if len(candidates) == 1 else choose_gateway(candidates)
+    if gateway is None:
+        sys.exit(1)
+    
+    success = connect_vpn(gateway['host'], gateway['port'], args.username,
+                          None if args.no_profile else args.profile_log)
     sys.exit(0 if success else 1)
 
 
@@ -12,15 +12,17 @@ from datetime import datetime
 # Adicionar diretório raiz ao path para imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.core.network_stats import NetworkStats
-from src.core.vpn_connection import VpnConnection
+from src.core.network_snapshot import NetworkSnapshot
+from src.core.netlink_discovery import get_discovery
+from src.core.traffic_sampler import TrafficSampler
+from src.core.rate_engine import RateEngine
 from src.ui.terminal import Colors, clear_screen
 from src.utils.formatters import format_bytes, format_speed
 
 
-def get_vpn_status() -> str:
+def get_vpn_status(snapshot: NetworkSnapshot) -> str:
     """Verifica status da VPN"""
-    if VpnConnection.check_vpn_connected():
+    if snapshot.is_vpn_connected():
         return "🟢 Conectada"
     return "🔴 Desconectada"
 
@@ -35,9 +37,36 @@ def draw_bar(value: float, max_value: float, width: int = 30) -> str:
     return "█" * filled + "░" * (width - filled)
 
 
-def main():
-    """Função principal"""
-    print("🔍 Procurando interface VPN...")
+def print_not_found():
+    """Exibe orientação quando a interface VPN não é encontrada"""
+    print("❌ Interface VPN não encontrada!")
+    print("💡 Certifique-se de que a VPN está conectada")
+    print("💡 Execute: python3 scripts/connect_vpn.py --gateway dtc.sonepar.com.br")
+    print()
+
+
+def wait_for_interface() -> str:
+    """
+    Aguarda a interface VPN aparecer.
+    
+    No Linux bloqueia em eventos rtnetlink (retorna assim que o túnel sobe);
+    nos demais sistemas consulta periodicamente.
+    
+    Returns:
+        Nome da interface VPN
+    """
+    discovery = get_discovery()
+    if discovery is not None:
+        interface = discovery.wait_for_tunnel(timeout=5)
+        if not interface:
+            print_not_found()
+            print("🔄 Aguardando o túnel subir...")
+            print("   Pressione Ctrl+C para sair")
+            print()
+            interface = discovery.wait_for_tunnel()
+        if interface:
+            return interface
+        # Descoberta por eventos morreu: segue com a consulta periódica
     
     interface = None
     retry_count = 0
@@ -45,7 +74,7 @@ def main():
     
     # Tentar encontrar interface com retry
     while not interface and retry_count < max_retries:
-        interface = NetworkStats.get_vpn_interface()
+        interface = NetworkSnapshot.current().get_vpn_interface()
         if not interface:
             retry_count += 1
             if retry_count < max_retries:
@@ -53,10 +82,7 @@ def main():
                 time.sleep(1)
     
     if not interface:
-        print("❌ Interface VPN não encontrada!")
-        print("💡 Certifique-se de que a VPN está conectada")
-        print("💡 Execute: python3 scripts/connect_vpn.py --gateway dtc.sonepar.com.br")
-        print()
+        print_not_found()
         print("🔄 Tentando novamente a cada 5 segundos...")
         print("   Pressione Ctrl+C para sair")
         print()
@@ -64,19 +90,30 @@ def main():
         # Tentar novamente periodicamente
         while True:
             time.sleep(5)
-            interface = NetworkStats.get_vpn_interface()
+            interface = NetworkSnapshot.current().get_vpn_interface()
             if interface:
-                print(f"✅ Interface encontrada: {interface}")
                 break
             print("   ⏳ Aguardando conexão VPN...")
     
+    return interface
+
+
+def main():
+    """Função principal"""
+    print("🔍 Procurando interface VPN...")
+    
+    interface = wait_for_interface()
+    
     if interface:
         print(f"✅ Interface encontrada: {interface}")
         print("📊 Iniciando monitoramento...")
         time.sleep(1)
     
-    last_stats = None
-    last_time = time.time()
+    rates = RateEngine()
+    
+    # Amostragem em alta frequência para picos e percentis entre os ticks
+    sampler = TrafficSampler(interface)
+    sampler.start()
     
     try:
         while True:
@@ -88,9 +125,10 @@ def main():
             print("=" * 70)
             print()
             
-            # Status
-            status = get_vpn_status()
-            vpn_ip = NetworkStats.get_vpn_ip(interface) if interface else "N/A"
+            # Status (um único snapshot por tick, compartilhado com o monitor)
+            snapshot = NetworkSnapshot.current()
+            status = get_vpn_status(snapshot)
+            vpn_ip = snapshot.get_vpn_ip(interface) if interface else "N/A"
             current_time = datetime.now().strftime("%H:%M:%S")
             
             print(f"Status: {status} | IP VPN: {vpn_ip} | Interface: {interface}")
@@ -99,30 +137,27 @@ def main():
             print()
             
             # Obter estatísticas atuais
-            stats = NetworkStats.get_interface_stats(interface) if interface else None
+            stats = snapshot.get_interface_stats(interface) if interface else None
             
             if stats:
                 rx_bytes = stats['rx']
                 tx_bytes = stats['tx']
                 
-                # Calcular velocidade
-                current_time_sec = time.time()
-                if last_stats:
-                    time_diff = current_time_sec - last_time
-                    if time_diff > 0:
-                        rx_speed = (rx_bytes - last_stats['rx']) / time_diff
-                        tx_speed = (tx_bytes - last_stats['tx']) / time_diff
-                    else:
-                        rx_speed = 0
-                        tx_speed = 0
-                else:
-                    rx_speed = 0
-                    tx_speed = 0
+                # Calcular velocidade (monotônico, tolera reset/wrap após reconexão)
+                speeds = rates.update(stats, source=interface)
+                rx_speed = speeds['rx']
+                tx_speed = speeds['tx']
+                
+                peak = sampler.get_peak()
+                window = sampler.window_stats(60)
                 
                 # Exibir estatísticas de entrada
                 print("⬇️  ENTRADA (Download)")
                 print(f"   Total: {format_bytes(rx_bytes)}")
                 print(f"   Velocidade: {format_speed(rx_speed)}")
+                print(f"   p50/p95/p99 (1m): {format_speed(window['rx']['p50'])} / "
+                      f"{format_speed(window['rx']['p95'])} / {format_speed(window['rx']['p99'])}")
+                print(f"   Pico: {format_speed(peak['rx'])}")
                 
                 # Barra de velocidade de entrada
                 max_speed = max(rx_speed, 1)  # Evitar divisão por zero
@@ -134,6 +169,9 @@ def main():
                 print("⬆️  SAÍDA (Upload)")
                 print(f"   Total: {format_bytes(tx_bytes)}")
                 print(f"   Velocidade: {format_speed(tx_speed)}")
+                print(f"   p50/p95/p99 (1m): {format_speed(window['tx']['p50'])} / "
+                      f"{format_speed(window['tx']['p95'])} / {format_speed(window['tx']['p99'])}")
+                print(f"   Pico: {format_speed(peak['tx'])}")
                 
                 # Barra de velocidade de saída
                 max_speed = max(tx_speed, 1)
@@ -148,11 +186,8 @@ def main():
                 print("📈 RESUMO")
                 print(f"   Total Transferido: {format_bytes(total_bytes)}")
                 print(f"   Velocidade Total: {format_speed(total_speed)}")
+                print(f"   Total na Sessão: {format_bytes(rates.totals['rx'] + rates.totals['tx'])}")
                 print()
-                
-                # Atualizar para próxima iteração
-                last_stats = {'rx': rx_bytes, 'tx': tx_bytes}
-                last_time = current_time_sec
             else:
                 print("⚠️  Não foi possível obter estatísticas")
                 print("💡 Verificando conexão...")
@@ -163,6 +198,7 @@ def main():
             time.sleep(1)  # Atualizar a cada segundo
             
     except KeyboardInterrupt:
+        sampler.stop()
         clear_screen()
         print("🛑 Monitoramento encerrado")
         sys.exit(0)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Script para agregar o profiling das tentativas de conexão (p50/p95/máx por fase)
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.phase_profiler import load_attempts, aggregate, DEFAULT_PROFILE_LOG
+
+
+def format_ms(value: float) -> str:
+    """Formata nanossegundos em milissegundos ou segundos"""
+    if value >= 1e9:
+        return f"{value / 1e9:.2f} s"
+    return f"{value / 1e6:.1f} ms"
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Relatório de tempo por fase das conexões VPN")
+    parser.add_argument("--log", type=str, default=DEFAULT_PROFILE_LOG, help="Log JSON lines das tentativas")
+    parser.add_argument("--hours", type=float, default=None, help="Só tentativas das últimas N horas")
+    parser.add_argument("--last", type=int, default=None, help="Só as últimas N tentativas")
+    parser.add_argument("--gateway", type=str, default=None, help="Só tentativas para este gateway")
+    parser.add_argument("--failed", action="store_true", help="Incluir tentativas que falharam")
+    parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    args = parser.parse_args()
+
+    attempts = load_attempts(args.log)
+    if not attempts:
+        print(f"❌ Nenhuma tentativa registrada em {args.log}")
+        sys.exit(1)
+
+    total = len(attempts)
+    failed = sum(1 for attempt in attempts if not attempt.get('success'))
+    if args.hours is not None:
+        since = time.time() - args.hours * 3600
+        attempts = [attempt for attempt in attempts if attempt.get('started_at', 0) >= since]
+    if args.gateway:
+        attempts = [attempt for attempt in attempts if attempt.get('gateway') == args.gateway]
+    if not args.failed:
+        attempts = [attempt for attempt in attempts if attempt.get('success')]
+    if args.last:
+        attempts = attempts[-args.last:]
+    report = aggregate(attempts)
+
+    if args.json:
+        print(json.dumps({'attempts': len(attempts), 'phases': report}, indent=2))
+        return
+
+    print(f"⏱️  Fases da conexão: {len(attempts)} tentativas agregadas "
+          f"({total} no log, {failed} com falha)")
+    print("-" * 86)
+    print(f"{'fase':<36} {'n':>5} {'p50':>10} {'p95':>10} {'máx':>10} {'% total':>9}")
+    print("-" * 86)
+    for name, summary in report.items():
+        if name == 'total':
+            print("-" * 86)
+        print(f"{name:<36} {summary['count']:>5} {format_ms(summary['p50']):>10} {format_ms(summary['p95']):>10} "
+              f"{format_ms(summary['max']):>10} {summary['share'] * 100:>8.1f}%")
+
+    phases = {name: summary for name, summary in report.items() if name != 'total'}
+    if phases:
+        slowest = max(phases, key=lambda name: phases[name]['share'])
+        print()
+        print(f"🐢 Maior parcela: {slowest} ({phases[slowest]['share'] * 100:.1f}% do tempo médio)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Script para consultar o histórico de tráfego VPN gravado pelo monitor
+"""
+
+import sys
+import os
+import time
+import argparse
+from datetime import datetime
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.traffic_store import TrafficStore, DEFAULT_HISTORY_DIR, RESOLUTIONS
+from src.utils.formatters import format_bytes, format_speed
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Consultar histórico de tráfego VPN")
+    parser.add_argument("--hours", type=float, default=24, help="Período a consultar em horas (padrão: 24)")
+    parser.add_argument("--resolution", type=str, default=None, choices=sorted(RESOLUTIONS),
+                        help="Resolução (padrão: automática)")
+    parser.add_argument("--dir", type=str, default=DEFAULT_HISTORY_DIR, help="Diretório do histórico")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ Histórico não encontrado em {args.dir}")
+        sys.exit(1)
+
+    store = TrafficStore(args.dir)
+    end = time.time()
+    start = end - args.hours * 3600
+    resolution = args.resolution or TrafficStore.choose_resolution(int(start), int(end))
+    records = store.query(start, end, resolution)
+
+    print(f"📈 Histórico ({resolution}) - últimas {args.hours:g}h: {len(records)} registros")
+    print("-" * 70)
+    total_rx = total_tx = 0
+    for record in records:
+        moment = datetime.fromtimestamp(record['timestamp']).strftime("%Y-%m-%d %H:%M:%S")
+        total_rx += record['rx']
+        total_tx += record['tx']
+        print(f"{moment}  ⬇️ {format_bytes(record['rx']):>12}  ⬆️ {format_bytes(record['tx']):>12}  "
+              f"pico ⬇️ {format_speed(record['rx_peak']):>14}")
+    print("-" * 70)
+    print(f"Total: ⬇️ {format_bytes(total_rx)}  ⬆️ {format_bytes(total_tx)}")
+
+
+if __name__ == "__main__":
+    main()
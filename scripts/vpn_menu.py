@@ -10,6 +10,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.core.vpn_monitor import VpnMonitor
+from src.core.gateway_pool import load_gateways
 from src.ui.terminal import Colors, Spinner, print_header
 
 
@@ -37,16 +38,30 @@ def main():
         
         # Configuração
         GATEWAY = "dtc.sonepar.com.br"
+        GATEWAYS = []  # ex: ["dtc.sonepar.com.br", "gw-sul.exemplo:443"] (conecta ao mais rápido)
         PORT = 443
         CHECK_INTERVAL = 5  # segundos
-        RECONNECT_DELAY = 10  # segundos
+        RECONNECT_DELAY = 10  # segundos (teto do backoff; após uma queda a reconexão é imediata)
+        HISTORY_DIR = os.path.expanduser("~/.vpn-connect/history")
+        METRICS_PORT = None  # ex: 9877 para expor /metrics (Prometheus)
+        PROBE_TARGETS = []  # ex: ["tcp://10.0.0.1:22", "https://intranet.exemplo/"]
+        LIVENESS_BUDGET = 1.0  # segundos sem resposta do peer até reconectar (só com PROBE_TARGETS definidos)
+        STANDBY_GATEWAY = None  # ex: ":10443" ou "gw-sul.exemplo" (sessão reserva: troca de rotas na queda)
+        TOKEN_CACHE = None  # ex: os.path.expanduser("~/.vpn-connect/token-cache.json") (token em disco, 0600)
         
         # Criar e iniciar monitor
         monitor = VpnMonitor(
             gateway=GATEWAY,
             port=PORT,
             check_interval=CHECK_INTERVAL,
-            reconnect_delay=RECONNECT_DELAY
+            reconnect_delay=RECONNECT_DELAY,
+            history_dir=HISTORY_DIR,
+            metrics_port=METRICS_PORT,
+            probe_targets=PROBE_TARGETS,
+            liveness_budget=LIVENESS_BUDGET,
+            standby=STANDBY_GATEWAY,
+            token_cache_path=TOKEN_CACHE,
+            gateways=GATEWAYS or load_gateways()
         )
         monitor.monitor()
     except KeyboardInterrupt:
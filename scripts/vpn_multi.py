@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Supervisor de múltiplos túneis VPN
+Mantém um openfortivpn por perfil em um único processo e mostra a visão por túnel e agregada
+"""
+
+import sys
+import os
+import time
+import argparse
+from datetime import datetime
+
+# Adicionar diretório raiz ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.core.multi_tunnel import MultiTunnelSupervisor, load_profiles, DEFAULT_PROFILES_FILE, SAMPLE_INTERVAL
+from src.core.connection_manager import STATE_CONNECTED, STATE_CONNECTING
+from src.ui.terminal import clear_screen
+from src.utils.formatters import format_bytes, format_speed, format_time
+
+
+STATE_ICONS = {STATE_CONNECTED: "🟢", STATE_CONNECTING: "🟡"}
+
+
+def print_flush(*args, **kwargs):
+    """Print com flush automático"""
+    print(*args, **kwargs, flush=True)
+
+
+def render(status: dict):
+    """Desenha a tabela por túnel e o resumo agregado"""
+    aggregate = status['aggregate']
+    print("=" * 100)
+    print(" " * 34 + "🔐 SUPERVISOR DE TÚNEIS VPN")
+    print("=" * 100)
+    print(f"Horário: {datetime.now().strftime('%H:%M:%S')} | Perfis: {aggregate['profiles']} | "
+          f"🟢 {aggregate['connected']}  🟡 {aggregate['connecting']}  🔴 {aggregate['disconnected']} | "
+          f"Quedas: {aggregate['drops']}")
+    print("-" * 100)
+    print(f"   {'perfil':<18} {'interface':<9} {'IP':<15} {'tempo':>8} {'⬇️ taxa':>12} {'⬆️ taxa':>12} "
+          f"{'tent.':>5}  situação")
+    print("-" * 100)
+    for tunnel in status['tunnels']:
+        icon = STATE_ICONS.get(tunnel['state'], "🔴")
+        uptime = format_time(int(tunnel['uptime'])) if tunnel['uptime'] is not None else "-"
+        if tunnel['state'] == STATE_CONNECTED:
+            applied = tunnel['routes_applied'] if tunnel['routes_applied'] is not None else '…'
+            note = f"rotas {applied}/{tunnel['routes']}" if tunnel['routes'] else "no ar"
+        elif tunnel['next_attempt_in'] is not None and tunnel['attempts']:
+            note = f"nova tentativa em {tunnel['next_attempt_in']:.0f}s ({tunnel['last_error'] or 'queda'})"
+        else:
+            note = (tunnel['last_line'] or "iniciando")[:30]
+        print(f"{icon} {tunnel['name'][:18]:<18} {tunnel['interface'] or '-':<9} {tunnel['ip'] or '-':<15} "
+              f"{uptime:>8} {format_speed(tunnel['rx_rate']):>12} {format_speed(tunnel['tx_rate']):>12} "
+              f"{tunnel['attempts']:>5}  {note}")
+    print("-" * 100)
+    print(f"📈 TOTAL  ⬇️ {format_speed(aggregate['rx_rate'])} ({format_bytes(aggregate['rx_total'])})  "
+          f"⬆️ {format_speed(aggregate['tx_rate'])} ({format_bytes(aggregate['tx_total'])})")
+    print()
+    print("💡 Pressione Ctrl+C para encerrar todos os túneis")
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Supervisiona vários perfis VPN em um único processo")
+    parser.add_argument("--profiles", type=str, default=DEFAULT_PROFILES_FILE,
+                        help=f"Arquivo JSON de perfis (padrão: {DEFAULT_PROFILES_FILE})")
+    parser.add_argument("--interval", type=float, default=SAMPLE_INTERVAL,
+                        help="Segundos entre atualizações (padrão: 1)")
+    args = parser.parse_args()
+
+    profiles = load_profiles(args.profiles)
+    if not profiles:
+        print_flush(f"❌ Nenhum perfil válido em {args.profiles}")
+        print_flush('💡 Formato: [{"name": "sp", "gateway": "vpn.exemplo.com:443", "routes": ["10.10.0.0/16"]}]')
+        sys.exit(1)
+
+    print_flush(f"🔐 Iniciando {len(profiles)} perfis...")
+    supervisor = MultiTunnelSupervisor(profiles, interval=args.interval)
+    if not supervisor.start():
+        print_flush("❌ Pré-checagem falhou (Azure CLI ou openfortivpn)")
+        sys.exit(1)
+
+    try:
+        while True:
+            clear_screen()
+            render(supervisor.status())
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print_flush("\n🛑 Encerrando túneis...")
+        supervisor.stop()
+        print_flush("✅ Túneis encerrados")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 """Módulo core - funcionalidades principais"""
 
 from .network_stats import NetworkStats
+from .network_snapshot import NetworkSnapshot
 from .vpn_connection import VpnConnection
 from .vpn_monitor import VpnMonitor
 
-__all__ = ['NetworkStats', 'VpnConnection', 'VpnMonitor']
+__all__ = ['NetworkStats', 'NetworkSnapshot', 'VpnConnection', 'VpnMonitor']
 
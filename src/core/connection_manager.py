@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Módulo de gerenciamento da conexão - conecta e reconecta no próprio processo, sem interpretador filho
+"""
+
+import threading
+from typing import Optional, Dict, List, Callable
+
+from .vpn_connection import VpnConnection
+from .preflight import run_preflight
+from .tunnel_supervisor import TunnelSupervisor
+from .token_cache import get_token_cache
+from .phase_profiler import PhaseProfiler, DEFAULT_PROFILE_LOG
+from .gateway_pool import GatewayPool
+from .openfortivpn_events import Event, EVENT_TUNNEL_UP, EVENT_DISCONNECTED, EVENT_ERROR
+
+
+# Configuração
+CONNECT_TIMEOUT = 120.0  # segundos até desistir de um openfortivpn que não sobe (login SAML incluído)
+
+# Estados
+STATE_DISCONNECTED = 'disconnected'
+STATE_PREPARING = 'preparing'  # pré-checagem (Azure CLI, token, openfortivpn)
+STATE_CONNECTING = 'connecting'  # openfortivpn rodando, túnel ainda não subiu
+STATE_CONNECTED = 'connected'
+
+
+class ConnectionManager:
+    """Dono da conexão openfortivpn de um gateway; cada reconexão é só um spawn do openfortivpn"""
+
+    def __init__(self, gateway: str, port: int = 443, username: Optional[str] = None,
+                 profile_log: Optional[str] = DEFAULT_PROFILE_LOG, source: str = 'monitor',
+                 pool: Optional[GatewayPool] = None, extra_args: Optional[List[str]] = None,
+                 connect_timeout: Optional[float] = CONNECT_TIMEOUT):
+        """
+        Inicializa gerenciador.
+
+        Args:
+            gateway: Endereço do gateway VPN
+            port: Porta do gateway
+            username: Nome de usuário (opcional)
+            profile_log: Log do tempo de cada fase (None = não gravar)
+            source: Origem gravada no profiling de cada tentativa
+            pool: Gateways candidatos; cada tentativa usa o mais rápido saudável
+                do ranking em cache (gateway/port passam a ser o escolhido)
+            extra_args: Argumentos extras do openfortivpn (valem a partir da próxima tentativa)
+            connect_timeout: Segundos até encerrar um openfortivpn que não subiu o túnel
+                (travado antes do túnel; None = esperar indefinidamente)
+        """
+        self.gateway = gateway
+        self.port = port
+        self.username = username
+        self.profile_log = profile_log
+        self.source = source
+        self.pool = pool
+        self.extra_args = list(extra_args or [])
+        self.connect_timeout = connect_timeout
+        self.selected = None  # candidato do pool usado na tentativa atual
+        self.supervisor = TunnelSupervisor()
+        self.session = None
+        self.state = STATE_DISCONNECTED
+        self.attempts = 0
+        self.preflight = None  # resultado da última pré-checagem completa
+        self.last_error = None
+        self._profiler = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, callback: Callable[[Event], None]):
+        """
+        Registra callback chamado a cada evento do openfortivpn (na thread de leitura).
+
+        Args:
+            callback: Função que recebe o evento
+        """
+        self._listeners.append(callback)
+
+    def add_exit_listener(self, callback: Callable[[int], None]):
+        """
+        Registra callback chamado (na thread do watcher) quando o openfortivpn termina.
+
+        Args:
+            callback: Função que recebe o código de saída
+        """
+        self.supervisor.add_listener(callback)
+
+    @property
+    def interface(self) -> Optional[str]:
+        """Interface do túnel no ar (ex: ppp0), segundo a saída do openfortivpn"""
+        session = self.session
+        if self.state != STATE_CONNECTED or session is None:
+            return None
+        return session.parser.interface
+
+    def is_active(self) -> bool:
+        """Há tentativa em andamento ou túnel no ar (sem syscalls)"""
+        return self.state != STATE_DISCONNECTED
+
+    def connect(self) -> bool:
+        """
+        Inicia uma tentativa de conexão em background.
+
+        A primeira tentativa faz a pré-checagem completa (com `az login` se
+        necessário). As seguintes reaproveitam o resultado enquanto houver
+        token válido no cache, e custam apenas o spawn do openfortivpn.
+
+        Returns:
+            True se a tentativa foi iniciada, False se já havia uma em andamento
+        """
+        with self._lock:
+            if self.state != STATE_DISCONNECTED:
+                return False
+            self.state = STATE_PREPARING
+            self.attempts += 1
+            self.last_error = None
+        threading.Thread(target=self._attempt, name='vpn-connect', daemon=True).start()
+        return True
+
+    def _ready(self) -> bool:
+        """Pré-checagem anterior ainda vale (openfortivpn encontrado, token em cache)"""
+        return (self.preflight is not None and self.preflight['authenticated']
+                and self.preflight['openfortivpn'] and get_token_cache().get(wait=False) is not None)
+
+    def _attempt(self):
+        """Tentativa em background; qualquer exceção vira falha (o estado nunca fica preso)"""
+        profiler = PhaseProfiler(self.profile_log, gateway=self.gateway, port=self.port,
+                                 source=self.source, attempt_number=self.attempts)
+        try:
+            self._prepare_and_spawn(profiler)
+        except Exception as e:
+            # Falha depois do spawn: o openfortivpn não fica rodando sem dono
+            self.supervisor.terminate(1)
+            self._fail(profiler, f'exception: {e}')
+
+    def _prepare_and_spawn(self, profiler: PhaseProfiler):
+        """Pré-checagem (só se necessária) e spawn do openfortivpn"""
+        if self.pool is not None:
+            # Ranking em cache: só há corrida quando o TTL expirou ou todos falharam
+            with profiler.phase('gateway.select'):
+                self.selected = self.pool.select()
+            if self.selected is None:
+                self._fail(profiler, 'no_gateway')
+                return
+            self.gateway, self.port = self.selected['host'], self.selected['port']
+            profiler.context.update(gateway=self.gateway, port=self.port)
+        if not self._ready():
+            self.preflight = run_preflight(self.gateway, self.port, profiler=profiler)
+            if not self.preflight['authenticated'] or not self.preflight['openfortivpn']:
+                error = 'azure' if not self.preflight['authenticated'] else 'openfortivpn'
+                self._fail(profiler, error)
+                return
+        with profiler.phase('connect.spawn'):
+            session = VpnConnection.spawn_session(self.gateway, self.port, self.username, supervisor=self.supervisor,
+                                                  extra_args=self.extra_args)
+        if session is None:
+            self._fail(profiler, 'spawn')
+            return
+        with self._lock:
+            self.session = session
+            self._profiler = profiler
+            self.state = STATE_CONNECTING
+        # Saída drenada pela sessão; eventos chegam a partir daqui
+        session.add_listener(self._on_event)
+        session.start()
+        if self.connect_timeout:
+            timer = threading.Timer(self.connect_timeout, self._expire, args=(session,))
+            timer.daemon = True
+            timer.start()
+
+    def _expire(self, session):
+        """Tentativa travada (sem túnel no prazo): encerra o openfortivpn, tratado como falha"""
+        with self._lock:
+            stuck = self.session is session and self.state == STATE_CONNECTING
+            if stuck:
+                self.last_error = 'timeout'
+        if stuck:
+            self.supervisor.terminate(1)
+
+    def _fail(self, profiler: PhaseProfiler, error: str):
+        """Encerra a tentativa sem túnel"""
+        profiler.finish(False, error=error)
+        with self._lock:
+            self.last_error = self.last_error or error
+            self.state = STATE_DISCONNECTED
+
+    def _on_event(self, event: Event):
+        """Atualiza o estado a partir da saída do openfortivpn"""
+        kind = event['kind']
+        if kind == EVENT_ERROR:
+            self.last_error = event.get('message') or event['line']
+        elif kind == EVENT_TUNNEL_UP:
+            with self._lock:
+                self.state = STATE_CONNECTED
+                profiler, self._profiler = self._profiler, None
+            if profiler is not None:
+                profiler.add_events(self.session.events, self.session.started_at)
+                profiler.finish(True)
+        elif kind == EVENT_DISCONNECTED:
+            with self._lock:
+                self.state = STATE_DISCONNECTED
+                profiler, self._profiler = self._profiler, None
+            if profiler is not None:
+                # Caiu antes de subir: a próxima tentativa usa o próximo gateway do ranking
+                if self.pool is not None and self.selected is not None:
+                    self.pool.mark_failed(self.selected['name'])
+                profiler.add_events(self.session.events, self.session.started_at)
+                profiler.finish(False, error=self.last_error or 'disconnected')
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception:
+                pass
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Aguarda até timeout segundos, acordando na hora se o openfortivpn terminar.
+
+        Args:
+            timeout: Segundos máximos de espera
+
+        Returns:
+            True se o processo terminou durante a espera
+        """
+        return self.supervisor.wait(timeout)
+
+    def disconnect(self, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Encerra o openfortivpn supervisionado.
+
+        Args:
+            timeout: Segundos até SIGKILL (None = padrão do supervisor)
+
+        Returns:
+            Código de saída do processo, ou None se não havia processo
+        """
+        returncode = self.supervisor.terminate() if timeout is None else self.supervisor.terminate(timeout)
+        if self.session is not None:
+            self.session.wait_closed(1)
+        with self._lock:
+            self.state = STATE_DISCONNECTED
+        return returncode
+
+    def declare_dead(self, reason: str):
+        """
+        Peer parou de responder com o openfortivpn vivo: encerra o processo.
+
+        A saída é vista na hora pelo supervisor (pidfd) e tratada como queda.
+
+        Args:
+            reason: Motivo exibido como última falha
+        """
+        self.disconnect(timeout=1)
+        self.last_error = reason
+
+    def status(self) -> Dict:
+        """
+        Estado atual para exibição.
+
+        Returns:
+            Dicionário com 'state', 'attempts', 'pid', 'openfortivpn_state',
+            'last_error' e 'last_line'
+        """
+        session = self.session
+        return {
+            'state': self.state,
+            'attempts': self.attempts,
+            'pid': self.supervisor.pid,
+            'openfortivpn_state': session.state if session is not None else None,
+            'last_error': self.last_error,
+            'last_line': session.output[-1] if session is not None and session.output else None,
+        }
+
+    def recent_output(self, count: int = 10) -> List[str]:
+        """Últimas linhas da saída do openfortivpn"""
+        session = self.session
+        return list(session.output)[-count:] if session is not None else []
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Módulo de cliente HTTPS do gateway - conexões keep-alive reaproveitadas e retomada de sessão TLS
+"""
+
+import select
+import socket
+import ssl
+import threading
+import time
+import http.client
+from typing import Optional, Dict, Tuple
+
+from ..utils.histogram import LatencyHistogram
+
+
+# Configuração
+DEFAULT_TIMEOUT = 10  # segundos de leitura por requisição
+CONNECT_TIMEOUT = 5  # segundos para TCP + handshake TLS
+IDLE_TIMEOUT = 30  # segundos que uma conexão ociosa fica no pool
+MAX_IDLE = 4  # conexões ociosas por gateway
+USER_AGENT = 'VPN-Client/1.0'
+
+# Erros de uma conexão reaproveitada que o servidor já fechou (a requisição é repetida uma vez)
+STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError,
+                BrokenPipeError, ConnectionAbortedError)
+
+# Contextos TLS compartilhados: sessões só podem ser retomadas no contexto que as criou
+_contexts = {}
+_contexts_lock = threading.Lock()
+
+
+def get_ssl_context(verify: bool = False) -> ssl.SSLContext:
+    """
+    Retorna o SSLContext compartilhado do cliente.
+
+    Args:
+        verify: Validar certificado e hostname (o gateway usa certificado
+            conferido pelo openfortivpn via digest, por isso o padrão é False)
+
+    Returns:
+        SSLContext reutilizado entre conexões e clientes
+    """
+    with _contexts_lock:
+        context = _contexts.get(verify)
+        if context is None:
+            context = ssl.create_default_context()
+            if not verify:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            _contexts[verify] = context
+        return context
+
+
+class _GatewayConnection(http.client.HTTPSConnection):
+    """HTTPSConnection que retoma a última sessão TLS do gateway e mede o estabelecimento"""
+
+    def __init__(self, host: str, port: int, timeout: float, connect_timeout: float,
+                 context: ssl.SSLContext, sessions: Dict):
+        super().__init__(host, port, timeout=timeout, context=context)
+        self.connect_timeout = connect_timeout
+        self.sessions = sessions
+        self.resumed = False
+        self.connect_ns = 0
+        self.idle_since = 0.0
+
+    def connect(self):
+        """TCP + TLS oferecendo a sessão guardada (sem o handshake completo quando aceita)"""
+        start = time.perf_counter_ns()
+        sock = socket.create_connection((self.host, self.port), self.connect_timeout, self.source_address)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock = self._context.wrap_socket(sock, server_hostname=self.host,
+                                                  session=self.sessions.get('session'))
+        except Exception:
+            sock.close()
+            raise
+        self.sock.settimeout(self.timeout)
+        self.resumed = self.sock.session_reused
+        self.connect_ns = time.perf_counter_ns() - start
+
+    def remember_session(self):
+        """Guarda a sessão TLS atual (no TLS 1.3 o ticket chega junto da primeira resposta)"""
+        if self.sock is not None:
+            session = self.sock.session
+            if session is not None:
+                self.sessions['session'] = session
+
+    def is_stale(self) -> bool:
+        """Conexão ociosa com dados ou EOF pendentes foi encerrada pelo servidor"""
+        if self.sock is None:
+            return True
+        if self.sock.pending():
+            return True
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+
+class GatewayClient:
+    """Cliente HTTPS de um gateway com pool de conexões keep-alive e métricas por requisição"""
+
+    def __init__(self, host: str, port: int = 443, timeout: float = DEFAULT_TIMEOUT,
+                 connect_timeout: float = CONNECT_TIMEOUT, verify: bool = False,
+                 max_idle: int = MAX_IDLE, idle_timeout: float = IDLE_TIMEOUT):
+        """
+        Inicializa cliente.
+
+        Args:
+            host: Endereço do gateway
+            port: Porta HTTPS
+            timeout: Timeout de leitura por requisição em segundos
+            connect_timeout: Timeout de TCP + TLS em segundos
+            verify: Validar certificado do gateway
+            max_idle: Conexões ociosas mantidas (0 = fechar após cada requisição,
+                só a sessão TLS é reaproveitada)
+            idle_timeout: Segundos até uma conexão ociosa ser descartada
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.context = get_ssl_context(verify)
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.sessions = {}  # 'session' -> última ssl.SSLSession do gateway
+        self.idle = []  # conexões ociosas (LIFO: a mais recente é a mais provável de estar viva)
+        self.lock = threading.Lock()
+        self.latency = LatencyHistogram()  # µs por requisição (incluindo conexão, se houve)
+        self.connect_latency = LatencyHistogram()  # µs de TCP + TLS das conexões novas
+        self.counters = {'requests': 0, 'errors': 0, 'connections': 0, 'reused': 0, 'resumed': 0, 'retries': 0}
+
+    def _acquire(self) -> Tuple[_GatewayConnection, bool]:
+        """Retorna uma conexão ociosa viva ou uma nova (não conectada)"""
+        now = time.monotonic()
+        while True:
+            with self.lock:
+                if not self.idle:
+                    break
+                conn = self.idle.pop()
+            if now - conn.idle_since < self.idle_timeout and not conn.is_stale():
+                return conn, True
+            conn.close()
+        return _GatewayConnection(self.host, self.port, self.timeout, self.connect_timeout,
+                                  self.context, self.sessions), False
+
+    def _release(self, conn: _GatewayConnection):
+        """Devolve a conexão ao pool (ou fecha, se o pool está cheio)"""
+        conn.idle_since = time.monotonic()
+        with self.lock:
+            if len(self.idle) < self.max_idle:
+                self.idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method: str = 'GET', path: str = '/', headers: Optional[Dict[str, str]] = None,
+                body: Optional[bytes] = None) -> Dict:
+        """
+        Executa uma requisição reaproveitando conexão e sessão TLS.
+
+        Redirecionamentos não são seguidos. Uma conexão reaproveitada que o
+        servidor fechou é descartada e a requisição repetida uma vez.
+
+        Args:
+            method: Método HTTP
+            path: Caminho (com query)
+            headers: Cabeçalhos extras
+            body: Corpo da requisição
+
+        Returns:
+            Dicionário com 'status', 'headers', 'body', 'reused' (sem TCP/TLS),
+            'resumed' (TLS retomado), 'connect_ns' e 'elapsed_ns'
+
+        Raises:
+            OSError, http.client.HTTPException: Se a requisição falhou
+        """
+        merged = {'Host': self.host if self.port == 443 else f"{self.host}:{self.port}",
+                  'User-Agent': USER_AGENT}
+        merged.update(headers or {})
+        for attempt in range(2):
+            conn, reused = self._acquire()
+            start = time.perf_counter_ns()
+            try:
+                conn.request(method, path, body=body, headers=merged)
+                response = conn.getresponse()
+                data = response.read()
+            except STALE_ERRORS:
+                conn.close()
+                if reused and attempt == 0:
+                    with self.lock:
+                        self.counters['retries'] += 1
+                    continue
+                with self.lock:
+                    self.counters['errors'] += 1
+                raise
+            except Exception:
+                conn.close()
+                with self.lock:
+                    self.counters['errors'] += 1
+                raise
+            elapsed = time.perf_counter_ns() - start
+            conn.remember_session()
+            with self.lock:
+                self.counters['requests'] += 1
+                self.latency.record(elapsed // 1000)
+                if reused:
+                    self.counters['reused'] += 1
+                else:
+                    self.counters['connections'] += 1
+                    self.counters['resumed'] += int(conn.resumed)
+                    self.connect_latency.record(conn.connect_ns // 1000)
+            result = {
+                'status': response.status,
+                'headers': dict(response.getheaders()),
+                'body': data,
+                'reused': reused,
+                'resumed': not reused and conn.resumed,
+                'connect_ns': 0 if reused else conn.connect_ns,
+                'elapsed_ns': elapsed,
+            }
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return result
+
+    def stats(self) -> Dict:
+        """
+        Métricas do cliente.
+
+        Returns:
+            Contadores ('requests', 'errors', 'connections', 'reused', 'resumed',
+            'retries', 'idle') e resumos em µs 'latency' e 'connect_latency'
+        """
+        with self.lock:
+            result = dict(self.counters, idle=len(self.idle))
+            result['latency'] = self.latency.summary()
+            result['connect_latency'] = self.connect_latency.summary()
+        return result
+
+    def close(self):
+        """Fecha as conexões ociosas e esquece a sessão TLS"""
+        with self.lock:
+            idle, self.idle = self.idle, []
+            self.sessions.clear()
+        for conn in idle:
+            conn.close()
+
+
+# Clientes compartilhados por (host, porta, verify)
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_gateway_client(host: str, port: int = 443, verify: bool = False) -> GatewayClient:
+    """
+    Retorna o cliente compartilhado do gateway, criando-o na primeira chamada.
+
+    Args:
+        host: Endereço do gateway
+        port: Porta HTTPS
+        verify: Validar certificado
+
+    Returns:
+        GatewayClient compartilhado
+    """
+    key = (host, port, verify)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = GatewayClient(host, port, verify=verify)
+            _clients[key] = client
+        return client
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Módulo de pool de gateways - corrida de TCP + TLS entre gateways regionais, ranking com TTL
+"""
+
+import os
+import json
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional, Dict, List
+
+from .gateway_client import get_ssl_context
+
+
+# Configuração
+DEFAULT_GATEWAYS_FILE = os.path.expanduser('~/.vpn-connect/gateways.json')
+DEFAULT_PORT = 443
+RACE_TIMEOUT = 3.0  # segundos para resolver, conectar e concluir o handshake TLS
+RANKING_TTL = 300.0  # segundos em que o ranking é reaproveitado (reconexões não refazem a corrida)
+RACE_GRACE = 0.25  # segundos que a corrida ainda espera pelos demais após o primeiro saudável
+MAX_ADDRESSES = 2  # endereços sondados por gateway (ex: um IPv6 e um IPv4)
+
+
+def parse_gateway(spec: str, default_port: int = DEFAULT_PORT) -> Dict:
+    """
+    Converte 'host', 'host:porta' ou '[ipv6]:porta' em candidato.
+
+    Args:
+        spec: Especificação do gateway
+        default_port: Porta quando omitida
+
+    Returns:
+        {'name', 'host', 'port'}
+
+    Raises:
+        ValueError: Se a porta é inválida
+    """
+    spec = spec.strip()
+    host, port = spec, default_port
+    if spec.startswith('['):
+        host, _, rest = spec[1:].partition(']')
+        if rest.startswith(':'):
+            port = int(rest[1:])
+    elif spec.count(':') == 1:
+        host, port_text = spec.split(':')
+        port = int(port_text)
+    if not host or not 0 < port < 65536:
+        raise ValueError(f"Gateway inválido: {spec}")
+    return {'name': spec, 'host': host, 'port': port}
+
+
+def load_gateways(path: str = DEFAULT_GATEWAYS_FILE) -> List[Dict]:
+    """
+    Lê a configuração do pool.
+
+    Formato: lista JSON de 'host[:porta]' ou de {"host", "port", "name"}.
+
+    Args:
+        path: Arquivo de configuração
+
+    Returns:
+        Candidatos na ordem do arquivo (vazio se o arquivo não existe ou é inválido)
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    candidates = []
+    for item in data if isinstance(data, list) else []:
+        try:
+            if isinstance(item, str):
+                candidates.append(parse_gateway(item))
+            elif isinstance(item, dict) and item.get('host'):
+                port = int(item.get('port', DEFAULT_PORT))
+                candidates.append({'name': item.get('name') or f"{item['host']}:{port}",
+                                   'host': item['host'], 'port': port})
+        except (TypeError, ValueError):
+            continue
+    return candidates
+
+
+def probe_candidate(candidate: Dict, timeout: float = RACE_TIMEOUT, deadline: Optional[float] = None) -> Dict:
+    """
+    Resolve o gateway e mede TCP e handshake TLS no primeiro endereço que responder.
+
+    Args:
+        candidate: Candidato de parse_gateway
+        timeout: Tempo máximo total em segundos
+        deadline: Instante (time.monotonic) limite, compartilhado pela corrida
+
+    Returns:
+        Cópia do candidato com 'healthy', 'address', 'resolve_ms', 'tcp_ms',
+        'tls_ms', 'total_ms' e 'error'
+    """
+    deadline = deadline if deadline is not None else time.monotonic() + timeout
+    result = dict(candidate, healthy=False, address=None, resolve_ms=None, tcp_ms=None, tls_ms=None,
+                  total_ms=None, error=None)
+    start = time.perf_counter()
+    try:
+        infos = socket.getaddrinfo(candidate['host'], candidate['port'], type=socket.SOCK_STREAM)
+    except OSError as exc:
+        result['error'] = f"dns: {exc}"
+        return result
+    resolved = time.perf_counter()
+    result['resolve_ms'] = (resolved - start) * 1000
+
+    # IPv6 e IPv4 alternados, como no happy eyeballs
+    seen, ordered = set(), []
+    for family in (socket.AF_INET6, socket.AF_INET):
+        for info in infos:
+            if info[0] == family and info[4][0] not in seen:
+                seen.add(info[4][0])
+                ordered.append(info)
+                break
+    for info in ordered[:MAX_ADDRESSES] or infos[:1]:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            result['error'] = result['error'] or 'timeout'
+            break
+        family, socktype, proto, _, address = info
+        sock = socket.socket(family, socktype, proto)
+        try:
+            sock.settimeout(remaining)
+            connect_start = time.perf_counter()
+            sock.connect(address)
+            connected = time.perf_counter()
+            sock.settimeout(max(0.001, deadline - time.monotonic()))
+            with get_ssl_context().wrap_socket(sock, server_hostname=candidate['host']):
+                done = time.perf_counter()
+        except (OSError, ValueError) as exc:
+            sock.close()
+            result['error'] = 'timeout' if isinstance(exc, socket.timeout) else str(exc) or type(exc).__name__
+            continue
+        result.update(healthy=True, address=address[0], error=None,
+                      tcp_ms=(connected - connect_start) * 1000, tls_ms=(done - connected) * 1000,
+                      total_ms=(done - start) * 1000)
+        break
+    return result
+
+
+class GatewayPool:
+    """Gateways candidatos ranqueados pela corrida de TCP + TLS, com o ranking em cache"""
+
+    def __init__(self, candidates: List[Dict], ttl: float = RANKING_TTL, timeout: float = RACE_TIMEOUT):
+        """
+        Inicializa pool.
+
+        Args:
+            candidates: Candidatos (parse_gateway / load_gateways), em ordem de preferência
+            ttl: Segundos de validade do ranking
+            timeout: Tempo máximo da corrida
+        """
+        self.candidates = list(candidates)
+        self.ttl = ttl
+        self.timeout = timeout
+        self.ranking = []  # resultados de probe_candidate, saudáveis primeiro e mais rápidos antes
+        self.ranked_at = None
+        self.failed = set()  # nomes que falharam na conexão desde o último ranking
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_specs(cls, specs: List[str], default_port: int = DEFAULT_PORT, **kwargs) -> 'GatewayPool':
+        """Cria o pool a partir de 'host[:porta]'"""
+        return cls([parse_gateway(spec, default_port) for spec in specs], **kwargs)
+
+    def race(self) -> List[Dict]:
+        """
+        Sonda todos os candidatos ao mesmo tempo e refaz o ranking.
+
+        A corrida termina quando todos respondem, o prazo acaba ou RACE_GRACE
+        segundos após o primeiro saudável; quem não concluiu o handshake até
+        lá fica como não saudável ('slow'), sem segurar a conexão.
+
+        Returns:
+            Ranking: saudáveis por tempo total (empate: ordem da configuração), depois os demais
+        """
+        deadline = time.monotonic() + self.timeout
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self.candidates)), thread_name_prefix='gateway-race')
+        futures = [executor.submit(probe_candidate, candidate, self.timeout, deadline)
+                   for candidate in self.candidates]
+        pending = set(futures)
+        end = deadline
+        while pending:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if any(future.result()['healthy'] for future in done):
+                end = min(end, time.monotonic() + RACE_GRACE)
+        executor.shutdown(wait=False)
+        results = []
+        for order, (candidate, future) in enumerate(zip(self.candidates, futures)):
+            if future.done():
+                result = future.result()
+            else:
+                result = dict(candidate, healthy=False, error='slow')
+            result['order'] = order
+            results.append(result)
+        results.sort(key=lambda item: (not item['healthy'], item.get('total_ms') or 0, item['order']))
+        with self._lock:
+            self.ranking = results
+            self.ranked_at = time.monotonic()
+            self.failed = set()
+        return results
+
+    def is_fresh(self) -> bool:
+        """Ranking dentro do TTL"""
+        return self.ranked_at is not None and time.monotonic() - self.ranked_at < self.ttl
+
+    def rank(self, force: bool = False) -> List[Dict]:
+        """Ranking em cache, refazendo a corrida se expirou (ou com force)"""
+        if force or not self.is_fresh():
+            return self.race()
+        with self._lock:
+            return list(self.ranking)
+
+    def select(self) -> Optional[Dict]:
+        """
+        Gateway mais rápido saudável que não falhou desde o último ranking.
+
+        Com o ranking em cache não há nenhuma sonda; se todos os saudáveis
+        falharam, a corrida é refeita.
+
+        Returns:
+            Resultado do candidato escolhido ou None se nenhum respondeu
+        """
+        pick = self._first_available(self.rank())
+        if pick is None and self.failed:
+            # Todos os saudáveis falharam ao conectar: o ranking está velho
+            pick = self._first_available(self.race())
+        return pick
+
+    def _first_available(self, ranking: List[Dict]) -> Optional[Dict]:
+        """Primeiro saudável do ranking que não falhou"""
+        with self._lock:
+            for result in ranking:
+                if result['healthy'] and result['name'] not in self.failed:
+                    return result
+        return None
+
+    def mark_failed(self, name: str):
+        """
+        Registra que a conexão por um gateway falhou (o próximo select() escolhe o seguinte).
+
+        Args:
+            name: Nome do candidato
+        """
+        with self._lock:
+            self.failed.add(name)
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Módulo de túnel reserva - segunda sessão autenticada pronta, rotas e DNS trocados na hora da queda
+"""
+
+import threading
+import time
+from typing import Optional, Dict, List, Callable, Sequence
+
+from .connection_manager import ConnectionManager, STATE_DISCONNECTED
+from .phase_profiler import DEFAULT_PROFILE_LOG
+from .gateway_pool import GatewayPool
+from .reconnect_scheduler import ReconnectScheduler
+from .routes import apply_routes, capture_routes, apply_dns
+from .openfortivpn_events import Event, EVENT_TUNNEL_UP, EVENT_DISCONNECTED
+
+
+# Configuração
+# A reserva sobe sem mexer em rotas nem DNS: ganha os dois quando assume
+STANDBY_ARGS = ['--set-routes=0', '--set-dns=0', '--pppd-use-peerdns=0']
+MAINTENANCE_INTERVAL = 1.0  # segundos entre verificações da sessão reserva
+FAILOVER_HISTORY = 20
+
+
+class HotStandby:
+    """
+    Duas sessões openfortivpn no ar: a ativa leva as rotas, a reserva espera autenticada.
+
+    Quando a ativa morre (processo terminou ou peer declarado morto) as rotas
+    e o DNS passam para a reserva na hora, e a sessão antiga é refeita em background
+    como nova reserva. Expõe a mesma interface do ConnectionManager usada
+    pelo VpnMonitor.
+    """
+
+    def __init__(self, gateway: str, port: int = 443, standby_gateway: Optional[str] = None,
+                 standby_port: Optional[int] = None, username: Optional[str] = None,
+                 routes: Optional[List[str]] = None, profile_log: Optional[str] = DEFAULT_PROFILE_LOG,
+                 pool: Optional[GatewayPool] = None,
+                 route_runner: Callable[[str, List[str]], int] = apply_routes,
+                 route_reader: Callable[[str], List[str]] = capture_routes,
+                 dns_runner: Callable[[str, Sequence[str], Sequence[str]], bool] = apply_dns,
+                 maintenance_interval: float = MAINTENANCE_INTERVAL):
+        """
+        Inicializa par de sessões.
+
+        Args:
+            gateway: Gateway da sessão primária
+            port: Porta da sessão primária
+            standby_gateway: Gateway da reserva (padrão: o mesmo do primário)
+            standby_port: Porta da reserva (padrão: a mesma do primário)
+            username: Nome de usuário (opcional)
+            routes: CIDRs levados pela sessão ativa (None = as rotas que o
+                openfortivpn instalou na primeira subida do primário)
+            profile_log: Log do tempo de cada fase (None = não gravar)
+            pool: Gateways candidatos da sessão primária
+            route_runner: Instala rotas em uma interface (substituível no benchmark)
+            route_reader: Lê as rotas de uma interface (substituível no benchmark)
+            dns_runner: Aponta o DNS para uma interface, ou remove com lista vazia
+                (substituível no benchmark)
+            maintenance_interval: Segundos entre verificações da reserva
+        """
+        standby_gateway = standby_gateway or gateway
+        standby_port = standby_port or port
+        self.routes = list(routes or [])
+        self.route_runner = route_runner
+        self.route_reader = route_reader
+        self.dns_runner = dns_runner
+        self.maintenance_interval = maintenance_interval
+        # Rotas explícitas: o primário também não instala as do gateway
+        primary_args = ['--set-routes=0'] if self.routes else []
+        self.slots = [
+            ConnectionManager(gateway, port, username, profile_log=profile_log, source='primary',
+                              pool=pool, extra_args=primary_args),
+            ConnectionManager(standby_gateway, standby_port, username, profile_log=profile_log,
+                              source='standby', extra_args=STANDBY_ARGS),
+        ]
+        self.schedulers = [ReconnectScheduler(), ReconnectScheduler()]
+        self.active = 0
+        self.routes_applied = None
+        self.nameservers = []  # DNS da VPN, lidos da saída do openfortivpn
+        self.dns_suffix = []
+        self.dns_applied = None  # None = o próprio openfortivpn configurou
+        self._dns_interfaces = set()  # interfaces com DNS aplicado por aqui
+        self.failovers = []
+        self.failover_count = 0
+        self._up = [False, False]
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()  # acorda a manutenção (sessão refeita, parada)
+        self._thread = None
+        for index, slot in enumerate(self.slots):
+            slot.add_listener(lambda event, index=index: self._on_event(index, event))
+
+    # Mesma interface do ConnectionManager usada pelo VpnMonitor
+
+    @property
+    def manager(self) -> ConnectionManager:
+        """Sessão ativa"""
+        return self.slots[self.active]
+
+    @property
+    def standby(self) -> ConnectionManager:
+        """Sessão reserva"""
+        return self.slots[1 - self.active]
+
+    @property
+    def state(self) -> str:
+        """Estado da sessão ativa (STATE_* do ConnectionManager)"""
+        return self.manager.state
+
+    @property
+    def gateway(self) -> str:
+        """Gateway da sessão ativa"""
+        return self.manager.gateway
+
+    @property
+    def port(self) -> int:
+        """Porta da sessão ativa"""
+        return self.manager.port
+
+    @property
+    def attempts(self) -> int:
+        """Tentativas das duas sessões"""
+        return sum(slot.attempts for slot in self.slots)
+
+    @property
+    def last_error(self) -> Optional[str]:
+        """Última falha da sessão ativa"""
+        return self.manager.last_error
+
+    @last_error.setter
+    def last_error(self, value: Optional[str]):
+        self.manager.last_error = value
+
+    @property
+    def interface(self) -> Optional[str]:
+        """Interface que leva as rotas (None se a sessão ativa não está no ar)"""
+        return self.manager.interface
+
+    def add_listener(self, callback: Callable[[Event], None]):
+        """Registra callback chamado a cada evento de qualquer um dos openfortivpn"""
+        for slot in self.slots:
+            slot.add_listener(callback)
+
+    def add_exit_listener(self, callback: Callable[[int], None]):
+        """Registra callback chamado quando qualquer um dos openfortivpn termina"""
+        for slot in self.slots:
+            slot.add_exit_listener(callback)
+
+    def is_active(self) -> bool:
+        """Há sessão no ar ou tentativa em andamento"""
+        return any(slot.is_active() for slot in self.slots)
+
+    def connect(self) -> bool:
+        """
+        Inicia a sessão ativa; a reserva sobe depois dela, reaproveitando a pré-checagem.
+
+        Returns:
+            True se a tentativa foi iniciada
+        """
+        self._ensure_maintenance()
+        return self.manager.connect()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Aguarda até timeout segundos, acordando em queda, subida ou troca de sessão.
+
+        Returns:
+            True se houve mudança durante a espera
+        """
+        changed = self._changed.wait(timeout)
+        self._changed.clear()
+        return changed
+
+    def declare_dead(self, reason: str):
+        """
+        Peer da sessão ativa parou de responder: troca para a reserva, ou derruba a ativa se não há reserva.
+
+        Args:
+            reason: Motivo exibido como última falha
+        """
+        active = self.active
+        if self.failover(reason, active) is None:
+            self.slots[active].declare_dead(reason)
+
+    def disconnect(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Encerra as duas sessões e a manutenção da reserva"""
+        self._stop.set()
+        self._wakeup.set()
+        self._changed.set()
+        returncodes = [slot.disconnect(timeout) for slot in self.slots]
+        with self._lock:
+            self._revert_dns(keep=None)
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        return returncodes[self.active]
+
+    def status(self) -> Dict:
+        """
+        Estado da sessão ativa (formato do ConnectionManager) e da reserva.
+
+        Returns:
+            status() da ativa com 'standby' (status da reserva), 'standby_gateway',
+            'standby_interface', 'failovers' e 'last_failover'
+        """
+        status = self.manager.status()
+        standby = self.standby
+        status.update(
+            standby=standby.status(),
+            standby_gateway=f"{standby.gateway}:{standby.port}",
+            standby_interface=standby.interface,
+            failovers=self.failover_count,
+            last_failover=self.failovers[-1] if self.failovers else None,
+        )
+        return status
+
+    # Troca de sessão
+
+    def failover(self, reason: str, from_index: Optional[int] = None) -> Optional[Dict]:
+        """
+        Passa as rotas para a reserva e refaz a sessão antiga em background.
+
+        Args:
+            reason: Motivo ('exit', ou o do detector de peer morto)
+            from_index: Sessão que caiu (ignorado se ela já não é a ativa)
+
+        Returns:
+            Registro da troca ({'reason', 'from', 'to', 'interface', 'routes',
+            'applied', 'dns', 'swap_ms', 'at'}) ou None se não havia reserva no ar
+        """
+        with self._lock:
+            old = self.active if from_index is None else from_index
+            new = 1 - old
+            if old != self.active or not self._up[new] or self.slots[new].interface is None:
+                return None
+            started = time.perf_counter()
+            interface = self.slots[new].interface
+            applied = self.route_runner(interface, self.routes) if self.routes else 0
+            # A reserva subiu com --set-dns=0: sem isto o DNS da VPN some com a sessão antiga
+            self.dns_applied = self._apply_dns(interface)
+            self.active = new
+            self.routes_applied = applied
+            record = {
+                'reason': reason,
+                'from': self.slots[old].interface or f"{self.slots[old].gateway}:{self.slots[old].port}",
+                'to': interface,
+                'routes': len(self.routes),
+                'applied': applied,
+                'dns': self.dns_applied,
+                'swap_ms': (time.perf_counter() - started) * 1000,
+                'at': time.time(),
+            }
+            self.failovers = (self.failovers + [record])[-FAILOVER_HISTORY:]
+            self.failover_count += 1
+        self._changed.set()
+        threading.Thread(target=self._rebuild, args=(old, reason), name='standby-rebuild', daemon=True).start()
+        return record
+
+    def _rebuild(self, index: int, reason: str):
+        """Encerra a sessão antiga e a sobe de novo como reserva"""
+        slot = self.slots[index]
+        slot.disconnect(timeout=1)
+        with self._lock:
+            # O openfortivpn antigo restaura o resolv.conf ao sair: reaplica na ativa
+            interface = self.manager.interface
+            self._revert_dns(keep=interface)
+            if interface and self.nameservers:
+                self.dns_applied = self._apply_dns(interface)
+        slot.last_error = reason
+        slot.extra_args = list(STANDBY_ARGS)
+        self.schedulers[index].record_drop()
+        self._ensure_maintenance()
+        self._wakeup.set()
+
+    def _activate(self, index: int):
+        """Sessão que subiu passa a levar as rotas (primeira subida ou a outra caída)"""
+        with self._lock:
+            self.active = index
+            # A outra sessão (caída ou ainda subindo) volta como reserva
+            self.slots[1 - index].extra_args = list(STANDBY_ARGS)
+            slot = self.slots[index]
+            interface = slot.interface
+            if slot.session is not None and slot.session.parser.nameservers:
+                self.nameservers = list(slot.session.parser.nameservers)
+                self.dns_suffix = list(slot.session.parser.dns_suffix)
+            if not self.routes and interface:
+                # Sem rotas configuradas: as que o openfortivpn instalou valem para a reserva
+                self.routes = self.route_reader(interface)
+                self.routes_applied = len(self.routes)
+            elif interface:
+                self.routes_applied = self.route_runner(interface, self.routes)
+            if interface and '--set-dns=0' in slot.extra_args:
+                # Sessão que subiu como reserva não configurou o DNS
+                self.dns_applied = self._apply_dns(interface)
+
+    def _apply_dns(self, interface: str) -> bool:
+        """Aponta o DNS da VPN para a interface (chamado com _lock)"""
+        if not self.nameservers:
+            return False
+        self._dns_interfaces.add(interface)
+        return self.dns_runner(interface, self.nameservers, self.dns_suffix)
+
+    def _revert_dns(self, keep: Optional[str]):
+        """Remove o DNS aplicado nas interfaces que não levam mais o tráfego (chamado com _lock)"""
+        for interface in list(self._dns_interfaces):
+            if interface != keep:
+                self._dns_interfaces.discard(interface)
+                self.dns_runner(interface, [], [])
+
+    def _on_event(self, index: int, event: Event):
+        """Estado das duas sessões a partir da saída dos openfortivpn (threads de leitura)"""
+        kind = event['kind']
+        if kind == EVENT_TUNNEL_UP:
+            self._up[index] = True
+            self.schedulers[index].record_success()
+            if index == self.active or not self._up[self.active]:
+                self._activate(index)
+            if self.standby.preflight is None:
+                # Reserva reaproveita a pré-checagem (token e openfortivpn já verificados)
+                self.standby.preflight = self.manager.preflight
+            self._wakeup.set()
+        elif kind == EVENT_DISCONNECTED:
+            was_up, self._up[index] = self._up[index], False
+            if index == self.active and self.failover('exit', index) is not None:
+                return
+            if index != self.active:
+                if was_up:
+                    self.schedulers[index].record_drop()
+                else:
+                    self.schedulers[index].record_failure()
+                self._wakeup.set()
+        else:
+            return
+        self._changed.set()
+
+    def _ensure_maintenance(self):
+        """Inicia a thread que mantém a reserva no ar"""
+        with self._lock:
+            if self._thread is not None or self._stop.is_set():
+                return
+            self._thread = threading.Thread(target=self._maintain, name='hot-standby', daemon=True)
+            self._thread.start()
+
+    def _maintain(self):
+        """Sobe a reserva quando a ativa está no ar, com backoff entre falhas"""
+        while not self._stop.is_set():
+            standby = 1 - self.active
+            slot = self.slots[standby]
+            if (self._up[self.active] and slot.state == STATE_DISCONNECTED
+                    and self.schedulers[standby].due()):
+                slot.connect()
+            self._wakeup.wait(min(self.maintenance_interval, max(0.05, self.schedulers[standby].delay())))
+            self._wakeup.clear()
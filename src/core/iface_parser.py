@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Módulo de parsers de interfaces - ifconfig, iproute2 JSON e netstat em uma passada
+"""
+
+import json
+from typing import Optional, Dict, List
+
+
+# Configuração
+VPN_INTERFACE_PREFIXES = ('ppp', 'utun', 'tun')
+VPN_IP_PREFIXES = ('192.168.50.', '10.')
+COUNTER_KEYS = ('rx', 'tx', 'rx_packets', 'tx_packets', 'rx_errors', 'tx_errors', 'rx_drop', 'tx_drop')
+OLD_COUNTER_FIELDS = {'packets': '_packets', 'errors': '_errors', 'dropped': '_drop'}
+
+# Registro de interface: dicionário com esquema fixo
+#   'name': str, 'flags': List[str], 'mtu': str ('N/A' se desconhecido),
+#   'ipv4': List[str], 'ipv6': List[str], 'peer': Optional[str]
+#   + contadores opcionais (COUNTER_KEYS), presentes só quando a fonte os traz
+InterfaceRecord = Dict[str, object]
+
+
+def new_record(name: str, flags: Optional[List[str]] = None, mtu: str = 'N/A') -> InterfaceRecord:
+    """
+    Cria um registro de interface vazio.
+
+    Args:
+        name: Nome da interface
+        flags: Flags (ex: ['UP', 'POINTOPOINT'])
+        mtu: MTU em texto
+
+    Returns:
+        Registro com todos os campos obrigatórios
+    """
+    return {'name': name, 'flags': flags or [], 'mtu': mtu, 'ipv4': [], 'ipv6': [], 'peer': None}
+
+
+def _number(text: str) -> Optional[int]:
+    """Converte texto em inteiro, None se não numérico"""
+    return int(text) if text.isdigit() else None
+
+
+def parse_ifconfig(output: str) -> Dict[str, InterfaceRecord]:
+    """
+    Converte a saída do ifconfig em registros, em uma única passada.
+
+    Aceita o formato do macOS/BSD e do net-tools do Linux (moderno e antigo
+    `inet addr:`). Cada linha é classificada pela primeira palavra, sem
+    regex por linha nem releitura de linhas vizinhas.
+
+    Args:
+        output: Saída de `ifconfig` ou `ifconfig <interface>`
+
+    Returns:
+        Dicionário {interface: registro}
+    """
+    records = {}
+    current = None
+    for line in output.split('\n'):
+        if not line:
+            continue
+        if line[0] not in ' \t':
+            # Cabeçalho: "ppp0: flags=8051<UP,POINTOPOINT> mtu 1354" ou,
+            # no net-tools antigo, "ppp0      Link encap:Point-to-Point Protocol"
+            words = line.split()
+            name = words[0]
+            if name.endswith(':'):
+                name = name[:-1]
+            elif 'encap:' not in line:
+                current = None
+                continue
+            flags = []
+            start = line.find('<')
+            if start >= 0:
+                end = line.find('>', start)
+                if end > start + 1:
+                    flags = line[start + 1:end].split(',')
+            mtu = 'N/A'
+            if 'mtu' in words:
+                position = words.index('mtu') + 1
+                if position < len(words):
+                    mtu = words[position]
+            current = new_record(name, flags, mtu)
+            records[name] = current
+            continue
+        if current is None:
+            continue
+        words = line.split()
+        keyword = words[0]
+        if keyword == 'inet' and len(words) > 1:
+            address = words[1]
+            if address.startswith('addr:'):
+                address = address[5:]
+            current['ipv4'].append(address)
+            # Ponto-a-ponto: "--> 192.0.2.1" (macOS), "destination 192.0.2.1"
+            # (net-tools) ou "P-t-P:192.0.2.1" (net-tools antigo)
+            for position, word in enumerate(words):
+                if word in ('-->', 'destination') and position + 1 < len(words):
+                    current['peer'] = words[position + 1]
+                elif word.startswith('P-t-P:'):
+                    current['peer'] = word[6:]
+        elif keyword == 'inet6' and len(words) > 1:
+            address = words[2] if words[1] == 'addr:' and len(words) > 2 else words[1]
+            current['ipv6'].append(address.split('%', 1)[0].split('/', 1)[0])
+        elif keyword in ('RX', 'TX') and len(words) > 1:
+            prefix = 'rx' if keyword == 'RX' else 'tx'
+            kind = words[1]
+            if kind == 'packets' and len(words) > 2:
+                # "RX packets 123  bytes 4567 (4.4 KiB)"
+                current[prefix + '_packets'] = _number(words[2]) or 0
+                if len(words) > 4 and words[3] == 'bytes':
+                    current[prefix] = _number(words[4]) or 0
+            elif kind == 'errors' and len(words) > 2:
+                # "RX errors 0  dropped 5  overruns 0  frame 0"
+                current[prefix + '_errors'] = _number(words[2]) or 0
+                if len(words) > 4 and words[3] == 'dropped':
+                    current[prefix + '_drop'] = _number(words[4]) or 0
+            elif kind.startswith('packets:'):
+                # Formato antigo: "RX packets:123 errors:0 dropped:0 ..."
+                for word in words[1:]:
+                    key, _, value = word.partition(':')
+                    field = OLD_COUNTER_FIELDS.get(key)
+                    if field and value.isdigit():
+                        current[prefix + field] = int(value)
+            elif kind.startswith('bytes:'):
+                # Formato antigo: "RX bytes:4567 (4.4 KiB)  TX bytes:890 (890.0 B)"
+                for position, word in enumerate(words[1:], 1):
+                    if word.startswith('bytes:') and word[6:].isdigit():
+                        current['rx' if words[position - 1] == 'RX' else 'tx'] = int(word[6:])
+        elif 'MTU:' in line:
+            # Formato antigo: "UP POINTOPOINT RUNNING NOARP MULTICAST  MTU:1354  Metric:1"
+            for position, word in enumerate(words):
+                if word.startswith('MTU:'):
+                    current['mtu'] = word[4:]
+                    current['flags'] = words[:position]
+                    break
+    return records
+
+
+def parse_ip_json(output: str) -> Dict[str, InterfaceRecord]:
+    """
+    Converte a saída JSON do iproute2 em registros.
+
+    Aceita `ip -j -s addr` (endereços e contadores), `ip -j addr`
+    e `ip -s -j link` (contadores sem endereços).
+
+    Args:
+        output: Saída JSON do comando `ip`
+
+    Returns:
+        Dicionário {interface: registro}, vazio se a saída não é JSON válido
+    """
+    try:
+        links = json.loads(output)
+    except ValueError:
+        return {}
+    records = {}
+    for link in links if isinstance(links, list) else []:
+        name = link.get('ifname')
+        if not name:
+            continue
+        mtu = link.get('mtu')
+        record = new_record(name, list(link.get('flags', [])), str(mtu) if mtu is not None else 'N/A')
+        for address in link.get('addr_info', []):
+            local = address.get('local')
+            if not local:
+                continue
+            if address.get('family') == 'inet':
+                record['ipv4'].append(local)
+                if address.get('address') and address['address'] != local:
+                    record['peer'] = address['address']
+            elif address.get('family') == 'inet6':
+                record['ipv6'].append(local)
+        stats = link.get('stats64') or link.get('stats')
+        if stats:
+            for prefix in ('rx', 'tx'):
+                values = stats.get(prefix, {})
+                record[prefix] = values.get('bytes', 0)
+                record[prefix + '_packets'] = values.get('packets', 0)
+                record[prefix + '_errors'] = values.get('errors', 0)
+                record[prefix + '_drop'] = values.get('dropped', 0)
+        records[name] = record
+    return records
+
+
+def parse_netstat_ibn(output: str) -> Dict[str, InterfaceRecord]:
+    """
+    Converte a saída de `netstat -ibn` (macOS/BSD) em registros.
+
+    A linha <Link#N> traz MTU e contadores, lidos a partir da direita pois a
+    coluna Address fica vazia em interfaces ponto-a-ponto. As linhas
+    seguintes da mesma interface trazem os endereços IPv4/IPv6.
+
+    Args:
+        output: Saída de `netstat -ibn`
+
+    Returns:
+        Dicionário {interface: registro}
+    """
+    records = {}
+    for line in output.split('\n'):
+        parts = line.split()
+        if len(parts) < 10 or parts[0] == 'Name':
+            continue
+        name = parts[0]
+        if parts[2].startswith('<Link#'):
+            if name in records and 'rx' in records[name]:
+                continue
+            try:
+                counters = {
+                    'rx_packets': int(parts[-7]),
+                    'rx_errors': int(parts[-6]),
+                    'rx': int(parts[-5]),
+                    'tx_packets': int(parts[-4]),
+                    'tx_errors': int(parts[-3]),
+                    'tx': int(parts[-2]),
+                }
+            except ValueError:
+                continue
+            record = records.setdefault(name, new_record(name, mtu=parts[1]))
+            record['mtu'] = parts[1]
+            record.update(counters)
+            continue
+        # Linha de endereço: "ppp0 1354 10.212.134/24 10.212.134.5 ..."
+        record = records.setdefault(name, new_record(name, mtu=parts[1]))
+        address = parts[3]
+        if ':' in address:
+            record['ipv6'].append(address.split('%', 1)[0])
+        elif address.count('.') == 3:
+            record['ipv4'].append(address)
+    return records
+
+
+def merge_records(base: Dict[str, InterfaceRecord], extra: Dict[str, InterfaceRecord]):
+    """
+    Completa registros com os de outra fonte (ex: contadores do netstat).
+
+    Campos já preenchidos em `base` prevalecem; contadores de `extra`
+    são sempre copiados.
+
+    Args:
+        base: Registros a completar (modificado no lugar)
+        extra: Registros de outra fonte
+    """
+    for name, values in extra.items():
+        record = base.setdefault(name, new_record(name))
+        for key, value in values.items():
+            if key in COUNTER_KEYS:
+                record[key] = value
+            elif key == 'mtu':
+                if record.get('mtu', 'N/A') == 'N/A':
+                    record['mtu'] = value
+            elif key in ('ipv4', 'ipv6'):
+                known = record.setdefault(key, [])
+                known.extend(address for address in value if address not in known)
+            elif record.get(key) in (None, []):
+                record[key] = value
+
+
+def find_vpn_interface(records: Dict[str, InterfaceRecord], openfortivpn_running: bool = True) -> Optional[str]:
+    """
+    Escolhe a interface VPN entre os registros.
+
+    Candidatas são interfaces ppp/utun/tun com IPv4 que não seja loopback.
+    Com o openfortivpn rodando vale a primeira candidata; sem ele, só uma
+    com IP típico da VPN (192.168.50.x ou 10.x.x.x) é aceita de imediato.
+
+    Args:
+        records: Registros de interface
+        openfortivpn_running: Se há processo openfortivpn ativo
+
+    Returns:
+        Nome da interface VPN ou None
+    """
+    candidates = []
+    for name, record in records.items():
+        if not name.lower().startswith(VPN_INTERFACE_PREFIXES):
+            continue
+        addresses = [ip for ip in record.get('ipv4', []) if ip != '127.0.0.1']
+        if addresses:
+            candidates.append((name, addresses))
+
+    if not candidates:
+        return None
+    if not openfortivpn_running:
+        for name, addresses in candidates:
+            if any(ip.startswith(VPN_IP_PREFIXES) for ip in addresses):
+                return name
+    return candidates[0][0]
+
+
+def record_counters(record: Optional[InterfaceRecord]) -> Optional[Dict[str, int]]:
+    """
+    Extrai os contadores de um registro.
+
+    Args:
+        record: Registro de interface
+
+    Returns:
+        Dicionário com 'rx', 'tx' e demais contadores presentes, ou None
+    """
+    if not record or 'rx' not in record or 'tx' not in record:
+        return None
+    return {key: record[key] for key in COUNTER_KEYS if key in record}
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Módulo de contadores de interface - leitura nativa de /proc/net/dev e sysfs
+"""
+
+import os
+import fcntl
+import socket
+import struct
+import threading
+from typing import Optional, Dict, List
+
+
+# Configuração
+PROC_NET_DEV = '/proc/net/dev'
+SYSFS_NET = '/sys/class/net'
+READ_CHUNK = 65536
+SIOCGIFADDR = 0x8915  # ioctl do endereço IPv4 principal da interface (Linux)
+IFF_UP = 0x1
+
+# Colunas de /proc/net/dev que nos interessam (índice após o "iface:")
+# Receive:  bytes packets errs drop fifo frame compressed multicast
+# Transmit: bytes packets errs drop fifo colls carrier compressed
+PROC_FIELDS = (
+    ('rx', 0),
+    ('rx_packets', 1),
+    ('rx_errors', 2),
+    ('rx_drop', 3),
+    ('tx', 8),
+    ('tx_packets', 9),
+    ('tx_errors', 10),
+    ('tx_drop', 11),
+)
+
+# Arquivos de /sys/class/net/<if>/statistics mapeados para as mesmas chaves
+SYSFS_FIELDS = (
+    ('rx', 'rx_bytes'),
+    ('rx_packets', 'rx_packets'),
+    ('rx_errors', 'rx_errors'),
+    ('rx_drop', 'rx_dropped'),
+    ('tx', 'tx_bytes'),
+    ('tx_packets', 'tx_packets'),
+    ('tx_errors', 'tx_errors'),
+    ('tx_drop', 'tx_dropped'),
+)
+
+
+def parse_proc_net_dev(data: bytes) -> Dict[str, Dict[str, int]]:
+    """
+    Converte o conteúdo de /proc/net/dev em contadores por interface.
+
+    Args:
+        data: Conteúdo bruto do arquivo
+
+    Returns:
+        Dicionário {interface: {'rx', 'tx', 'rx_packets', ...}}
+    """
+    stats = {}
+    # As duas primeiras linhas são cabeçalho
+    for line in data.split(b'\n')[2:]:
+        name, sep, rest = line.partition(b':')
+        if not sep:
+            continue
+        values = rest.split()
+        if len(values) < 16:
+            continue
+        try:
+            stats[name.strip().decode()] = {key: int(values[index]) for key, index in PROC_FIELDS}
+        except ValueError:
+            continue
+    return stats
+
+
+class ProcNetDevReader:
+    """Leitor de contadores de todas as interfaces via /proc/net/dev"""
+
+    def __init__(self, path: str = PROC_NET_DEV):
+        """
+        Inicializa o leitor.
+
+        Args:
+            path: Caminho do arquivo (padrão: /proc/net/dev)
+        """
+        self.path = path
+        self._fd = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_available(path: str = PROC_NET_DEV) -> bool:
+        """Verifica se /proc/net/dev existe e pode ser lido"""
+        return os.access(path, os.R_OK)
+
+    def read_raw(self) -> bytes:
+        """
+        Lê o arquivo inteiro reaproveitando o descritor aberto.
+
+        Returns:
+            Conteúdo bruto de /proc/net/dev
+        """
+        with self._lock:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDONLY)
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            chunks = []
+            while True:
+                chunk = os.read(self._fd, READ_CHUNK)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            return b''.join(chunks)
+
+    def read_all(self) -> Dict[str, Dict[str, int]]:
+        """
+        Lê contadores de todas as interfaces em uma única leitura.
+
+        Returns:
+            Dicionário {interface: contadores} ou {} em caso de erro
+        """
+        try:
+            return parse_proc_net_dev(self.read_raw())
+        except OSError:
+            self.close()
+            return {}
+
+    def read_interface(self, interface: str) -> Optional[Dict[str, int]]:
+        """
+        Lê contadores de uma interface.
+
+        Args:
+            interface: Nome da interface de rede
+
+        Returns:
+            Dicionário de contadores ou None se a interface não existe
+        """
+        return self.read_all().get(interface)
+
+    def close(self):
+        """Fecha o descritor mantido aberto"""
+        with self._lock:
+            if self._fd is not None:
+                try:
+                    os.close(self._fd)
+                except OSError:
+                    pass
+                self._fd = None
+
+
+class SysfsCounterReader:
+    """Leitor de contadores por interface via /sys/class/net/<if>/statistics"""
+
+    def __init__(self, root: str = SYSFS_NET):
+        """
+        Inicializa o leitor.
+
+        Args:
+            root: Diretório base do sysfs de rede
+        """
+        self.root = root
+        self._fds = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_available(root: str = SYSFS_NET) -> bool:
+        """Verifica se o sysfs de rede está montado"""
+        return os.path.isdir(root)
+
+    def _open(self, interface: str) -> Dict[str, int]:
+        """Abre (uma única vez) os arquivos de estatística da interface"""
+        fds = self._fds.get(interface)
+        if fds is None:
+            base = os.path.join(self.root, interface, 'statistics')
+            fds = {}
+            try:
+                for key, filename in SYSFS_FIELDS:
+                    fds[key] = os.open(os.path.join(base, filename), os.O_RDONLY)
+            except OSError:
+                for fd in fds.values():
+                    os.close(fd)
+                raise
+            self._fds[interface] = fds
+        return fds
+
+    def read_interface(self, interface: str) -> Optional[Dict[str, int]]:
+        """
+        Lê contadores de uma interface usando descritores mantidos abertos.
+
+        Args:
+            interface: Nome da interface de rede
+
+        Returns:
+            Dicionário de contadores ou None se a interface não existe
+        """
+        with self._lock:
+            try:
+                fds = self._open(interface)
+                return {key: int(os.pread(fd, 32, 0)) for key, fd in fds.items()}
+            except (OSError, ValueError):
+                # Interface removida (ex: ppp0 caiu) - descartar descritores antigos
+                self._close_interface(interface)
+                return None
+
+    def read_all(self) -> Dict[str, Dict[str, int]]:
+        """
+        Lê contadores de todas as interfaces presentes no sysfs.
+
+        Returns:
+            Dicionário {interface: contadores}
+        """
+        stats = {}
+        try:
+            interfaces = os.listdir(self.root)
+        except OSError:
+            return stats
+        for interface in interfaces:
+            counters = self.read_interface(interface)
+            if counters is not None:
+                stats[interface] = counters
+        return stats
+
+    def _close_interface(self, interface: str):
+        """Fecha os descritores de uma interface"""
+        for fd in self._fds.pop(interface, {}).values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def close(self):
+        """Fecha todos os descritores mantidos abertos"""
+        with self._lock:
+            for interface in list(self._fds):
+                self._close_interface(interface)
+
+
+class SysfsInterfaceReader:
+    """Tabela de interfaces (flags, MTU, IPv4) via sysfs e ioctl, sem rtnetlink nem ifconfig"""
+
+    def __init__(self, root: str = SYSFS_NET):
+        """
+        Inicializa o leitor.
+
+        Args:
+            root: Diretório base do sysfs de rede
+        """
+        self.root = root
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_available(root: str = SYSFS_NET) -> bool:
+        """Verifica se o sysfs de rede está montado"""
+        return os.path.isdir(root)
+
+    def _read(self, interface: str, name: str) -> Optional[str]:
+        """Conteúdo de /sys/class/net/<if>/<name>, None se a interface sumiu"""
+        try:
+            with open(os.path.join(self.root, interface, name)) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _ipv4(self, interface: str) -> List[str]:
+        """Endereço IPv4 principal da interface (vazio se não há)"""
+        request = struct.pack('256s', interface.encode()[:15])
+        try:
+            data = fcntl.ioctl(self._socket.fileno(), SIOCGIFADDR, request)
+        except OSError:
+            return []
+        return [socket.inet_ntoa(data[20:24])]
+
+    def read_all(self) -> Dict[str, Dict]:
+        """
+        Lê a tabela de interfaces no formato da descoberta rtnetlink.
+
+        Returns:
+            Dicionário {interface: {'flags', 'mtu', 'ipv4'}}
+        """
+        records = {}
+        try:
+            interfaces = os.listdir(self.root)
+        except OSError:
+            return records
+        with self._lock:
+            for interface in interfaces:
+                flags = self._read(interface, 'flags')
+                if flags is None:
+                    continue
+                try:
+                    value = int(flags, 16)
+                except ValueError:
+                    value = 0
+                names = []
+                if value & IFF_UP:
+                    names.append('UP')
+                    # O sysfs não traz IFF_RUNNING nas flags: vem do carrier
+                    if self._read(interface, 'carrier') == '1':
+                        names.append('RUNNING')
+                records[interface] = {
+                    'flags': names,
+                    'mtu': self._read(interface, 'mtu') or 'N/A',
+                    'ipv4': self._ipv4(interface),
+                }
+        return records
+
+    def close(self):
+        """Fecha o socket usado nos ioctl"""
+        self._socket.close()
+
+
+_backend = None
+_backend_checked = False
+_interface_reader = None
+_interface_reader_checked = False
+
+
+def get_counter_backend():
+    """
+    Retorna o backend nativo de contadores disponível neste sistema.
+
+    Prefere /proc/net/dev (uma leitura para todas as interfaces) e recorre
+    ao sysfs quando o procfs não está disponível.
+
+    Returns:
+        ProcNetDevReader, SysfsCounterReader ou None (ex: macOS)
+    """
+    global _backend, _backend_checked
+    if not _backend_checked:
+        if ProcNetDevReader.is_available():
+            _backend = ProcNetDevReader()
+        elif SysfsCounterReader.is_available():
+            _backend = SysfsCounterReader()
+        _backend_checked = True
+    return _backend
+
+
+def get_interface_reader() -> Optional[SysfsInterfaceReader]:
+    """
+    Retorna o leitor nativo da tabela de interfaces, usado quando rtnetlink não está disponível.
+
+    Returns:
+        SysfsInterfaceReader ou None (ex: macOS, onde resta o ifconfig)
+    """
+    global _interface_reader, _interface_reader_checked
+    if not _interface_reader_checked:
+        if SysfsInterfaceReader.is_available():
+            _interface_reader = SysfsInterfaceReader()
+        _interface_reader_checked = True
+    return _interface_reader
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Módulo de sondagem de latência - probes TCP/HTTP concorrentes com asyncio
+"""
+
+import asyncio
+import ssl
+import threading
+import time
+from typing import Optional, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from ..utils.histogram import LatencyHistogram
+
+
+# Configuração
+DEFAULT_INTERVAL = 1.0  # segundos entre rodadas
+DEFAULT_TIMEOUT = 2.0  # segundos; probe sem resposta conta como perda
+DEFAULT_CONCURRENCY = 64  # probes simultâneos no máximo
+RECENT_WINDOW = 60  # segundos cobertos pelas estatísticas "recentes"
+PERCENTILES = (50, 90, 99)
+
+
+def parse_target(spec: str) -> Dict:
+    """
+    Interpreta um alvo de probe.
+
+    Formatos aceitos: 'tcp://host:porta', 'host:porta' (TCP),
+    'http://host[:porta][/caminho]' e 'https://host[:porta][/caminho]' (HEAD).
+
+    Args:
+        spec: Texto do alvo
+
+    Returns:
+        Dicionário {'name', 'kind', 'host', 'port', 'path', 'tls'}
+
+    Raises:
+        ValueError: Se o alvo não tem host ou porta válidos
+    """
+    name = spec
+    if '://' not in spec:
+        spec = 'tcp://' + spec
+    parts = urlsplit(spec)
+    kind = parts.scheme.lower()
+    if kind not in ('tcp', 'http', 'https') or not parts.hostname:
+        raise ValueError(f"Alvo inválido: {spec}")
+    port = parts.port
+    if port is None:
+        if kind == 'tcp':
+            raise ValueError(f"Alvo TCP sem porta: {spec}")
+        port = 443 if kind == 'https' else 80
+    return {
+        'name': name,
+        'kind': 'tcp' if kind == 'tcp' else 'http',
+        'host': parts.hostname,
+        'port': port,
+        'path': (parts.path or '/') + (f"?{parts.query}" if parts.query else ''),
+        'tls': kind == 'https',
+    }
+
+
+async def probe_tcp(host: str, port: int, timeout: float = DEFAULT_TIMEOUT,
+                    source_ip: Optional[str] = None) -> int:
+    """
+    Mede o tempo de um TCP connect (handshake completo).
+
+    Args:
+        host: Host de destino
+        port: Porta de destino
+        timeout: Tempo máximo em segundos
+        source_ip: IP local de origem (ex: IP da VPN para forçar o túnel)
+
+    Returns:
+        RTT em microssegundos
+
+    Raises:
+        OSError, asyncio.TimeoutError: Se o probe falhou
+    """
+    local_addr = (source_ip, 0) if source_ip else None
+    started = time.perf_counter_ns()
+    _, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port, local_addr=local_addr), timeout)
+    rtt = (time.perf_counter_ns() - started) // 1000
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return rtt
+
+
+async def probe_http_head(host: str, port: int, path: str = '/', tls: bool = False,
+                          timeout: float = DEFAULT_TIMEOUT, source_ip: Optional[str] = None) -> int:
+    """
+    Mede o tempo até a linha de status de um HEAD (connect + TLS + resposta).
+
+    Qualquer status HTTP conta como sucesso: o objetivo é medir o caminho,
+    não a saúde da aplicação.
+
+    Args:
+        host: Host de destino
+        port: Porta de destino
+        path: Caminho requisitado
+        tls: Usar HTTPS
+        timeout: Tempo máximo em segundos
+        source_ip: IP local de origem
+
+    Returns:
+        RTT em microssegundos
+
+    Raises:
+        OSError, asyncio.TimeoutError, ValueError: Se o probe falhou
+    """
+    local_addr = (source_ip, 0) if source_ip else None
+    context = ssl.create_default_context() if tls else None
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=context, server_hostname=host if tls else None, local_addr=local_addr)
+        try:
+            writer.write(f"HEAD {path} HTTP/1.1\r\nHost: {host}\r\n"
+                         f"User-Agent: vpn-connect-probe\r\nConnection: close\r\n\r\n".encode('ascii'))
+            await writer.drain()
+            status_line = await reader.readline()
+        finally:
+            writer.close()
+        if not status_line.startswith(b'HTTP/'):
+            raise ValueError("Resposta HTTP inválida")
+
+    started = time.perf_counter_ns()
+    await asyncio.wait_for(exchange(), timeout)
+    return (time.perf_counter_ns() - started) // 1000
+
+
+def _summarize(histogram: LatencyHistogram, sent: int, lost: int) -> Dict:
+    """Resumo do histograma acrescido de envios e perda"""
+    result = histogram.summary(PERCENTILES)
+    result.update({'sent': sent, 'lost': lost, 'loss': lost / sent if sent else 0.0})
+    return result
+
+
+class ProbeStats:
+    """Estatísticas de um alvo: histograma total e janela recente"""
+
+    def __init__(self, window: float = RECENT_WINDOW):
+        """
+        Inicializa estatísticas vazias.
+
+        Args:
+            window: Duração (segundos) de cada metade da janela recente
+        """
+        self.window = window
+        self.sent = 0
+        self.lost = 0
+        self.last_rtt = None
+        self.last_error = None
+        self.histogram = LatencyHistogram()
+        # Janela recente: intervalo corrente + anterior, trocados a cada `window`
+        self._current = LatencyHistogram()
+        self._previous = LatencyHistogram()
+        self._current_sent = self._current_lost = 0
+        self._previous_sent = self._previous_lost = 0
+        self._rotated_at = time.monotonic()
+
+    def _rotate(self, now: float):
+        """Descarta o intervalo anterior quando o corrente completa a janela"""
+        if now - self._rotated_at < self.window:
+            return
+        if now - self._rotated_at >= 2 * self.window:
+            self._current.reset()
+            self._current_sent = self._current_lost = 0
+        self._previous, self._current = self._current, self._previous
+        self._current.reset()
+        self._previous_sent, self._previous_lost = self._current_sent, self._current_lost
+        self._current_sent = self._current_lost = 0
+        self._rotated_at = now
+
+    def record(self, rtt_us: Optional[int], error: Optional[str] = None, now: Optional[float] = None):
+        """
+        Registra o resultado de um probe.
+
+        Args:
+            rtt_us: RTT em microssegundos ou None se o probe falhou
+            error: Descrição da falha
+            now: Instante (padrão: time.monotonic())
+        """
+        self._rotate(time.monotonic() if now is None else now)
+        self.sent += 1
+        self._current_sent += 1
+        if rtt_us is None:
+            self.lost += 1
+            self._current_lost += 1
+            self.last_error = error
+            return
+        self.last_rtt = rtt_us
+        self.last_error = None
+        self.histogram.record(rtt_us)
+        self._current.record(rtt_us)
+
+    def recent_histogram(self) -> Tuple[LatencyHistogram, int, int]:
+        """
+        Dados da janela recente (entre 1 e 2 janelas de duração).
+
+        Returns:
+            Tupla (histograma mesclado, probes enviados, probes perdidos)
+        """
+        self._rotate(time.monotonic())
+        merged = self._previous.copy()
+        merged.merge(self._current)
+        return (merged, self._previous_sent + self._current_sent,
+                self._previous_lost + self._current_lost)
+
+    def recent(self) -> Dict:
+        """
+        Estatísticas da janela recente.
+
+        Returns:
+            Dicionário com 'sent', 'lost', 'loss' e o resumo do histograma (µs)
+        """
+        return _summarize(*self.recent_histogram())
+
+
+class LatencyProber:
+    """Executa rodadas periódicas de probes concorrentes em background"""
+
+    def __init__(self, targets: List[str], interval: float = DEFAULT_INTERVAL,
+                 timeout: float = DEFAULT_TIMEOUT, concurrency: int = DEFAULT_CONCURRENCY,
+                 source_ip: Optional[str] = None, window: float = RECENT_WINDOW):
+        """
+        Inicializa o prober.
+
+        Args:
+            targets: Alvos no formato de parse_target (inválidos são ignorados)
+            interval: Segundos entre o início de rodadas consecutivas
+            timeout: Tempo máximo de cada probe
+            concurrency: Número máximo de probes simultâneos
+            source_ip: IP local de origem (ex: IP da VPN)
+            window: Janela das estatísticas recentes em segundos
+        """
+        self.targets = []
+        for spec in targets:
+            try:
+                self.targets.append(parse_target(spec))
+            except ValueError:
+                continue
+        self.interval = interval
+        self.timeout = timeout
+        self.concurrency = max(1, concurrency)
+        self.source_ip = source_ip
+        self.stats = {target['name']: ProbeStats(window) for target in self.targets}
+        self.rounds = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._loop = None
+        self._wakeup = None
+        self._stopping = False
+
+    async def _probe(self, target: Dict, semaphore: asyncio.Semaphore):
+        """Executa um probe e registra o resultado"""
+        async with semaphore:
+            rtt, error = None, None
+            try:
+                if target['kind'] == 'tcp':
+                    rtt = await probe_tcp(target['host'], target['port'], self.timeout, self.source_ip)
+                else:
+                    rtt = await probe_http_head(target['host'], target['port'], target['path'],
+                                                target['tls'], self.timeout, self.source_ip)
+            except asyncio.TimeoutError:
+                error = 'timeout'
+            except (OSError, ValueError, ssl.SSLError) as exc:
+                error = type(exc).__name__
+        with self._lock:
+            self.stats[target['name']].record(rtt, error)
+
+    async def run_round(self):
+        """Dispara um probe por alvo, todos concorrentes (limitados por `concurrency`)"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self._probe(target, semaphore) for target in self.targets))
+        self.rounds += 1
+
+    def probe_once(self):
+        """Executa uma rodada de forma síncrona (fora da thread de background)"""
+        asyncio.run(self.run_round())
+
+    async def _run(self):
+        """Loop de rodadas com período fixo até stop()"""
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        next_round = loop.time()
+        while not self._stopping:
+            await self.run_round()
+            next_round += self.interval
+            delay = next_round - loop.time()
+            if delay < 0:
+                next_round = loop.time()
+                delay = 0
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _thread_main(self):
+        """Corpo da thread: event loop próprio, isolado do chamador"""
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._run())
+        finally:
+            self._loop = None
+            loop.close()
+
+    def start(self):
+        """Inicia as rodadas em background"""
+        if self._thread is not None or not self.targets:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._thread_main, name='latency-prober', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Encerra as rodadas em background"""
+        self._stopping = True
+        loop = self._loop
+        if loop is not None and self._wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout + 1)
+            self._thread = None
+
+    def summary(self, recent: bool = True) -> Dict[str, Dict]:
+        """
+        Estatísticas por alvo.
+
+        Args:
+            recent: True para a janela recente, False para o total desde o início
+
+        Returns:
+            {nome: {'sent', 'lost', 'loss', 'count', 'min', 'max', 'mean', 'p50', 'p90', 'p99'}}
+            com tempos em microssegundos
+        """
+        result = {}
+        with self._lock:
+            for name, stats in self.stats.items():
+                if recent:
+                    result[name] = stats.recent()
+                else:
+                    result[name] = _summarize(stats.histogram, stats.sent, stats.lost)
+                result[name]['last_error'] = stats.last_error
+        return result
+
+    def overall(self) -> Dict:
+        """
+        Estatísticas recentes agregadas de todos os alvos.
+
+        Returns:
+            Dicionário no formato de summary() para um único alvo
+        """
+        merged = LatencyHistogram()
+        sent = lost = 0
+        with self._lock:
+            for stats in self.stats.values():
+                histogram, target_sent, target_lost = stats.recent_histogram()
+                merged.merge(histogram)
+                sent += target_sent
+                lost += target_lost
+        return _summarize(merged, sent, lost)
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Módulo de detecção de peer morto - rx parado com tx crescendo, confirmado por sondas pelo túnel
+"""
+
+import socket
+import threading
+import time
+from typing import Optional, Dict, List, Callable
+
+from .latency_prober import parse_target
+
+
+# Configuração
+DEFAULT_BUDGET = 1.0  # segundos entre o primeiro envio sem resposta e a declaração de peer morto
+STALL_TIME = 0.3  # segundos de rx parado (com tx crescendo) que disparam as sondas
+IDLE_PROBE_INTERVAL = 1.0  # segundos sem rx após os quais o túnel ocioso é sondado
+
+STATE_ALIVE = 'alive'
+STATE_SUSPECT = 'suspect'  # tx sem rx: sondas em andamento
+STATE_DEAD = 'dead'
+
+
+def probe_peer(host: str, port: int, timeout: float, source_ip: Optional[str] = None) -> bool:
+    """
+    Sonda pelo túnel: um TCP connect com origem no IP da VPN.
+
+    Conexão recusada (RST) também conta: a resposta atravessou o túnel.
+
+    Args:
+        host: Host de destino (alcançável só pela VPN)
+        port: Porta de destino
+        timeout: Tempo máximo em segundos
+        source_ip: IP local de origem (força a rota pelo túnel)
+
+    Returns:
+        True se o destino respondeu
+    """
+    try:
+        with socket.create_connection((host, port), timeout,
+                                      source_address=(source_ip, 0) if source_ip else None):
+            return True
+    except ConnectionRefusedError:
+        return True
+    except OSError:
+        return False
+
+
+class LivenessDetector:
+    """Decide se o peer do túnel está vivo a partir dos contadores e do resultado das sondas"""
+
+    def __init__(self, budget: float = DEFAULT_BUDGET, stall_time: float = STALL_TIME,
+                 idle_probe_interval: float = IDLE_PROBE_INTERVAL, probes: bool = True,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Inicializa detector.
+
+        Args:
+            budget: Segundos entre o primeiro envio sem resposta e a declaração de morte
+            stall_time: Segundos de rx parado com tx crescendo até suspeitar
+            idle_probe_interval: Segundos sem rx até sondar um túnel ocioso
+                (e intervalo mínimo entre sondas com tráfego só de ida)
+            probes: Há alvos de sonda; sem eles o detector só informa a suspeita
+                (tráfego só de ida, como upload UDP, não distingue peer morto)
+            clock: Relógio monotônico (substituível no replay)
+        """
+        self.budget = budget
+        self.stall_time = stall_time
+        self.idle_probe_interval = idle_probe_interval
+        self.probes = probes
+        self.clock = clock
+        # Uma sonda por suspeita, respondida até o fim do prazo
+        self.probe_timeout = max(0.05, self.budget - stall_time)
+        self.state = STATE_ALIVE
+        self.dead_at = None
+        self.evidence_since = None  # primeiro envio (ou sonda) sem resposta desde o último rx
+        self.probes_sent = 0
+        self.probes_failed = 0
+        self._probe_failed = False  # sonda sem resposta desde o início da evidência
+        self._rx = None
+        self._tx = None
+        self._rx_at = None  # último crescimento do rx (ou sonda respondida)
+        self._probe_started = None  # sonda em andamento
+        self._probe_at = None  # início da última sonda
+
+    def update(self, counters: Dict[str, int], now: Optional[float] = None) -> str:
+        """
+        Registra uma leitura de contadores da interface do túnel.
+
+        Args:
+            counters: Dicionário com 'rx' e 'tx'
+            now: Instante da leitura (padrão: clock())
+
+        Returns:
+            Estado após a leitura
+        """
+        if self.state == STATE_DEAD:
+            return self.state
+        now = self.clock() if now is None else now
+        rx, tx = counters['rx'], counters['tx']
+        if self._rx is None or rx != self._rx:
+            # Qualquer byte recebido (ou contador reiniciado) prova que o peer responde
+            self._alive(now)
+        elif tx != self._tx and self.evidence_since is None:
+            self.evidence_since = now
+        self._rx, self._tx = rx, tx
+        return self._evaluate(now)
+
+    def _alive(self, now: float):
+        """Volta ao estado vivo"""
+        self.state = STATE_ALIVE
+        self.evidence_since = None
+        self._probe_failed = False
+        self._rx_at = now
+
+    def _evaluate(self, now: float) -> str:
+        """Suspeita após STALL_TIME de tx sem rx; morte só após o prazo com uma sonda sem resposta"""
+        if self.evidence_since is None:
+            return self.state
+        waited = now - self.evidence_since
+        if waited >= self.stall_time:
+            self.state = STATE_SUSPECT
+        if waited >= self.budget and self._probe_failed:
+            self.state = STATE_DEAD
+            self.dead_at = now
+        return self.state
+
+    def probe_due(self, now: Optional[float] = None) -> bool:
+        """
+        Há uma sonda a enviar: peer suspeito, ou túnel sem rx há idle_probe_interval.
+
+        Args:
+            now: Instante (padrão: clock())
+
+        Returns:
+            True se a sonda deve ser iniciada agora
+        """
+        if not self.probes or self.state == STATE_DEAD or self._probe_started is not None or self._rx_at is None:
+            return False
+        now = self.clock() if now is None else now
+        last_probe = self._probe_at if self._probe_at is not None else float('-inf')
+        if self.state == STATE_SUSPECT:
+            # Tráfego só de ida fica suspeito a cada resposta: no máximo uma sonda por intervalo
+            return now - last_probe >= self.idle_probe_interval
+        return now - max(self._rx_at, last_probe) >= self.idle_probe_interval
+
+    def probe_started(self, now: Optional[float] = None):
+        """Registra o início de uma sonda"""
+        now = self.clock() if now is None else now
+        self._probe_started = self._probe_at = now
+        self.probes_sent += 1
+
+    def record_probe(self, ok: bool, now: Optional[float] = None) -> str:
+        """
+        Registra o resultado da sonda em andamento.
+
+        Args:
+            ok: Se o destino respondeu
+            now: Instante (padrão: clock())
+
+        Returns:
+            Estado após a sonda
+        """
+        now = self.clock() if now is None else now
+        started, self._probe_started = self._probe_started, None
+        if self.state == STATE_DEAD:
+            return self.state
+        if ok:
+            self._alive(now)
+            return self.state
+        self.probes_failed += 1
+        self._probe_failed = True
+        if self.evidence_since is None:
+            # Túnel ocioso: a própria sonda (ou o rx que chegou depois dela) marca o início
+            self.evidence_since = max(started if started is not None else now, self._rx_at)
+        return self._evaluate(now)
+
+    def tick(self, now: Optional[float] = None) -> str:
+        """Reavalia o estado sem nova leitura (ex: amostragem atrasada)"""
+        if self.state == STATE_DEAD:
+            return self.state
+        return self._evaluate(self.clock() if now is None else now)
+
+    def status(self) -> Dict:
+        """Estado para exibição"""
+        now = self.clock()
+        return {
+            'state': self.state,
+            'budget': self.budget,
+            'rx_idle': now - self._rx_at if self._rx_at is not None else None,
+            'probes_sent': self.probes_sent,
+            'probes_failed': self.probes_failed,
+        }
+
+
+class LivenessMonitor:
+    """Alimenta o detector com as amostras do TrafficSampler e envia as sondas em uma thread própria"""
+
+    def __init__(self, targets: List[str], on_dead: Callable[[Dict], None], source_ip: Optional[str] = None,
+                 budget: float = DEFAULT_BUDGET):
+        """
+        Inicializa monitor.
+
+        Args:
+            targets: Alvos alcançáveis só pela VPN ('tcp://host:porta', 'https://host/'; sondados por TCP connect)
+            on_dead: Chamado uma vez (em thread própria) quando o peer é declarado morto
+            source_ip: IP da VPN usado como origem das sondas
+            budget: Prazo de detecção em segundos
+        """
+        self.targets = []
+        for spec in targets:
+            try:
+                self.targets.append(parse_target(spec))
+            except ValueError:
+                continue
+        self.source_ip = source_ip
+        self.on_dead = on_dead
+        self.detector = LivenessDetector(budget, probes=bool(self.targets))
+        self._lock = threading.Lock()
+        self._probe_wanted = threading.Event()
+        self._stop = threading.Event()
+        self._fired = False
+        self._next_target = 0
+        self._thread = None
+        if self.targets:
+            self._thread = threading.Thread(target=self._probe_loop, name='liveness-probe', daemon=True)
+            self._thread.start()
+
+    @property
+    def state(self) -> str:
+        """Estado atual do detector"""
+        return self.detector.state
+
+    def observe(self, counters: Dict[str, int]):
+        """
+        Listener do TrafficSampler: uma chamada por amostra.
+
+        Args:
+            counters: Contadores da interface do túnel
+        """
+        with self._lock:
+            state = self.detector.update(counters)
+            if self.detector.probe_due():
+                self.detector.probe_started()
+                self._probe_wanted.set()
+        if state == STATE_DEAD:
+            self._fire()
+
+    def _probe_loop(self):
+        """Envia uma sonda por pedido, alternando entre os alvos"""
+        while True:
+            self._probe_wanted.wait()
+            self._probe_wanted.clear()
+            if self._stop.is_set():
+                return
+            target = self.targets[self._next_target % len(self.targets)]
+            self._next_target += 1
+            ok = probe_peer(target['host'], target['port'], self.detector.probe_timeout, self.source_ip)
+            with self._lock:
+                state = self.detector.record_probe(ok)
+            if state == STATE_DEAD:
+                self._fire()
+
+    def _fire(self):
+        """Avisa on_dead uma única vez, fora da thread do amostrador"""
+        with self._lock:
+            if self._fired:
+                return
+            self._fired = True
+        report = dict(self.detector.status(), dead_at=self.detector.dead_at,
+                      evidence_since=self.detector.evidence_since)
+        threading.Thread(target=self.on_dead, args=(report,), name='liveness-dead', daemon=True).start()
+
+    def stop(self):
+        """Encerra a thread de sondas"""
+        self._stop.set()
+        self._probe_wanted.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
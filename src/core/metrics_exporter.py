@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Módulo de exportação de métricas - endpoint Prometheus/OpenMetrics
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Tuple
+
+
+# Configuração
+DEFAULT_METRICS_HOST = '127.0.0.1'
+DEFAULT_METRICS_PORT = 9877
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+REQUEST_QUEUE_SIZE = 128
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    """Formata labels no padrão {chave="valor",...}"""
+    if not labels:
+        return ''
+    escaped = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{key}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+class MetricsRegistry:
+    """Registro de métricas com exposição pré-renderizada"""
+
+    def __init__(self):
+        """Inicializa registro vazio"""
+        self._metrics = {}  # nome -> (tipo, ajuda, {labels: valor})
+        self._lock = threading.Lock()
+        self._rendered = b'# EOF\n'
+
+    def describe(self, name: str, metric_type: str, help_text: str):
+        """
+        Declara uma métrica.
+
+        Args:
+            name: Nome da família (sem sufixo _total)
+            metric_type: 'gauge', 'counter' ou 'summary'
+            help_text: Descrição exibida em # HELP
+        """
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = (metric_type, help_text, {})
+
+    def set(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        """
+        Define o valor de uma amostra.
+
+        Args:
+            name: Nome da família declarada
+            value: Valor atual
+            labels: Labels da amostra
+        """
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            self._metrics[name][2][key] = value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        """
+        Acumula uma observação em uma métrica summary (_sum e _count).
+
+        Args:
+            name: Nome da família declarada como 'summary'
+            value: Valor observado
+            labels: Labels da amostra
+        """
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            samples = self._metrics[name][2]
+            total, count = samples.get(key, (0.0, 0))
+            samples[key] = (total + value, count + 1)
+
+    def set_summary(self, name: str, total: float, count: int, quantiles: Dict[str, float],
+                    labels: Optional[Dict[str, str]] = None):
+        """
+        Define uma amostra summary completa (quantis, _sum e _count).
+
+        Args:
+            name: Nome da família declarada como 'summary'
+            total: Soma acumulada das observações (_sum)
+            count: Número acumulado de observações (_count)
+            quantiles: {quantil ('0.5', '0.99', ...): valor}
+            labels: Labels da amostra (sem 'quantile')
+        """
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            self._metrics[name][2][key] = (total, count, dict(quantiles))
+
+    def render(self) -> bytes:
+        """
+        Gera o texto OpenMetrics de todas as métricas.
+
+        Returns:
+            Exposição codificada em UTF-8
+        """
+        lines = []
+        with self._lock:
+            for name, (metric_type, help_text, samples) in self._metrics.items():
+                lines.append(f'# TYPE {name} {metric_type}')
+                lines.append(f'# HELP {name} {help_text}')
+                for labels, value in samples.items():
+                    label_text = _format_labels(labels)
+                    if metric_type == 'summary':
+                        for quantile, quantile_value in (value[2].items() if len(value) > 2 else ()):
+                            quantile_text = _format_labels(labels + (('quantile', quantile),))
+                            lines.append(f'{name}{quantile_text} {quantile_value}')
+                        lines.append(f'{name}_sum{label_text} {value[0]}')
+                        lines.append(f'{name}_count{label_text} {value[1]}')
+                    elif metric_type == 'counter':
+                        lines.append(f'{name}_total{label_text} {value}')
+                    else:
+                        lines.append(f'{name}{label_text} {value}')
+        lines.append('# EOF')
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+
+    def publish(self):
+        """Pré-renderiza a exposição; scrapes só leem os bytes prontos"""
+        self._rendered = self.render()
+
+    def exposition(self) -> bytes:
+        """Última exposição publicada"""
+        return self._rendered
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Handler HTTP que serve a exposição pré-renderizada"""
+
+    registry = None
+
+    def do_GET(self):
+        """Responde /metrics com o texto OpenMetrics"""
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.exposition()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Silencia o log de acesso (o terminal pertence ao dashboard)"""
+        pass
+
+
+class _MetricsHTTPServer(ThreadingHTTPServer):
+    """Servidor HTTP com uma thread por scrape e fila de conexões ampliada"""
+
+    daemon_threads = True
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+
+class MetricsServer:
+    """Endpoint HTTP de métricas em thread de background"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = DEFAULT_METRICS_HOST,
+                 port: int = DEFAULT_METRICS_PORT):
+        """
+        Inicializa servidor.
+
+        Args:
+            registry: Registro cujas métricas serão expostas
+            host: Endereço de escuta (padrão: somente localhost)
+            port: Porta de escuta (0 = porta livre escolhida pelo sistema)
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self) -> bool:
+        """
+        Inicia o endpoint em background.
+
+        Returns:
+            True se o servidor está escutando
+        """
+        if self._server is not None:
+            return True
+        handler = type('MetricsHandler', (_MetricsHandler,), {'registry': self.registry})
+        try:
+            self._server = _MetricsHTTPServer((self.host, self.port), handler)
+        except OSError:
+            return False
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Encerra o endpoint"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+
+class VpnMetrics:
+    """Métricas do túnel VPN, atualizadas pelo coletor a cada tick"""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        """
+        Declara as métricas do túnel.
+
+        Args:
+            registry: Registro a usar (padrão: novo registro)
+        """
+        self.registry = registry or MetricsRegistry()
+        describe = self.registry.describe
+        describe('vpn_tunnel_up', 'gauge', 'Túnel VPN conectado (1) ou não (0)')
+        describe('vpn_reconnects', 'counter', 'Reconexões desde o início do monitor')
+        describe('vpn_uptime_seconds', 'gauge', 'Tempo de conexão do túnel atual')
+        describe('vpn_receive_bytes', 'counter', 'Bytes recebidos na sessão (através de reconexões)')
+        describe('vpn_transmit_bytes', 'counter', 'Bytes enviados na sessão (através de reconexões)')
+        describe('vpn_receive_packets', 'counter', 'Pacotes recebidos na sessão')
+        describe('vpn_transmit_packets', 'counter', 'Pacotes enviados na sessão')
+        describe('vpn_receive_rate_bytes_per_second', 'gauge', 'Taxa de recepção por janela')
+        describe('vpn_transmit_rate_bytes_per_second', 'gauge', 'Taxa de envio por janela')
+        describe('vpn_connection_phase_seconds', 'summary', 'Duração das fases de estabelecimento da conexão')
+        describe('vpn_connection_phase_last_seconds', 'gauge', 'Duração da última execução de cada fase')
+        describe('vpn_probe_rtt_seconds', 'summary', 'RTT dos probes pelo túnel (quantis da janela recente)')
+        describe('vpn_probe_loss_ratio', 'gauge', 'Fração de probes perdidos na janela recente')
+        describe('vpn_probe_sent', 'counter', 'Probes de latência enviados')
+        describe('vpn_probe_lost', 'counter', 'Probes de latência sem resposta')
+        self.registry.set('vpn_tunnel_up', 0)
+        self.registry.set('vpn_reconnects', 0)
+        self.registry.publish()
+
+    def update_state(self, connected: bool, reconnect_count: int, uptime_seconds: float = 0):
+        """Atualiza estado do túnel, reconexões e uptime"""
+        self.registry.set('vpn_tunnel_up', 1 if connected else 0)
+        self.registry.set('vpn_reconnects', reconnect_count)
+        self.registry.set('vpn_uptime_seconds', uptime_seconds if connected else 0)
+
+    def update_traffic(self, rate_engine):
+        """
+        Atualiza contadores e taxas a partir de um RateEngine.
+
+        Args:
+            rate_engine: RateEngine alimentado pelo coletor
+        """
+        totals = rate_engine.totals
+        self.registry.set('vpn_receive_bytes', totals['rx'])
+        self.registry.set('vpn_transmit_bytes', totals['tx'])
+        self.registry.set('vpn_receive_packets', totals['rx_packets'])
+        self.registry.set('vpn_transmit_packets', totals['tx_packets'])
+        for window, rates in rate_engine.rates().items():
+            self.registry.set('vpn_receive_rate_bytes_per_second', rates['rx'], {'window': window})
+            self.registry.set('vpn_transmit_rate_bytes_per_second', rates['tx'], {'window': window})
+
+    def update_latency(self, prober):
+        """
+        Atualiza RTT e perda a partir de um LatencyProber.
+
+        Args:
+            prober: LatencyProber em execução
+        """
+        totals = prober.summary(recent=False)
+        for target, stats in prober.summary().items():
+            total = totals[target]
+            quantiles = {quantile: stats[key] / 1e6
+                         for quantile, key in (('0.5', 'p50'), ('0.9', 'p90'), ('0.99', 'p99'))}
+            self.registry.set_summary('vpn_probe_rtt_seconds', total['mean'] * total['count'] / 1e6,
+                                      total['count'], quantiles, {'target': target})
+            self.registry.set('vpn_probe_loss_ratio', stats['loss'], {'target': target})
+            self.registry.set('vpn_probe_sent', total['sent'], {'target': target})
+            self.registry.set('vpn_probe_lost', total['lost'], {'target': target})
+
+    def observe_phase(self, phase: str, seconds: float):
+        """
+        Registra a duração de uma fase de conexão.
+
+        Args:
+            phase: Nome da fase (ex: 'reconnect', 'azure_token', 'ppp')
+            seconds: Duração em segundos
+        """
+        self.registry.observe('vpn_connection_phase_seconds', seconds, {'phase': phase})
+        self.registry.set('vpn_connection_phase_last_seconds', seconds, {'phase': phase})
+
+    def publish(self):
+        """Pré-renderiza a exposição para os scrapes"""
+        self.registry.publish()
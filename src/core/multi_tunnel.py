@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Módulo de múltiplos túneis - vários perfis VPN supervisionados por um único laço de eventos
+"""
+
+import os
+import json
+import selectors
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+from .vpn_connection import VpnConnection
+from .preflight import run_preflight
+from .tunnel_supervisor import pidfd_supported, TERMINATE_TIMEOUT
+from .reconnect_scheduler import ReconnectScheduler
+from .rate_engine import RateEngine
+from .interface_counters import get_counter_backend
+from .network_stats import NetworkStats
+from .iface_parser import record_counters
+from .gateway_pool import parse_gateway, DEFAULT_PORT
+from .openfortivpn_events import OpenfortivpnEventParser, OUTPUT_LINES, EVENT_SAML_URL, EVENT_TUNNEL_UP, EVENT_ERROR
+from .routes import apply_routes
+from .connection_manager import STATE_DISCONNECTED, STATE_CONNECTING, STATE_CONNECTED, CONNECT_TIMEOUT
+
+
+# Configuração
+DEFAULT_PROFILES_FILE = os.path.expanduser('~/.vpn-connect/profiles.json')
+SAMPLE_INTERVAL = 1.0  # segundos entre leituras de contadores (uma leitura para todas as interfaces)
+RATE_WINDOW = 10  # segundos da taxa média exibida por túnel
+READ_SIZE = 65536
+
+
+def load_profiles(path: str = DEFAULT_PROFILES_FILE) -> List[Dict]:
+    """
+    Lê os perfis de túnel.
+
+    Formato: lista JSON de {"name", "gateway", "port", "username", "routes"};
+    "gateway" aceita 'host:porta' e "routes" é uma lista de CIDRs roteados
+    pelo túnel (vazia = rotas enviadas pelo gateway).
+
+    Args:
+        path: Arquivo de perfis
+
+    Returns:
+        Perfis válidos na ordem do arquivo (vazio se o arquivo não existe ou é inválido)
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    profiles = []
+    for item in data if isinstance(data, list) else []:
+        try:
+            profiles.append(normalize_profile(item))
+        except (TypeError, ValueError, KeyError):
+            continue
+    return profiles
+
+
+def normalize_profile(item: Dict) -> Dict:
+    """
+    Valida um perfil e preenche os padrões.
+
+    Args:
+        item: Perfil lido da configuração
+
+    Returns:
+        {'name', 'gateway', 'port', 'username', 'routes'}
+
+    Raises:
+        ValueError: Se o gateway é inválido
+    """
+    candidate = parse_gateway(item['gateway'], int(item.get('port') or DEFAULT_PORT))
+    routes = item.get('routes') or []
+    if isinstance(routes, str):
+        routes = [routes]
+    return {
+        'name': item.get('name') or candidate['name'],
+        'gateway': candidate['host'],
+        'port': candidate['port'],
+        'username': item.get('username'),
+        'routes': [str(route) for route in routes],
+    }
+
+
+def read_all_counters() -> Dict[str, Dict[str, int]]:
+    """
+    Contadores de todas as interfaces em uma única leitura.
+
+    Returns:
+        {interface: contadores}; sem backend nativo (ex: macOS) usa um único subprocesso
+    """
+    backend = get_counter_backend()
+    if backend is not None:
+        return backend.read_all()
+    counters = {}
+    for name, record in NetworkStats.get_interface_table().items():
+        values = record_counters(record)
+        if values is not None:
+            counters[name] = values
+    return counters
+
+
+class ManagedTunnel:
+    """Estado de um perfil: processo openfortivpn, parser da saída, agendador e taxas"""
+
+    def __init__(self, profile: Dict):
+        """
+        Inicializa túnel.
+
+        Args:
+            profile: Perfil de normalize_profile
+        """
+        self.profile = profile
+        self.name = profile['name']
+        self.process = None
+        self.parser = None
+        self.state = STATE_DISCONNECTED
+        self.scheduler = ReconnectScheduler()
+        self.rates = RateEngine(windows=(RATE_WINDOW,))
+        self.output = deque(maxlen=OUTPUT_LINES)
+        self.attempts = 0
+        self.drops = 0
+        self.interface = None
+        self.ip = None
+        self.up_since = None
+        self.last_error = None
+        self.routes_applied = None
+        self.deadline = None  # monotonic: encerrar se o túnel não subiu (depois, SIGKILL)
+        self.terminating = False
+        self._buffer = b''
+        self._stdout_fd = None
+        self._pidfd = None
+
+    def status(self) -> Dict:
+        """Estado do túnel para exibição"""
+        rates = self.rates.window_rate(RATE_WINDOW) if self.state == STATE_CONNECTED else {}
+        return {
+            'name': self.name,
+            'gateway': self.profile['gateway'],
+            'port': self.profile['port'],
+            'state': self.state,
+            'pid': self.process.pid if self.process is not None else None,
+            'interface': self.interface,
+            'ip': self.ip,
+            'uptime': time.monotonic() - self.up_since if self.up_since is not None else None,
+            'attempts': self.attempts,
+            'drops': self.drops,
+            'next_attempt_in': self.scheduler.delay() if self.process is None else None,
+            'routes': len(self.profile['routes']),
+            'routes_applied': self.routes_applied,
+            'rx_rate': rates.get('rx', 0.0),
+            'tx_rate': rates.get('tx', 0.0),
+            'rx_total': self.rates.totals['rx'],
+            'tx_total': self.rates.totals['tx'],
+            'last_error': self.last_error,
+            'last_line': self.output[-1] if self.output else None,
+        }
+
+
+class MultiTunnelSupervisor:
+    """Supervisiona um openfortivpn por perfil em uma única thread, sem polling por túnel"""
+
+    def __init__(self, profiles: List[Dict], interval: float = SAMPLE_INTERVAL, preflight: bool = True,
+                 connect_timeout: float = CONNECT_TIMEOUT):
+        """
+        Inicializa supervisor.
+
+        Args:
+            profiles: Perfis (load_profiles / normalize_profile)
+            interval: Segundos entre leituras de contadores
+            preflight: Fazer a pré-checagem (Azure CLI, openfortivpn) antes do primeiro spawn;
+                os demais perfis e as reconexões reaproveitam o token em cache
+            connect_timeout: Segundos até encerrar um openfortivpn que não subiu o túnel
+                (travado antes de "Tunnel is up"; None = esperar indefinidamente)
+        """
+        self.tunnels = [ManagedTunnel(profile) for profile in profiles]
+        self.interval = interval
+        self.connect_timeout = connect_timeout
+        self.preflight = preflight
+        self.preflight_result = None
+        self.use_pidfd = pidfd_supported()
+        self.samples = 0
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        self._selector.register(self._wakeup_read, selectors.EVENT_READ, ('wakeup', None))
+
+    def start(self) -> bool:
+        """
+        Faz a pré-checagem (uma vez para todos os perfis) e inicia o laço de eventos.
+
+        Returns:
+            True se o laço foi iniciado, False se a pré-checagem falhou
+        """
+        if self.preflight and self.tunnels:
+            first = self.tunnels[0].profile
+            self.preflight_result = run_preflight(first['gateway'], first['port'])
+            if not self.preflight_result['authenticated'] or not self.preflight_result['openfortivpn']:
+                return False
+        self._thread = threading.Thread(target=self._run, name='multi-tunnel', daemon=True)
+        self._thread.start()
+        return True
+
+    def _wake(self):
+        """Libera o select() do laço"""
+        try:
+            os.write(self._wakeup_write, b'x')
+        except OSError:
+            pass
+
+    def _run(self):
+        """Laço único: saída e saída de processo de todos os túneis, agendamento e amostragem"""
+        next_sample = time.monotonic()
+        while not self._stopping:
+            for tunnel in self.tunnels:
+                if tunnel.process is None and tunnel.scheduler.due():
+                    self._spawn(tunnel)
+            now = time.monotonic()
+            for tunnel in self.tunnels:
+                if tunnel.deadline is not None and now >= tunnel.deadline:
+                    self._expire(tunnel, now)
+            if now >= next_sample:
+                self._sample()
+                next_sample = max(next_sample + self.interval, now)
+            timeout = next_sample - now
+            for tunnel in self.tunnels:
+                if tunnel.process is None:
+                    timeout = min(timeout, tunnel.scheduler.delay())
+                elif tunnel.deadline is not None:
+                    timeout = min(timeout, tunnel.deadline - now)
+            for key, _ in self._selector.select(max(0.0, timeout)):
+                kind, tunnel = key.data
+                if kind == 'wakeup':
+                    try:
+                        os.read(self._wakeup_read, READ_SIZE)
+                    except OSError:
+                        pass
+                elif kind == 'output':
+                    self._read(tunnel)
+                else:
+                    self._reap(tunnel)
+
+    def _spawn(self, tunnel: ManagedTunnel):
+        """Inicia o openfortivpn do perfil e registra sua saída no seletor"""
+        profile = tunnel.profile
+        extra_args = ['--set-routes=0'] if profile['routes'] else None
+        command = VpnConnection.build_command(profile['gateway'], profile['port'], profile['username'],
+                                              extra_args=extra_args)
+        tunnel.attempts += 1
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                       stdin=subprocess.DEVNULL)
+        except OSError as exc:
+            tunnel.last_error = str(exc)
+            tunnel.scheduler.record_failure()
+            return
+        with self._lock:
+            tunnel.process = process
+            tunnel.parser = OpenfortivpnEventParser()
+            tunnel.state = STATE_CONNECTING
+            tunnel.interface = None
+            tunnel.ip = None
+            tunnel.routes_applied = None
+            tunnel.last_error = None
+            tunnel.deadline = time.monotonic() + self.connect_timeout if self.connect_timeout else None
+            tunnel.terminating = False
+            tunnel._buffer = b''
+        tunnel._stdout_fd = process.stdout.fileno()
+        os.set_blocking(tunnel._stdout_fd, False)
+        self._selector.register(tunnel._stdout_fd, selectors.EVENT_READ, ('output', tunnel))
+
+    def _expire(self, tunnel: ManagedTunnel, now: float):
+        """Tentativa travada (sem túnel no prazo): SIGTERM, e SIGKILL se não sair; tratada como falha"""
+        try:
+            if tunnel.terminating:
+                tunnel.process.kill()
+                tunnel.deadline = None
+            else:
+                tunnel.last_error = 'timeout'
+                tunnel.process.terminate()
+                tunnel.terminating = True
+                tunnel.deadline = now + TERMINATE_TIMEOUT
+        except OSError:
+            tunnel.deadline = None
+
+    def _read(self, tunnel: ManagedTunnel):
+        """Consome a saída disponível, alimentando o parser linha a linha"""
+        try:
+            data = os.read(tunnel._stdout_fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self._selector.unregister(tunnel._stdout_fd)
+            tunnel._stdout_fd = None
+            if tunnel._buffer:
+                self._feed(tunnel, tunnel._buffer)
+                tunnel._buffer = b''
+            self._wait_exit(tunnel)
+            return
+        lines = (tunnel._buffer + data).split(b'\n')
+        tunnel._buffer = lines.pop()
+        for line in lines:
+            self._feed(tunnel, line)
+
+    def _feed(self, tunnel: ManagedTunnel, raw: bytes):
+        """Processa uma linha da saída"""
+        line = raw.decode('utf-8', 'replace').rstrip()
+        tunnel.output.append(line)
+        for event in tunnel.parser.feed(line):
+            kind = event['kind']
+            if kind == EVENT_SAML_URL:
+                VpnConnection._open_saml_url(event)
+            elif kind == EVENT_ERROR:
+                tunnel.last_error = event.get('message') or line
+            elif kind == EVENT_TUNNEL_UP:
+                with self._lock:
+                    tunnel.state = STATE_CONNECTED
+                    tunnel.deadline = None
+                    tunnel.interface = event.get('interface')
+                    tunnel.ip = event.get('ip')
+                    tunnel.up_since = time.monotonic()
+                tunnel.scheduler.record_success()
+                if tunnel.profile['routes'] and tunnel.interface:
+                    # sudo pode demorar: fora do laço para não atrasar os demais túneis
+                    threading.Thread(target=self._apply_routes, args=(tunnel, tunnel.interface),
+                                     name=f'routes-{tunnel.name}', daemon=True).start()
+
+    def _apply_routes(self, tunnel: ManagedTunnel, interface: str):
+        """Instala as rotas do perfil (thread auxiliar)"""
+        tunnel.routes_applied = apply_routes(interface, tunnel.profile['routes'])
+
+    def _wait_exit(self, tunnel: ManagedTunnel):
+        """Após o EOF: colhe o processo, ou espera o pidfd se ele ainda não terminou"""
+        if tunnel.process.poll() is not None:
+            self._reap(tunnel)
+            return
+        if self.use_pidfd:
+            try:
+                tunnel._pidfd = os.pidfd_open(tunnel.process.pid)
+                self._selector.register(tunnel._pidfd, selectors.EVENT_READ, ('exit', tunnel))
+                return
+            except OSError:
+                tunnel._pidfd = None
+        # Sem pidfd: a saída já foi fechada, o processo está terminando
+        try:
+            tunnel.process.wait(timeout=TERMINATE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            tunnel.process.kill()
+        self._reap(tunnel)
+
+    def _reap(self, tunnel: ManagedTunnel):
+        """Registra a saída do processo e agenda a reconexão"""
+        if tunnel._pidfd is not None:
+            self._selector.unregister(tunnel._pidfd)
+            os.close(tunnel._pidfd)
+            tunnel._pidfd = None
+        process = tunnel.process
+        returncode = process.wait()
+        if process.stdout is not None:
+            process.stdout.close()
+        was_up = tunnel.state == STATE_CONNECTED
+        tunnel.parser.close(returncode)
+        with self._lock:
+            tunnel.process = None
+            tunnel.state = STATE_DISCONNECTED
+            tunnel.up_since = None
+            tunnel.deadline = None
+            tunnel.terminating = False
+        if self._stopping:
+            return
+        if was_up:
+            tunnel.drops += 1
+            tunnel.scheduler.record_drop()
+        else:
+            tunnel.last_error = tunnel.last_error or f'exit {returncode}'
+            tunnel.scheduler.record_failure()
+
+    def _sample(self):
+        """Uma leitura de contadores para todas as interfaces, distribuída aos túneis no ar"""
+        connected = [tunnel for tunnel in self.tunnels if tunnel.state == STATE_CONNECTED and tunnel.interface]
+        if not connected:
+            return
+        counters = read_all_counters()
+        now_ns = time.monotonic_ns()
+        self.samples += 1
+        for tunnel in connected:
+            values = counters.get(tunnel.interface)
+            if values is not None:
+                tunnel.rates.update(values, now_ns, source=tunnel.interface)
+
+    def status(self) -> Dict:
+        """
+        Visão por túnel e agregada.
+
+        Returns:
+            {'tunnels': [status de cada túnel], 'aggregate': {'profiles', 'connected',
+            'connecting', 'disconnected', 'rx_rate', 'tx_rate', 'rx_total', 'tx_total', 'drops'}}
+        """
+        with self._lock:
+            tunnels = [tunnel.status() for tunnel in self.tunnels]
+        aggregate = {
+            'profiles': len(tunnels),
+            'connected': sum(1 for item in tunnels if item['state'] == STATE_CONNECTED),
+            'connecting': sum(1 for item in tunnels if item['state'] == STATE_CONNECTING),
+            'disconnected': sum(1 for item in tunnels if item['state'] == STATE_DISCONNECTED),
+            'drops': sum(item['drops'] for item in tunnels),
+        }
+        for key in ('rx_rate', 'tx_rate', 'rx_total', 'tx_total'):
+            aggregate[key] = sum(item[key] for item in tunnels)
+        return {'tunnels': tunnels, 'aggregate': aggregate}
+
+    def stop(self, timeout: float = TERMINATE_TIMEOUT):
+        """
+        Encerra o laço e todos os openfortivpn (SIGTERM, depois SIGKILL).
+
+        Args:
+            timeout: Segundos entre SIGTERM e SIGKILL
+        """
+        self._stopping = True
+        self._wake()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        processes = [tunnel.process for tunnel in self.tunnels if tunnel.process is not None]
+        for process in processes:
+            try:
+                process.terminate()
+            except OSError:
+                pass
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            try:
+                process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        for tunnel in self.tunnels:
+            if tunnel.process is not None and tunnel.process.stdout is not None:
+                tunnel.process.stdout.close()
+            if tunnel._pidfd is not None:
+                os.close(tunnel._pidfd)
+                tunnel._pidfd = None
+            tunnel.process = None
+            tunnel.state = STATE_DISCONNECTED
+        self._selector.close()
+        os.close(self._wakeup_read)
+        os.close(self._wakeup_write)
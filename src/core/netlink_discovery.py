@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+Módulo de descoberta de interfaces via rtnetlink - eventos em vez de polling
+"""
+
+import os
+import errno
+import socket
+import struct
+import selectors
+import threading
+from typing import Optional, Dict, List, Tuple, Callable
+
+
+# Constantes de rtnetlink (linux/netlink.h, linux/rtnetlink.h, linux/if_link.h)
+NETLINK_ROUTE = 0
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+IFLA_IFNAME = 3
+IFLA_MTU = 4
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+
+IFF_UP = 0x1
+IFF_LOOPBACK = 0x8
+IFF_RUNNING = 0x40
+
+NLMSGHDR = struct.Struct('=IHHII')   # len, type, flags, seq, pid
+IFINFOMSG = struct.Struct('=BxHiII')  # family, type, index, flags, change
+IFADDRMSG = struct.Struct('=BBBBI')   # family, prefixlen, flags, scope, index
+RTATTR = struct.Struct('=HH')         # len, type
+
+# Configuração
+VPN_INTERFACE_PREFIXES = ('ppp', 'utun', 'tun')
+RECV_BUFFER = 65536
+RESYNC_ATTEMPTS = 3
+
+# Eventos emitidos para interfaces VPN
+EVENT_INTERFACE_ADDED = 'interface_added'
+EVENT_INTERFACE_UP = 'interface_up'
+EVENT_ADDRESS_ADDED = 'address_added'
+EVENT_ADDRESS_REMOVED = 'address_removed'
+EVENT_INTERFACE_DOWN = 'interface_down'
+EVENT_INTERFACE_REMOVED = 'interface_removed'
+
+# Evento emitido quando uma interface de saída (não VPN, não loopback) sobe ou ganha IPv4
+EVENT_NETWORK_UP = 'network_up'
+
+
+def _align(length: int) -> int:
+    """Alinha tamanho em 4 bytes (NLMSG_ALIGN / RTA_ALIGN)"""
+    return (length + 3) & ~3
+
+
+def parse_attributes(data: bytes, offset: int, end: int) -> Dict[int, bytes]:
+    """
+    Lê a lista de rtattr de uma mensagem.
+
+    Args:
+        data: Buffer completo
+        offset: Início dos atributos
+        end: Fim da mensagem
+
+    Returns:
+        Dicionário {tipo do atributo: payload}
+    """
+    attributes = {}
+    while offset + RTATTR.size <= end:
+        length, attr_type = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        attributes[attr_type] = data[offset + RTATTR.size:offset + length]
+        offset += _align(length)
+    return attributes
+
+
+def parse_messages(data: bytes) -> List[Tuple[int, Dict]]:
+    """
+    Decodifica um datagrama rtnetlink em mensagens de link e endereço.
+
+    Função pura, usada tanto pelo socket quanto para reproduzir
+    fluxos de mensagens gravados.
+
+    Args:
+        data: Datagrama recebido do socket NETLINK_ROUTE
+
+    Returns:
+        Lista de (tipo da mensagem, campos decodificados)
+    """
+    messages = []
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        length, msg_type, _, _, _ = NLMSGHDR.unpack_from(data, offset)
+        if length < NLMSGHDR.size:
+            break
+        body = offset + NLMSGHDR.size
+        end = offset + length
+
+        if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+            _, _, index, flags, _ = IFINFOMSG.unpack_from(data, body)
+            attributes = parse_attributes(data, body + IFINFOMSG.size, end)
+            fields = {'index': index, 'flags': flags}
+            if IFLA_IFNAME in attributes:
+                fields['name'] = attributes[IFLA_IFNAME].rstrip(b'\0').decode()
+            if IFLA_MTU in attributes:
+                fields['mtu'] = struct.unpack('=I', attributes[IFLA_MTU][:4])[0]
+            messages.append((msg_type, fields))
+        elif msg_type in (RTM_NEWADDR, RTM_DELADDR):
+            family, prefixlen, _, _, index = IFADDRMSG.unpack_from(data, body)
+            if family == socket.AF_INET:
+                attributes = parse_attributes(data, body + IFADDRMSG.size, end)
+                # Em ponto-a-ponto IFA_LOCAL é o IP local e IFA_ADDRESS o do peer
+                raw = attributes.get(IFA_LOCAL) or attributes.get(IFA_ADDRESS)
+                if raw:
+                    messages.append((msg_type, {
+                        'index': index,
+                        'address': socket.inet_ntoa(raw[:4]),
+                        'prefixlen': prefixlen,
+                    }))
+        elif msg_type in (NLMSG_DONE, NLMSG_ERROR):
+            messages.append((msg_type, {}))
+
+        offset += _align(length)
+    return messages
+
+
+def is_vpn_interface(name: str) -> bool:
+    """Verifica se o nome corresponde a uma interface de túnel (ppp/tun/utun)"""
+    return name.lower().startswith(VPN_INTERFACE_PREFIXES)
+
+
+class LinkTable:
+    """Tabela em memória de links e endereços IPv4"""
+
+    def __init__(self):
+        """Inicializa tabela vazia"""
+        self.links = {}
+        self.names = {}
+
+    def apply(self, msg_type: int, fields: Dict) -> List[Tuple[str, str, Optional[str]]]:
+        """
+        Aplica uma mensagem rtnetlink à tabela.
+
+        Args:
+            msg_type: Tipo da mensagem (RTM_NEWLINK, RTM_NEWADDR, ...)
+            fields: Campos decodificados por parse_messages
+
+        Returns:
+            Lista de eventos (evento, interface, endereço) para interfaces VPN,
+            mais EVENT_NETWORK_UP para as demais
+        """
+        events = []
+        index = fields.get('index')
+
+        if msg_type == RTM_NEWLINK:
+            link = self.links.get(index)
+            is_new = link is None
+            if is_new:
+                link = {'name': fields.get('name', str(index)), 'flags': 0, 'mtu': None, 'ipv4': []}
+                self.links[index] = link
+            was_up = bool(link['flags'] & IFF_UP)
+            self.names.pop(link['name'], None)
+            link['name'] = fields.get('name', link['name'])
+            link['flags'] = fields.get('flags', link['flags'])
+            link['mtu'] = fields.get('mtu', link['mtu'])
+            self.names[link['name']] = index
+            if is_vpn_interface(link['name']):
+                is_up = bool(link['flags'] & IFF_UP)
+                if is_new:
+                    events.append((EVENT_INTERFACE_ADDED, link['name'], None))
+                elif was_up and not is_up:
+                    events.append((EVENT_INTERFACE_DOWN, link['name'], None))
+                elif is_up and not was_up:
+                    events.append((EVENT_INTERFACE_UP, link['name'], None))
+            elif link['flags'] & IFF_UP and not was_up and not link['flags'] & IFF_LOOPBACK:
+                events.append((EVENT_NETWORK_UP, link['name'], None))
+
+        elif msg_type == RTM_DELLINK:
+            link = self.links.pop(index, None)
+            if link is not None:
+                self.names.pop(link['name'], None)
+                if is_vpn_interface(link['name']):
+                    events.append((EVENT_INTERFACE_REMOVED, link['name'], None))
+
+        elif msg_type in (RTM_NEWADDR, RTM_DELADDR):
+            link = self.links.get(index)
+            if link is None:
+                return events
+            address = fields['address']
+            if msg_type == RTM_NEWADDR and address not in link['ipv4']:
+                link['ipv4'].append(address)
+                if is_vpn_interface(link['name']):
+                    events.append((EVENT_ADDRESS_ADDED, link['name'], address))
+                elif not link['flags'] & IFF_LOOPBACK:
+                    events.append((EVENT_NETWORK_UP, link['name'], address))
+            elif msg_type == RTM_DELADDR and address in link['ipv4']:
+                link['ipv4'].remove(address)
+                if is_vpn_interface(link['name']):
+                    events.append((EVENT_ADDRESS_REMOVED, link['name'], address))
+
+        return events
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Retorna o registro de uma interface pelo nome"""
+        index = self.names.get(name)
+        return self.links.get(index) if index is not None else None
+
+    def find_vpn_interface(self) -> Optional[str]:
+        """Retorna a primeira interface VPN ativa com IP atribuído"""
+        for link in self.links.values():
+            if is_vpn_interface(link['name']) and link['flags'] & IFF_UP and link['ipv4']:
+                return link['name']
+        return None
+
+
+class NetlinkDiscovery:
+    """Descoberta de interfaces VPN dirigida por eventos rtnetlink"""
+
+    def __init__(self):
+        """Inicializa descoberta (sem abrir socket)"""
+        self.table = LinkTable()
+        self._vpn_interface = None
+        self._listeners = []
+        self._condition = threading.Condition()
+        self._sock = None
+        self._thread = None
+        self._wakeup_r = None
+        self._wakeup_w = None
+        self._seq = 0
+        self._dead = False
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Verifica se o sistema suporta sockets rtnetlink (Linux)"""
+        return hasattr(socket, 'AF_NETLINK')
+
+    def subscribe(self, callback: Callable[[str, str, Optional[str]], None]):
+        """
+        Registra callback chamado a cada evento de interface VPN.
+
+        Args:
+            callback: Função (evento, interface, endereço)
+        """
+        self._listeners.append(callback)
+
+    def _request_dump(self, msg_type: int, family_payload: bytes):
+        """Envia pedido de dump (RTM_GETLINK / RTM_GETADDR)"""
+        self._seq += 1
+        header = NLMSGHDR.pack(NLMSGHDR.size + len(family_payload), msg_type,
+                               NLM_F_REQUEST | NLM_F_DUMP, self._seq, 0)
+        self._sock.send(header + family_payload)
+
+    def _read_until_done(self) -> List[Tuple[int, Dict]]:
+        """
+        Lê mensagens até o fim de um dump.
+
+        Returns:
+            Mensagens aplicadas (inclui eventos intercalados com o dump)
+        """
+        applied = []
+        while True:
+            done = False
+            for msg_type, fields in parse_messages(self._sock.recv(RECV_BUFFER)):
+                if msg_type in (NLMSG_DONE, NLMSG_ERROR):
+                    done = True
+                else:
+                    self._apply(msg_type, fields)
+                    applied.append((msg_type, fields))
+            if done:
+                return applied
+
+    def _resync(self):
+        """
+        Recarrega links e endereços após perda de eventos (ENOBUFS).
+
+        Interfaces e endereços que não aparecem no novo dump foram removidos
+        enquanto o buffer estava cheio e são retirados da tabela, emitindo os
+        eventos de remoção correspondentes.
+        """
+        self._request_dump(RTM_GETLINK, IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0))
+        seen_links = {fields['index'] for msg_type, fields in self._read_until_done()
+                      if msg_type == RTM_NEWLINK}
+        self._request_dump(RTM_GETADDR, IFADDRMSG.pack(socket.AF_INET, 0, 0, 0, 0))
+        seen_addresses = {(fields['index'], fields['address'])
+                          for msg_type, fields in self._read_until_done()
+                          if msg_type == RTM_NEWADDR}
+
+        with self._condition:
+            stale_links = [index for index in self.table.links if index not in seen_links]
+            stale_addresses = [(index, address)
+                               for index, link in self.table.links.items()
+                               if index in seen_links
+                               for address in link['ipv4']
+                               if (index, address) not in seen_addresses]
+        for index, address in stale_addresses:
+            self._apply(RTM_DELADDR, {'index': index, 'address': address})
+        for index in stale_links:
+            self._apply(RTM_DELLINK, {'index': index})
+
+    def start(self) -> bool:
+        """
+        Abre o socket, carrega o estado atual e inicia a thread de eventos.
+
+        Returns:
+            True se iniciou, False se rtnetlink não está disponível
+        """
+        if self._thread is not None:
+            return True
+        if not NetlinkDiscovery.is_supported():
+            return False
+        try:
+            self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+            self._sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR))
+            self._request_dump(RTM_GETLINK, IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0))
+            self._read_until_done()
+            self._request_dump(RTM_GETADDR, IFADDRMSG.pack(socket.AF_INET, 0, 0, 0, 0))
+            self._read_until_done()
+        except OSError:
+            self.stop()
+            return False
+
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name='netlink-discovery', daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self):
+        """Loop de eventos: bloqueia no socket até chegar mensagem"""
+        selector = selectors.DefaultSelector()
+        selector.register(self._sock, selectors.EVENT_READ)
+        selector.register(self._wakeup_r, selectors.EVENT_READ)
+        try:
+            while True:
+                for key, _ in selector.select():
+                    if key.fileobj == self._wakeup_r:
+                        return
+                    try:
+                        data = self._sock.recv(RECV_BUFFER)
+                    except OSError as e:
+                        if e.errno != errno.ENOBUFS:
+                            raise
+                        # Buffer do socket estourou: eventos perdidos, recarrega tudo
+                        self._resync_with_retry()
+                        continue
+                    for msg_type, fields in parse_messages(data):
+                        self._apply(msg_type, fields)
+        except OSError:
+            # Tabela não é mais confiável: get_discovery() passa a retornar None
+            self._dead = True
+            with self._condition:
+                self._vpn_interface = None
+                self._condition.notify_all()
+        finally:
+            selector.close()
+
+    def _resync_with_retry(self):
+        """Executa _resync, repetindo se o dump também perder mensagens"""
+        for attempt in range(RESYNC_ATTEMPTS):
+            try:
+                self._resync()
+                return
+            except OSError as e:
+                if e.errno != errno.ENOBUFS or attempt == RESYNC_ATTEMPTS - 1:
+                    raise
+
+    def is_alive(self) -> bool:
+        """Verifica se a thread de eventos continua mantendo a tabela atualizada"""
+        return not self._dead
+
+    def _apply(self, msg_type: int, fields: Dict):
+        """Atualiza a tabela e notifica ouvintes e threads aguardando"""
+        with self._condition:
+            events = self.table.apply(msg_type, fields)
+            if not events:
+                return
+            self._vpn_interface = self.table.find_vpn_interface()
+            self._condition.notify_all()
+        for event, interface, address in events:
+            for callback in list(self._listeners):
+                try:
+                    callback(event, interface, address)
+                except Exception:
+                    pass
+
+    def get_vpn_interface(self) -> Optional[str]:
+        """Retorna a interface VPN atual (consulta O(1), sem subprocess)"""
+        return self._vpn_interface
+
+    def get_vpn_ip(self, interface: str) -> str:
+        """
+        Obtém IP da interface a partir da tabela em memória.
+
+        Args:
+            interface: Nome da interface de rede
+
+        Returns:
+            IP ou "N/A" se não encontrado
+        """
+        with self._condition:
+            link = self.table.get(interface)
+            if link and link['ipv4']:
+                return link['ipv4'][0]
+        return "N/A"
+
+    def interfaces(self) -> Dict[str, Dict]:
+        """
+        Retorna cópia da tabela no formato usado por NetworkSnapshot.
+
+        Returns:
+            Dicionário {interface: {'flags', 'mtu', 'ipv4'}}
+        """
+        records = {}
+        with self._condition:
+            for link in self.table.links.values():
+                flags = []
+                if link['flags'] & IFF_UP:
+                    flags.append('UP')
+                if link['flags'] & IFF_RUNNING:
+                    flags.append('RUNNING')
+                records[link['name']] = {
+                    'flags': flags,
+                    'mtu': str(link['mtu']) if link['mtu'] is not None else 'N/A',
+                    'ipv4': list(link['ipv4']),
+                }
+        return records
+
+    def wait_for_tunnel(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Bloqueia até existir interface VPN ativa com IP.
+
+        Args:
+            timeout: Tempo máximo em segundos (None = sem limite)
+
+        Returns:
+            Nome da interface ou None se o tempo esgotou ou a descoberta morreu
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._vpn_interface is not None or self._dead, timeout)
+            return self._vpn_interface
+
+    def stop(self):
+        """Encerra a thread de eventos e fecha o socket"""
+        if self._wakeup_w is not None:
+            os.write(self._wakeup_w, b'\0')
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        for fd in (self._wakeup_r, self._wakeup_w):
+            if fd is not None:
+                os.close(fd)
+        self._wakeup_r = self._wakeup_w = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+_discovery = None
+_discovery_checked = False
+_discovery_lock = threading.Lock()
+
+
+def get_discovery() -> Optional[NetlinkDiscovery]:
+    """
+    Retorna a instância compartilhada de descoberta, iniciando-a na primeira chamada.
+
+    Returns:
+        NetlinkDiscovery ativo ou None se rtnetlink não está disponível (ex: macOS)
+        ou se a thread de eventos morreu (chamadores voltam a ifconfig/ip)
+    """
+    global _discovery, _discovery_checked
+    with _discovery_lock:
+        if not _discovery_checked:
+            discovery = NetlinkDiscovery()
+            if discovery.start():
+                _discovery = discovery
+            _discovery_checked = True
+        if _discovery is not None and not _discovery.is_alive():
+            _discovery.stop()
+            _discovery = None
+        return _discovery
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Módulo de snapshot de rede - coleta única por tick com cache de curta duração
+"""
+
+import os
+import json
+import subprocess
+import threading
+import time
+from typing import Optional, Dict, List
+
+from .interface_counters import get_counter_backend, get_interface_reader
+from .netlink_discovery import get_discovery
+from .tunnel_supervisor import tunnel_running
+from .iface_parser import (parse_ifconfig, parse_netstat_ibn, merge_records, find_vpn_interface,
+                           record_counters)
+
+
+# Configuração
+SNAPSHOT_TTL = 0.5  # segundos
+# Snapshot compartilhado entre processos (monitor do vpn_menu e scripts/monitor_vpn.py)
+SHARED_SNAPSHOT = os.path.expanduser('~/.vpn-connect/network-snapshot.json')
+
+
+def _run(command: List[str]) -> Optional[subprocess.CompletedProcess]:
+    """Executa comando capturando output, retornando None em caso de erro"""
+    try:
+        return subprocess.run(command, capture_output=True, text=True)
+    except Exception:
+        return None
+
+
+class NetworkSnapshot:
+    """Retrato único do estado de rede, compartilhado dentro de um tick (inclusive entre processos)"""
+
+    _cache = None
+    _cache_lock = threading.Lock()
+    shared_path = SHARED_SNAPSHOT  # None = só dentro do processo
+
+    def __init__(self, interfaces: Dict[str, Dict], openfortivpn_running: bool,
+                 service_connected: bool = False, taken_at: Optional[float] = None):
+        """
+        Inicializa snapshot.
+
+        Args:
+            interfaces: Registros por interface (flags, mtu, ipv4, contadores)
+            openfortivpn_running: Se há processo openfortivpn ativo
+            service_connected: Se `scutil --nc list` reporta VPN conectada
+            taken_at: Instante da coleta (time.monotonic())
+        """
+        self.interfaces = interfaces
+        self.openfortivpn_running = openfortivpn_running
+        self.service_connected = service_connected
+        self.taken_at = time.monotonic() if taken_at is None else taken_at
+
+    @classmethod
+    def take(cls) -> 'NetworkSnapshot':
+        """
+        Coleta um novo snapshot com o mínimo de subprocessos.
+
+        Um `pgrep` e um `ifconfig` por tick; no Linux a tabela de interfaces
+        vem da descoberta rtnetlink, ou do sysfs quando rtnetlink não está
+        disponível (sem `ifconfig`). Contadores vêm do backend
+        nativo quando disponível, senão de um único `netstat -ibn`. O `scutil`
+        só é consultado quando não há processo openfortivpn. Com um túnel
+        supervisionado rodando, o `pgrep` também é dispensado.
+
+        Returns:
+            Novo NetworkSnapshot
+        """
+        openfortivpn_running = tunnel_running()
+        if openfortivpn_running is None:
+            result = _run(['pgrep', '-f', 'openfortivpn'])
+            openfortivpn_running = result is not None and result.returncode == 0
+
+        service_connected = False
+        if not openfortivpn_running:
+            result = _run(['scutil', '--nc', 'list'])
+            service_connected = result is not None and 'Connected' in result.stdout
+
+        discovery = get_discovery()
+        reader = get_interface_reader() if discovery is None else None
+        if discovery is not None:
+            interfaces = discovery.interfaces()
+        elif reader is not None:
+            interfaces = reader.read_all()
+        else:
+            result = _run(['ifconfig'])
+            interfaces = parse_ifconfig(result.stdout) if result is not None else {}
+
+        backend = get_counter_backend()
+        if backend is not None:
+            counters = backend.read_all()
+        else:
+            result = _run(['netstat', '-ibn'])
+            counters = parse_netstat_ibn(result.stdout) if result is not None else {}
+
+        merge_records(interfaces, counters)
+
+        return cls(interfaces, openfortivpn_running, service_connected)
+
+    @classmethod
+    def current(cls, ttl: float = SNAPSHOT_TTL) -> 'NetworkSnapshot':
+        """
+        Retorna o snapshot do tick atual, coletando um novo se expirou.
+
+        Antes de coletar, reaproveita o snapshot que outro processo gravou
+        em shared_path dentro do TTL; uma coleta nova é gravada lá.
+
+        Args:
+            ttl: Idade máxima em segundos de um snapshot reaproveitável
+
+        Returns:
+            NetworkSnapshot compartilhado
+        """
+        with cls._cache_lock:
+            cached = cls._cache
+            if cached is None or time.monotonic() - cached.taken_at > ttl:
+                cached = cls._load_shared(ttl)
+                if cached is None:
+                    cached = cls.take()
+                    cls._save_shared(cached)
+                cls._cache = cached
+            return cached
+
+    @classmethod
+    def invalidate(cls):
+        """Descarta o snapshot em cache, também o compartilhado (ex: após reconectar)"""
+        with cls._cache_lock:
+            cls._cache = None
+            if cls.shared_path:
+                try:
+                    os.unlink(cls.shared_path)
+                except OSError:
+                    pass
+
+    @classmethod
+    def _load_shared(cls, ttl: float) -> Optional['NetworkSnapshot']:
+        """
+        Snapshot gravado por outro processo, se ainda dentro do TTL.
+
+        Arquivos de outro dono ou legíveis por outros usuários são ignorados.
+        """
+        if not cls.shared_path:
+            return None
+        try:
+            info = os.stat(cls.shared_path)
+            if time.time() - info.st_mtime > ttl:
+                return None
+            if info.st_mode & 0o077 or (hasattr(os, 'getuid') and info.st_uid != os.getuid()):
+                return None
+            with open(cls.shared_path) as f:
+                data = json.load(f)
+            age = time.time() - float(data['taken_at'])
+            interfaces = data['interfaces']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not 0 <= age <= ttl or not isinstance(interfaces, dict):
+            return None
+        return cls(interfaces, bool(data.get('openfortivpn_running')), bool(data.get('service_connected')),
+                   taken_at=time.monotonic() - age)
+
+    @classmethod
+    def _save_shared(cls, snapshot: 'NetworkSnapshot'):
+        """Grava o snapshot para os outros processos (escrita atômica, permissão 0600)"""
+        if not cls.shared_path:
+            return
+        data = {
+            'taken_at': time.time() - (time.monotonic() - snapshot.taken_at),
+            'interfaces': snapshot.interfaces,
+            'openfortivpn_running': snapshot.openfortivpn_running,
+            'service_connected': snapshot.service_connected,
+        }
+        temporary = f"{cls.shared_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cls.shared_path) or '.', mode=0o700, exist_ok=True)
+            fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(temporary, cls.shared_path)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+
+    def is_vpn_connected(self) -> bool:
+        """Verifica se VPN está conectada (mesma regra de check_vpn_connected)"""
+        return self.openfortivpn_running or self.service_connected
+
+    def get_vpn_interface(self) -> Optional[str]:
+        """
+        Identifica a interface VPN.
+
+        Returns:
+            Nome da interface VPN ou None se não encontrada
+        """
+        return find_vpn_interface(self.interfaces, self.openfortivpn_running)
+
+    def get_vpn_ip(self, interface: str) -> str:
+        """
+        Obtém IP da VPN a partir da interface.
+
+        Args:
+            interface: Nome da interface de rede
+
+        Returns:
+            IP da VPN ou "N/A" se não encontrado
+        """
+        record = self.interfaces.get(interface)
+        if record and record['ipv4']:
+            return record['ipv4'][0]
+        return "N/A"
+
+    def get_interface_stats(self, interface: str) -> Optional[Dict[str, int]]:
+        """
+        Obtém estatísticas de tráfego de uma interface.
+
+        Args:
+            interface: Nome da interface de rede
+
+        Returns:
+            Dicionário com 'rx' e 'tx' em bytes (e demais contadores), ou None
+        """
+        return record_counters(self.interfaces.get(interface))
+
+    def get_interface_details(self, interface: str) -> Dict[str, any]:
+        """
+        Obtém detalhes da interface (MTU, packets).
+
+        Args:
+            interface: Nome da interface de rede
+
+        Returns:
+            Dicionário com 'mtu', 'ipkts' e 'opkts'
+        """
+        record = self.interfaces.get(interface, {})
+        return {
+            'mtu': record.get('mtu', 'N/A'),
+            'ipkts': record.get('rx_packets', 0),
+            'opkts': record.get('tx_packets', 0),
+        }
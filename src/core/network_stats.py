@@ -4,9 +4,14 @@ Módulo de estatísticas de rede - interface VPN, IP, tráfego
 """
 
 import subprocess
-import re
 from typing import Optional, Dict
 
+from .interface_counters import get_counter_backend, get_interface_reader
+from .netlink_discovery import get_discovery
+from .tunnel_supervisor import tunnel_running
+from .iface_parser import (InterfaceRecord, parse_ifconfig, parse_ip_json, parse_netstat_ibn,
+                           find_vpn_interface, record_counters)
+
 
 class NetworkStats:
     """Classe para obter estatísticas de rede da VPN"""
@@ -19,73 +24,147 @@ class NetworkStats:
         Returns:
             Nome da interface VPN ou None se não encontrada
         """
+        # Linux: tabela mantida por eventos rtnetlink - consulta O(1)
+        discovery = get_discovery()
+        if discovery is not None:
+            return discovery.get_vpn_interface()
+        
         try:
-            # Verificar processos openfortivpn primeiro
-            result = subprocess.run(['pgrep', '-f', 'openfortivpn'], capture_output=True, text=True)
-            if result.returncode == 0:
-                # openfortivpn está rodando, procurar interface
-                result = subprocess.run(['ifconfig'], capture_output=True, text=True)
-                lines = result.stdout.split('\n')
-                
-                # Procurar por interfaces ppp ou utun
-                current_interface = None
-                for i, line in enumerate(lines):
-                    # Detectar início de interface
-                    match = re.search(r'^([a-z0-9]+):', line)
-                    if match:
-                        current_interface = match.group(1)
-                    
-                    # Verificar se é interface VPN e tem IP
-                    if current_interface and ('ppp' in current_interface.lower() or 'utun' in current_interface.lower()):
-                        # Verificar se tem IP atribuído
-                        if i + 1 < len(lines):
-                            next_lines = '\n'.join(lines[i:i+5])
-                            if 'inet ' in next_lines:
-                                # Verificar se não é loopback
-                                if '127.0.0.1' not in next_lines:
-                                    return current_interface
-            
-            # Tentar encontrar por IP específico da VPN (192.168.50.x ou 10.x.x.x)
-            result = subprocess.run(['ifconfig'], capture_output=True, text=True)
-            lines = result.stdout.split('\n')
-            current_interface = None
-            
-            for i, line in enumerate(lines):
-                match = re.search(r'^([a-z0-9]+):', line)
-                if match:
-                    current_interface = match.group(1)
-                
-                if current_interface:
-                    # Verificar se tem IP da VPN
-                    if i + 1 < len(lines):
-                        next_lines = '\n'.join(lines[i:i+5])
-                        ip_match = re.search(r'inet\s+(\d+\.\d+\.\d+\.\d+)', next_lines)
-                        if ip_match:
-                            ip = ip_match.group(1)
-                            # Verificar se é IP da VPN (192.168.50.x ou 10.x.x.x)
-                            if ip.startswith('192.168.50.') or ip.startswith('10.'):
-                                if 'ppp' in current_interface.lower() or 'utun' in current_interface.lower():
-                                    return current_interface
+            # Verificar processos openfortivpn primeiro (túnel supervisionado dispensa o pgrep)
+            openfortivpn_running = tunnel_running()
+            if openfortivpn_running is None:
+                result = subprocess.run(['pgrep', '-f', 'openfortivpn'], capture_output=True, text=True)
+                openfortivpn_running = result.returncode == 0
             
-            # Última tentativa: procurar qualquer interface ppp/utun com IP
-            result = subprocess.run(['ifconfig'], capture_output=True, text=True)
-            for line in result.stdout.split('\n'):
-                if re.match(r'^(ppp\d+|utun\d+):', line):
-                    interface = re.match(r'^(ppp\d+|utun\d+):', line).group(1)
-                    # Verificar se tem IP
-                    ifconfig_result = subprocess.run(['ifconfig', interface], capture_output=True, text=True)
-                    if 'inet ' in ifconfig_result.stdout and '127.0.0.1' not in ifconfig_result.stdout:
-                        return interface
-            
-            return None
+            # Uma única leitura da tabela de interfaces, sem ifconfig por candidata
+            reader = get_interface_reader()
+            table = reader.read_all() if reader is not None else NetworkStats.get_interface_table()
+            return find_vpn_interface(table, openfortivpn_running)
         except Exception:
             return None
     
+    @staticmethod
+    def get_interface_table(interface: Optional[str] = None) -> Dict[str, InterfaceRecord]:
+        """
+        Lê a tabela de interfaces com um único subprocesso.
+        
+        Usa `ifconfig`; em sistemas sem net-tools (Linux moderno) usa
+        `ip -j -s addr`.
+        
+        Args:
+            interface: Restringir a uma interface (None = todas)
+        
+        Returns:
+            Dicionário {interface: registro} (vazio se nenhum comando funcionou)
+        """
+        command = ['ifconfig'] + ([interface] if interface else [])
+        try:
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode == 0:
+                return parse_ifconfig(result.stdout)
+        except OSError:
+            pass
+        
+        command = ['ip', '-j', '-s', 'addr'] + (['show', 'dev', interface] if interface else [])
+        try:
+            result = subprocess.run(command, capture_output=True, text=True)
+            if result.returncode == 0:
+                return parse_ip_json(result.stdout)
+        except OSError:
+            pass
+        return {}
+    
+    @staticmethod
+    def parse_vpn_interface(output: str, openfortivpn_running: bool = True) -> Optional[str]:
+        """
+        Procura a interface VPN na saída do ifconfig.
+        
+        Args:
+            output: Saída completa de `ifconfig`
+            openfortivpn_running: Se o openfortivpn está rodando (aceita a
+                primeira ppp/utun com IP, sem exigir IP típico da VPN)
+        
+        Returns:
+            Nome da interface VPN ou None se não encontrada
+        """
+        return find_vpn_interface(parse_ifconfig(output), openfortivpn_running)
+    
+    @staticmethod
+    def parse_ifconfig_bytes(output: str) -> Optional[Dict[str, int]]:
+        """
+        Extrai contadores da saída de `ifconfig <interface>`.
+        
+        Args:
+            output: Saída do ifconfig de uma interface
+        
+        Returns:
+            Dicionário com 'rx' e 'tx' em bytes (e pacotes/erros), ou None se não há contadores
+        """
+        for record in parse_ifconfig(output).values():
+            counters = record_counters(record)
+            if counters is not None:
+                return counters
+        return None
+    
+    @staticmethod
+    def parse_netstat_bytes(output: str, interface: str) -> Optional[Dict[str, int]]:
+        """
+        Extrai contadores da linha <Link#> de `netstat -ibn`.
+        
+        Args:
+            output: Saída de `netstat -ibn`
+            interface: Nome da interface
+        
+        Returns:
+            Dicionário com 'rx' e 'tx' em bytes (e pacotes/erros), ou None
+        """
+        return record_counters(parse_netstat_ibn(output).get(interface))
+    
+    @staticmethod
+    def parse_netstat_details(output: str, interface: str) -> Dict[str, any]:
+        """
+        Extrai MTU e pacotes da linha <Link#> de `netstat -ibn`.
+        
+        Args:
+            output: Saída de `netstat -ibn`
+            interface: Nome da interface
+        
+        Returns:
+            Dicionário com 'mtu', 'ipkts' e 'opkts'
+        """
+        record = parse_netstat_ibn(output).get(interface, {})
+        return {
+            'mtu': record.get('mtu', 'N/A'),
+            'ipkts': record.get('rx_packets', 0),
+            'opkts': record.get('tx_packets', 0),
+        }
+    
     @staticmethod
     def get_interface_stats(interface: str) -> Optional[Dict[str, int]]:
         """
         Obtém estatísticas de tráfego de uma interface.
         
+        Args:
+            interface: Nome da interface de rede
+        
+        Returns:
+            Dicionário com 'rx' (recebido) e 'tx' (enviado) em bytes, ou None.
+            No backend nativo (Linux) inclui também packets, erros e drops.
+        """
+        # Backend nativo (/proc/net/dev ou sysfs) - sem fork de processos
+        backend = get_counter_backend()
+        if backend is not None:
+            stats = backend.read_interface(interface)
+            if stats is not None:
+                return stats
+        
+        return NetworkStats.get_interface_stats_subprocess(interface)
+    
+    @staticmethod
+    def get_interface_stats_subprocess(interface: str) -> Optional[Dict[str, int]]:
+        """
+        Obtém estatísticas de tráfego via ifconfig/netstat (macOS e fallback).
+        
         Args:
             interface: Nome da interface de rede
         
@@ -93,60 +172,15 @@ class NetworkStats:
             Dicionário com 'rx' (recebido) e 'tx' (enviado) em bytes, ou None
         """
         try:
-            # Primeiro tentar ifconfig (funciona para a maioria das interfaces)
-            result = subprocess.run(['ifconfig', interface], capture_output=True, text=True)
-            if result.returncode == 0:
-                # Extrair bytes recebidos e enviados
-                rx_bytes = 0
-                tx_bytes = 0
-                
-                # Padrão macOS: "RX packets 1234 bytes 567890"
-                rx_match = re.search(r'RX.*?bytes\s+(\d+)', result.stdout, re.IGNORECASE)
-                tx_match = re.search(r'TX.*?bytes\s+(\d+)', result.stdout, re.IGNORECASE)
-                
-                if rx_match:
-                    rx_bytes = int(rx_match.group(1))
-                if tx_match:
-                    tx_bytes = int(tx_match.group(1))
-                
-                # Tentar formato alternativo (linhas separadas)
-                if rx_bytes == 0 or tx_bytes == 0:
-                    lines = result.stdout.split('\n')
-                    for line in lines:
-                        if 'RX' in line.upper() and 'bytes' in line.lower():
-                            match = re.search(r'(\d+)\s+bytes', line)
-                            if match:
-                                rx_bytes = int(match.group(1))
-                        if 'TX' in line.upper() and 'bytes' in line.lower():
-                            match = re.search(r'(\d+)\s+bytes', line)
-                            if match:
-                                tx_bytes = int(match.group(1))
-                
-                # Se encontrou estatísticas no ifconfig, retornar
-                if rx_bytes > 0 or tx_bytes > 0:
-                    return {'rx': rx_bytes, 'tx': tx_bytes}
+            # Primeiro a tabela de interfaces (ifconfig ou ip -j -s addr)
+            counters = record_counters(NetworkStats.get_interface_table(interface).get(interface))
+            if counters is not None:
+                return counters
             
-            # Para interfaces PPP, ifconfig não mostra bytes, usar netstat
-            # Formato netstat -ibn: Interface MTU Network Address Ipkts Ierrs Ibytes Opkts Oerrs Obytes Coll
+            # Para interfaces PPP no macOS, ifconfig não mostra bytes, usar netstat
             result = subprocess.run(['netstat', '-ibn'], capture_output=True, text=True)
             if result.returncode == 0:
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    # Procurar linha da interface que começa com o nome
-                    if re.match(rf'^{re.escape(interface)}\s+', line) and '<Link#' in line:
-                        # Dividir por espaços múltiplos para pegar os campos corretos
-                        parts = re.split(r'\s+', line.strip())
-                        if len(parts) >= 10:
-                            try:
-                                # Ibytes (bytes recebidos) está em parts[5]
-                                # Obytes (bytes enviados) está em parts[8]
-                                rx_bytes = int(parts[5]) if len(parts) > 5 else 0
-                                tx_bytes = int(parts[8]) if len(parts) > 8 else 0
-                                
-                                # Retornar mesmo se um for 0
-                                return {'rx': rx_bytes, 'tx': tx_bytes}
-                            except (ValueError, IndexError):
-                                continue
+                return NetworkStats.parse_netstat_bytes(result.stdout, interface)
             
             return None
         except Exception:
@@ -163,10 +197,17 @@ class NetworkStats:
         Returns:
             IP da VPN ou "N/A" se não encontrado
         """
+        discovery = get_discovery()
+        if discovery is not None:
+            return discovery.get_vpn_ip(interface)
+        
         try:
-            result = subprocess.run(['ifconfig', interface], capture_output=True, text=True)
-            ip_match = re.search(r'inet\s+(\d+\.\d+\.\d+\.\d+)', result.stdout)
-            return ip_match.group(1) if ip_match else "N/A"
+            reader = get_interface_reader()
+            if reader is not None:
+                record = reader.read_all().get(interface)
+            else:
+                record = NetworkStats.get_interface_table(interface).get(interface)
+            return record['ipv4'][0] if record and record['ipv4'] else "N/A"
         except Exception:
             return "N/A"
     
@@ -181,26 +222,8 @@ class NetworkStats:
         Returns:
             Dicionário com detalhes da interface
         """
-        details = {
-            'mtu': 'N/A',
-            'ipkts': 0,
-            'opkts': 0
-        }
-        
         try:
             result = subprocess.run(['netstat', '-ibn'], capture_output=True, text=True)
-            for line in result.stdout.split('\n'):
-                if re.match(rf'^{re.escape(interface)}\s+', line) and '<Link#' in line:
-                    parts = re.split(r'\s+', line.strip())
-                    if len(parts) > 1:
-                        details['mtu'] = parts[1]
-                    if len(parts) > 4:
-                        details['ipkts'] = int(parts[4])
-                    if len(parts) > 6:
-                        details['opkts'] = int(parts[6])
-                    break
+            return NetworkStats.parse_netstat_details(result.stdout, interface)
         except Exception:
-            pass
-        
-        return details
-
+            return {'mtu': 'N/A', 'ipkts': 0, 'opkts': 0}
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Módulo de eventos do openfortivpn - saída do processo convertida em eventos com timestamp
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, List, Callable, Iterable, Tuple
+
+
+# Configuração
+OUTPUT_LINES = 50  # linhas recentes da saída mantidas pela sessão
+
+EVENT_SAML_URL = 'saml_url'
+EVENT_AUTH_OK = 'auth_ok'
+EVENT_PPP_NEGOTIATED = 'ppp_negotiated'
+EVENT_ROUTES_INSTALLED = 'routes_installed'
+EVENT_TUNNEL_UP = 'tunnel_up'
+EVENT_ERROR = 'error'
+EVENT_DISCONNECTED = 'disconnected'
+
+STATE_STARTING = 'starting'
+STATE_AUTHENTICATING = 'authenticating'  # URL SAML emitida, aguardando o navegador
+STATE_AUTHENTICATED = 'authenticated'
+STATE_NEGOTIATED = 'negotiated'  # PPP pronto, rotas/DNS sendo aplicados
+STATE_UP = 'up'
+STATE_CLOSED = 'closed'
+
+# Estado após cada evento (erros não mudam o estado)
+STATE_AFTER = {
+    EVENT_SAML_URL: STATE_AUTHENTICATING,
+    EVENT_AUTH_OK: STATE_AUTHENTICATED,
+    EVENT_PPP_NEGOTIATED: STATE_NEGOTIATED,
+    EVENT_ROUTES_INSTALLED: STATE_NEGOTIATED,
+    EVENT_TUNNEL_UP: STATE_UP,
+    EVENT_DISCONNECTED: STATE_CLOSED,
+}
+
+URL_PATTERN = re.compile(r"https?://[^\s'\"]+")
+ADDRESS_PATTERN = re.compile(r'Got addresses: \[([^\]]*)\]')
+NAMESERVER_PATTERN = re.compile(r'\bns \[([^\]]*)\]')
+DNS_SUFFIX_PATTERN = re.compile(r'\bns_suffix \[([^\]]*)\]')
+UNSET_VALUES = ('', '0.0.0.0', '(null)')  # campos que o gateway deixou em branco
+INTERFACE_PATTERN = re.compile(r'(?:Interface|Using interface) (\S+?)(?: is UP)?\.?$')
+
+# Trechos (em minúsculas) que marcam cada evento na saída do openfortivpn/pppd
+AUTH_MARKERS = ('authenticated.', 'remote gateway has allocated a vpn')
+PPP_MARKERS = ('negotiation complete', ' is up.')
+ROUTES_MARKER = 'setting new routes'
+TUNNEL_UP_MARKERS = ('tunnel is up',)
+DISCONNECT_MARKERS = ('closed connection to gateway', 'logged out', 'connection closed',
+                      'disconnected', 'the link was terminated')
+
+Event = Dict[str, object]
+
+
+def new_event(kind: str, at: float, line: Optional[str] = None, **data) -> Event:
+    """
+    Cria um evento.
+
+    Args:
+        kind: Tipo (EVENT_*)
+        at: Instante em time.monotonic()
+        line: Linha de saída que gerou o evento
+        **data: Campos extras (ex: url, ip, interface, message)
+
+    Returns:
+        Dicionário {'kind', 'at', 'line', ...}
+    """
+    event = {'kind': kind, 'at': at, 'line': line}
+    event.update(data)
+    return event
+
+
+class OpenfortivpnEventParser:
+    """Máquina de estados alimentada linha a linha com a saída do openfortivpn"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Inicializa parser.
+
+        Args:
+            clock: Relógio dos timestamps (time.monotonic, ou fictício no replay)
+        """
+        self.clock = clock
+        self.state = STATE_STARTING
+        self.events = []
+        self.ip = None
+        self.interface = None
+        self.nameservers = []  # DNS do gateway, impressos mesmo com --set-dns=0
+        self.dns_suffix = []
+        self._seen = set()
+        self._routes_pending = False
+
+    def _emit(self, kind: str, at: float, line: Optional[str], **data) -> Event:
+        """Registra um evento e avança o estado"""
+        event = new_event(kind, at, line, **data)
+        self.events.append(event)
+        self._seen.add(kind)
+        self.state = STATE_AFTER.get(kind, self.state)
+        return event
+
+    def _once(self, kind: str, at: float, line: str, emitted: List[Event], **data):
+        """Emite eventos de fase só na primeira ocorrência"""
+        if kind not in self._seen:
+            emitted.append(self._emit(kind, at, line, **data))
+
+    @staticmethod
+    def _values(match, separators: str) -> List[str]:
+        """Valores de uma lista [a, b] da saída, sem os campos em branco"""
+        if not match:
+            return []
+        values = re.split('[' + re.escape(separators) + ']', match.group(1))
+        return [value.strip() for value in values if value.strip() not in UNSET_VALUES]
+
+    def feed(self, line: str, at: Optional[float] = None) -> List[Event]:
+        """
+        Processa uma linha de saída.
+
+        Args:
+            line: Linha (com ou sem quebra de linha)
+            at: Instante da linha (padrão: clock())
+
+        Returns:
+            Eventos gerados pela linha (geralmente zero ou um)
+        """
+        line = line.rstrip()
+        if not line or self.state == STATE_CLOSED:
+            return []
+        at = self.clock() if at is None else at
+        lower = line.lower()
+        emitted = []
+
+        # "Setting new routes..." só é seguido de outra linha quando as rotas já estão no lugar
+        if self._routes_pending:
+            self._routes_pending = False
+            self._once(EVENT_ROUTES_INSTALLED, at, line, emitted)
+
+        match = ADDRESS_PATTERN.search(line)
+        if match:
+            self.ip = match.group(1).split(',')[0].strip() or None
+            self.nameservers = self._values(NAMESERVER_PATTERN.search(line), ',')
+            self.dns_suffix = self._values(DNS_SUFFIX_PATTERN.search(line), ';, ')
+        match = INTERFACE_PATTERN.search(line)
+        if match:
+            self.interface = match.group(1)
+
+        if 'authenticate at' in lower or ('saml' in lower and 'http' in lower):
+            urls = URL_PATTERN.findall(line)
+            if urls:
+                self._once(EVENT_SAML_URL, at, line, emitted, url=urls[0])
+        elif any(marker in lower for marker in TUNNEL_UP_MARKERS):
+            self._once(EVENT_TUNNEL_UP, at, line, emitted, ip=self.ip, interface=self.interface,
+                       nameservers=list(self.nameservers), dns_suffix=list(self.dns_suffix))
+        elif ROUTES_MARKER in lower:
+            self._routes_pending = True
+        elif any(marker in lower for marker in AUTH_MARKERS):
+            self._once(EVENT_AUTH_OK, at, line, emitted)
+        elif any(marker in lower for marker in PPP_MARKERS) and EVENT_AUTH_OK in self._seen:
+            self._once(EVENT_PPP_NEGOTIATED, at, line, emitted, ip=self.ip, interface=self.interface)
+        elif any(marker in lower for marker in DISCONNECT_MARKERS):
+            emitted.append(self._emit(EVENT_DISCONNECTED, at, line, reason='output'))
+        elif lower.startswith('error:'):
+            emitted.append(self._emit(EVENT_ERROR, at, line, message=line.split(':', 1)[1].strip()))
+        elif 'error' in lower and 'failed' in lower and 'certificate' not in lower:
+            # Mensagens sem prefixo (pppd, bibliotecas); avisos de certificado não são falhas
+            emitted.append(self._emit(EVENT_ERROR, at, line, message=line))
+        return emitted
+
+    def close(self, returncode: Optional[int] = None, at: Optional[float] = None) -> List[Event]:
+        """
+        Marca o fim da saída (EOF), emitindo 'disconnected' se ainda não houve.
+
+        Args:
+            returncode: Código de saída do processo, se conhecido
+            at: Instante do fim (padrão: clock())
+
+        Returns:
+            Eventos gerados
+        """
+        if self.state == STATE_CLOSED:
+            return []
+        return [self._emit(EVENT_DISCONNECTED, self.clock() if at is None else at, None,
+                           reason='eof', returncode=returncode)]
+
+    def last(self, kind: str) -> Optional[Event]:
+        """Último evento do tipo, ou None"""
+        for event in reversed(self.events):
+            if event['kind'] == kind:
+                return event
+        return None
+
+
+def replay_transcript(lines: Iterable[str], interval: float = 0.0) -> List[Event]:
+    """
+    Reproduz uma saída gravada do openfortivpn.
+
+    Args:
+        lines: Linhas da transcrição
+        interval: Segundos fictícios entre linhas (timestamps determinísticos)
+
+    Returns:
+        Eventos na ordem, incluindo 'disconnected' no fim da transcrição
+    """
+    clock = [0.0]
+    parser = OpenfortivpnEventParser(clock=lambda: clock[0])
+    for line in lines:
+        parser.feed(line)
+        clock[0] += interval
+    parser.close()
+    return parser.events
+
+
+class OpenfortivpnSession:
+    """Consome a saída do openfortivpn em background e expõe os eventos"""
+
+    def __init__(self, process, parser: Optional[OpenfortivpnEventParser] = None):
+        """
+        Inicializa sessão.
+
+        Args:
+            process: subprocess.Popen com stdout em modo texto
+            parser: Parser a usar (padrão: novo OpenfortivpnEventParser)
+        """
+        self.process = process
+        self.parser = parser or OpenfortivpnEventParser()
+        self.started_at = time.monotonic()
+        self.output = deque(maxlen=OUTPUT_LINES)  # últimas linhas da saída (sem quebra de linha)
+        self._condition = threading.Condition()
+        self._listeners = []
+        self._thread = None
+
+    @property
+    def state(self) -> str:
+        """Estado atual da máquina de estados"""
+        return self.parser.state
+
+    @property
+    def events(self) -> List[Event]:
+        """Cópia dos eventos recebidos até agora"""
+        with self._condition:
+            return list(self.parser.events)
+
+    def add_listener(self, callback: Callable[[Event], None]):
+        """
+        Registra callback chamado (na thread de leitura) a cada evento.
+
+        Args:
+            callback: Função que recebe o evento
+        """
+        self._listeners.append(callback)
+
+    def start(self):
+        """Inicia a leitura da saída em background"""
+        self._thread = threading.Thread(target=self._read_loop, name='openfortivpn-output', daemon=True)
+        self._thread.start()
+
+    def _read_loop(self):
+        """Lê linhas até EOF, alimentando o parser"""
+        try:
+            for line in iter(self.process.stdout.readline, ''):
+                with self._condition:
+                    self.output.append(line.rstrip('\n'))
+                    emitted = self.parser.feed(line)
+                    self._condition.notify_all()
+                self._notify(emitted)
+        except (OSError, ValueError):
+            pass
+        try:
+            returncode = self.process.wait(timeout=5)
+        except Exception:
+            returncode = None
+        with self._condition:
+            emitted = self.parser.close(returncode)
+            self._condition.notify_all()
+        self._notify(emitted)
+
+    def _notify(self, emitted: List[Event]):
+        """Repassa eventos aos listeners"""
+        for event in emitted:
+            for callback in list(self._listeners):
+                try:
+                    callback(event)
+                except Exception:
+                    pass
+
+    def wait_for(self, kinds: Tuple[str, ...], timeout: Optional[float] = None) -> Optional[Event]:
+        """
+        Aguarda o primeiro evento de um dos tipos (já ocorrido ou futuro).
+
+        Args:
+            kinds: Tipos aceitos
+            timeout: Segundos máximos de espera (None = indefinido)
+
+        Returns:
+            Evento encontrado ou None se o prazo esgotou
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                for event in self.parser.events:
+                    if event['kind'] in kinds:
+                        return event
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def wait_until_up(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda o túnel subir.
+
+        Args:
+            timeout: Segundos máximos de espera (None = indefinido)
+
+        Returns:
+            True com o túnel no ar; False se desconectou antes ou o prazo esgotou
+        """
+        event = self.wait_for((EVENT_TUNNEL_UP, EVENT_DISCONNECTED), timeout)
+        return event is not None and event['kind'] == EVENT_TUNNEL_UP
+
+    def wait_closed(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda o fim da sessão.
+
+        Args:
+            timeout: Segundos máximos de espera (None = indefinido)
+
+        Returns:
+            True se a sessão terminou (desconexão ou EOF)
+        """
+        return self.wait_for((EVENT_DISCONNECTED,), timeout) is not None
+
+    def phase_durations(self) -> Dict[str, float]:
+        """
+        Tempo de cada fase desde o início da sessão.
+
+        Returns:
+            {tipo do evento: segundos desde started_at} para a primeira ocorrência de cada tipo
+        """
+        durations = {}
+        for event in self.events:
+            durations.setdefault(event['kind'], event['at'] - self.started_at)
+        return durations
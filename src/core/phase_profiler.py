@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Módulo de profiling do estabelecimento da conexão - fases com perf_counter_ns em JSON lines
+"""
+
+import os
+import json
+import math
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Iterable
+
+
+# Configuração
+DEFAULT_PROFILE_LOG = os.path.expanduser('~/.vpn-connect/connect-profile.jsonl')
+REPORT_PERCENTILES = (50, 95)
+
+# Fase do openfortivpn encerrada por cada evento (duração = evento - evento anterior)
+EVENT_PHASES = {
+    'saml_url': 'openfortivpn.start',
+    'auth_ok': 'openfortivpn.saml_browser',
+    'ppp_negotiated': 'openfortivpn.ppp_negotiation',
+    'routes_installed': 'openfortivpn.routes',
+    'tunnel_up': 'openfortivpn.dns_and_up',
+}
+
+_write_lock = threading.Lock()
+
+
+class PhaseProfiler:
+    """Cronometra as fases de uma tentativa de conexão e grava uma linha JSON por tentativa"""
+
+    def __init__(self, log_path: Optional[str] = DEFAULT_PROFILE_LOG, **context):
+        """
+        Inicializa profiler de uma tentativa.
+
+        Args:
+            log_path: Arquivo JSON lines de destino (None = não gravar)
+            **context: Campos extras gravados com a tentativa (ex: gateway, source)
+        """
+        self.log_path = log_path
+        self.context = context
+        self.attempt_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.started_ns = time.perf_counter_ns()
+        self.phases = {}  # nome -> ns (fases repetidas são somadas)
+        self.order = []
+        self.finished = False
+
+    def add(self, name: str, duration_ns: int):
+        """
+        Registra a duração de uma fase.
+
+        Args:
+            name: Nome da fase (ex: 'connect.get_token')
+            duration_ns: Duração em nanossegundos
+        """
+        if name not in self.phases:
+            self.order.append(name)
+            self.phases[name] = 0
+        self.phases[name] += max(0, int(duration_ns))
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Cronometra o bloco como uma fase (registrada mesmo se o bloco falhar).
+
+        Args:
+            name: Nome da fase
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter_ns() - start)
+
+    def add_events(self, events: Iterable[Dict], started_at: float):
+        """
+        Converte eventos do openfortivpn em fases.
+
+        Args:
+            events: Eventos de OpenfortivpnSession (campo 'at' em time.monotonic())
+            started_at: time.monotonic() de quando o processo foi iniciado
+        """
+        previous = started_at
+        for event in events:
+            name = EVENT_PHASES.get(event['kind'])
+            if name is None or name in self.phases:
+                continue
+            self.add(name, (event['at'] - previous) * 1e9)
+            previous = event['at']
+
+    def finish(self, success: bool, **extra) -> Dict:
+        """
+        Encerra a tentativa e grava a linha no log.
+
+        Args:
+            success: Se a conexão foi estabelecida
+            **extra: Campos extras (ex: error)
+
+        Returns:
+            Registro gravado
+        """
+        record = {
+            'attempt': self.attempt_id,
+            'started_at': round(self.started_at, 3),
+            'success': bool(success),
+            'total_ns': time.perf_counter_ns() - self.started_ns,
+            'phases': {name: self.phases[name] for name in self.order},
+        }
+        record.update(self.context)
+        record.update(extra)
+        if self.log_path and not self.finished:
+            try:
+                os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+                line = json.dumps(record, separators=(',', ':')) + '\n'
+                with _write_lock, open(self.log_path, 'a') as f:
+                    f.write(line)
+            except OSError:
+                pass
+        self.finished = True
+        return record
+
+
+def load_attempts(path: str = DEFAULT_PROFILE_LOG) -> List[Dict]:
+    """
+    Lê as tentativas gravadas.
+
+    Args:
+        path: Arquivo JSON lines
+
+    Returns:
+        Lista de registros (linhas inválidas são ignoradas), vazia se o arquivo não existe
+    """
+    attempts = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and isinstance(record.get('phases'), dict):
+                    attempts.append(record)
+    except OSError:
+        return []
+    return attempts
+
+
+def _percentile(ordered: List[int], pct: float) -> int:
+    """Percentil por rank mais próximo de uma lista ordenada"""
+    rank = min(len(ordered), max(1, math.ceil(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def aggregate(attempts: List[Dict], percentiles=REPORT_PERCENTILES) -> Dict[str, Dict]:
+    """
+    Agrega as fases de muitas tentativas.
+
+    Args:
+        attempts: Registros de load_attempts
+        percentiles: Percentis calculados
+
+    Returns:
+        {fase: {'count', 'mean', 'max', 'p50', 'p95', 'share'}} em ns, na ordem em que
+        as fases aparecem, com 'total' por último; 'share' é a fração do tempo total médio
+    """
+    samples = {}
+    totals = []
+    for attempt in attempts:
+        for name, duration in attempt['phases'].items():
+            samples.setdefault(name, []).append(duration)
+        if 'total_ns' in attempt:
+            totals.append(attempt['total_ns'])
+    mean_total = sum(totals) / len(totals) if totals else 0
+
+    report = {}
+    for name, values in list(samples.items()) + [('total', totals)]:
+        if not values:
+            continue
+        ordered = sorted(values)
+        summary = {
+            'count': len(ordered),
+            'mean': sum(ordered) / len(ordered),
+            'max': ordered[-1],
+        }
+        for pct in percentiles:
+            summary[f'p{pct:g}'] = _percentile(ordered, pct)
+        # Fração do total: soma da fase dividida pela soma dos totais
+        summary['share'] = sum(ordered) / (mean_total * len(totals)) if mean_total else 0.0
+        report[name] = summary
+    return report
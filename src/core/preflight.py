@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Módulo de pré-checagem da conexão - Azure CLI, token, openfortivpn e gateway em paralelo
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict
+
+from .vpn_connection import AzureAuth, VpnConnection
+from .phase_profiler import PhaseProfiler
+from .token_cache import get_token_cache
+
+
+def _timed(timings: Dict[str, int], name: str, func, *args):
+    """Executa func(*args) registrando a duração em ns em timings[name]"""
+    start = time.perf_counter_ns()
+    try:
+        return func(*args)
+    finally:
+        timings[name] = time.perf_counter_ns() - start
+
+
+def _token_and_probe(timings: Dict[str, int], gateway: str, port: int, token: Optional[str] = None):
+    """Obtém o token (se não veio do cache) e, com ele, sonda o gateway (a sonda depende do token)"""
+    if token is None:
+        token = _timed(timings, 'get_token', AzureAuth.get_token)
+    reachable = None
+    if token:
+        reachable = _timed(timings, 'authenticate_with_token', AzureAuth.authenticate_with_token,
+                           gateway, port, token)
+    return token, reachable
+
+
+def run_preflight(gateway: str, port: int = 443, login: bool = True,
+                  profiler: Optional[PhaseProfiler] = None) -> Dict:
+    """
+    Executa as checagens anteriores ao openfortivpn, uma vez e em paralelo.
+
+    `az account show`, `az account get-access-token` (seguido da sonda ao
+    gateway com o token) e a busca do openfortivpn rodam ao mesmo tempo; o
+    tempo total fica no da checagem mais lenta. Com token válido e conta no
+    cache de tokens, o az não é executado. Só quando o Azure CLI não está
+    autenticado o login interativo é feito (complete_login).
+
+    Args:
+        gateway: Endereço do gateway VPN
+        port: Porta do gateway
+        login: Fazer `az login` se o Azure CLI não estiver autenticado
+        profiler: Profiler da tentativa (fases 'preflight.*')
+
+    Returns:
+        Dicionário com 'authenticated', 'account', 'access_token', 'openfortivpn',
+        'gateway_reachable' (None se não sondado), 'logged_in', 'token_cached',
+        'timings' (ns por checagem) e 'elapsed_ns' (tempo de parede)
+    """
+    timings = {}
+    start = time.perf_counter_ns()
+    cache = get_token_cache()
+    cached = cache.get(wait=False)
+    token_cached = cached is not None and cache.account is not None
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix='preflight') as executor:
+        openfortivpn_future = executor.submit(_timed, timings, 'check_openfortivpn', VpnConnection.check_openfortivpn)
+        if token_cached:
+            # Token válido e conta em cache: nenhum az nesta tentativa
+            token_future = executor.submit(_token_and_probe, timings, gateway, port, cached['access_token'])
+            authenticated, account = True, cache.account
+        else:
+            account_future = executor.submit(_timed, timings, 'check_authenticated', AzureAuth.check_authenticated)
+            token_future = executor.submit(_token_and_probe, timings, gateway, port)
+            authenticated, account = account_future.result()
+        access_token, reachable = token_future.result()
+        openfortivpn = openfortivpn_future.result()
+    if authenticated and not token_cached:
+        cache.remember_account(account)
+    result = {
+        'authenticated': authenticated,
+        'account': account,
+        'access_token': access_token,
+        'openfortivpn': openfortivpn,
+        'gateway_reachable': reachable,
+        'logged_in': False,
+        'token_cached': token_cached,
+        'timings': timings,
+        'elapsed_ns': time.perf_counter_ns() - start,
+    }
+    if profiler is not None:
+        # Checagens individuais se sobrepõem; 'preflight' é o tempo de parede
+        for name, duration in timings.items():
+            profiler.add(f'preflight.{name}', duration)
+        profiler.add('preflight', result['elapsed_ns'])
+    if not authenticated and login:
+        complete_login(result, gateway, port, profiler)
+    return result
+
+
+def complete_login(result: Dict, gateway: str, port: int = 443, profiler: Optional[PhaseProfiler] = None) -> bool:
+    """
+    Faz `az login` e refaz só as checagens que dependem dele (conta, token, gateway).
+
+    Args:
+        result: Resultado de run_preflight (atualizado no lugar)
+        gateway: Endereço do gateway VPN
+        port: Porta do gateway
+        profiler: Profiler da tentativa
+
+    Returns:
+        True se o login funcionou
+    """
+    timings = {}
+    cache = get_token_cache()
+    result['logged_in'] = bool(_timed(timings, 'az_login', AzureAuth.login))
+    if result['logged_in']:
+        # Conta nova: tokens anteriores não valem mais
+        cache.invalidate()
+        result['authenticated'], result['account'] = _timed(timings, 'check_authenticated_after_login',
+                                                            AzureAuth.check_authenticated)
+        if result['authenticated']:
+            cache.remember_account(result['account'])
+        result['access_token'], result['gateway_reachable'] = _token_and_probe(timings, gateway, port)
+    result['timings'].update(timings)
+    result['elapsed_ns'] += sum(timings.values())
+    if profiler is not None:
+        for name, duration in timings.items():
+            profiler.add(f'preflight.{name}', duration)
+    return result['logged_in']
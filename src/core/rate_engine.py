@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Módulo de cálculo de taxas - relógio monotônico, wrap e reset de contadores
+"""
+
+import time
+from collections import deque
+from typing import Optional, Dict, Tuple
+
+from .interface_counters import get_counter_backend
+
+
+# Configuração
+COUNTER_32_MODULUS = 1 << 32
+DEFAULT_WINDOWS = (1, 10, 60)  # segundos
+COUNTER_32_HIGH = 1 << 31  # wrap só é considerado se o valor anterior estava na metade alta
+MAX_PLAUSIBLE_RATE = 1_250_000_000  # 10 Gbit/s - acima disso um "wrap" é na verdade reset
+RATE_KEYS = ('rx', 'tx', 'rx_packets', 'tx_packets')
+
+# Classificação de cada delta
+DELTA_OK = 'ok'
+DELTA_WRAP = 'wrap'
+DELTA_RESET = 'reset'
+
+
+def counters_wrap_32() -> bool:
+    """
+    Indica se os contadores deste sistema podem dar a volta em 32 bits.
+
+    No Linux /proc/net/dev e sysfs são de 64 bits: um contador que diminui
+    é sempre reset. Só o caminho por netstat/ifconfig (macOS) é de 32 bits.
+
+    Returns:
+        True quando não há backend nativo de contadores
+    """
+    return get_counter_backend() is None
+
+
+def counter_delta(previous: int, current: int, elapsed: float = 0.0,
+                  wrap_32: Optional[bool] = None) -> Tuple[int, str]:
+    """
+    Calcula o incremento de um contador tratando wrap de 32 bits e reset.
+
+    Um contador que diminui pode ter dado a volta em 32 bits (só em origens
+    de 32 bits) ou ter sido zerado (interface recriada após reconexão). O
+    wrap só é aceito quando a origem é de 32 bits, o valor anterior estava
+    perto do topo e o incremento resultante é plausível para o intervalo;
+    caso contrário é tratado como reset e o valor atual conta como tráfego
+    desde o reset.
+
+    Args:
+        previous: Valor anterior do contador
+        current: Valor atual do contador
+        elapsed: Segundos entre as leituras (0 = não verificar plausibilidade)
+        wrap_32: Origem de 32 bits (None = a deste sistema, ver counters_wrap_32)
+
+    Returns:
+        Tupla (incremento, DELTA_OK | DELTA_WRAP | DELTA_RESET)
+    """
+    if current >= previous:
+        return current - previous, DELTA_OK
+    if wrap_32 is None:
+        wrap_32 = counters_wrap_32()
+    if wrap_32 and COUNTER_32_HIGH <= previous < COUNTER_32_MODULUS:
+        wrapped = COUNTER_32_MODULUS - previous + current
+        if elapsed <= 0 or wrapped <= MAX_PLAUSIBLE_RATE * elapsed:
+            return wrapped, DELTA_WRAP
+    return current, DELTA_RESET
+
+
+class RateEngine:
+    """Calcula taxas instantâneas e por janela, com totais de sessão"""
+
+    def __init__(self, windows: Tuple[int, ...] = DEFAULT_WINDOWS, wrap_32: Optional[bool] = None):
+        """
+        Inicializa o motor de taxas.
+
+        Args:
+            windows: Janelas (em segundos) com taxa média mantida incrementalmente
+            wrap_32: Contadores de 32 bits (None = os deste sistema, ver counters_wrap_32)
+        """
+        self.windows = tuple(windows)
+        self.wrap_32 = counters_wrap_32() if wrap_32 is None else wrap_32
+        self.totals = {key: 0 for key in RATE_KEYS}
+        self.instant = {key: 0.0 for key in RATE_KEYS}
+        self.reset_count = 0
+        self.wrap_count = 0
+        self.source = None
+        self._last = None
+        self._last_ns = None
+        self._first_ns = None
+        # Por janela: fila de (timestamp_ns, deltas) e somas correntes
+        self._queues = {window: deque() for window in self.windows}
+        self._sums = {window: {key: 0 for key in RATE_KEYS} for window in self.windows}
+
+    def rebase(self):
+        """
+        Esquece a última leitura sem contabilizar tráfego.
+
+        Usado quando a origem dos contadores muda (ex: ppp0 -> ppp1) ou um
+        novo túnel sobe com o mesmo nome, em vez de interpretar a troca
+        como reset.
+        """
+        self._last = None
+        self._last_ns = None
+
+    def update(self, counters: Dict[str, int], now_ns: Optional[int] = None,
+               source: Optional[str] = None) -> Dict[str, float]:
+        """
+        Registra uma leitura de contadores. Custo O(1) amortizado.
+
+        Args:
+            counters: Dicionário com 'rx', 'tx' (e opcionalmente packets)
+            now_ns: Instante da leitura (padrão: time.monotonic_ns())
+            source: Identificador da origem (ex: nome da interface)
+
+        Returns:
+            Taxas instantâneas {'rx', 'tx', ...} por segundo
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        if source != self.source:
+            self.source = source
+            self.rebase()
+
+        if self._last is None:
+            self._last = {key: counters.get(key, 0) for key in RATE_KEYS}
+            self._last_ns = now_ns
+            if self._first_ns is None:
+                self._first_ns = now_ns
+            return dict(self.instant)
+
+        elapsed_ns = now_ns - self._last_ns
+        if elapsed_ns <= 0:
+            return dict(self.instant)
+        elapsed = elapsed_ns / 1e9
+
+        deltas = {}
+        reset = False
+        for key in RATE_KEYS:
+            current = counters.get(key, 0)
+            delta, kind = counter_delta(self._last[key], current, elapsed, self.wrap_32)
+            if kind == DELTA_RESET:
+                reset = True
+            elif kind == DELTA_WRAP:
+                self.wrap_count += 1
+            deltas[key] = delta
+            self._last[key] = current
+            self.totals[key] += delta
+            self.instant[key] = delta / elapsed
+        if reset:
+            self.reset_count += 1
+        self._last_ns = now_ns
+
+        for window in self.windows:
+            queue = self._queues[window]
+            sums = self._sums[window]
+            queue.append((now_ns, deltas))
+            for key in RATE_KEYS:
+                sums[key] += deltas[key]
+            horizon = now_ns - window * 1_000_000_000
+            while queue and queue[0][0] <= horizon:
+                _, expired = queue.popleft()
+                for key in RATE_KEYS:
+                    sums[key] -= expired[key]
+
+        return dict(self.instant)
+
+    def window_rate(self, window: int, now_ns: Optional[int] = None) -> Dict[str, float]:
+        """
+        Taxa média em uma janela mantida pelo motor.
+
+        Args:
+            window: Janela em segundos (deve estar em self.windows)
+            now_ns: Instante de referência (padrão: última leitura)
+
+        Returns:
+            Taxas médias {'rx', 'tx', ...} por segundo
+        """
+        if self._last_ns is None or window not in self._sums:
+            return {key: 0.0 for key in RATE_KEYS}
+        if now_ns is None:
+            now_ns = self._last_ns
+        # Antes de a janela encher, dividir só pelo tempo efetivamente observado
+        span = min(window, (now_ns - self._first_ns) / 1e9)
+        if span <= 0:
+            return {key: 0.0 for key in RATE_KEYS}
+        sums = self._sums[window]
+        return {key: sums[key] / span for key in RATE_KEYS}
+
+    def rates(self) -> Dict[str, Dict[str, float]]:
+        """
+        Todas as taxas calculadas.
+
+        Returns:
+            {'instant': {...}, '1s': {...}, '10s': {...}, '60s': {...}}
+        """
+        result = {'instant': dict(self.instant)}
+        for window in self.windows:
+            result[f'{window}s'] = self.window_rate(window)
+        return result
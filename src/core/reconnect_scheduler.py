@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Módulo de agendamento de reconexão - backoff exponencial com jitter e circuit breaker
+"""
+
+import random
+import socket
+import threading
+import time
+from typing import Optional, Callable
+
+
+# Configuração
+BASE_DELAY = 2.0  # segundos após a primeira falha (a primeira tentativa após uma queda é imediata)
+MAX_DELAY = 120.0  # teto do backoff em segundos
+MULTIPLIER = 2.0
+JITTER = 0.5  # fração do atraso sorteada (0 = sem jitter, 1 = full jitter)
+FAILURE_THRESHOLD = 4  # falhas seguidas com o gateway inalcançável que abrem o circuito
+PROBE_INTERVAL = 10.0  # segundos entre sondas TCP com o circuito aberto (não iniciam o openfortivpn)
+PROBE_TIMEOUT = 3.0
+
+CIRCUIT_CLOSED = 'closed'  # tentativas normais, com backoff
+CIRCUIT_OPEN = 'open'  # gateway inalcançável: só sondas baratas até uma responder
+
+
+def probe_gateway(gateway: str, port: int = 443, timeout: float = PROBE_TIMEOUT) -> bool:
+    """
+    Sonda barata do gateway: só o connect TCP, sem TLS nem token.
+
+    Args:
+        gateway: Endereço do gateway
+        port: Porta
+        timeout: Tempo máximo em segundos
+
+    Returns:
+        True se a porta aceitou a conexão
+    """
+    try:
+        with socket.create_connection((gateway, port), timeout):
+            return True
+    except OSError:
+        return False
+
+
+class ReconnectScheduler:
+    """Decide quando reconectar: imediato após queda, backoff exponencial com jitter em falhas seguidas"""
+
+    def __init__(self, base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY,
+                 multiplier: float = MULTIPLIER, jitter: float = JITTER,
+                 failure_threshold: int = FAILURE_THRESHOLD, probe_interval: float = PROBE_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic, rng: Optional[random.Random] = None):
+        """
+        Inicializa agendador.
+
+        Args:
+            base_delay: Atraso após a primeira falha em segundos
+            max_delay: Teto do backoff em segundos
+            multiplier: Fator de crescimento por falha
+            jitter: Fração do atraso sorteada (espalha clientes que caíram juntos)
+            failure_threshold: Falhas seguidas com gateway inalcançável que abrem o circuito
+            probe_interval: Intervalo entre sondas com o circuito aberto
+            clock: Relógio monotônico (substituível no simulador)
+            rng: Gerador aleatório (substituível para resultados reproduzíveis)
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.failures = 0
+        self.unreachable = 0  # falhas seguidas em que o gateway também não respondeu
+        self.circuit = CIRCUIT_CLOSED
+        self.next_attempt_at = clock()
+        self.last_reason = 'start'
+        self.probing = False  # sonda ao gateway em andamento (em outra thread)
+        self._probe_result = None
+        self._wakeup = threading.Event()
+
+    def _jittered(self, delay: float) -> float:
+        """Sorteia a fração `jitter` do atraso: delay * (1 - jitter) + U(0, delay * jitter)"""
+        return delay * (1 - self.jitter) + self.rng.random() * delay * self.jitter
+
+    def backoff(self, failures: int) -> float:
+        """
+        Atraso (sem jitter) após N falhas seguidas.
+
+        Args:
+            failures: Falhas seguidas (>= 1)
+
+        Returns:
+            Segundos, limitado a max_delay
+        """
+        return min(self.max_delay, self.base_delay * self.multiplier ** max(0, failures - 1))
+
+    def record_drop(self):
+        """Túnel que estava no ar caiu: reconectar imediatamente"""
+        self.failures = 0
+        self.unreachable = 0
+        self.next_attempt_at = self.clock()
+        self.last_reason = 'drop'
+
+    def record_failure(self, reachable: Optional[bool] = None):
+        """
+        Tentativa terminou sem túnel: agenda a próxima com backoff.
+
+        Args:
+            reachable: Se o gateway respondeu (None = desconhecido, não conta para o circuito)
+        """
+        now = self.clock()
+        self.failures += 1
+        self.unreachable = self.unreachable + 1 if reachable is False else 0
+        if self.unreachable >= self.failure_threshold:
+            self.circuit = CIRCUIT_OPEN
+            self.next_attempt_at = now + self._jittered(self.probe_interval)
+            self.last_reason = 'circuit_open'
+        else:
+            self.next_attempt_at = now + self._jittered(self.backoff(self.failures))
+            self.last_reason = 'backoff'
+
+    def record_success(self):
+        """Túnel subiu: zera o backoff e fecha o circuito"""
+        self.failures = 0
+        self.unreachable = 0
+        self.circuit = CIRCUIT_CLOSED
+        self.last_reason = 'connected'
+
+    def record_probe(self, reachable: bool):
+        """
+        Resultado de uma sonda com o circuito aberto.
+
+        Args:
+            reachable: Se o gateway respondeu (fecha o circuito e libera a tentativa na hora)
+        """
+        now = self.clock()
+        if reachable:
+            self.circuit = CIRCUIT_CLOSED
+            self.unreachable = 0
+            self.next_attempt_at = now
+            self.last_reason = 'probe_ok'
+        else:
+            self.next_attempt_at = now + self._jittered(self.probe_interval)
+            self.last_reason = 'probe_failed'
+
+    def start_probe(self, gateway: str, port: int = 443, after_failure: bool = False,
+                    probe: Callable[[str, int], bool] = probe_gateway) -> bool:
+        """
+        Sonda o gateway em uma thread, sem bloquear quem chama.
+
+        Enquanto a sonda roda nenhuma tentativa fica liberada; o resultado é
+        aplicado por collect_probe() na thread do chamador.
+
+        Args:
+            gateway: Endereço do gateway
+            port: Porta
+            after_failure: Resultado vira record_failure (tentativa que falhou)
+                em vez de record_probe (circuito aberto)
+            probe: Função de sonda (substituível no simulador)
+
+        Returns:
+            True se a sonda foi iniciada, False se já havia uma em andamento
+        """
+        if self.probing:
+            return False
+        self.probing = True
+
+        def run():
+            reachable = probe(gateway, port)
+            self._probe_result = (after_failure, reachable)
+            self._wakeup.set()
+
+        threading.Thread(target=run, name='gateway-probe', daemon=True).start()
+        return True
+
+    def collect_probe(self) -> Optional[bool]:
+        """
+        Aplica o resultado da sonda concluída, se houver.
+
+        Returns:
+            Se o gateway respondeu, ou None se não havia resultado pronto
+        """
+        result, self._probe_result = self._probe_result, None
+        if result is None:
+            return None
+        self.probing = False
+        after_failure, reachable = result
+        if after_failure:
+            self.record_failure(reachable)
+        else:
+            self.record_probe(reachable)
+        return reachable
+
+    def wake(self, reason: str = 'network_up'):
+        """
+        Cancela a espera atual: a próxima tentativa (ou sonda, com o circuito aberto) fica liberada já.
+
+        Seguro para chamar de outras threads (ex: eventos rtnetlink).
+
+        Args:
+            reason: Motivo registrado em last_reason
+        """
+        self.next_attempt_at = self.clock()
+        self.last_reason = reason
+        self._wakeup.set()
+
+    def delay(self) -> float:
+        """Segundos até a próxima tentativa/sonda (0 = liberada)"""
+        return max(0.0, self.next_attempt_at - self.clock())
+
+    def due(self) -> bool:
+        """Próxima tentativa (circuito fechado) ou sonda (aberto) está liberada"""
+        return not self.probing and self.clock() >= self.next_attempt_at
+
+    def should_probe(self) -> bool:
+        """Circuito aberto e hora da sonda"""
+        return self.circuit == CIRCUIT_OPEN and self.due()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda até a próxima tentativa, timeout, wake() ou o fim de uma sonda.
+
+        Args:
+            timeout: Segundos máximos de espera (None = até a tentativa)
+
+        Returns:
+            True se a tentativa/sonda está liberada
+        """
+        # Sonda em andamento: a espera só termina com o resultado (ou o timeout)
+        remaining = timeout if self.probing else self.delay()
+        if timeout is not None:
+            remaining = min(remaining, timeout)
+        if remaining is None or remaining > 0:
+            self._wakeup.wait(remaining)
+        self._wakeup.clear()
+        return self.due()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Módulo de rotas e DNS do túnel - comandos compartilhados pelos múltiplos túneis e pela sessão reserva
+"""
+
+import platform
+import shutil
+import subprocess
+from typing import Optional, List, Sequence
+
+
+# Configuração
+ROUTE_TIMEOUT = 10  # segundos por comando de rota ou DNS
+
+
+def route_command(cidr: str, interface: str) -> List[str]:
+    """Comando que roteia um CIDR pela interface do túnel (com sudo)"""
+    if platform.system() == 'Darwin':
+        return ['sudo', 'route', '-n', 'add', '-net', cidr, '-interface', interface]
+    return ['sudo', 'ip', 'route', 'replace', cidr, 'dev', interface]
+
+
+def apply_routes(interface: str, routes: List[str]) -> int:
+    """
+    Instala as rotas do perfil na interface do túnel.
+
+    Args:
+        interface: Interface do túnel (ex: ppp1)
+        routes: CIDRs
+
+    Returns:
+        Número de rotas instaladas com sucesso
+    """
+    applied = 0
+    for cidr in routes:
+        try:
+            result = subprocess.run(route_command(cidr, interface), capture_output=True, timeout=ROUTE_TIMEOUT)
+            applied += result.returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+    return applied
+
+
+def capture_routes(interface: str) -> List[str]:
+    """
+    Rotas que o openfortivpn instalou na interface do túnel.
+
+    Args:
+        interface: Interface do túnel (ex: ppp0)
+
+    Returns:
+        Destinos ('10.0.0.0/8', 'default', ...), sem a rota do peer (proto kernel);
+        vazio no macOS ou em erro
+    """
+    if platform.system() == 'Darwin':
+        return []
+    try:
+        result = subprocess.run(['ip', '-o', 'route', 'show', 'dev', interface],
+                                capture_output=True, text=True, timeout=ROUTE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return []
+    if result.returncode != 0:
+        return []
+    routes = []
+    for line in result.stdout.splitlines():
+        fields = line.split()
+        if fields and 'proto kernel' not in line:
+            routes.append(fields[0])
+    return routes
+
+
+def _run_dns(command: List[str], stdin: Optional[str] = None) -> bool:
+    """Executa um comando de DNS, True se terminou com sucesso"""
+    try:
+        result = subprocess.run(command, input=stdin, capture_output=True, text=True, timeout=ROUTE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
+def apply_dns(interface: str, nameservers: Sequence[str], suffix: Sequence[str] = ()) -> bool:
+    """
+    Aponta o resolvedor para os DNS da VPN pela interface do túnel (com sudo).
+
+    Configuração por interface (systemd-resolved, resolvconf ou scutil), que
+    sobrevive ao openfortivpn antigo restaurando o resolv.conf ao sair.
+
+    Args:
+        interface: Interface do túnel (ex: ppp1)
+        nameservers: Servidores DNS; vazio remove a configuração da interface
+        suffix: Domínios de busca
+
+    Returns:
+        True se a configuração foi aplicada (ou removida)
+    """
+    if platform.system() == 'Darwin':
+        key = f"State:/Network/Service/{interface}/DNS"
+        if not nameservers:
+            return _run_dns(['sudo', 'scutil'], f"remove {key}\nquit\n")
+        lines = ['d.init', 'd.add ServerAddresses * ' + ' '.join(nameservers)]
+        if suffix:
+            lines.append('d.add SearchDomains * ' + ' '.join(suffix))
+        return _run_dns(['sudo', 'scutil'], '\n'.join(lines + [f"set {key}", 'quit', '']))
+    if shutil.which('resolvectl'):
+        if not nameservers:
+            return _run_dns(['sudo', 'resolvectl', 'revert', interface])
+        applied = _run_dns(['sudo', 'resolvectl', 'dns', interface] + list(nameservers))
+        if applied and suffix:
+            applied = _run_dns(['sudo', 'resolvectl', 'domain', interface] + list(suffix))
+        if applied:
+            return True
+    if shutil.which('resolvconf'):
+        if not nameservers:
+            return _run_dns(['sudo', 'resolvconf', '-d', interface])
+        content = ''.join(f"nameserver {server}\n" for server in nameservers)
+        if suffix:
+            content += f"search {' '.join(suffix)}\n"
+        return _run_dns(['sudo', 'resolvconf', '-a', interface], content)
+    return False
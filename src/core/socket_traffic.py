@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Módulo de tráfego por processo - sockets do túnel atribuídos a PIDs
+"""
+
+import os
+import socket
+import struct
+import time
+from typing import Optional, Dict, List, Set, Tuple
+
+
+# Configuração
+PROC_ROOT = '/proc'
+PROC_NET_SOURCES = (
+    ('tcp', '/proc/net/tcp'),
+    ('tcp', '/proc/net/tcp6'),
+    ('udp', '/proc/net/udp'),
+    ('udp', '/proc/net/udp6'),
+)
+RESCAN_BUDGET = 64  # máximo de PIDs já conhecidos re-varridos por atualização
+TOP_N = 5
+
+TCP_STATES = {
+    '01': 'ESTABLISHED', '02': 'SYN_SENT', '03': 'SYN_RECV', '04': 'FIN_WAIT1',
+    '05': 'FIN_WAIT2', '06': 'TIME_WAIT', '07': 'CLOSE', '08': 'CLOSE_WAIT',
+    '09': 'LAST_ACK', '0A': 'LISTEN', '0B': 'CLOSING',
+}
+
+# sock_diag (linux/sock_diag.h, linux/inet_diag.h) para bytes por socket TCP
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+INET_DIAG_INFO = 2
+NLMSGHDR = struct.Struct('=IHHII')
+INET_DIAG_REQ_V2 = struct.Struct('=BBBxI48x')
+INET_DIAG_MSG = struct.Struct('=BBBB48xIIIII')  # family, state, timer, retrans, id, expires, rq, wq, uid, inode
+RTATTR = struct.Struct('=HH')
+TCP_INFO_BYTES = struct.Struct('=QQ')  # bytes_acked, bytes_received
+TCP_INFO_BYTES_OFFSET = 120
+
+
+def decode_address(hex_address: str) -> str:
+    """
+    Converte um endereço de /proc/net/{tcp,udp}[6] em texto.
+
+    O kernel imprime cada palavra de 32 bits na ordem do host (little-endian).
+
+    Args:
+        hex_address: Campo IP em hexadecimal (8 ou 32 dígitos)
+
+    Returns:
+        Endereço IPv4 ou IPv6 em texto
+    """
+    raw = bytes.fromhex(hex_address)
+    words = b''.join(raw[i:i + 4][::-1] for i in range(0, len(raw), 4))
+    if len(words) == 4:
+        return socket.inet_ntop(socket.AF_INET, words)
+    return socket.inet_ntop(socket.AF_INET6, words)
+
+
+def parse_proc_net(content: str, protocol: str) -> List[Dict]:
+    """
+    Lê as linhas de um arquivo /proc/net/{tcp,udp}[6].
+
+    Args:
+        content: Conteúdo do arquivo
+        protocol: 'tcp' ou 'udp'
+
+    Returns:
+        Lista de sockets {'protocol', 'local', 'local_port', 'remote', 'remote_port',
+        'state', 'tx_queue', 'rx_queue', 'uid', 'inode'}
+    """
+    sockets = []
+    for line in content.split('\n')[1:]:
+        parts = line.split()
+        if len(parts) < 10:
+            continue
+        try:
+            local, local_port = parts[1].split(':')
+            remote, remote_port = parts[2].split(':')
+            tx_queue, rx_queue = parts[4].split(':')
+            sockets.append({
+                'protocol': protocol,
+                'local': decode_address(local),
+                'local_port': int(local_port, 16),
+                'remote': decode_address(remote),
+                'remote_port': int(remote_port, 16),
+                'state': TCP_STATES.get(parts[3], parts[3]) if protocol == 'tcp' else '',
+                'tx_queue': int(tx_queue, 16),
+                'rx_queue': int(rx_queue, 16),
+                'uid': int(parts[7]),
+                'inode': int(parts[9]),
+            })
+        except ValueError:
+            continue
+    return sockets
+
+
+def tcp_bytes_by_inode() -> Dict[int, Tuple[int, int]]:
+    """
+    Lê bytes enviados/recebidos de todos os sockets TCP via sock_diag.
+
+    Returns:
+        Dicionário {inode: (bytes_acked, bytes_received)}, vazio se indisponível
+    """
+    result = {}
+    if not hasattr(socket, 'AF_NETLINK'):
+        return result
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_SOCK_DIAG)
+    except OSError:
+        return result
+    try:
+        for family in (socket.AF_INET, socket.AF_INET6):
+            request = INET_DIAG_REQ_V2.pack(family, socket.IPPROTO_TCP, 1 << (INET_DIAG_INFO - 1), 0xFFFFFFFF)
+            header = NLMSGHDR.pack(NLMSGHDR.size + len(request), SOCK_DIAG_BY_FAMILY,
+                                   NLM_F_REQUEST | NLM_F_DUMP, family, 0)
+            sock.send(header + request)
+            done = False
+            while not done:
+                data = sock.recv(65536)
+                offset = 0
+                while offset + NLMSGHDR.size <= len(data):
+                    length, msg_type, _, _, _ = NLMSGHDR.unpack_from(data, offset)
+                    if length < NLMSGHDR.size:
+                        done = True
+                        break
+                    if msg_type in (NLMSG_DONE, NLMSG_ERROR):
+                        done = True
+                        break
+                    body = offset + NLMSGHDR.size
+                    inode = INET_DIAG_MSG.unpack_from(data, body)[8]
+                    attr = body + INET_DIAG_MSG.size
+                    end = offset + length
+                    while attr + RTATTR.size <= end:
+                        attr_len, attr_type = RTATTR.unpack_from(data, attr)
+                        if attr_len < RTATTR.size:
+                            break
+                        payload = attr_len - RTATTR.size
+                        if attr_type == INET_DIAG_INFO and payload >= TCP_INFO_BYTES_OFFSET + TCP_INFO_BYTES.size:
+                            result[inode] = TCP_INFO_BYTES.unpack_from(
+                                data, attr + RTATTR.size + TCP_INFO_BYTES_OFFSET)
+                        attr += (attr_len + 3) & ~3
+                    offset += (length + 3) & ~3
+    except OSError:
+        pass
+    finally:
+        sock.close()
+    return result
+
+
+class InodePidIndex:
+    """Índice socket inode -> PID mantido incrementalmente a partir de /proc/*/fd"""
+
+    def __init__(self, proc_root: str = PROC_ROOT, rescan_budget: int = RESCAN_BUDGET):
+        """
+        Inicializa índice vazio.
+
+        Args:
+            proc_root: Raiz do procfs
+            rescan_budget: PIDs já conhecidos re-varridos por atualização
+        """
+        self.proc_root = proc_root
+        self.rescan_budget = rescan_budget
+        self.pid_inodes = {}  # pid -> set de inodes de sockets
+        self.inode_pid = {}
+        self.names = {}
+        self._rescan_order = []
+
+    def _scan_pid(self, pid: int) -> Set[int]:
+        """Lê os descritores de um processo e retorna os inodes de sockets"""
+        inodes = set()
+        fd_dir = os.path.join(self.proc_root, str(pid), 'fd')
+        try:
+            for fd in os.listdir(fd_dir):
+                try:
+                    target = os.readlink(os.path.join(fd_dir, fd))
+                except OSError:
+                    continue
+                if target.startswith('socket:['):
+                    inodes.add(int(target[8:-1]))
+        except OSError:
+            pass
+        return inodes
+
+    def _index_pid(self, pid: int):
+        """(Re)indexa os sockets de um processo"""
+        for inode in self.pid_inodes.get(pid, ()):
+            if self.inode_pid.get(inode) == pid:
+                del self.inode_pid[inode]
+        inodes = self._scan_pid(pid)
+        self.pid_inodes[pid] = inodes
+        for inode in inodes:
+            self.inode_pid[inode] = pid
+
+    def _forget_pid(self, pid: int):
+        """Remove um processo encerrado do índice"""
+        for inode in self.pid_inodes.pop(pid, ()):
+            if self.inode_pid.get(inode) == pid:
+                del self.inode_pid[inode]
+        self.names.pop(pid, None)
+
+    def resolve(self, inodes: Set[int]) -> Dict[int, int]:
+        """
+        Mapeia inodes para PIDs, atualizando o índice só onde necessário.
+
+        Novos PIDs são sempre varridos; PIDs conhecidos só são re-varridos
+        quando há inodes sem dono, limitados a `rescan_budget` por chamada
+        (priorizando processos que já possuem sockets no túnel).
+
+        Args:
+            inodes: Inodes de sockets a resolver
+
+        Returns:
+            Dicionário {inode: pid} dos inodes encontrados
+        """
+        try:
+            current = {int(entry) for entry in os.listdir(self.proc_root) if entry.isdigit()}
+        except OSError:
+            return {}
+        for pid in list(self.pid_inodes):
+            if pid not in current:
+                self._forget_pid(pid)
+
+        missing = {inode for inode in inodes if inode not in self.inode_pid}
+        if missing:
+            for pid in current:
+                if pid not in self.pid_inodes:
+                    self._index_pid(pid)
+            missing = {inode for inode in missing if inode not in self.inode_pid}
+
+        if missing:
+            owners = {self.inode_pid[inode] for inode in inodes if inode in self.inode_pid}
+            if not self._rescan_order:
+                self._rescan_order = sorted(self.pid_inodes, key=lambda pid: pid not in owners)
+            budget = self.rescan_budget
+            while self._rescan_order and budget and missing:
+                pid = self._rescan_order.pop(0)
+                if pid in current:
+                    self._index_pid(pid)
+                    missing = {inode for inode in missing if inode not in self.inode_pid}
+                budget -= 1
+
+        return {inode: self.inode_pid[inode] for inode in inodes if inode in self.inode_pid}
+
+    def process_name(self, pid: int) -> str:
+        """Nome do processo (cacheado enquanto o PID existir)"""
+        name = self.names.get(pid)
+        if name is None:
+            try:
+                with open(os.path.join(self.proc_root, str(pid), 'comm')) as f:
+                    name = f.read().strip()
+            except OSError:
+                name = '?'
+            self.names[pid] = name
+        return name
+
+
+class SocketTrafficCollector:
+    """Atribui sockets com IP local da VPN aos processos donos"""
+
+    def __init__(self, index: Optional[InodePidIndex] = None):
+        """
+        Inicializa coletor.
+
+        Args:
+            index: Índice inode -> PID (padrão: novo índice)
+        """
+        self.index = index or InodePidIndex()
+        self._previous_bytes = {}
+        self._previous_ns = None
+
+    @staticmethod
+    def is_supported() -> bool:
+        """Verifica se /proc/net está disponível (Linux)"""
+        return os.path.exists(PROC_NET_SOURCES[0][1])
+
+    @staticmethod
+    def tunnel_sockets(vpn_ip: str) -> List[Dict]:
+        """
+        Lista os sockets TCP/UDP cujo endereço local é o IP da VPN (exceto LISTEN).
+
+        Args:
+            vpn_ip: IP local do túnel (ex: retornado por get_vpn_ip)
+
+        Returns:
+            Lista de sockets no formato de parse_proc_net
+        """
+        local_ips = (vpn_ip, '::ffff:' + vpn_ip)
+        sockets = []
+        for protocol, path in PROC_NET_SOURCES:
+            try:
+                with open(path) as f:
+                    content = f.read()
+            except OSError:
+                continue
+            sockets.extend(entry for entry in parse_proc_net(content, protocol)
+                           if entry['local'] in local_ips and entry['inode'] and entry['state'] != 'LISTEN')
+        return sockets
+
+    def collect(self, vpn_ip: str, now_ns: Optional[int] = None) -> List[Dict]:
+        """
+        Agrega o tráfego do túnel por processo.
+
+        Args:
+            vpn_ip: IP local do túnel
+            now_ns: Instante da coleta (padrão: time.monotonic_ns())
+
+        Returns:
+            Lista de {'pid', 'name', 'connections', 'tcp', 'udp', 'rx', 'tx',
+            'rx_rate', 'tx_rate', 'queued'} ordenada por taxa e bytes
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        sockets = SocketTrafficCollector.tunnel_sockets(vpn_ip)
+        owners = self.index.resolve({entry['inode'] for entry in sockets})
+        tcp_bytes = tcp_bytes_by_inode() if any(e['protocol'] == 'tcp' for e in sockets) else {}
+
+        elapsed = (now_ns - self._previous_ns) / 1e9 if self._previous_ns else 0
+        processes = {}
+        current_bytes = {}
+        for entry in sockets:
+            pid = owners.get(entry['inode'])
+            key = pid if pid is not None else -1
+            process = processes.get(key)
+            if process is None:
+                process = {
+                    'pid': pid,
+                    'name': self.index.process_name(pid) if pid is not None else '?',
+                    'connections': 0, 'tcp': 0, 'udp': 0,
+                    'rx': 0, 'tx': 0, 'rx_rate': 0.0, 'tx_rate': 0.0, 'queued': 0,
+                }
+                processes[key] = process
+            process['connections'] += 1
+            process[entry['protocol']] += 1
+            process['queued'] += entry['tx_queue'] + entry['rx_queue']
+            sent_received = tcp_bytes.get(entry['inode'])
+            if sent_received is not None:
+                tx, rx = sent_received
+                process['tx'] += tx
+                process['rx'] += rx
+                current_bytes[entry['inode']] = sent_received
+                previous = self._previous_bytes.get(entry['inode'])
+                if previous is not None and elapsed > 0:
+                    process['tx_rate'] += max(0, tx - previous[0]) / elapsed
+                    process['rx_rate'] += max(0, rx - previous[1]) / elapsed
+
+        self._previous_bytes = current_bytes
+        self._previous_ns = now_ns
+        return sorted(processes.values(),
+                      key=lambda p: (p['rx_rate'] + p['tx_rate'], p['rx'] + p['tx'], p['connections']),
+                      reverse=True)
+
+    def top(self, vpn_ip: str, n: int = TOP_N) -> List[Dict]:
+        """Os N processos que mais usam o túnel"""
+        return self.collect(vpn_ip)[:n]
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Módulo de benchmark de throughput - streams TCP paralelos através da VPN
+"""
+
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Optional, Dict, List, Callable
+
+from .network_stats import NetworkStats
+from .rate_engine import counter_delta
+
+
+# Configuração
+DEFAULT_BENCH_PORT = 5201
+DEFAULT_STREAMS = 4
+DEFAULT_DURATION = 10.0  # segundos por direção
+MAX_DURATION = 60.0  # teto aceito pelo servidor (e pedido pelo cliente) por stream
+DEFAULT_BENCH_HOST = '127.0.0.1'  # servidor só escuta fora do loopback se pedido (IP do túnel)
+CHUNK_SIZE = 128 * 1024
+SAMPLE_INTERVAL = 0.5  # segundos entre leituras de get_interface_stats
+CONNECT_TIMEOUT = 5.0
+
+# Protocolo: cabeçalho do cliente = modo + duração em ms; no upload o
+# servidor responde com o total recebido ao fim do stream
+MODE_UPLOAD = b'U'  # cliente envia, servidor descarta
+MODE_DOWNLOAD = b'D'  # servidor envia pelo tempo pedido
+HEADER = struct.Struct('!cI')
+RESULT = struct.Struct('!Q')
+
+
+def jain_fairness(values: List[float]) -> float:
+    """
+    Índice de justiça de Jain entre streams (1.0 = divisão perfeita).
+
+    Args:
+        values: Bytes (ou taxa) de cada stream
+
+    Returns:
+        Índice entre 1/n e 1.0, ou 0 se não houve tráfego
+    """
+    total = sum(values)
+    squares = sum(value * value for value in values)
+    if not values or squares == 0:
+        return 0.0
+    return total * total / (len(values) * squares)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Lê exatamente `size` bytes ou None se a conexão fechou antes"""
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def _cpu_seconds() -> float:
+    """Tempo de CPU (usuário + sistema) consumido pelo processo"""
+    times = os.times()
+    return times.user + times.system
+
+
+class ThroughputServer:
+    """Servidor sink/fonte para o benchmark (uma thread por stream)"""
+
+    def __init__(self, host: str = DEFAULT_BENCH_HOST, port: int = DEFAULT_BENCH_PORT):
+        """
+        Inicializa servidor.
+
+        Args:
+            host: Endereço de escuta (padrão: loopback; use o IP do túnel para o peer)
+            port: Porta de escuta (0 = porta livre escolhida pelo sistema)
+        """
+        self.host = host
+        self.port = port
+        self._sock = None
+        self._thread = None
+        self._payload = os.urandom(CHUNK_SIZE)
+
+    def start(self) -> bool:
+        """
+        Começa a aceitar conexões em background.
+
+        Returns:
+            True se o servidor está escutando
+        """
+        if self._sock is not None:
+            return True
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((self.host, self.port))
+            sock.listen(128)
+        except OSError:
+            return False
+        self._sock = sock
+        self.port = sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept_loop, name='bench-server', daemon=True)
+        self._thread.start()
+        return True
+
+    def _accept_loop(self):
+        """Aceita streams até stop()"""
+        while self._sock is not None:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: socket.socket):
+        """Atende um stream conforme o modo pedido no cabeçalho"""
+        try:
+            header = _recv_exact(conn, HEADER.size)
+            if header is None:
+                return
+            mode, duration_ms = HEADER.unpack(header)
+            # Sem autenticação: nenhum stream ocupa o servidor além do teto
+            duration = min(duration_ms / 1000.0, MAX_DURATION)
+            deadline = time.monotonic() + duration
+            if mode == MODE_UPLOAD:
+                received = 0
+                buffer = bytearray(CHUNK_SIZE)
+                conn.settimeout(MAX_DURATION + CONNECT_TIMEOUT)
+                while time.monotonic() < deadline + CONNECT_TIMEOUT:
+                    count = conn.recv_into(buffer)
+                    if not count:
+                        break
+                    received += count
+                conn.sendall(RESULT.pack(received))
+            elif mode == MODE_DOWNLOAD:
+                payload = self._payload
+                while time.monotonic() < deadline:
+                    conn.sendall(payload)
+                conn.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def stop(self):
+        """Encerra o servidor"""
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            sock.close()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+
+class InterfaceRateProbe:
+    """Lê get_interface_stats periodicamente durante o benchmark"""
+
+    def __init__(self, interface: str, interval: float = SAMPLE_INTERVAL):
+        """
+        Inicializa amostragem.
+
+        Args:
+            interface: Interface cujos contadores serão comparados com o benchmark
+            interval: Segundos entre leituras
+        """
+        self.interface = interface
+        self.interval = interval
+        self.samples = []  # (monotonic, rx, tx)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        """Grava uma leitura dos contadores"""
+        stats = NetworkStats.get_interface_stats(self.interface)
+        if stats:
+            self.samples.append((time.monotonic(), stats['rx'], stats['tx']))
+
+    def _run(self):
+        """Loop de amostragem"""
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Inicia amostragem em background"""
+        self.samples = []
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='bench-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Optional[Dict[str, float]]:
+        """
+        Encerra a amostragem.
+
+        Returns:
+            {'rx', 'tx' (bytes), 'rx_rate', 'tx_rate' (bytes/s), 'samples'} ou None
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+        self._sample()
+        if len(self.samples) < 2:
+            return None
+        start, end = self.samples[0], self.samples[-1]
+        elapsed = end[0] - start[0]
+        if elapsed <= 0:
+            return None
+        rx = counter_delta(start[1], end[1], elapsed)[0]
+        tx = counter_delta(start[2], end[2], elapsed)[0]
+        return {'rx': rx, 'tx': tx, 'rx_rate': rx / elapsed, 'tx_rate': tx / elapsed,
+                'samples': len(self.samples)}
+
+
+class ThroughputBenchmark:
+    """Cliente do benchmark: N streams TCP paralelos em upload e/ou download"""
+
+    def __init__(self, host: str, port: int = DEFAULT_BENCH_PORT, streams: int = DEFAULT_STREAMS,
+                 duration: float = DEFAULT_DURATION, interface: Optional[str] = None):
+        """
+        Inicializa benchmark.
+
+        Args:
+            host: Peer que roda o servidor do benchmark
+            port: Porta do peer
+            streams: Número de streams TCP paralelos
+            duration: Duração de cada direção em segundos (limitada a MAX_DURATION)
+            interface: Interface amostrada durante a execução (None = não amostrar)
+        """
+        self.host = host
+        self.port = port
+        self.streams = max(1, streams)
+        self.duration = min(duration, MAX_DURATION)
+        self.interface = interface
+
+    def _connect(self, mode: bytes) -> socket.socket:
+        """Abre um stream e envia o cabeçalho"""
+        sock = socket.create_connection((self.host, self.port), timeout=CONNECT_TIMEOUT)
+        try:
+            sock.settimeout(self.duration + CONNECT_TIMEOUT)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.sendall(HEADER.pack(mode, int(self.duration * 1000)))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _connect_all(self, mode: bytes) -> List[socket.socket]:
+        """Abre todos os streams; se um falhar, fecha os já abertos"""
+        sockets = []
+        try:
+            for _ in range(self.streams):
+                sockets.append(self._connect(mode))
+        except OSError:
+            for sock in sockets:
+                sock.close()
+            raise
+        return sockets
+
+    def _upload_stream(self, sock: socket.socket, deadline: float) -> int:
+        """Envia dados até o prazo e retorna o total confirmado pelo servidor"""
+        payload = os.urandom(CHUNK_SIZE)
+        while time.monotonic() < deadline:
+            sock.sendall(payload)
+        sock.shutdown(socket.SHUT_WR)
+        result = _recv_exact(sock, RESULT.size)
+        return RESULT.unpack(result)[0] if result else 0
+
+    def _download_stream(self, sock: socket.socket, deadline: float) -> int:
+        """Recebe dados até o servidor fechar o stream"""
+        received = 0
+        buffer = bytearray(CHUNK_SIZE)
+        while True:
+            count = sock.recv_into(buffer)
+            if not count:
+                break
+            received += count
+        return received
+
+    def run_direction(self, mode: bytes, progress: Optional[Callable[[float], None]] = None) -> Dict:
+        """
+        Executa uma direção com todos os streams em paralelo.
+
+        Args:
+            mode: MODE_UPLOAD ou MODE_DOWNLOAD
+            progress: Callback chamado com os segundos decorridos durante a execução
+
+        Returns:
+            Dicionário com 'direction', 'bytes', 'elapsed', 'throughput',
+            'streams' (bytes por stream), 'fairness', 'cpu_seconds', 'cpu_percent',
+            'cpu_per_gb', 'errors' e 'interface' (leituras de get_interface_stats)
+        """
+        sockets = self._connect_all(mode)
+        results = [0] * len(sockets)
+        errors = []
+        worker = self._upload_stream if mode == MODE_UPLOAD else self._download_stream
+
+        def run_stream(index: int):
+            try:
+                results[index] = worker(sockets[index], deadline)
+            except OSError as exc:
+                errors.append(str(exc))
+            finally:
+                sockets[index].close()
+
+        probe = InterfaceRateProbe(self.interface) if self.interface else None
+        if probe is not None:
+            probe.start()
+        cpu_start = _cpu_seconds()
+        started = time.monotonic()
+        deadline = started + self.duration
+        threads = [threading.Thread(target=run_stream, args=(i,), daemon=True) for i in range(len(sockets))]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            if progress is not None:
+                progress(time.monotonic() - started)
+            for thread in threads:
+                thread.join(timeout=0.25)
+        elapsed = time.monotonic() - started
+        cpu = _cpu_seconds() - cpu_start
+        interface = probe.stop() if probe is not None else None
+
+        total = sum(results)
+        return {
+            'direction': 'upload' if mode == MODE_UPLOAD else 'download',
+            'bytes': total,
+            'elapsed': elapsed,
+            'throughput': total / elapsed if elapsed > 0 else 0.0,
+            'streams': results,
+            'fairness': jain_fairness(results),
+            'cpu_seconds': cpu,
+            'cpu_percent': cpu / elapsed * 100 if elapsed > 0 else 0.0,
+            'cpu_per_gb': cpu / (total / 1e9) if total else 0.0,
+            'errors': errors,
+            'interface': interface,
+        }
+
+    def run(self, directions: str = 'both', progress: Optional[Callable[[str, float], None]] = None) -> List[Dict]:
+        """
+        Executa o benchmark.
+
+        Args:
+            directions: 'up', 'down' ou 'both' (upload seguido de download)
+            progress: Callback (direção, segundos decorridos)
+
+        Returns:
+            Lista de resultados de run_direction, na ordem executada
+        """
+        modes = {'up': [MODE_UPLOAD], 'down': [MODE_DOWNLOAD], 'both': [MODE_UPLOAD, MODE_DOWNLOAD]}[directions]
+        results = []
+        for mode in modes:
+            name = 'upload' if mode == MODE_UPLOAD else 'download'
+            callback = (lambda elapsed, name=name: progress(name, elapsed)) if progress else None
+            results.append(self.run_direction(mode, callback))
+        return results
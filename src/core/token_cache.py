@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Módulo de cache de token Azure - memória (disco 0600 opcional) com renovação antes de expirar
+"""
+
+import os
+import json
+import subprocess
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Dict, Tuple
+
+
+# Configuração
+DEFAULT_TOKEN_CACHE = os.path.expanduser('~/.vpn-connect/token-cache.json')  # só se pedido (opt-in)
+REFRESH_MARGIN = 300  # segundos antes de expirar em que o token é renovado em background
+MIN_VALIDITY = 60  # segundos mínimos de validade para um token ser entregue
+RETRY_INTERVAL = 30  # segundos entre tentativas após falha na renovação
+RELOAD_INTERVAL = 60  # segundos entre checagens do arquivo (outros processos também o renovam)
+AZ_TIMEOUT = 30
+
+TokenKey = Tuple[str, str]  # (tenant, resource); '' = padrão do az
+
+
+def parse_expires(info: Dict) -> Optional[float]:
+    """
+    Extrai o instante de expiração da saída do `az account get-access-token`.
+
+    Args:
+        info: JSON do az (`expires_on` em epoch nas versões novas,
+            `expiresOn` em horário local nas antigas)
+
+    Returns:
+        Expiração em epoch (segundos) ou None
+    """
+    if info.get('expires_on') is not None:
+        try:
+            return float(info['expires_on'])
+        except (TypeError, ValueError):
+            pass
+    text = info.get('expiresOn')
+    if not text:
+        return None
+    for pattern in ('%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M:%S'):
+        try:
+            return datetime.strptime(text, pattern).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_token_output(output: str) -> Optional[Dict]:
+    """
+    Converte a saída JSON do `az account get-access-token`.
+
+    Args:
+        output: Saída do comando
+
+    Returns:
+        {'access_token', 'expires_at', 'tenant', 'subscription'} ou None
+    """
+    try:
+        info = json.loads(output)
+    except ValueError:
+        return None
+    if not isinstance(info, dict) or not info.get('accessToken'):
+        return None
+    return {
+        'access_token': info['accessToken'],
+        'expires_at': parse_expires(info),
+        'tenant': info.get('tenant'),
+        'subscription': info.get('subscription'),
+    }
+
+
+def fetch_token(tenant: str = '', resource: str = '') -> Optional[Dict]:
+    """
+    Obtém um token novo executando o az (bloqueante, ~1s só para o az iniciar).
+
+    Args:
+        tenant: Tenant ('' = padrão)
+        resource: Recurso ('' = Azure Resource Manager)
+
+    Returns:
+        Token como em parse_token_output, ou None
+    """
+    command = ['az', 'account', 'get-access-token', '--output', 'json']
+    if tenant:
+        command += ['--tenant', tenant]
+    if resource:
+        command += ['--resource', resource]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=AZ_TIMEOUT)
+    except Exception:
+        return None
+    if result.returncode != 0:
+        return None
+    return parse_token_output(result.stdout)
+
+
+def fetch_account() -> Optional[Dict]:
+    """Executa `az account show` e retorna a conta, ou None"""
+    try:
+        result = subprocess.run(['az', 'account', 'show'], capture_output=True, text=True, timeout=AZ_TIMEOUT)
+        if result.returncode == 0:
+            return json.loads(result.stdout)
+    except Exception:
+        pass
+    return None
+
+
+class TokenCache:
+    """Tokens por (tenant, recurso) em memória, opcionalmente em disco, renovados antes de expirar"""
+
+    def __init__(self, path: Optional[str] = None, refresh_margin: float = REFRESH_MARGIN,
+                 min_validity: float = MIN_VALIDITY):
+        """
+        Inicializa cache.
+
+        Args:
+            path: Arquivo do cache em disco, criado com permissão 0600 (None = só memória;
+                ex: DEFAULT_TOKEN_CACHE para reaproveitar o token entre processos)
+            refresh_margin: Segundos antes da expiração para renovar em background
+            min_validity: Validade mínima restante para um token ser usado
+        """
+        self.path = path
+        self.refresh_margin = refresh_margin
+        self.min_validity = min_validity
+        self.entries = {}  # (tenant, resource) -> token
+        self.account = None  # última saída de `az account show`
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._retry_at = {}
+        self._loaded_mtime = None
+        self._load()
+
+    @staticmethod
+    def _key(tenant: Optional[str], resource: Optional[str]) -> TokenKey:
+        """Chave normalizada"""
+        return (tenant or '', resource or '')
+
+    def _valid(self, entry: Optional[Dict], now: float) -> bool:
+        """Verifica se o token ainda tem a validade mínima"""
+        return (entry is not None and entry.get('expires_at') is not None
+                and entry['expires_at'] - now >= self.min_validity)
+
+    def _load(self):
+        """
+        Carrega o cache em disco se mudou desde a última leitura.
+
+        Arquivos de outro dono ou legíveis por outros usuários são ignorados.
+        Tokens do disco só substituem os da memória quando expiram depois.
+        """
+        if not self.path:
+            return
+        try:
+            info = os.stat(self.path)
+            if info.st_mtime == self._loaded_mtime:
+                return
+            if info.st_mode & 0o077 or (hasattr(os, 'getuid') and info.st_uid != os.getuid()):
+                return
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._loaded_mtime = info.st_mtime
+        if not isinstance(data, dict):
+            return
+        now = time.time()
+        with self._lock:
+            for item in data.get('tokens', []):
+                if not isinstance(item, dict) or not item.get('access_token') or not self._valid(item, now):
+                    continue
+                key = self._key(item.get('key_tenant'), item.get('key_resource'))
+                current = self.entries.get(key)
+                if current is None or (current.get('expires_at') or 0) < item['expires_at']:
+                    self.entries[key] = item
+            if isinstance(data.get('account'), dict):
+                self.account = data['account']
+
+    def _save(self):
+        """Grava o cache em disco (escrita atômica, permissão 0600)"""
+        if not self.path:
+            return
+        with self._lock:
+            tokens = [dict(entry, key_tenant=key[0], key_resource=key[1])
+                      for key, entry in self.entries.items() if entry is not None]
+            data = {'tokens': tokens, 'account': self.account}
+        directory = os.path.dirname(self.path) or '.'
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(temporary, self.path)
+            self._loaded_mtime = os.stat(self.path).st_mtime
+        except OSError:
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+
+    def get(self, tenant: Optional[str] = None, resource: Optional[str] = None,
+            wait: bool = True) -> Optional[Dict]:
+        """
+        Retorna um token válido.
+
+        Args:
+            tenant: Tenant (None = padrão do az)
+            resource: Recurso (None = Azure Resource Manager)
+            wait: Se não há token válido, buscar agora (bloqueia no az); com
+                False retorna None e agenda a busca em background
+
+        Returns:
+            {'access_token', 'expires_at', 'tenant', 'subscription'} ou None
+        """
+        key = self._key(tenant, resource)
+        with self._lock:
+            entry = self.entries.get(key)
+        if self._valid(entry, time.time()):
+            return entry
+        if not wait:
+            with self._lock:
+                self.entries.setdefault(key, None)
+            self._wakeup.set()
+            return None
+        return self.refresh(tenant, resource)
+
+    def refresh(self, tenant: Optional[str] = None, resource: Optional[str] = None) -> Optional[Dict]:
+        """
+        Busca um token novo no az e atualiza o cache.
+
+        Args:
+            tenant: Tenant (None = padrão)
+            resource: Recurso (None = ARM)
+
+        Returns:
+            Token novo ou None se o az falhou
+        """
+        key = self._key(tenant, resource)
+        with self._fetch_lock:
+            # Outra thread pode ter renovado enquanto esta esperava
+            with self._lock:
+                entry = self.entries.get(key)
+            if self._valid(entry, time.time() + self.refresh_margin):
+                return entry
+            entry = fetch_token(*key)
+            if entry is None:
+                self._retry_at[key] = time.time() + RETRY_INTERVAL
+                return None
+            if entry['expires_at'] is None:
+                # Sem expiração conhecida: assume a vida útil mínima de um token do Entra ID
+                entry['expires_at'] = time.time() + 3600
+            with self._lock:
+                self.entries[key] = entry
+            if entry['expires_at'] - self.refresh_margin <= time.time():
+                # O az devolve o próprio cache até perto da expiração: não insistir em loop
+                self._retry_at[key] = time.time() + RETRY_INTERVAL
+            else:
+                self._retry_at.pop(key, None)
+        self._save()
+        self._wakeup.set()
+        return entry
+
+    def remember_account(self, account: Optional[Dict]):
+        """
+        Guarda a saída de `az account show` junto dos tokens.
+
+        Args:
+            account: Conta (None = esquecer)
+        """
+        with self._lock:
+            changed = self.account != account
+            self.account = account
+        if changed:
+            self._save()
+
+    def invalidate(self):
+        """Descarta tokens e conta (ex: após `az logout` ou token rejeitado)"""
+        with self._lock:
+            self.entries = {}
+            self.account = None
+        self._save()
+
+    def next_refresh(self) -> Optional[float]:
+        """Próximo instante (epoch) em que algum token precisa ser renovado"""
+        with self._lock:
+            items = list(self.entries.items())
+        moments = []
+        for key, entry in items:
+            due = time.time() if entry is None or entry.get('expires_at') is None else \
+                entry['expires_at'] - self.refresh_margin
+            moments.append(max(due, self._retry_at.get(key, 0)))
+        return min(moments) if moments else None
+
+    def _run(self):
+        """Renova cada token `refresh_margin` segundos antes de expirar"""
+        while not self._stop.is_set():
+            due = self.next_refresh()
+            timeout = RELOAD_INTERVAL if due is None else min(RELOAD_INTERVAL, max(0.0, due - time.time()))
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                return
+            self._load()
+            now = time.time()
+            with self._lock:
+                keys = list(self.entries)
+            for key in keys:
+                with self._lock:
+                    entry = self.entries.get(key)
+                if self._retry_at.get(key, 0) > now:
+                    continue
+                if entry is None or entry.get('expires_at') is None or \
+                        entry['expires_at'] - self.refresh_margin <= now:
+                    self.refresh(*key)
+                    if self.account is None:
+                        self.remember_account(fetch_account())
+
+    def start(self):
+        """Inicia a renovação em background"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='token-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Encerra a renovação em background"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+
+# Instância compartilhada
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_token_cache(path: Optional[str] = None) -> TokenCache:
+    """
+    Retorna o cache compartilhado, criando-o (com renovação em background) na primeira chamada.
+
+    Args:
+        path: Arquivo em disco usado na criação (None = só memória, o padrão)
+
+    Returns:
+        TokenCache compartilhado
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TokenCache(path)
+            _cache.start()
+        return _cache
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Módulo de amostragem de tráfego - histórico em ring buffer de tamanho fixo
+"""
+
+import math
+import threading
+import time
+from array import array
+from typing import Optional, Dict, List, Callable
+
+from .interface_counters import get_counter_backend
+from .network_stats import NetworkStats
+from .rate_engine import counter_delta
+
+
+# Configuração
+DEFAULT_HZ = 20
+MAX_HZ = 100
+SUBPROCESS_MAX_HZ = 1  # sem backend nativo cada amostra custa um fork
+HISTORY_SECONDS = 60
+EWMA_TAU = 1.0  # constante de tempo da média móvel exponencial, em segundos
+WINDOWS = (('1s', 1), ('10s', 10), ('1m', 60))
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Percentil por nearest-rank de uma lista já ordenada.
+
+    Args:
+        sorted_values: Valores em ordem crescente
+        pct: Percentil desejado (0-100)
+
+    Returns:
+        Valor do percentil ou 0 se a lista está vazia
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(math.ceil(pct / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class CounterRing:
+    """Ring buffer de contadores com timestamp, armazenado em arrays"""
+
+    def __init__(self, capacity: int):
+        """
+        Inicializa ring buffer com memória fixa.
+
+        Args:
+            capacity: Número máximo de amostras mantidas
+        """
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.rx = array('Q', bytes(8 * capacity))
+        self.tx = array('Q', bytes(8 * capacity))
+        self.rx_packets = array('Q', bytes(8 * capacity))
+        self.tx_packets = array('Q', bytes(8 * capacity))
+        self.count = 0
+        self.head = 0  # próxima posição de escrita
+
+    def append(self, timestamp: float, rx: int, tx: int, rx_packets: int = 0, tx_packets: int = 0):
+        """Grava uma amostra sobrescrevendo a mais antiga quando cheio"""
+        i = self.head
+        self.timestamps[i] = timestamp
+        self.rx[i] = rx
+        self.tx[i] = tx
+        self.rx_packets[i] = rx_packets
+        self.tx_packets[i] = tx_packets
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def index(self, age: int) -> int:
+        """Posição física da amostra `age` (0 = mais recente)"""
+        return (self.head - 1 - age) % self.capacity
+
+    def interval_rates(self, since: float) -> Dict[str, List[float]]:
+        """
+        Taxas entre amostras consecutivas com timestamp >= since.
+
+        Args:
+            since: Instante inicial (time.monotonic())
+
+        Returns:
+            Dicionário {'rx': [...], 'tx': [...]} em bytes/s
+        """
+        rates = {'rx': [], 'tx': []}
+        for age in range(self.count - 1):
+            newer = self.index(age)
+            older = self.index(age + 1)
+            if self.timestamps[older] < since:
+                break
+            dt = self.timestamps[newer] - self.timestamps[older]
+            if dt <= 0:
+                continue
+            rates['rx'].append(counter_delta(self.rx[older], self.rx[newer], dt)[0] / dt)
+            rates['tx'].append(counter_delta(self.tx[older], self.tx[newer], dt)[0] / dt)
+        return rates
+
+
+class TrafficSampler:
+    """Amostrador em background de contadores de uma interface"""
+
+    def __init__(self, interface: str, hz: float = DEFAULT_HZ, history_seconds: int = HISTORY_SECONDS):
+        """
+        Inicializa amostrador.
+
+        Args:
+            interface: Nome da interface de rede
+            hz: Frequência de amostragem (10-100 Hz com backend nativo)
+            history_seconds: Janela de histórico mantida no ring buffer
+        """
+        self.interface = interface
+        self._backend = get_counter_backend()
+        max_hz = MAX_HZ if self._backend is not None else SUBPROCESS_MAX_HZ
+        self.hz = max(0.1, min(hz, max_hz))
+        self.ring = CounterRing(int(self.hz * history_seconds) + 1)
+        self.ewma = {'rx': 0.0, 'tx': 0.0}
+        self.peak = {'rx': 0.0, 'tx': 0.0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners = []
+
+    def add_listener(self, callback: Callable[[Dict[str, int]], None]):
+        """
+        Registra callback chamado com os contadores de cada amostra.
+
+        Args:
+            callback: Função que recebe o dicionário de contadores
+        """
+        self._listeners.append(callback)
+
+    def _read(self) -> Optional[Dict[str, int]]:
+        """Lê contadores da interface pelo caminho mais barato disponível"""
+        if self._backend is not None:
+            return self._backend.read_interface(self.interface)
+        return NetworkStats.get_interface_stats(self.interface)
+
+    def sample(self, now: Optional[float] = None) -> bool:
+        """
+        Coleta uma amostra e atualiza EWMA e picos.
+
+        Args:
+            now: Instante da amostra (padrão: time.monotonic())
+
+        Returns:
+            True se a amostra foi gravada
+        """
+        stats = self._read()
+        if stats is None:
+            return False
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            ring = self.ring
+            if ring.count:
+                last = ring.index(0)
+                dt = now - ring.timestamps[last]
+                if dt > 0:
+                    alpha = 1.0 - math.exp(-dt / EWMA_TAU)
+                    for key, column in (('rx', ring.rx), ('tx', ring.tx)):
+                        rate = counter_delta(column[last], stats[key], dt)[0] / dt
+                        self.ewma[key] += alpha * (rate - self.ewma[key])
+                        if rate > self.peak[key]:
+                            self.peak[key] = rate
+            ring.append(now, stats['rx'], stats['tx'],
+                        stats.get('rx_packets', 0), stats.get('tx_packets', 0))
+        for callback in self._listeners:
+            try:
+                callback(stats)
+            except Exception:
+                pass
+        return True
+
+    def start(self):
+        """Inicia a thread de amostragem"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f'sampler-{self.interface}', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Loop de amostragem com período fixo (sem acumular atraso)"""
+        period = 1.0 / self.hz
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            self.sample()
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                # Atrasou mais de um período: realinhar em vez de disparar em rajada
+                next_tick = time.monotonic()
+                delay = 0
+            self._stop.wait(delay)
+
+    def stop(self):
+        """Encerra a thread de amostragem"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def instantaneous_rate(self) -> Dict[str, float]:
+        """
+        Taxa entre as duas amostras mais recentes.
+
+        Returns:
+            Dicionário {'rx', 'tx'} em bytes/s
+        """
+        with self._lock:
+            ring = self.ring
+            if ring.count < 2:
+                return {'rx': 0.0, 'tx': 0.0}
+            newer, older = ring.index(0), ring.index(1)
+            dt = ring.timestamps[newer] - ring.timestamps[older]
+            if dt <= 0:
+                return {'rx': 0.0, 'tx': 0.0}
+            return {
+                'rx': counter_delta(ring.rx[older], ring.rx[newer], dt)[0] / dt,
+                'tx': counter_delta(ring.tx[older], ring.tx[newer], dt)[0] / dt,
+            }
+
+    def get_ewma(self) -> Dict[str, float]:
+        """Média móvel exponencial das taxas (bytes/s)"""
+        with self._lock:
+            return dict(self.ewma)
+
+    def get_peak(self) -> Dict[str, float]:
+        """Maiores taxas observadas desde o início (bytes/s)"""
+        with self._lock:
+            return dict(self.peak)
+
+    def window_stats(self, seconds: float) -> Dict[str, Dict[str, float]]:
+        """
+        Estatísticas das taxas em uma janela recente.
+
+        Args:
+            seconds: Tamanho da janela em segundos
+
+        Returns:
+            {'rx': {'min', 'max', 'mean', 'p50', 'p95', 'p99'}, 'tx': {...}}
+        """
+        with self._lock:
+            if not self.ring.count:
+                rates = {'rx': [], 'tx': []}
+            else:
+                newest = self.ring.timestamps[self.ring.index(0)]
+                rates = self.ring.interval_rates(newest - seconds)
+
+        result = {}
+        for key, values in rates.items():
+            values.sort()
+            summary = {
+                'min': values[0] if values else 0.0,
+                'max': values[-1] if values else 0.0,
+                'mean': sum(values) / len(values) if values else 0.0,
+            }
+            for pct in PERCENTILES:
+                summary[f'p{pct}'] = percentile(values, pct)
+            result[key] = summary
+        return result
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Resumo completo para dashboards e exportadores.
+
+        Returns:
+            {'instant', 'ewma', 'peak', '1s', '10s', '1m'}
+        """
+        result = {
+            'instant': self.instantaneous_rate(),
+            'ewma': self.get_ewma(),
+            'peak': self.get_peak(),
+        }
+        for label, seconds in WINDOWS:
+            result[label] = self.window_stats(seconds)
+        return result
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Módulo de histórico de tráfego - série temporal compacta em disco com rollups
+"""
+
+import os
+import mmap
+import struct
+import threading
+import time
+from typing import Optional, Dict, List, Tuple
+
+from .rate_engine import counter_delta
+
+
+# Configuração
+DEFAULT_HISTORY_DIR = os.path.expanduser('~/.vpn-connect/history')
+
+# Registro de largura fixa, igual para todas as resoluções:
+# timestamp, amostras, rx, tx, rx_packets, tx_packets, pico rx/s, pico tx/s
+RECORD = struct.Struct('<IIQQQQQQ')
+FIELDS = ('timestamp', 'samples', 'rx', 'tx', 'rx_packets', 'tx_packets', 'rx_peak', 'tx_peak')
+COUNTER_KEYS = ('rx', 'tx', 'rx_packets', 'tx_packets')
+
+DAY = 86400
+# Resolução: (segundos por registro, segundos por arquivo de segmento, retenção em segundos)
+RESOLUTIONS = {
+    '1s': (1, DAY, 7 * DAY),
+    '1m': (60, 30 * DAY, 90 * DAY),
+    '1h': (3600, 365 * DAY, 2 * 365 * DAY),
+    '1d': (DAY, 10 * 365 * DAY, 10 * 365 * DAY),
+}
+ROLLUPS = ('1m', '1h', '1d')
+
+
+class SeriesLevel:
+    """Uma resolução da série: segmentos append-only de registros fixos"""
+
+    def __init__(self, root: str, name: str):
+        """
+        Inicializa nível.
+
+        Args:
+            root: Diretório base do histórico
+            name: Nome da resolução ('1s', '1m', '1h', '1d')
+        """
+        self.name = name
+        self.step, self.segment_span, self.retention = RESOLUTIONS[name]
+        self.directory = os.path.join(root, name)
+        os.makedirs(self.directory, exist_ok=True)
+        self._file = None
+        self._file_segment = None
+        self.last_timestamp = 0
+        last = self.last_record()
+        if last is not None:
+            self.last_timestamp = last[0]
+
+    def segment_start(self, timestamp: int) -> int:
+        """Início do segmento que contém o timestamp"""
+        return timestamp - timestamp % self.segment_span
+
+    def segment_path(self, start: int) -> str:
+        """Caminho do arquivo de um segmento"""
+        return os.path.join(self.directory, f'{start:010d}.bin')
+
+    def segments(self) -> List[int]:
+        """Inícios dos segmentos existentes, em ordem"""
+        starts = []
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.bin'):
+                try:
+                    starts.append(int(filename[:-4]))
+                except ValueError:
+                    continue
+        return sorted(starts)
+
+    def append(self, record: Tuple):
+        """
+        Grava um registro no segmento correspondente.
+
+        Args:
+            record: Tupla no formato RECORD (timestamp primeiro)
+        """
+        timestamp = max(record[0], self.last_timestamp)  # relógio voltou: manter ordem
+        record = (timestamp,) + tuple(record[1:])
+        segment = self.segment_start(timestamp)
+        if segment != self._file_segment:
+            self.close()
+            self._file = open(self.segment_path(segment), 'ab')
+            self._file_segment = segment
+        self._file.write(RECORD.pack(*record))
+        self._file.flush()
+        self.last_timestamp = timestamp
+
+    def last_record(self) -> Optional[Tuple]:
+        """Último registro gravado (mantém a ordem dos timestamps após reinício)"""
+        for start in reversed(self.segments()):
+            path = self.segment_path(start)
+            size = os.path.getsize(path) // RECORD.size * RECORD.size
+            if size:
+                with open(path, 'rb') as f:
+                    f.seek(size - RECORD.size)
+                    return RECORD.unpack(f.read(RECORD.size))
+        return None
+
+    def read_range(self, start: int, end: int) -> List[Tuple]:
+        """
+        Lê registros com start <= timestamp < end sem carregar arquivos inteiros.
+
+        Cada segmento é mapeado com mmap e o primeiro registro é localizado
+        por busca binária (registros de largura fixa e ordenados).
+
+        Args:
+            start: Timestamp inicial (inclusivo)
+            end: Timestamp final (exclusivo)
+
+        Returns:
+            Lista de tuplas RECORD
+        """
+        records = []
+        for segment in self.segments():
+            if segment + self.segment_span <= start or segment >= end:
+                continue
+            path = self.segment_path(segment)
+            count = os.path.getsize(path) // RECORD.size
+            if not count:
+                continue
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                low, high = 0, count
+                while low < high:
+                    middle = (low + high) // 2
+                    if RECORD.unpack_from(view, middle * RECORD.size)[0] < start:
+                        low = middle + 1
+                    else:
+                        high = middle
+                for index in range(low, count):
+                    record = RECORD.unpack_from(view, index * RECORD.size)
+                    if record[0] >= end:
+                        break
+                    records.append(record)
+        return records
+
+    def enforce_retention(self, now: int):
+        """Remove segmentos inteiramente fora da janela de retenção"""
+        horizon = now - self.retention
+        for start in self.segments():
+            if start + self.segment_span <= horizon and start != self._file_segment:
+                try:
+                    os.remove(self.segment_path(start))
+                except OSError:
+                    pass
+
+    def close(self):
+        """Fecha o segmento aberto para escrita"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_segment = None
+
+
+class TrafficStore:
+    """Histórico persistente de tráfego por segundo com rollups automáticos"""
+
+    def __init__(self, root: str = DEFAULT_HISTORY_DIR):
+        """
+        Abre (ou cria) o histórico.
+
+        Args:
+            root: Diretório do histórico
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.levels = {name: SeriesLevel(root, name) for name in RESOLUTIONS}
+        self._lock = threading.Lock()
+        self._last_counters = None
+        self._last_time = None
+        self._source = None
+        self._pending = None  # segundo corrente ainda em acumulação
+        # Após reinício o bucket corrente recomeça vazio; a parte já gravada
+        # com o mesmo timestamp é mesclada na leitura
+        self._buckets = {name: None for name in ROLLUPS}
+        self._last_retention = 0
+
+    def record(self, counters: Dict[str, int], source: Optional[str] = None, now: Optional[float] = None):
+        """
+        Registra uma leitura de contadores (qualquer frequência).
+
+        As leituras são convertidas em incrementos (tolerando reset e wrap)
+        e consolidadas em um registro por segundo.
+
+        Args:
+            counters: Dicionário com 'rx', 'tx' e opcionalmente packets
+            source: Origem dos contadores (troca de interface não conta como tráfego)
+            now: Timestamp Unix da leitura (padrão: time.time())
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            if source != self._source or self._last_counters is None:
+                self._source = source
+                self._last_counters = {key: counters.get(key, 0) for key in COUNTER_KEYS}
+                self._last_time = now
+                return
+            elapsed = max(now - self._last_time, 0.0)
+            deltas = {}
+            for key in COUNTER_KEYS:
+                current = counters.get(key, 0)
+                deltas[key] = counter_delta(self._last_counters[key], current, elapsed)[0]
+                self._last_counters[key] = current
+            self._last_time = now
+
+            second = int(now)
+            if self._pending is not None and self._pending[0] != second:
+                self._flush_second()
+            if self._pending is None:
+                self._pending = [second, 1, 0, 0, 0, 0, 0, 0]
+            pending = self._pending
+            pending[2] += deltas['rx']
+            pending[3] += deltas['tx']
+            pending[4] += deltas['rx_packets']
+            pending[5] += deltas['tx_packets']
+            pending[6] = pending[2]
+            pending[7] = pending[3]
+
+    def _flush_second(self):
+        """Grava o segundo acumulado e propaga para os rollups"""
+        record = tuple(self._pending)
+        self._pending = None
+        self.levels['1s'].append(record)
+        for name in ROLLUPS:
+            self._rollup(name, record)
+        if record[0] - self._last_retention >= 3600:
+            for level in self.levels.values():
+                level.enforce_retention(record[0])
+            self._last_retention = record[0]
+
+    def _rollup(self, name: str, record: Tuple):
+        """Acumula um registro de 1s no bucket de um rollup"""
+        step = RESOLUTIONS[name][0]
+        bucket_start = record[0] - record[0] % step
+        bucket = self._buckets[name]
+        if bucket is not None and bucket[0] != bucket_start:
+            if bucket[1]:
+                self.levels[name].append(tuple(bucket))
+            bucket = None
+        if bucket is None:
+            bucket = [bucket_start, 0, 0, 0, 0, 0, 0, 0]
+        bucket[1] += 1
+        for i in range(2, 6):
+            bucket[i] += record[i]
+        bucket[6] = max(bucket[6], record[6])
+        bucket[7] = max(bucket[7], record[7])
+        self._buckets[name] = bucket
+
+    def flush(self):
+        """Grava o segundo pendente e os buckets parciais dos rollups"""
+        with self._lock:
+            if self._pending is not None:
+                self._flush_second()
+            for name in ROLLUPS:
+                bucket = self._buckets[name]
+                if bucket is not None and bucket[1]:
+                    # Parcial: gravado agora e mesclado na leitura se o bucket continuar
+                    self.levels[name].append(tuple(bucket))
+                    self._buckets[name] = [bucket[0], 0, 0, 0, 0, 0, 0, 0]
+
+    @staticmethod
+    def choose_resolution(start: int, end: int) -> str:
+        """Escolhe a resolução mais fina que mantém a consulta pequena"""
+        span = end - start
+        if span <= 2 * 3600:
+            return '1s'
+        if span <= 7 * DAY:
+            return '1m'
+        if span <= 180 * DAY:
+            return '1h'
+        return '1d'
+
+    def query(self, start: float, end: float, resolution: Optional[str] = None) -> List[Dict[str, int]]:
+        """
+        Retorna registros de um intervalo de tempo.
+
+        Args:
+            start: Timestamp Unix inicial
+            end: Timestamp Unix final
+            resolution: '1s', '1m', '1h', '1d' ou None para escolher automaticamente
+
+        Returns:
+            Lista de dicionários com os campos de FIELDS
+        """
+        start, end = int(start), int(end)
+        if resolution is None:
+            resolution = TrafficStore.choose_resolution(start, end)
+        with self._lock:
+            records = self.levels[resolution].read_range(start, end)
+
+        # Mesclar buckets gravados em partes (flush parcial antes de reinício)
+        merged = []
+        for record in records:
+            if merged and merged[-1][0] == record[0]:
+                previous = merged[-1]
+                merged[-1] = (record[0],) + tuple(previous[i] + record[i] for i in range(1, 6)) + \
+                             (max(previous[6], record[6]), max(previous[7], record[7]))
+            else:
+                merged.append(record)
+        return [dict(zip(FIELDS, record)) for record in merged]
+
+    def close(self):
+        """Grava dados pendentes e fecha os arquivos"""
+        self.flush()
+        with self._lock:
+            for level in self.levels.values():
+                level.close()
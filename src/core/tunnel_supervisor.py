@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Módulo de supervisão do túnel - dono do processo openfortivpn, avisado na saída via pidfd
+"""
+
+import os
+import selectors
+import subprocess
+import threading
+import time
+import weakref
+from typing import Optional, List, Callable
+
+
+# Configuração
+STATE_IDLE = 'idle'  # nenhum processo iniciado
+STATE_RUNNING = 'running'
+STATE_EXITED = 'exited'
+TERMINATE_TIMEOUT = 5.0  # segundos antes de SIGKILL em terminate()
+TUNNEL_COMMAND = 'openfortivpn'  # só processos deste programa contam como túnel (regra do pgrep)
+
+# Supervisores vivos, consultados por tunnel_running() no lugar do pgrep
+_supervisors = weakref.WeakSet()
+_supervisors_lock = threading.Lock()
+
+
+def pidfd_supported() -> bool:
+    """Verifica se o sistema oferece os.pidfd_open (Linux 5.3+)"""
+    if not hasattr(os, 'pidfd_open'):
+        return False
+    try:
+        fd = os.pidfd_open(os.getpid())
+    except OSError:
+        return False
+    os.close(fd)
+    return True
+
+
+def tunnel_running() -> Optional[bool]:
+    """
+    Estado do túnel segundo os supervisores, sem syscalls.
+
+    Mesma regra do `pgrep -f openfortivpn`: só conta processo supervisionado
+    que é o próprio openfortivpn. Um wrapper (ex: connect_vpn.py, ainda nas
+    checagens do az) não indica túnel.
+
+    Returns:
+        True se algum openfortivpn supervisionado está rodando, None se não há
+        nenhum (quem chama decide, ex: recorrendo ao pgrep)
+    """
+    with _supervisors_lock:
+        supervisors = list(_supervisors)
+    if any(supervisor.is_running() and supervisor.is_tunnel() for supervisor in supervisors):
+        return True
+    return None
+
+
+class TunnelSupervisor:
+    """Supervisiona um processo filho e registra sua saída assim que ela acontece"""
+
+    def __init__(self, use_pidfd: Optional[bool] = None):
+        """
+        Inicializa supervisor.
+
+        Args:
+            use_pidfd: Força (True) ou desativa (False) o pidfd; None = detectar
+        """
+        self.use_pidfd = pidfd_supported() if use_pidfd is None else use_pidfd
+        self.process = None
+        self.state = STATE_IDLE
+        self.returncode = None
+        self.started_at = None
+        self.exited_at = None  # time.monotonic() de quando a saída foi observada
+        self._exited = threading.Event()
+        self._listeners = []
+        self._thread = None
+        self._wakeup = None  # pipe para liberar o watcher sem esperar a saída
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        """Mecanismo de notificação em uso ('pidfd' ou 'wait')"""
+        return 'pidfd' if self.use_pidfd else 'wait'
+
+    @property
+    def pid(self) -> Optional[int]:
+        """PID do processo supervisionado"""
+        return self.process.pid if self.process is not None else None
+
+    def add_listener(self, callback: Callable[[int], None]):
+        """
+        Registra callback chamado (na thread do watcher) com o código de saída.
+
+        Args:
+            callback: Função que recebe o returncode
+        """
+        self._listeners.append(callback)
+
+    def spawn(self, command: List[str], **popen_kwargs) -> Optional[subprocess.Popen]:
+        """
+        Inicia e passa a supervisionar um processo.
+
+        Um processo anterior ainda vivo é encerrado antes (ver adopt).
+
+        Args:
+            command: Comando a executar
+            **popen_kwargs: Argumentos repassados ao subprocess.Popen
+
+        Returns:
+            Popen do processo ou None se não foi possível iniciá-lo
+        """
+        self._retire()
+        try:
+            process = subprocess.Popen(command, **popen_kwargs)
+        except Exception:
+            return None
+        self.adopt(process)
+        return process
+
+    def adopt(self, process: subprocess.Popen):
+        """
+        Passa a supervisionar um processo já iniciado (filho deste processo).
+
+        Se o processo anterior ainda não terminou (ex: o openfortivpn já
+        avisou a desconexão mas segue saindo), ele é encerrado e aguardado
+        antes: soltá-lo deixaria um openfortivpn órfão.
+
+        Args:
+            process: Popen a supervisionar
+        """
+        if self.process is not process:
+            self._retire()
+        self.release()
+        with self._lock:
+            self.process = process
+            self.state = STATE_RUNNING
+            self.returncode = None
+            self.started_at = time.monotonic()
+            self.exited_at = None
+            self._exited = threading.Event()
+
+        pidfd = None
+        if self.use_pidfd:
+            try:
+                pidfd = os.pidfd_open(process.pid)
+            except OSError:
+                # Já terminou (ESRCH) ou kernel sem suporte: o waiter resolve
+                pidfd = None
+        if pidfd is not None:
+            read_fd, write_fd = os.pipe()
+            self._wakeup = write_fd
+            target, args = self._watch_pidfd, (process, self._exited, pidfd, read_fd)
+        else:
+            target, args = self._watch_wait, (process, self._exited)
+        self._thread = threading.Thread(target=target, args=args, name=f'tunnel-supervisor-{process.pid}',
+                                        daemon=True)
+        self._thread.start()
+        with _supervisors_lock:
+            _supervisors.add(self)
+
+    def _watch_pidfd(self, process: subprocess.Popen, exited: threading.Event, pidfd: int, wakeup_fd: int):
+        """Bloqueia no pidfd (legível quando o processo termina) ou no pipe de liberação"""
+        selector = selectors.DefaultSelector()
+        try:
+            selector.register(pidfd, selectors.EVENT_READ, 'exit')
+            selector.register(wakeup_fd, selectors.EVENT_READ, 'release')
+            while True:
+                for key, _ in selector.select():
+                    if key.data == 'release':
+                        return
+                    # O processo já terminou: wait() só colhe o status
+                    self._finish(process, exited, process.wait())
+                    return
+        except (OSError, ValueError):
+            self._watch_wait(process, exited)
+        finally:
+            selector.close()
+            os.close(pidfd)
+            os.close(wakeup_fd)
+
+    def _watch_wait(self, process: subprocess.Popen, exited: threading.Event):
+        """Fallback sem pidfd (ex: macOS): thread bloqueada em waitpid"""
+        try:
+            returncode = process.wait()
+        except Exception:
+            returncode = -1
+        self._finish(process, exited, returncode)
+
+    def _finish(self, process: subprocess.Popen, exited: threading.Event, returncode: int):
+        """Registra a saída e avisa os listeners"""
+        with self._lock:
+            if self.process is not process:
+                return  # supervisor já foi reaproveitado para outro processo
+            self.state = STATE_EXITED
+            self.returncode = returncode
+            self.exited_at = time.monotonic()
+        exited.set()
+        for callback in list(self._listeners):
+            try:
+                callback(returncode)
+            except Exception:
+                pass
+
+    def is_tunnel(self) -> bool:
+        """Verifica se o processo supervisionado é o openfortivpn (direto ou via sudo)"""
+        process = self.process
+        if process is None:
+            return False
+        args = process.args if isinstance(process.args, (list, tuple)) else str(process.args).split()
+        return any(os.path.basename(str(arg)) == TUNNEL_COMMAND for arg in args)
+
+    def is_running(self) -> bool:
+        """Verifica se o processo supervisionado está vivo (estado em memória)"""
+        return self.state == STATE_RUNNING
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda a saída do processo.
+
+        Args:
+            timeout: Segundos máximos de espera (None = indefinido)
+
+        Returns:
+            True se o processo terminou dentro do prazo
+        """
+        if self.state == STATE_IDLE:
+            if timeout is not None:
+                time.sleep(timeout)
+            return False
+        return self._exited.wait(timeout)
+
+    def terminate(self, timeout: float = TERMINATE_TIMEOUT) -> Optional[int]:
+        """
+        Encerra o processo (SIGTERM, depois SIGKILL) e aguarda a saída.
+
+        Args:
+            timeout: Segundos entre SIGTERM e SIGKILL
+
+        Returns:
+            Código de saída ou None se não havia processo
+        """
+        process = self.process
+        if process is None:
+            return None
+        if self.is_running():
+            try:
+                process.terminate()
+                if not self._exited.wait(timeout):
+                    process.kill()
+                    self._exited.wait(timeout)
+            except OSError:
+                pass
+        return self.returncode
+
+    def _retire(self):
+        """Encerra (SIGTERM, depois SIGKILL) e aguarda o processo anterior, se ainda vivo"""
+        if self.is_running():
+            self.terminate()
+
+    def release(self):
+        """Deixa de supervisionar o processo atual sem encerrá-lo"""
+        wakeup, self._wakeup = self._wakeup, None
+        if wakeup is not None:
+            try:
+                os.write(wakeup, b'x')
+            except OSError:
+                pass
+            os.close(wakeup)
+        with self._lock:
+            self.process = None
+            self.state = STATE_IDLE
+        with _supervisors_lock:
+            _supervisors.discard(self)
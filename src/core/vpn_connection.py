@@ -6,10 +6,14 @@ Módulo de conexão VPN - Azure CLI, openfortivpn
 import subprocess
 import sys
 import json
-import ssl
-import urllib.request
-import urllib.error
-from typing import Optional, Tuple, Dict
+import time
+from typing import Optional, Tuple, Dict, List
+
+from .tunnel_supervisor import TunnelSupervisor, tunnel_running
+from .token_cache import get_token_cache
+from .gateway_client import get_gateway_client
+from .openfortivpn_events import OpenfortivpnSession, EVENT_SAML_URL
+from .phase_profiler import PhaseProfiler
 
 
 class AzureAuth:
@@ -44,39 +48,21 @@ class AzureAuth:
     
     @staticmethod
     def get_token() -> Optional[str]:
-        """Obtém token de acesso do Azure CLI"""
-        success, output = AzureAuth.run_command(["az", "account", "get-access-token", "--output", "json"])
-        if success:
-            try:
-                token_info = json.loads(output)
-                return token_info.get("accessToken")
-            except Exception:
-                pass
-        return None
+        """Obtém token de acesso do Azure CLI (do cache; o az só roda se não há token válido)"""
+        entry = get_token_cache().get()
+        return entry['access_token'] if entry else None
     
     @staticmethod
     def authenticate_with_token(gateway: str, port: int, access_token: str) -> bool:
-        """Tenta autenticar no gateway VPN usando token Azure CLI"""
-        saml_url = f"https://{gateway}:{port}/remote/saml/start?redirect=1"
+        """Tenta autenticar no gateway VPN usando token Azure CLI (conexão e sessão TLS reaproveitadas)"""
+        headers = {
+            'Authorization': f'Bearer {access_token}',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
+        }
         
         try:
-            context = ssl.create_default_context()
-            context.check_hostname = False
-            context.verify_mode = ssl.CERT_NONE
-            
-            headers = {
-                'Authorization': f'Bearer {access_token}',
-                'User-Agent': 'VPN-Client/1.0',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
-            }
-            
-            req = urllib.request.Request(saml_url, headers=headers)
-            
-            try:
-                with urllib.request.urlopen(req, timeout=10, context=context) as response:
-                    return True
-            except urllib.error.HTTPError as e:
-                return e.code in [200, 302, 401, 403]
+            response = get_gateway_client(gateway, port).request('GET', '/remote/saml/start?redirect=1', headers)
+            return response['status'] < 400 or response['status'] in [401, 403]
         except Exception:
             return False
 
@@ -87,6 +73,9 @@ class VpnConnection:
     # Digest conhecido do certificado (em minúsculas como openfortivpn espera)
     CERT_DIGEST = "2285b102c6bcbfef350f48611daba7de94325d8e482f901aa0c813cdbbfb064e"
     
+    # Sessão openfortivpn da última chamada a connect() (eventos e saída em background)
+    session = None
+    
     @staticmethod
     def check_openfortivpn() -> bool:
         """Verifica se openfortivpn está instalado"""
@@ -96,6 +85,9 @@ class VpnConnection:
     @staticmethod
     def check_vpn_connected() -> bool:
         """Verifica se VPN está conectada"""
+        # Túnel supervisionado: estado em memória, sem subprocessos
+        if tunnel_running():
+            return True
         try:
             # Verificar processos openfortivpn
             result = subprocess.run(['pgrep', '-f', 'openfortivpn'], capture_output=True)
@@ -112,7 +104,9 @@ class VpnConnection:
             return False
     
     @staticmethod
-    def connect(gateway: str, port: int = 443, username: Optional[str] = None) -> bool:
+    def connect(gateway: str, port: int = 443, username: Optional[str] = None,
+                profiler: Optional[PhaseProfiler] = None, preflight: Optional[Dict] = None,
+                profile_log: Optional[str] = None) -> bool:
         """
         Conecta à VPN usando openfortivpn com Azure CLI.
         
@@ -120,29 +114,61 @@ class VpnConnection:
             gateway: Endereço do gateway VPN
             port: Porta do gateway (padrão: 443)
             username: Nome de usuário (opcional)
+            profiler: Profiler da tentativa; se omitido, um novo é criado
+                (gravado só se profile_log for informado)
+            preflight: Resultado de run_preflight já executado pelo chamador;
+                se omitido, as checagens rodam aqui (em paralelo)
+            profile_log: Log JSON lines do profiler criado aqui (None = não gravar)
         
         Returns:
-            True se conectou com sucesso, False caso contrário
+            True assim que o túnel sobe, False se o openfortivpn terminou antes
         """
-        # Verificar Azure CLI
-        azure_authenticated, account_info = AzureAuth.check_authenticated()
-        
-        if not azure_authenticated:
-            if not AzureAuth.login():
-                return False
-            azure_authenticated, account_info = AzureAuth.check_authenticated()
-        
-        # Obter token
-        access_token = AzureAuth.get_token()
+        owns_profiler = profiler is None
+        if owns_profiler:
+            profiler = PhaseProfiler(profile_log, gateway=gateway, port=port, source='connect')
+        success = VpnConnection._connect(gateway, port, username, profiler, preflight)
+        if owns_profiler:
+            profiler.finish(success)
+        return success
+    
+    @staticmethod
+    def _connect(gateway: str, port: int, username: Optional[str], profiler: PhaseProfiler,
+                 preflight: Optional[Dict]) -> bool:
+        """Implementação de connect() com cada fase cronometrada"""
+        if preflight is None:
+            # Import local: preflight depende deste módulo
+            from .preflight import run_preflight
+            preflight = run_preflight(gateway, port, profiler=profiler)
         
-        if not VpnConnection.check_openfortivpn():
+        if not preflight['authenticated'] or not preflight['openfortivpn']:
             return False
         
-        # Tentar autenticar com token Azure CLI antes
-        if access_token:
-            AzureAuth.authenticate_with_token(gateway, port, access_token)
+        spawned_at = time.monotonic()
+        session = VpnConnection.spawn_session(gateway, port, username)
+        if session is None:
+            return False
+        session.start()
+        process = session.process
         
-        # Construir comando
+        try:
+            # Retorna assim que o túnel sobe; a sessão segue lendo a saída
+            up = session.wait_until_up()
+            # Fases internas do openfortivpn (navegador SAML, PPP, rotas) a partir dos eventos
+            profiler.add_events(session.events, spawned_at)
+            return up
+        except KeyboardInterrupt:
+            process.terminate()
+            process.wait()
+            return True
+        except Exception:
+            process.terminate()
+            process.wait()
+            return False
+    
+    @staticmethod
+    def build_command(gateway: str, port: int = 443, username: Optional[str] = None,
+                      extra_args: Optional[List[str]] = None) -> List[str]:
+        """Monta o comando do openfortivpn (com sudo)"""
         cmd = ["openfortivpn", f"{gateway}:{port}", "--saml-login"]
         
         # Adicionar certificado confiável
@@ -152,71 +178,73 @@ class VpnConnection:
         if username:
             cmd.extend(["--username", username])
         
+        if extra_args:
+            cmd.extend(extra_args)
+        
+        return ["sudo"] + cmd
+    
+    @staticmethod
+    def spawn_session(gateway: str, port: int = 443, username: Optional[str] = None,
+                      supervisor: Optional[TunnelSupervisor] = None,
+                      extra_args: Optional[List[str]] = None) -> Optional[OpenfortivpnSession]:
+        """
+        Inicia o openfortivpn e cria a sessão que consome sua saída.
+        
+        A sessão volta sem iniciar a leitura: o chamador registra seus
+        listeners e chama start(). A URL SAML abre o navegador.
+        
+        Args:
+            gateway: Endereço do gateway VPN
+            port: Porta do gateway
+            username: Nome de usuário (opcional)
+            supervisor: Supervisor que passa a ser dono do processo (opcional)
+            extra_args: Argumentos extras do openfortivpn (ex: '--set-routes=0')
+        
+        Returns:
+            Sessão (também em VpnConnection.session) ou None se o spawn falhou
+        """
+        command = VpnConnection.build_command(gateway, port, username, extra_args=extra_args)
+        popen_kwargs = {'stdout': subprocess.PIPE, 'stderr': subprocess.STDOUT, 'text': True, 'bufsize': 1}
         try:
-            # Executar openfortivpn com sudo
-            sudo_cmd = ["sudo"] + cmd
-            process = subprocess.Popen(
-                sudo_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1
-            )
-            
-            saml_url = None
-            browser_opened = False
-            
-            # Ler output em tempo real
-            for line in iter(process.stdout.readline, ''):
-                if line:
-                    line_stripped = line.rstrip()
-                    
-                    # Detectar URL SAML
-                    if "Authenticate at" in line_stripped or "saml" in line_stripped.lower():
-                        if "http" in line_stripped:
-                            import re
-                            urls = re.findall(r'https?://[^\s\']+', line_stripped)
-                            if urls and not browser_opened:
-                                saml_url = urls[0]
-                                try:
-                                    subprocess.run(["open", saml_url], check=False)
-                                    browser_opened = True
-                                except Exception:
-                                    pass
-                    
-                    # Verificar se conectou
-                    if "connected" in line.lower() or "tunnel is up" in line.lower():
-                        # Manter processo rodando
-                        try:
-                            for line in iter(process.stdout.readline, ''):
-                                if line:
-                                    line_stripped = line.rstrip()
-                                    if "disconnected" in line.lower() or "connection closed" in line.lower():
-                                        return False
-                        except KeyboardInterrupt:
-                            process.terminate()
-                            process.wait()
-                            return True
-                        
-                        return True
-                    
-                    # Verificar erros
-                    if "error" in line.lower() and "failed" in line.lower() and "certificate" not in line.lower():
-                        return False
-            
-            process.wait()
-            return process.returncode == 0
-            
-        except KeyboardInterrupt:
-            if 'process' in locals():
-                process.terminate()
-                process.wait()
-            return True
+            if supervisor is not None:
+                process = supervisor.spawn(command, **popen_kwargs)
+            else:
+                process = subprocess.Popen(command, **popen_kwargs)
         except Exception:
-            if 'process' in locals():
-                process.terminate()
-                process.wait()
-            return False
+            return None
+        if process is None:
+            return None
+        
+        session = OpenfortivpnSession(process)
+        session.add_listener(VpnConnection._open_saml_url)
+        VpnConnection.session = session
+        return session
+    
+    @staticmethod
+    def _open_saml_url(event: Dict):
+        """Abre o navegador na URL de login SAML emitida pelo openfortivpn"""
+        if event['kind'] != EVENT_SAML_URL:
+            return
+        try:
+            subprocess.run(["open", event['url']], check=False)
+        except Exception:
+            pass
+    
+    @staticmethod
+    def wait_disconnected(timeout: Optional[float] = None) -> bool:
+        """
+        Aguarda o fim da sessão openfortivpn iniciada por connect().
+        
+        Args:
+            timeout: Segundos máximos de espera (None = indefinido)
+        
+        Returns:
+            True se a sessão terminou (ou não há sessão), False se o prazo esgotou
+        """
+        session = VpnConnection.session
+        if session is None:
+            return True
+        return session.wait_closed(timeout)
     
     @staticmethod
     def disconnect():
@@ -3,15 +3,29 @@
 Módulo de monitoramento VPN - auto-reconexão
 """
 
-import subprocess
 import sys
 import os
 import time
+import threading
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 
 from .vpn_connection import VpnConnection
-from .network_stats import NetworkStats
+from .network_snapshot import NetworkSnapshot
+from .traffic_sampler import TrafficSampler
+from .rate_engine import RateEngine
+from .traffic_store import TrafficStore
+from .metrics_exporter import VpnMetrics, MetricsServer, DEFAULT_METRICS_HOST
+from .socket_traffic import SocketTrafficCollector, TOP_N
+from .latency_prober import LatencyProber
+from .liveness import LivenessMonitor, DEFAULT_BUDGET, STATE_ALIVE, STATE_SUSPECT
+from .connection_manager import ConnectionManager, STATE_CONNECTED, STATE_DISCONNECTED
+from .hot_standby import HotStandby
+from .gateway_pool import GatewayPool, parse_gateway
+from .reconnect_scheduler import ReconnectScheduler, CIRCUIT_OPEN, BASE_DELAY
+from .openfortivpn_events import EVENT_TUNNEL_UP
+from .netlink_discovery import get_discovery, EVENT_NETWORK_UP
+from .token_cache import get_token_cache
 from ..ui.terminal import Colors, Spinner, clear_screen, move_cursor_to_line, clear_from_cursor, strip_ansi
 from ..utils.formatters import format_bytes, format_speed, format_time
 
@@ -19,7 +33,12 @@ from ..utils.formatters import format_bytes, format_speed, format_time
 class VpnMonitor:
     """Classe para monitorar e reconectar VPN automaticamente"""
     
-    def __init__(self, gateway: str, port: int = 443, check_interval: int = 5, reconnect_delay: int = 10):
+    def __init__(self, gateway: str, port: int = 443, check_interval: int = 5, reconnect_delay: int = 10,
+                 history_dir: Optional[str] = None, metrics_port: Optional[int] = None,
+                 metrics_host: str = DEFAULT_METRICS_HOST, probe_targets: Optional[List[str]] = None,
+                 gateways: Optional[List] = None, liveness_budget: float = DEFAULT_BUDGET,
+                 standby: Optional[str] = None, standby_routes: Optional[List[str]] = None,
+                 token_cache_path: Optional[str] = None):
         """
         Inicializa monitor de VPN.
         
@@ -27,7 +46,23 @@ class VpnMonitor:
             gateway: Endereço do gateway VPN
             port: Porta do gateway
             check_interval: Intervalo de verificação em segundos
-            reconnect_delay: Delay antes de reconectar em segundos
+            reconnect_delay: Teto do backoff entre tentativas que falham, em segundos
+                (a primeira tentativa após uma queda é imediata)
+            history_dir: Diretório do histórico de tráfego (None = desativado)
+            metrics_port: Porta do endpoint OpenMetrics (None = desativado)
+            metrics_host: Endereço de escuta do endpoint de métricas
+            probe_targets: Alvos de latência pelo túnel (ex: 'tcp://10.0.0.1:22', 'https://intranet/')
+            gateways: Gateways regionais ('host[:porta]' ou candidatos de load_gateways);
+                conecta ao mais rápido saudável (gateway/port viram só o padrão inicial)
+            liveness_budget: Segundos de tx sem resposta até derrubar o túnel com o peer morto
+                (confirmado por sonda aos probe_targets; sem alvos o túnel nunca é derrubado,
+                a suspeita só aparece no painel)
+            standby: Sessão reserva sempre autenticada ('host[:porta]' ou ':porta' no mesmo
+                gateway); na queda da ativa as rotas passam para ela na hora (None = desativado)
+            standby_routes: CIDRs levados pela sessão ativa (None = os que o openfortivpn
+                instalou na primeira subida)
+            token_cache_path: Arquivo do cache de token Azure (0600) para reaproveitá-lo
+                entre execuções (None = só memória)
         """
         self.gateway = gateway
         self.port = port
@@ -35,25 +70,167 @@ class VpnMonitor:
         self.reconnect_delay = reconnect_delay
         self.reconnect_count = 0
         self.was_connected = False
-        self.connection_process = None
+        self.attempt_pending = False
+        self.scheduler = ReconnectScheduler(max_delay=max(reconnect_delay, BASE_DELAY))
+        # Interface de saída voltou (Wi-Fi, cabo): tentar já, sem esperar o backoff
+        discovery = get_discovery()
+        if discovery is not None:
+            discovery.subscribe(lambda event, interface, address:
+                                event == EVENT_NETWORK_UP and self.scheduler.wake())
+        # Conexão no próprio processo: cada reconexão é só um spawn do openfortivpn
+        pool = None
+        if gateways:
+            pool = GatewayPool([parse_gateway(item, port) if isinstance(item, str) else item for item in gateways])
+        self.hot_standby = None
+        if standby:
+            # Segunda sessão autenticada: a queda vira só uma troca de rotas
+            candidate = parse_gateway(gateway + standby if standby.startswith(':') else standby, port)
+            self.hot_standby = HotStandby(gateway, port, candidate['host'], candidate['port'],
+                                          routes=standby_routes, pool=pool)
+        self.manager = self.hot_standby or ConnectionManager(gateway, port, pool=pool)
+        self.failovers_seen = 0
+        # Saída do openfortivpn invalida o snapshot: o próximo tick já vê o túnel caído
+        self.manager.add_exit_listener(lambda returncode: NetworkSnapshot.invalidate())
         self.connection_start_time = None
-        self.last_rx_bytes = 0
-        self.last_tx_bytes = 0
-        self.last_time = time.time()
+        # Mantém o token renovado em background: a reconexão (ConnectionManager) não espera pelo az
+        self.token_cache = get_token_cache(token_cache_path)
+        self.token_cache.get(wait=False)
+        self.rates = RateEngine()
+        # Túnel novo (mesmo que volte como ppp0): contadores recomeçam, sem contar como reset
+        self.tunnel_changed = threading.Event()
+        self.manager.add_listener(lambda event: event['kind'] == EVENT_TUNNEL_UP and self.tunnel_changed.set())
+        self.sampler = None
+        self.store = None
+        if history_dir:
+            try:
+                self.store = TrafficStore(history_dir)
+            except OSError:
+                self.store = None
+        self.reconnect_started_at = None
+        self.socket_traffic = SocketTrafficCollector() if SocketTrafficCollector.is_supported() else None
+        self.probe_targets = list(probe_targets or [])
+        self.prober = None
+        self.liveness_budget = liveness_budget
+        self.liveness = None
+        self.dead_peer_count = 0
+        self.metrics = None
+        self.metrics_server = None
+        if metrics_port is not None:
+            self.metrics = VpnMetrics()
+            self.metrics_server = MetricsServer(self.metrics.registry, metrics_host, metrics_port)
+            if not self.metrics_server.start():
+                self.metrics = None
+                self.metrics_server = None
     
-    def connect_vpn_process(self) -> Optional[subprocess.Popen]:
-        """Conecta à VPN em processo separado"""
-        script_path = os.path.join(os.path.dirname(__file__), '../../scripts/connect_vpn.py')
+    def publish_metrics(self, is_connected: bool):
+        """Atualiza e pré-renderiza as métricas do tick (scrapes não disparam coleta)"""
+        if self.metrics is None:
+            return
+        uptime = 0
+        if is_connected and self.connection_start_time is not None:
+            uptime = time.monotonic() - self.connection_start_time
+        self.metrics.update_state(is_connected, self.reconnect_count, uptime)
+        self.metrics.update_traffic(self.rates)
+        if self.hot_standby is not None:
+            new = self.hot_standby.failover_count - self.failovers_seen
+            for record in self.hot_standby.failovers[-new:] if new > 0 else []:
+                self.metrics.observe_phase('failover', record['swap_ms'] / 1000)
+            self.failovers_seen = self.hot_standby.failover_count
+        if self.prober is not None:
+            self.metrics.update_latency(self.prober)
+        self.metrics.publish()
+    
+    def ensure_sampler(self, interface: str) -> TrafficSampler:
+        """Garante um amostrador em background rodando para a interface atual"""
+        if self.sampler is None or self.sampler.interface != interface:
+            self.stop_sampler()
+            self.sampler = TrafficSampler(interface)
+            if self.store is not None:
+                # Histórico persistente alimentado pelas mesmas leituras do amostrador
+                store = self.store
+                self.sampler.add_listener(lambda stats: store.record(stats, source=interface))
+            self.sampler.start()
+        return self.sampler
+    
+    def stop_sampler(self):
+        """Encerra o amostrador em background, se houver"""
+        self.stop_liveness()
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler = None
+    
+    def ensure_liveness(self, sampler: TrafficSampler, vpn_ip: str) -> LivenessMonitor:
+        """Garante o detector de peer morto alimentado pelas amostras do amostrador atual"""
+        source_ip = vpn_ip if vpn_ip != "N/A" else None
+        if self.liveness is None or self.liveness.source_ip != source_ip:
+            self.stop_liveness()
+            self.liveness = LivenessMonitor(self.probe_targets, self.on_peer_dead, source_ip=source_ip,
+                                            budget=self.liveness_budget)
+            sampler.add_listener(self.liveness.observe)
+        return self.liveness
+    
+    def stop_liveness(self):
+        """Encerra o detector de peer morto, se houver"""
+        if self.liveness is not None:
+            self.liveness.stop()
+            self.liveness = None
+    
+    def on_peer_dead(self, report: dict):
+        """
+        Peer parou de responder com o openfortivpn vivo: encerra o processo.
+        
+        A saída é vista na hora pelo supervisor (pidfd), o loop acorda e trata
+        como queda, com reconexão imediata. Com sessão reserva, as rotas
+        passam para ela e não há queda.
         
+        Args:
+            report: Estado do detector no momento da declaração
+        """
+        if not report.get('probes_failed'):
+            # Só uma sonda sem resposta derruba o túnel; contadores sozinhos são só indício
+            return
+        self.dead_peer_count += 1
+        if self.metrics is not None and report.get('evidence_since') is not None:
+            self.metrics.observe_phase('dead_peer', report['dead_at'] - report['evidence_since'])
+        self.manager.declare_dead(f"peer sem resposta por {report['budget']:g}s")
+    
+    def ensure_prober(self, vpn_ip: str) -> Optional[LatencyProber]:
+        """Garante probes de latência rodando com origem no IP atual da VPN"""
+        if not self.probe_targets:
+            return None
+        source_ip = vpn_ip if vpn_ip != "N/A" else None
+        if self.prober is None or self.prober.source_ip != source_ip:
+            self.stop_prober()
+            self.prober = LatencyProber(self.probe_targets, source_ip=source_ip)
+            self.prober.start()
+        return self.prober
+    
+    def stop_prober(self):
+        """Encerra os probes de latência, se houver"""
+        if self.prober is not None:
+            self.prober.stop()
+            self.prober = None
+    
+    def print_top_processes(self, vpn_ip: str):
+        """Exibe os processos que mais usam o túnel (Linux)"""
+        if self.socket_traffic is None or vpn_ip == "N/A":
+            return
         try:
-            process = subprocess.Popen(
-                [sys.executable, script_path, '--gateway', self.gateway, '--port', str(self.port)],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            return process
+            top = self.socket_traffic.top(vpn_ip, TOP_N)
         except Exception:
-            return None
+            return
+        print()
+        print(f"  {Colors.BRIGHT_CYAN}🔝 Processos no túnel{Colors.RESET}")
+        if not top:
+            print(f"     {Colors.DIM}Nenhuma conexão ativa{Colors.RESET}")
+            return
+        for process in top:
+            label = f"{process['name']} ({process['pid']})" if process['pid'] is not None else "desconhecido"
+            print(f"     {Colors.BOLD}{label:<24}{Colors.RESET} " +
+                  f"{Colors.CYAN}{process['connections']:>3} conn{Colors.RESET} " +
+                  f"{Colors.DIM}│{Colors.RESET} ⬇️ {Colors.BRIGHT_GREEN}{format_speed(process['rx_rate']):>12}{Colors.RESET} " +
+                  f"⬆️ {Colors.BRIGHT_GREEN}{format_speed(process['tx_rate']):>12}{Colors.RESET} " +
+                  f"{Colors.DIM}│ total {format_bytes(process['rx'] + process['tx'])}{Colors.RESET}")
     
     def get_enhanced_bar(self, frame: int, width: int, value: int = 0, max_value: int = 1000000000) -> str:
         """Cria barra de progresso animada"""
@@ -121,18 +298,33 @@ class VpnMonitor:
         try:
             while True:
                 current_time = datetime.now().strftime("%H:%M:%S")
-                is_connected = VpnConnection.check_vpn_connected()
+                # Um único snapshot responde status, interface, IP, MTU e contadores
+                snapshot = NetworkSnapshot.current()
+                # Conectado só com o túnel no ar: o openfortivpn já rodando durante SAML/PPP é progresso
+                is_connected = self.manager.state == STATE_CONNECTED
                 
-                # Verificar se processo de conexão ainda está rodando
-                if self.connection_process:
-                    if self.connection_process.poll() is not None:
-                        self.connection_process = None
-                
-                # Se não está conectado e não há processo de conexão
-                if not is_connected and self.connection_process is None:
-                    # Incrementar contador de reconexões se estava conectado antes
+                # Se não está conectado e não há tentativa em andamento (estado do gerenciador, sem syscalls)
+                if not is_connected and not self.manager.is_active():
+                    # Resultado da sonda ao gateway (roda em outra thread, o loop não bloqueia)
+                    self.scheduler.collect_probe()
+                    
+                    # Queda de um túnel que estava no ar: reconexão imediata
                     if self.was_connected:
                         self.reconnect_count += 1
+                        self.scheduler.record_drop()
+                        self.was_connected = False
+                        self.stop_sampler()
+                        self.stop_prober()
+                    elif self.attempt_pending:
+                        # Tentativa terminou sem túnel: backoff (e circuito, se o gateway não responde)
+                        self.scheduler.start_probe(self.manager.gateway, self.manager.port, after_failure=True)
+                    self.attempt_pending = False
+                    if self.reconnect_started_at is None:
+                        self.reconnect_started_at = time.monotonic()
+                    
+                    # Circuito aberto: só a sonda TCP ao gateway, sem openfortivpn
+                    if self.scheduler.should_probe():
+                        self.scheduler.start_probe(self.manager.gateway, self.manager.port)
                     
                     # Atualizar header com status desconectado
                     spinner = Spinner.get_char(int(time.time() * 5) % 8, 0)
@@ -149,81 +341,78 @@ class VpnMonitor:
                     move_cursor_to_line(content_start_line)
                     clear_from_cursor()
                     print(Colors.BRIGHT_RED + f"⚠️  VPN desconectada" + Colors.RESET)
-                    if self.was_connected:
+                    if self.reconnect_count:
                         print(Colors.BRIGHT_MAGENTA + f"📊 Reconexão #{self.reconnect_count}" + Colors.RESET)
-                    sys.stdout.flush()
+                    if self.manager.last_error:
+                        print(Colors.DIM + f"   Última falha: {self.manager.last_error}" + Colors.RESET)
                     
-                    # Animação de contagem regressiva
-                    for remaining in range(self.reconnect_delay, 0, -1):
-                        spinner = Spinner.get_char(int(time.time() * 10) % 8, 1)
-                        move_cursor_to_line(content_start_line + (2 if self.was_connected else 1))
-                        sys.stdout.write(f'{Colors.BRIGHT_YELLOW}{spinner} Reconectando em {remaining}s...{Colors.RESET}')
-                        sys.stdout.flush()
-                        time.sleep(1)
-                    move_cursor_to_line(content_start_line + (2 if self.was_connected else 1))
-                    sys.stdout.write(' ' * 50)
-                    sys.stdout.flush()
-                    
-                    # Atualizar header com status reconectando
-                    spinner = Spinner.get_char(int(time.time() * 10) % 8, 1)
-                    move_cursor_to_line(header_status_line)
-                    status_text = (f" {Colors.BRIGHT_YELLOW}{spinner} Reconectando...{Colors.RESET} " + 
-                                  f"{Colors.DIM}|{Colors.RESET} {Colors.CYAN}{current_time}{Colors.RESET} " +
-                                  f"{Colors.DIM}|{Colors.RESET} {Colors.BRIGHT_MAGENTA}Reconexões: {self.reconnect_count}{Colors.RESET}")
-                    status_text_plain = strip_ansi(status_text)
-                    padding = max(0, terminal_width - len(status_text_plain) - 3)
-                    print(Colors.BRIGHT_CYAN + "║" + Colors.RESET + status_text + " " * padding + Colors.BRIGHT_CYAN + "║" + Colors.RESET)
-                    sys.stdout.flush()
-                    
-                    # Mostrar no conteúdo
-                    move_cursor_to_line(content_start_line)
-                    clear_from_cursor()
-                    print(Colors.BRIGHT_BLUE + f"🔌 Tentando conectar..." + Colors.RESET)
-                    sys.stdout.flush()
-                    
-                    self.connection_process = self.connect_vpn_process()
-                    
-                    move_cursor_to_line(content_start_line)
-                    clear_from_cursor()
-                    if self.connection_process:
-                        print(Colors.BRIGHT_GREEN + f"✅ Processo de conexão iniciado (PID: {self.connection_process.pid})" + Colors.RESET)
+                    if self.scheduler.probing:
+                        print(Colors.BRIGHT_YELLOW + f"🔎 Sondando o gateway {self.manager.gateway}:{self.manager.port}..." +
+                              Colors.RESET)
+                    elif self.scheduler.circuit == CIRCUIT_OPEN:
+                        # Sem contagem bloqueante: o loop acorda na hora da sonda ou num evento de rede
+                        print(Colors.BRIGHT_RED + f"⛔ Gateway inalcançável após {self.scheduler.failures} falhas; " +
+                              f"próxima sonda em {self.scheduler.delay():.0f}s" + Colors.RESET)
+                    elif not self.scheduler.due():
+                        print(Colors.BRIGHT_YELLOW + f"⏳ Reconectando em {self.scheduler.delay():.0f}s " +
+                              f"(falhas seguidas: {self.scheduler.failures})" + Colors.RESET)
                     else:
-                        print(Colors.BRIGHT_RED + f"❌ Erro ao iniciar conexão" + Colors.RESET)
+                        # Atualizar header com status reconectando
+                        spinner = Spinner.get_char(int(time.time() * 10) % 8, 1)
+                        move_cursor_to_line(header_status_line)
+                        status_text = (f" {Colors.BRIGHT_YELLOW}{spinner} Reconectando...{Colors.RESET} " + 
+                                      f"{Colors.DIM}|{Colors.RESET} {Colors.CYAN}{current_time}{Colors.RESET} " +
+                                      f"{Colors.DIM}|{Colors.RESET} {Colors.BRIGHT_MAGENTA}Reconexões: {self.reconnect_count}{Colors.RESET}")
+                        status_text_plain = strip_ansi(status_text)
+                        padding = max(0, terminal_width - len(status_text_plain) - 3)
+                        print(Colors.BRIGHT_CYAN + "║" + Colors.RESET + status_text + " " * padding + Colors.BRIGHT_CYAN + "║" + Colors.RESET)
+                        
+                        move_cursor_to_line(content_start_line)
+                        clear_from_cursor()
+                        self.attempt_pending = self.manager.connect()
+                        if self.attempt_pending:
+                            print(Colors.BRIGHT_GREEN + f"✅ Tentativa de conexão #{self.manager.attempts} iniciada" + Colors.RESET)
+                        else:
+                            print(Colors.BRIGHT_RED + "❌ Erro ao iniciar conexão" + Colors.RESET)
                     sys.stdout.flush()
-                    
-                    self.was_connected = False
                 
                 # Se está conectado
                 elif is_connected:
                     # Verificar interface para obter estatísticas
-                    interface = NetworkStats.get_vpn_interface()
+                    # Com sessão reserva, só a ativa leva as rotas
+                    interface = self.manager.interface or snapshot.get_vpn_interface()
                     if interface:
                         # Obter estatísticas básicas
-                        stats = NetworkStats.get_interface_stats(interface)
+                        stats = snapshot.get_interface_stats(interface)
                         if stats:
                             rx_bytes = stats['rx']
                             tx_bytes = stats['tx']
                             
-                            # Calcular velocidade
-                            current_time_sec = time.time()
-                            time_diff = current_time_sec - self.last_time
-                            
-                            if time_diff > 0:
-                                rx_speed = (rx_bytes - self.last_rx_bytes) / time_diff
-                                tx_speed = (tx_bytes - self.last_tx_bytes) / time_diff
-                            else:
-                                rx_speed = 0
-                                tx_speed = 0
+                            # Calcular velocidade (monotônico, tolera reset/wrap após reconexão)
+                            if self.tunnel_changed.is_set():
+                                self.tunnel_changed.clear()
+                                self.rates.rebase()
+                            speeds = self.rates.update(stats, source=interface)
+                            rx_speed = speeds['rx']
+                            tx_speed = speeds['tx']
+                            session_bytes = self.rates.totals['rx'] + self.rates.totals['tx']
                             
-                            self.last_rx_bytes = rx_bytes
-                            self.last_tx_bytes = tx_bytes
-                            self.last_time = current_time_sec
+                            # Histórico em alta frequência (picos e percentis)
+                            sampler = self.ensure_sampler(interface)
+                            peak = sampler.get_peak()
+                            window = sampler.window_stats(10)
                             
                             # Obter IP da VPN
-                            vpn_ip = NetworkStats.get_vpn_ip(interface)
+                            vpn_ip = snapshot.get_vpn_ip(interface)
+                            
+                            # Latência pelo túnel (probes com origem no IP da VPN)
+                            prober = self.ensure_prober(vpn_ip)
+                            
+                            # Peer morto com o processo vivo: rx parado + sondas, a cada amostra
+                            liveness = self.ensure_liveness(sampler, vpn_ip)
                             
                             # Obter detalhes da interface
-                            details = NetworkStats.get_interface_details(interface)
+                            details = snapshot.get_interface_details(interface)
                             mtu = details['mtu']
                             ipkts = details['ipkts']
                             opkts = details['opkts']
@@ -231,11 +420,16 @@ class VpnMonitor:
                             # Atualizar status de conexão
                             if not self.was_connected:
                                 self.was_connected = True
+                                self.attempt_pending = False
+                                self.scheduler.record_success()
+                                if self.reconnect_started_at is not None and self.metrics is not None:
+                                    self.metrics.observe_phase('reconnect', time.monotonic() - self.reconnect_started_at)
+                                self.reconnect_started_at = None
                                 if self.connection_start_time is None:
-                                    self.connection_start_time = time.time()
+                                    self.connection_start_time = time.monotonic()
                             
                             # Calcular tempo de conexão
-                            uptime_seconds = int(time.time() - self.connection_start_time)
+                            uptime_seconds = int(time.monotonic() - self.connection_start_time)
                             
                             # Calcular porcentagens
                             total_bytes = rx_bytes + tx_bytes
@@ -276,6 +470,8 @@ class VpnMonitor:
                             print(f"     {Colors.BOLD}Total:{Colors.RESET} {Colors.BRIGHT_GREEN}{format_bytes(rx_bytes):>15}{Colors.RESET} " +
                                   f"{Colors.DIM}({rx_percent:.1f}% do total){Colors.RESET}")
                             print(f"     {Colors.BOLD}Velocidade:{Colors.RESET} {Colors.BRIGHT_GREEN}{format_speed(rx_speed):>15}{Colors.RESET}")
+                            print(f"     {Colors.BOLD}p95 (10s):{Colors.RESET} {Colors.CYAN}{format_speed(window['rx']['p95'])}{Colors.RESET} " +
+                                  f"{Colors.DIM}│{Colors.RESET} {Colors.BOLD}Pico:{Colors.RESET} {Colors.BRIGHT_YELLOW}{format_speed(peak['rx'])}{Colors.RESET}")
                             print(f"     {Colors.BOLD}Packets:{Colors.RESET} {Colors.CYAN}{ipkts:,}{Colors.RESET}")
                             rx_bar = self.get_enhanced_bar(animation_frame, terminal_width - 10, rx_bytes, max(rx_bytes, tx_bytes, 1))
                             print(f"     {rx_bar}")
@@ -286,6 +482,8 @@ class VpnMonitor:
                             print(f"     {Colors.BOLD}Total:{Colors.RESET} {Colors.BRIGHT_GREEN}{format_bytes(tx_bytes):>15}{Colors.RESET} " +
                                   f"{Colors.DIM}({tx_percent:.1f}% do total){Colors.RESET}")
                             print(f"     {Colors.BOLD}Velocidade:{Colors.RESET} {Colors.BRIGHT_GREEN}{format_speed(tx_speed):>15}{Colors.RESET}")
+                            print(f"     {Colors.BOLD}p95 (10s):{Colors.RESET} {Colors.CYAN}{format_speed(window['tx']['p95'])}{Colors.RESET} " +
+                                  f"{Colors.DIM}│{Colors.RESET} {Colors.BOLD}Pico:{Colors.RESET} {Colors.BRIGHT_YELLOW}{format_speed(peak['tx'])}{Colors.RESET}")
                             print(f"     {Colors.BOLD}Packets:{Colors.RESET} {Colors.CYAN}{opkts:,}{Colors.RESET}")
                             tx_bar = self.get_enhanced_bar(animation_frame + terminal_width, terminal_width - 10, tx_bytes, max(rx_bytes, tx_bytes, 1))
                             print(f"     {tx_bar}")
@@ -297,14 +495,75 @@ class VpnMonitor:
                                   " " * (terminal_width - 25) + Colors.BRIGHT_CYAN + "║" + Colors.RESET)
                             print(Colors.BRIGHT_CYAN + "║" + Colors.RESET + f"     {Colors.BOLD}Total Transferido:{Colors.RESET} {Colors.BRIGHT_GREEN}{format_bytes(total_bytes):>15}{Colors.RESET}" +
                                   " " * (terminal_width - 45) + Colors.BRIGHT_CYAN + "║" + Colors.RESET)
+                            print(Colors.BRIGHT_CYAN + "║" + Colors.RESET + f"     {Colors.BOLD}Total na Sessão:{Colors.RESET} {Colors.BRIGHT_GREEN}{format_bytes(session_bytes):>15}{Colors.RESET}" +
+                                  " " * (terminal_width - 43) + Colors.BRIGHT_CYAN + "║" + Colors.RESET)
                             print(Colors.BRIGHT_CYAN + "║" + Colors.RESET + f"     {Colors.BOLD}Velocidade Média:{Colors.RESET} {Colors.BRIGHT_GREEN}{format_speed(avg_speed):>15}{Colors.RESET}" +
                                   " " * (terminal_width - 45) + Colors.BRIGHT_CYAN + "║" + Colors.RESET)
+                            if prober is not None:
+                                latency = prober.overall()
+                                latency_text = (f"     {Colors.BOLD}Latência:{Colors.RESET} " +
+                                                f"{Colors.BRIGHT_GREEN}p50 {latency['p50'] / 1000:.1f} ms{Colors.RESET} " +
+                                                f"{Colors.DIM}│{Colors.RESET} {Colors.BRIGHT_YELLOW}p99 {latency['p99'] / 1000:.1f} ms{Colors.RESET} " +
+                                                f"{Colors.DIM}│{Colors.RESET} {Colors.BOLD}Perda:{Colors.RESET} " +
+                                                f"{Colors.BRIGHT_RED if latency['loss'] else Colors.BRIGHT_GREEN}{latency['loss'] * 100:.1f}%{Colors.RESET}")
+                                padding = max(0, terminal_width - len(strip_ansi(latency_text)) - 3)
+                                print(Colors.BRIGHT_CYAN + "║" + Colors.RESET + latency_text + " " * padding + Colors.BRIGHT_CYAN + "║" + Colors.RESET)
+                            liveness_status = liveness.detector.status()
+                            if liveness_status['state'] == STATE_ALIVE:
+                                liveness_label = f"{Colors.BRIGHT_GREEN}respondendo{Colors.RESET}"
+                            elif liveness_status['state'] == STATE_SUSPECT and not self.probe_targets:
+                                liveness_label = f"{Colors.BRIGHT_YELLOW}tx sem rx (sem alvos de sonda){Colors.RESET}"
+                            elif liveness_status['state'] == STATE_SUSPECT:
+                                liveness_label = f"{Colors.BRIGHT_YELLOW}sem resposta, sondando{Colors.RESET}"
+                            else:
+                                liveness_label = f"{Colors.BRIGHT_RED}sem resposta, reconectando{Colors.RESET}"
+                            liveness_text = (f"     {Colors.BOLD}Peer:{Colors.RESET} {liveness_label} " +
+                                             f"{Colors.DIM}│ prazo {liveness_status['budget']:g}s │ " +
+                                             f"sondas {liveness_status['probes_sent']} │ " +
+                                             f"quedas detectadas {self.dead_peer_count}{Colors.RESET}")
+                            padding = max(0, terminal_width - len(strip_ansi(liveness_text)) - 3)
+                            print(Colors.BRIGHT_CYAN + "║" + Colors.RESET + liveness_text + " " * padding + Colors.BRIGHT_CYAN + "║" + Colors.RESET)
+                            if self.hot_standby is not None:
+                                standby_status = self.hot_standby.status()
+                                if standby_status['standby_interface']:
+                                    standby_label = f"{Colors.BRIGHT_GREEN}pronta ({standby_status['standby_interface']}){Colors.RESET}"
+                                elif standby_status['standby']['state'] != STATE_DISCONNECTED:
+                                    standby_label = f"{Colors.BRIGHT_YELLOW}subindo{Colors.RESET}"
+                                else:
+                                    standby_label = f"{Colors.BRIGHT_RED}fora do ar{Colors.RESET}"
+                                last_failover = standby_status['last_failover']
+                                failover_info = (f" │ última {last_failover['swap_ms']:.1f} ms ({last_failover['reason']})"
+                                                 if last_failover else "")
+                                standby_text = (f"     {Colors.BOLD}Reserva:{Colors.RESET} {standby_label} " +
+                                                f"{Colors.DIM}│ {standby_status['standby_gateway']} │ " +
+                                                f"trocas {standby_status['failovers']}{failover_info}{Colors.RESET}")
+                                padding = max(0, terminal_width - len(strip_ansi(standby_text)) - 3)
+                                print(Colors.BRIGHT_CYAN + "║" + Colors.RESET + standby_text + " " * padding + Colors.BRIGHT_CYAN + "║" + Colors.RESET)
                             print(Colors.BRIGHT_CYAN + "╚" + "═" * (terminal_width - 2) + "╝" + Colors.RESET)
                             
+                            # Quem está usando o túnel
+                            self.print_top_processes(vpn_ip)
+                            
                             sys.stdout.flush()
                 
-                # Aguardar antes da próxima verificação
-                time.sleep(self.check_interval)
+                # Tentativa em andamento: progresso a partir da saída do openfortivpn
+                else:
+                    status = self.manager.status()
+                    move_cursor_to_line(content_start_line)
+                    clear_from_cursor()
+                    print(Colors.BRIGHT_BLUE + f"🔌 Conectando ({status['openfortivpn_state'] or status['state']})..." + Colors.RESET)
+                    if status['last_line']:
+                        print(Colors.DIM + f"   {status['last_line'][:terminal_width - 4]}" + Colors.RESET)
+                    sys.stdout.flush()
+                
+                self.publish_metrics(is_connected)
+                
+                # Aguardar antes da próxima verificação; a saída do openfortivpn
+                # acorda o loop imediatamente, e um evento de rede antecipa a reconexão
+                if not is_connected and not self.manager.is_active():
+                    self.scheduler.wait(self.check_interval)
+                else:
+                    self.manager.wait(self.check_interval)
         
         except KeyboardInterrupt:
             print()
@@ -313,9 +572,15 @@ class VpnMonitor:
             
             Spinner.animate("Desconectando", 1, 1)
             
-            # Matar processos de conexão
-            if self.connection_process:
-                self.connection_process.terminate()
+            self.stop_sampler()
+            self.stop_prober()
+            if self.store is not None:
+                self.store.close()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+            
+            # Encerrar o openfortivpn supervisionado
+            self.manager.disconnect()
             
             # Desconectar VPN
             VpnConnection.disconnect()
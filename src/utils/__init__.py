@@ -1,6 +1,7 @@
 """Módulo de utilitários"""
 
 from .formatters import format_bytes, format_speed, format_time
+from .histogram import LatencyHistogram
 
-__all__ = ['format_bytes', 'format_speed', 'format_time']
+__all__ = ['format_bytes', 'format_speed', 'format_time', 'LatencyHistogram']
 
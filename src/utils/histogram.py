@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Módulo de histograma de latência - buckets logarítmicos (estilo HDR)
+"""
+
+import math
+from array import array
+from typing import Dict, Tuple
+
+
+# Configuração
+SUB_BUCKET_BITS = 7  # 64 buckets por potência de 2: erro relativo < 1,6%
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT // 2
+MAX_VALUE = (1 << 36) - 1  # ~19 horas em microssegundos; valores maiores são saturados
+
+
+def bucket_index(value: int) -> int:
+    """
+    Índice do bucket de um valor.
+
+    Valores abaixo de SUB_BUCKET_COUNT têm bucket exato; acima disso cada
+    potência de 2 é dividida em SUB_BUCKET_HALF buckets de mesma largura.
+
+    Args:
+        value: Valor inteiro não negativo
+
+    Returns:
+        Índice do bucket
+    """
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF + (value >> shift) - SUB_BUCKET_HALF
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """
+    Menor e maior valor representados por um bucket.
+
+    Args:
+        index: Índice do bucket
+
+    Returns:
+        Tupla (mínimo, máximo) inclusivos
+    """
+    if index < SUB_BUCKET_COUNT:
+        return index, index
+    offset = index - SUB_BUCKET_COUNT
+    shift = offset // SUB_BUCKET_HALF + 1
+    sub = offset % SUB_BUCKET_HALF + SUB_BUCKET_HALF
+    return sub << shift, ((sub + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Histograma de valores inteiros (ex: microssegundos) com memória limitada"""
+
+    def __init__(self):
+        """Inicializa histograma vazio"""
+        self.counts = array('Q', bytes(8 * (bucket_index(MAX_VALUE) + 1)))
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, value: int, count: int = 1):
+        """
+        Registra uma ou mais ocorrências de um valor. Custo O(1).
+
+        Args:
+            value: Valor a registrar (negativos viram 0, acima de MAX_VALUE saturam)
+            count: Número de ocorrências
+        """
+        value = min(max(int(value), 0), MAX_VALUE)
+        self.counts[bucket_index(value)] += count
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += count
+        self.total += value * count
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Soma as contagens de outro histograma neste"""
+        if other.count == 0:
+            return
+        counts = self.counts
+        for index, value in enumerate(other.counts):
+            if value:
+                counts[index] += value
+        if self.count == 0 or other.min < self.min:
+            self.min = other.min
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def reset(self):
+        """Zera o histograma mantendo a memória alocada"""
+        if self.count:
+            self.counts = array('Q', bytes(8 * len(self.counts)))
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def copy(self) -> 'LatencyHistogram':
+        """Cópia independente do histograma"""
+        clone = LatencyHistogram()
+        clone.merge(self)
+        return clone
+
+    def mean(self) -> float:
+        """Média dos valores registrados (0 se vazio)"""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> int:
+        """
+        Percentil por nearest-rank, com a precisão do bucket.
+
+        Args:
+            pct: Percentil desejado (0-100)
+
+        Returns:
+            Maior valor do bucket que contém o percentil (limitado ao máximo
+            observado), ou 0 se vazio
+        """
+        if self.count == 0:
+            return 0
+        rank = min(self.count, max(1, int(math.ceil(pct / 100.0 * self.count))))
+        seen = 0
+        for index, value in enumerate(self.counts):
+            if value:
+                seen += value
+                if seen >= rank:
+                    return max(self.min, min(bucket_bounds(index)[1], self.max))
+        return self.max
+
+    def summary(self, percentiles=(50, 90, 99)) -> Dict[str, float]:
+        """
+        Resumo do histograma.
+
+        Args:
+            percentiles: Percentis a incluir
+
+        Returns:
+            Dicionário {'count', 'min', 'max', 'mean', 'p50', ...}
+        """
+        result = {'count': self.count, 'min': self.min, 'max': self.max, 'mean': self.mean()}
+        for pct in percentiles:
+            result[f'p{pct:g}'] = self.percentile(pct)
+        return result